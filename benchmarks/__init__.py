@@ -0,0 +1,3 @@
+"""
+Benchmarks de performance (à lancer depuis la racine: python -m benchmarks.<nom>)
+"""
@@ -0,0 +1,144 @@
+"""
+Benchmark du moteur d'exposition vectorisé
+
+Compare, sur des actifs synthétiques, les boucles Python historiques (dictionnaires
+catégories × zones parcourus actif par actif) au moteur NumPy: construction des tableaux
+une fois, puis répartitions filtrées par produits matriciels masqués.
+
+Usage:
+    python -m benchmarks.exposure_engine [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from config.app_config import ASSET_CATEGORIES, GEO_ZONES
+from services.exposure_engine import ExposureEngine
+
+ACCOUNTS = [f"account-{i}" for i in range(20)]
+BANK_BY_ACCOUNT = {account: f"bank-{i % 5}" for i, account in enumerate(ACCOUNTS)}
+
+
+def make_assets(count: int, seed: int = 42) -> List[SimpleNamespace]:
+    """Génère des actifs synthétiques (1 à 3 catégories, 1 à 4 zones par catégorie)"""
+    rng = random.Random(seed)
+    assets = []
+    for _ in range(count):
+        categories = rng.sample(ASSET_CATEGORIES, rng.randint(1, 3))
+        shares = [rng.random() for _ in categories]
+        allocation = {cat: 100 * share / sum(shares) for cat, share in zip(categories, shares)}
+        geo_allocation = {}
+        for category in categories:
+            zones = rng.sample(GEO_ZONES, rng.randint(1, 4))
+            zone_shares = [rng.random() for _ in zones]
+            geo_allocation[category] = {zone: 100 * share / sum(zone_shares) for zone, share in zip(zones, zone_shares)}
+        assets.append(SimpleNamespace(
+            account_id=rng.choice(ACCOUNTS), type_produit=rng.choice(["etf", "action", "scpi", "obligation"]),
+            value_eur=rng.uniform(100, 50000), valeur_actuelle=None,
+            allocation=allocation, geo_allocation=geo_allocation,
+        ))
+    return assets
+
+
+def legacy_breakdowns(assets: List[SimpleNamespace], bank_id: Optional[str], category: Optional[str]) -> Dict[str, Any]:
+    """Répartitions filtrées calculées par les boucles Python historiques"""
+    category_values = {cat: 0.0 for cat in ASSET_CATEGORIES}
+    geo_values = {zone: 0.0 for zone in GEO_ZONES}
+    for asset in assets:
+        if bank_id and BANK_BY_ACCOUNT.get(asset.account_id) != bank_id:
+            continue
+        if category and category not in asset.allocation:
+            continue
+        value = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
+        if not value:
+            continue
+        for cat in ASSET_CATEGORIES:
+            if cat in asset.allocation:
+                category_values[cat] += value * asset.allocation[cat] / 100.0
+        for cat, allocation_pct in asset.allocation.items():
+            if allocation_pct <= 0 or (category and cat != category):
+                continue
+            category_value = value * allocation_pct / 100
+            for zone, percentage in asset.geo_allocation.get(cat, {}).items():
+                if zone in geo_values:
+                    geo_values[zone] += category_value * percentage / 100
+    return {"categories": category_values, "zones": geo_values}
+
+
+def engine_breakdowns(engine: ExposureEngine, bank_id: Optional[str], category: Optional[str]) -> Dict[str, Any]:
+    """Mêmes répartitions calculées par le moteur vectorisé"""
+    selected = engine.mask(bank_id=bank_id, category=category)
+    return {"categories": engine.category_values(selected), "zones": engine.geo_values(selected, category)}
+
+
+def _best_of(repeat: int, func, *args) -> float:
+    """Meilleure durée (s) sur plusieurs exécutions"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_size(count: int, repeat: int) -> Dict[str, Any]:
+    """
+    Mesure les deux approches pour un nombre d'actifs
+
+    Args:
+        count: Nombre d'actifs synthétiques
+        repeat: Nombre de répétitions (meilleure durée retenue)
+
+    Returns:
+        Durées (ms) et écart maximal entre les résultats
+    """
+    assets = make_assets(count)
+    filters = [(None, None), ("bank-1", None), (None, "actions"), ("bank-2", "obligations")]
+
+    start = time.perf_counter()
+    engine = ExposureEngine.from_assets(assets, BANK_BY_ACCOUNT)
+    build = time.perf_counter() - start
+
+    legacy = sum(_best_of(repeat, legacy_breakdowns, assets, *f) for f in filters) / len(filters)
+    vectorized = sum(_best_of(repeat, engine_breakdowns, engine, *f) for f in filters) / len(filters)
+
+    max_error = 0.0
+    for bank_id, category in filters:
+        expected = legacy_breakdowns(assets, bank_id, category)
+        actual = engine_breakdowns(engine, bank_id, category)
+        for kind in ("categories", "zones"):
+            for key, value in expected[kind].items():
+                max_error = max(max_error, abs(value - actual[kind][key]))
+
+    return {
+        "assets": count,
+        "build_ms": build * 1000,
+        "legacy_ms": legacy * 1000,
+        "engine_ms": vectorized * 1000,
+        "max_error": max_error,
+        "memory_mb": (engine.values.nbytes + engine.weights.nbytes + engine.geo_weights.nbytes) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du moteur d'exposition vectorisé")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Nombres d'actifs (défaut: 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Répétitions par mesure (défaut: 3)")
+    args = parser.parse_args()
+
+    header = f"{'actifs':>8}{'construction':>14}{'boucles':>12}{'moteur':>12}{'gain':>8}{'mémoire':>10}{'écart max':>12}"
+    print(header)
+    print("-" * len(header))
+    for count in args.sizes:
+        r = run_size(count, args.repeat)
+        speedup = r["legacy_ms"] / r["engine_ms"] if r["engine_ms"] > 0 else 0.0
+        print(f"{r['assets']:>8}{r['build_ms']:>12.1f}ms{r['legacy_ms']:>10.1f}ms{r['engine_ms']:>10.2f}ms"
+              f"{speedup:>7.0f}x{r['memory_mb']:>8.1f}Mo{r['max_error']:>12.2e}")
+    print("\nDurées par répartition filtrée (catégories + zones), construction des tableaux comptée à part.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark de la synchronisation complète avec le fournisseur de données local
+
+Synchronise N actifs synthétiques portant M ISIN distincts (plus des actifs en devise
+étrangère et des métaux) dans une base SQLite temporaire, avec un fournisseur local
+(cf. services.price_providers.LocalPriceProvider) dont chaque appel dure --latency secondes
+et dont une proportion --failure-rate des symboles est en erreur. Les échecs étant tirés
+d'après la graine, deux exécutions avec les mêmes paramètres sont identiques.
+
+Deux passes sont mesurées: à froid (résolution des symboles et cotations) puis à chaud
+(cache des cotations, ISIN en échec en attente).
+
+Les actifs sont chiffrés avec les clés de l'application (python init_keys.py au préalable).
+
+Usage:
+    python -m benchmarks.price_sync [--assets 1000] [--isins 200] [--failure-rate 0.1]
+                                    [--latency 0.05] [--seed 42] [--fixtures DOSSIER_OU_CSV]
+"""
+import argparse
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.db_config import Base
+from database.instrument_reference import instrument_reference
+from database.models import Account, Asset, Bank, User
+from database.quote_store import quote_store
+from services import price_providers
+from services.asset_sync_service import AssetSyncService
+from services.price_providers import METAL_SYMBOLS, LocalPriceProvider
+
+# Pays des ISIN synthétiques et suffixe de leur place de cotation ("" pour un symbole trouvé par recherche)
+COUNTRIES = {"FR": ".PA", "DE": ".DE", "NL": ".AS", "IE": ""}
+FX_RATES = {"USD": 1.08, "GBP": 0.85, "CHF": 0.96, "JPY": 168.0}
+
+
+def make_isins(count: int) -> List[str]:
+    """Génère des ISIN synthétiques répartis entre les pays de COUNTRIES"""
+    countries = list(COUNTRIES)
+    return [f"{countries[i % len(countries)]}{i:09d}{i % 10}" for i in range(count)]
+
+
+def write_fixtures(directory: Path, isins: List[str], seed: int) -> None:
+    """Écrit quotes.csv (une cotation par ISIN et par métal) et fx_rates.csv"""
+    rng = random.Random(seed)
+    with open(directory / "quotes.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["symbol", "price", "isin", "currency", "exchange", "name", "quote_type"])
+        for isin in isins:
+            suffix = COUNTRIES[isin[:2]]
+            # Symboles sans suffixe: seulement retrouvés par la recherche
+            symbol = f"{isin}{suffix}" if suffix else f"X{isin[-6:]}.MI"
+            writer.writerow([symbol, round(rng.uniform(5, 500), 2), isin, "EUR", suffix.strip(".") or "MIL",
+                             f"Instrument {isin}", "ETF"])
+        for metal, symbol in METAL_SYMBOLS.items():
+            writer.writerow([symbol, round(rng.uniform(20, 2500), 2), "", "USD", "CMX", metal, "FUTURE"])
+    with open(directory / "fx_rates.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["currency", "rate"])
+        writer.writerows(FX_RATES.items())
+
+
+def populate(session_factory, isins: List[str], count: int, seed: int) -> None:
+    """Crée un utilisateur, un compte et `count` actifs (ISIN, devises étrangères, métaux)"""
+    rng = random.Random(seed)
+    with session_factory() as db:
+        db.add(User(id="bench-user", username="bench", email="bench@example.com", password_hash="-", is_active=True))
+        db.add(Bank(id="bench-bank", owner_id="bench-user", nom="Banque"))
+        db.add(Account(id="bench-account", bank_id="bench-bank", type="titre", libelle="Compte"))
+        for i in range(count):
+            kind = i % 10
+            metal = kind == 9
+            db.add(Asset(
+                id=f"bench-asset-{i}", owner_id="bench-user", account_id="bench-account",
+                nom=f"{rng.choice(list(METAL_SYMBOLS))} {i}" if metal else f"Actif {i}",
+                type_produit="metal" if metal else "etf", categorie="metaux" if metal else "actions",
+                allocation={"metaux" if metal else "actions": 100}, geo_allocation={},
+                valeur_actuelle=1000.0, prix_de_revient=900.0,
+                devise=rng.choice(list(FX_RATES)) if kind == 8 else "EUR",
+                isin=None if kind >= 8 else isins[i % len(isins)],
+                ounces=rng.uniform(1, 20) if metal else None,
+            ))
+        db.commit()
+
+
+def run_pass(name: str, service: AssetSyncService, session_factory, provider: LocalPriceProvider) -> Dict[str, Any]:
+    """Exécute une synchronisation complète et mesure sa durée et ses appels au fournisseur"""
+    provider.calls = 0
+    start = time.perf_counter()
+    with session_factory() as db:
+        result = service.sync_all(db)
+        errors = db.query(Asset).filter(Asset.sync_error != None).count()
+    return {
+        "pass": name,
+        "duration": time.perf_counter() - start,
+        "fetch_time": result["timings"]["wall_time"],
+        "calls": provider.calls,
+        "updated": result["updated_count"],
+        "errors": errors,
+        "pending": len(result["pending_isins"]),
+    }
+
+
+def run_benchmark(assets: int, isins: int, failure_rate: float, latency: float, seed: int,
+                  fixtures: str = None) -> List[Dict[str, Any]]:
+    """
+    Mesure une synchronisation à froid puis à chaud dans une base temporaire
+
+    Args:
+        assets: Nombre d'actifs
+        isins: Nombre d'ISIN distincts
+        failure_rate: Proportion des symboles en erreur
+        latency: Latence par appel au fournisseur (secondes)
+        seed: Graine des données et des échecs
+        fixtures: Fixtures existantes (générées d'après les ISIN synthétiques si None)
+
+    Returns:
+        Mesures de chaque passe
+    """
+    isin_codes = make_isins(isins)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        if fixtures is None:
+            write_fixtures(temp_path, isin_codes, seed)
+            fixtures = temp_dir
+        provider = LocalPriceProvider(fixtures=fixtures, latency=latency, error_rate=failure_rate, seed=seed)
+
+        engine = create_engine(f"sqlite:///{temp_path / 'bench.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        populate(session_factory, isin_codes, assets, seed)
+
+        # Caches et fournisseur redirigés vers la base et les fixtures du benchmark
+        previous_provider = price_providers.set_provider(provider)
+        previous_binds = quote_store.bind, instrument_reference.bind
+        quote_store.bind = instrument_reference.bind = engine
+        quote_store.clear_memory()
+        try:
+            service = AssetSyncService()
+            results = [
+                run_pass("à froid", service, session_factory, provider),
+                run_pass("à chaud", service, session_factory, provider),
+            ]
+        finally:
+            quote_store.clear_memory()
+            quote_store.bind, instrument_reference.bind = previous_binds
+            price_providers.set_provider(previous_provider)
+            engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la synchronisation avec le fournisseur local")
+    parser.add_argument("--assets", type=int, default=1000, help="Actifs (défaut: 1000)")
+    parser.add_argument("--isins", type=int, default=200, help="ISIN distincts (défaut: 200)")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Proportion de symboles en erreur (défaut: 0.1)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence par appel en secondes (défaut: 0.05)")
+    parser.add_argument("--seed", type=int, default=42, help="Graine (défaut: 42)")
+    parser.add_argument("--fixtures", type=str, default=None, help="Répertoire ou CSV de fixtures (générées sinon)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.assets, args.isins, args.failure_rate, args.latency, args.seed, args.fixtures)
+
+    print(f"{args.assets} actifs, {args.isins} ISIN, {args.failure_rate:.0%} d'échecs, "
+          f"latence {args.latency * 1000:.0f}ms, graine {args.seed}\n")
+    header = f"{'passe':<10}{'durée':>9}{'récup.':>9}{'appels':>9}{'à jour':>9}{'erreurs':>9}{'attente':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['pass']:<10}{r['duration']:>8.2f}s{r['fetch_time']:>8.2f}s{r['calls']:>9}"
+              f"{r['updated']:>9}{r['errors']:>9}{r['pending']:>9}")
+
+
+if __name__ == "__main__":
+    main()
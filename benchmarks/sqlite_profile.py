@@ -0,0 +1,146 @@
+"""
+Benchmark du profil de performance SQLite
+
+Compare la latence des lectures et des écritures concurrentes entre le profil historique
+(journal DELETE, seul foreign_keys=ON) et le profil SQLITE_PRAGMAS: un écrivain enchaîne
+de petites transactions pendant que plusieurs lecteurs agrègent la table.
+
+Usage:
+    python -m benchmarks.sqlite_profile [--rows 5000] [--writes 300] [--readers 4]
+"""
+import argparse
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config.app_config import SQLITE_PRAGMAS
+from database.db_config import apply_sqlite_pragmas
+
+# Profil historique: uniquement les contraintes de clé étrangère, journal par défaut
+LEGACY_PRAGMAS = {"journal_mode": "DELETE", "foreign_keys": "ON"}
+
+
+def _connect(db_path: Path, pragmas: Dict[str, Any]) -> sqlite3.Connection:
+    """Ouvre une connexion avec un profil de pragmas"""
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    apply_sqlite_pragmas(conn, pragmas)
+    return conn
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    """Percentile d'une liste de durées (en ms)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(ratio * len(ordered)))] * 1000
+
+
+def run_profile(name: str, pragmas: Dict[str, Any], rows: int, writes: int, readers: int) -> Dict[str, Any]:
+    """
+    Mesure les latences de lecture et d'écriture pour un profil
+
+    Args:
+        name: Nom du profil
+        pragmas: Pragmas à appliquer
+        rows: Nombre de lignes initiales
+        writes: Nombre de transactions d'écriture
+        readers: Nombre de threads lecteurs
+
+    Returns:
+        Latences médianes et p95 (ms), débit d'écriture et nombre d'erreurs de verrouillage
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / "bench.db"
+        conn = _connect(db_path, pragmas)
+        conn.execute("CREATE TABLE assets (id INTEGER PRIMARY KEY, owner_id TEXT, value_eur REAL, payload TEXT)")
+        conn.executemany("INSERT INTO assets (owner_id, value_eur, payload) VALUES (?, ?, ?)",
+                         [(f"user-{i % 5}", float(i), "x" * 200) for i in range(rows)])
+        conn.commit()
+        conn.close()
+
+        read_latencies: List[float] = []
+        write_latencies: List[float] = []
+        locked_errors = [0]
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def reader():
+            reader_conn = _connect(db_path, pragmas)
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    reader_conn.execute(
+                        "SELECT owner_id, SUM(value_eur), COUNT(*) FROM assets GROUP BY owner_id").fetchall()
+                    with lock:
+                        read_latencies.append(time.perf_counter() - start)
+                except sqlite3.OperationalError:
+                    with lock:
+                        locked_errors[0] += 1
+            reader_conn.close()
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+
+        writer_conn = _connect(db_path, pragmas)
+        write_start = time.perf_counter()
+        for i in range(writes):
+            start = time.perf_counter()
+            try:
+                writer_conn.execute("UPDATE assets SET value_eur = value_eur + 1 WHERE id = ?", (i % rows + 1,))
+                writer_conn.commit()
+                write_latencies.append(time.perf_counter() - start)
+            except sqlite3.OperationalError:
+                writer_conn.rollback()
+                locked_errors[0] += 1
+        write_elapsed = time.perf_counter() - write_start
+        writer_conn.close()
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    return {
+        "profile": name,
+        "read_p50_ms": _percentile(read_latencies, 0.5),
+        "read_p95_ms": _percentile(read_latencies, 0.95),
+        "reads": len(read_latencies),
+        "write_p50_ms": _percentile(write_latencies, 0.5),
+        "write_p95_ms": _percentile(write_latencies, 0.95),
+        "writes_per_second": len(write_latencies) / write_elapsed if write_elapsed > 0 else 0.0,
+        "locked_errors": locked_errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du profil de performance SQLite")
+    parser.add_argument("--rows", type=int, default=5000, help="Lignes initiales (défaut: 5000)")
+    parser.add_argument("--writes", type=int, default=300, help="Transactions d'écriture (défaut: 300)")
+    parser.add_argument("--readers", type=int, default=4, help="Threads lecteurs (défaut: 4)")
+    args = parser.parse_args()
+
+    results = [
+        run_profile("historique", LEGACY_PRAGMAS, args.rows, args.writes, args.readers),
+        run_profile("SQLITE_PRAGMAS", SQLITE_PRAGMAS, args.rows, args.writes, args.readers),
+    ]
+
+    header = f"{'profil':<16}{'lect. p50':>11}{'lect. p95':>11}{'lectures':>10}" \
+             f"{'écr. p50':>11}{'écr. p95':>11}{'écr./s':>9}{'verrous':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['profile']:<16}{r['read_p50_ms']:>9.2f}ms{r['read_p95_ms']:>9.2f}ms{r['reads']:>10}"
+              f"{r['write_p50_ms']:>9.2f}ms{r['write_p95_ms']:>9.2f}ms{r['writes_per_second']:>9.0f}"
+              f"{r['locked_errors']:>9}")
+
+    legacy, tuned = results
+    if tuned["write_p50_ms"] > 0:
+        print(f"\nÉcritures: médiane {legacy['write_p50_ms'] / tuned['write_p50_ms']:.1f}x plus rapide, "
+              f"lectures servies: {tuned['reads']} contre {legacy['reads']}")
+
+
+if __name__ == "__main__":
+    main()
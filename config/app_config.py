@@ -1,31 +1,28 @@
 """
 Centralized application configuration
+
+L'import de ce module est sans effet de bord: il ne définit que des constantes.
+Les dossiers, le logging et la lecture des clés sont initialisés explicitement par
+bootstrap() ou paresseusement au premier accès (SECRET_KEY, ENCRYPTION_SALT).
 """
 
-import sys
+import os
+import threading
 from pathlib import Path
-
-from dotenv import load_dotenv
+from typing import Optional, Tuple
 
 # Import logger functions only, not the full module
+from utils.exceptions import ConfigurationError
 from utils.logger import get_logger, configure_logging
 
-# Load environment variables
-load_dotenv()
-
 # Directory paths
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 LOGS_DIR = BASE_DIR / "logs"
 STATIC_DIR = BASE_DIR / "static"
 
-# Ensure directories exist
-DATA_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
-
 # Dossier dédié pour les backups de clés
 KEY_BACKUPS_DIR = DATA_DIR / "key_backups"
-KEY_BACKUPS_DIR.mkdir(exist_ok=True)
 
 # Définir la configuration de logging
 LOGGING_CONFIG = {
@@ -63,9 +60,6 @@ LOGGING_CONFIG = {
     }
 }
 
-# Configurer le logging avec notre configuration
-configure_logging(LOGGING_CONFIG, LOGS_DIR)
-
 # Configure logger for this module
 logger = get_logger(__name__)
 
@@ -77,28 +71,135 @@ SQLALCHEMY_DATABASE_URL = f"sqlite:///{DB_PATH}"
 salt_file = DATA_DIR / ".salt"
 key_file = DATA_DIR / ".key"
 
-# Initialiser le gestionnaire de clés
-from utils.key_manager import KeyManager
-
-key_manager = KeyManager(DATA_DIR, KEY_BACKUPS_DIR)
-
-# Charger les clés existantes ou arrêter l'exécution
-if key_manager.check_keys_exist():
-    with open(key_file, "rb") as f:
-        SECRET_KEY = f.read()
-    with open(salt_file, "rb") as f:
-        ENCRYPTION_SALT = f.read()
-    logger.info("Clés de chiffrement chargées avec succès")
-else:
-    # Afficher un message d'erreur critique et arrêter l'exécution
-    error_msg = (
-        "ERREUR CRITIQUE: Fichiers de clés manquants. "
-        "Exécutez 'python init_keys.py' pour générer de nouvelles clés "
-        "ou restaurez les fichiers .key et .salt à partir d'une sauvegarde."
-    )
-    logger.critical(error_msg)
-    print(error_msg)
-    sys.exit(1)  # Arrêt de l'exécution avec code d'erreur 1
+_bootstrap_lock = threading.RLock()
+_bootstrapped = False
+_secret_keys: Optional[Tuple[bytes, bytes]] = None
+
+
+def bootstrap() -> None:
+    """
+    Initialise l'environnement de l'application (une seule fois par processus)
+
+    Charge le fichier .env, crée les dossiers de données et de logs et configure le logging.
+    Appelée par les points d'entrée (application, scripts) et au premier accès à la base.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    with _bootstrap_lock:
+        if _bootstrapped:
+            return
+        from dotenv import load_dotenv
+
+        # Load environment variables
+        load_dotenv()
+
+        # Ensure directories exist
+        DATA_DIR.mkdir(exist_ok=True)
+        LOGS_DIR.mkdir(exist_ok=True)
+        KEY_BACKUPS_DIR.mkdir(exist_ok=True)
+
+        # Configurer le logging avec notre configuration
+        configure_logging(LOGGING_CONFIG, LOGS_DIR)
+        _bootstrapped = True
+
+
+def load_secret_keys() -> Tuple[bytes, bytes]:
+    """
+    Lit la clé secrète et le sel de chiffrement (une seule fois par processus)
+
+    Returns:
+        Tuple (SECRET_KEY, ENCRYPTION_SALT)
+
+    Raises:
+        ConfigurationError: Si les fichiers de clés sont absents
+    """
+    global _secret_keys
+    if _secret_keys is not None:
+        return _secret_keys
+    with _bootstrap_lock:
+        if _secret_keys is not None:
+            return _secret_keys
+        bootstrap()
+
+        # Initialiser le gestionnaire de clés
+        from utils.key_manager import KeyManager
+        key_manager = KeyManager(DATA_DIR, KEY_BACKUPS_DIR)
+
+        if not key_manager.check_keys_exist():
+            error_msg = (
+                "ERREUR CRITIQUE: Fichiers de clés manquants. "
+                "Exécutez 'python init_keys.py' pour générer de nouvelles clés "
+                "ou restaurez les fichiers .key et .salt à partir d'une sauvegarde."
+            )
+            logger.critical(error_msg)
+            raise ConfigurationError(error_msg)
+
+        with open(key_file, "rb") as f:
+            secret_key = f.read()
+        with open(salt_file, "rb") as f:
+            encryption_salt = f.read()
+        _secret_keys = (secret_key, encryption_salt)
+        logger.info("Clés de chiffrement chargées avec succès")
+        return _secret_keys
+
+
+def reset_secret_keys() -> None:
+    """Oublie les clés lues (elles seront relues au prochain accès, ex: après une rotation)"""
+    global _secret_keys
+    with _bootstrap_lock:
+        _secret_keys = None
+
+
+def load_rotation_salts() -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+    Lit les sels liés à la rotation de la clé de chiffrement
+
+    Returns:
+        Tuple (sel de la rotation en cours, sel d'avant la dernière rotation), None si absent
+    """
+    bootstrap()
+    from utils.key_manager import KeyManager
+    key_manager = KeyManager(DATA_DIR, KEY_BACKUPS_DIR)
+    return key_manager.read_next_salt(), key_manager.read_previous_salt()
+
+
+def __getattr__(name: str):
+    """Chargement paresseux des clés: SECRET_KEY et ENCRYPTION_SALT sont lues au premier accès"""
+    if name == "SECRET_KEY":
+        return load_secret_keys()[0]
+    if name == "ENCRYPTION_SALT":
+        return load_secret_keys()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Profil de performance SQLite, appliqué à chaque nouvelle connexion
+# - journal_mode=WAL: les lectures ne bloquent plus les écritures (sessions Streamlit + scripts cron)
+# - synchronous=NORMAL: sûr en mode WAL (seule la dernière transaction peut être perdue en cas de coupure)
+# - cache_size négatif: taille en Kio (ici 64 Mio par connexion)
+# - mmap_size: lecture par projection mémoire (256 Mio)
+# - temp_store=MEMORY: tables temporaires (tris, GROUP BY) en mémoire
+# - busy_timeout: attente en ms sur un verrou avant l'erreur "database is locked"
+# Modifier ce dictionnaire pour adapter le profil (ex: {"journal_mode": "DELETE"} pour revenir
+# au mode historique); les pragmas sont appliqués dans l'ordre.
+SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+# Pool de connexions: quelques connexions réutilisées (les pragmas ne sont appliqués qu'une fois
+# par connexion); SQLite n'accepte qu'un écrivain à la fois, un grand pool n'apporte rien
+SQLITE_POOL_SIZE = 5
+SQLITE_MAX_OVERFLOW = 5
+SQLITE_POOL_TIMEOUT = 30
+
+# Maintenance périodique: point de contrôle du journal WAL et PRAGMA optimize (secondes)
+SQLITE_MAINTENANCE_INTERVAL = 3600
 
 # JWT configuration
 JWT_ALGORITHM = "HS256"
@@ -107,6 +208,81 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60  # Reduced from 1440 (24h) to 60 minutes (1h)
 # Application limits
 MAX_USERS = 5
 
+# Déchiffrement par lots des résultats de requêtes
+# En dessous du seuil, les cellules sont déchiffrées séquentiellement (le coût du pool dépasse le gain)
+DECRYPTION_PARALLEL_THRESHOLD = 512
+DECRYPTION_MAX_WORKERS = min(8, os.cpu_count() or 1)
+DECRYPTION_CHUNK_SIZE = 128
+
+# Cache LRU des valeurs déchiffrées (nombre d'entrées, 0 pour désactiver)
+DECRYPTION_CACHE_SIZE = 4096
+
+# Mémoïsation des lectures de services (cf. utils.read_cache): durée de vie (secondes)
+# et nombre maximum d'entrées par fonction (0 pour désactiver)
+READ_CACHE_TTL = 300
+READ_CACHE_MAX_ENTRIES = 128
+
+# Synchronisation des prix: nombre de symboles par requête de cotations groupée
+PRICE_BATCH_SIZE = 50
+
+# Cache des prix (cf. PriceService): durée de validité des prix par ISIN et des métaux (secondes)
+ISIN_PRICE_CACHE_TTL = 24 * 3600
+METAL_PRICE_CACHE_TTL = 3600
+
+# Planification de la synchronisation (cf. services.sync_planner): types de métal mémorisés
+# par index aveugle du nom (nombre d'entrées, 0 pour désactiver)
+METAL_TYPE_CACHE_MAX_ENTRIES = 1024
+
+# Cache partagé des cotations (cf. database.quote_store): rétention des lignes par table (secondes),
+# au-delà de laquelle elles sont supprimées (les prix expirés restent un repli en cas d'erreur réseau)
+QUOTE_STORE_RETENTION = {
+    "instrument_symbols": 365 * 24 * 3600,
+    "quotes": 30 * 24 * 3600,
+    "fx_rates": 30 * 24 * 3600,
+    "symbol_resolutions": 365 * 24 * 3600,
+    "symbol_resolution_attempts": 90 * 24 * 3600,
+}
+
+# Résolution des symboles: après un échec, attente avant la tentative suivante (secondes),
+# doublée à chaque échec consécutif jusqu'au maximum
+SYMBOL_RESOLUTION_BACKOFF_BASE = 3600
+SYMBOL_RESOLUTION_BACKOFF_MAX = 7 * 24 * 3600
+
+# Résolution des symboles: suffixes des places sondées en parallèle ("" pour l'ISIN seul), et
+# place par défaut selon le pays de l'ISIN (sondée en premier faute d'historique pour ce pays)
+EXCHANGE_SUFFIXES = ["", ".PA", ".DE", ".L", ".MI", ".AS", ".BR", ".VI", ".MC", ".LS", ".SW", ".ST"]
+ISIN_COUNTRY_EXCHANGES = {
+    "FR": ".PA", "DE": ".DE", "GB": ".L", "IT": ".MI", "NL": ".AS", "BE": ".BR",
+    "AT": ".VI", "ES": ".MC", "PT": ".LS", "CH": ".SW", "SE": ".ST",
+}
+
+# Fournisseur des données de marché (cf. services.price_providers): "yahoo" (en ligne) ou "local"
+# (rejeu de fixtures, répertoire ou CSV, avec latence et taux d'erreur simulés, pour les
+# benchmarks et tests de charge hors ligne). Variables d'environnement de mêmes noms prioritaires.
+PRICE_PROVIDER = "yahoo"
+PRICE_PROVIDER_FIXTURES = DATA_DIR / "price_fixtures"
+PRICE_PROVIDER_LATENCY = 0.0
+PRICE_PROVIDER_ERROR_RATE = 0.0
+
+# Récupérations réseau concurrentes (cf. utils.fetch_executor): requêtes simultanées,
+# délai par requête (secondes) et limite de débit par hôte amont (jetons par seconde, rafale)
+FETCH_MAX_WORKERS = 8
+FETCH_TIMEOUT = 10
+FETCH_RATE_LIMITS = {
+    "yahoo_quote": (5.0, 10),
+    "yahoo_search": (2.0, 4),
+    "open_er_api": (1.0, 2),
+}
+
+# Rotation de la clé de chiffrement: lignes lues par segment (une transaction par segment)
+# et nombre de threads pour le rechiffrement
+KEY_ROTATION_CHUNK_SIZE = 500
+KEY_ROTATION_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Index aveugles des champs chiffrés: longueur des préfixes indexés pour la recherche par mot
+BLIND_INDEX_MIN_PREFIX = 2
+BLIND_INDEX_MAX_PREFIX = 20
+
 # Types and categories (business constants)
 ACCOUNT_TYPES = ["courant", "livret", "pea", "titre", "assurance_vie", "autre"]
 
@@ -0,0 +1,135 @@
+"""
+Index aveugles (blind indexes) pour les champs chiffrés
+
+Les champs chiffrés avec Fernet ne sont pas comparables en SQL (chaque chiffrement est
+aléatoire). Un index aveugle est une empreinte HMAC déterministe de la valeur normalisée,
+calculée avec une clé dédiée: il permet les recherches d'égalité indexées sans exposer
+la valeur en clair. Les jetons de recherche appliquent le même principe à chaque préfixe
+des mots d'un texte, pour la recherche par mot ou début de mot.
+"""
+import hashlib
+import hmac
+import re
+import unicodedata
+from typing import Optional, Set, List
+
+from config.app_config import BLIND_INDEX_MIN_PREFIX, BLIND_INDEX_MAX_PREFIX
+from database.key_ring import key_ring
+
+_WORD_PATTERN = re.compile(r"[0-9a-z]+")
+
+
+def get_blind_index_key() -> bytes:
+    """
+    Retourne la clé HMAC des index aveugles (fournie par le trousseau de clés du processus)
+
+    Returns:
+        Clé HMAC de 32 octets
+    """
+    return key_ring.blind_index_key
+
+
+def normalize_text(value: str) -> str:
+    """
+    Normalise un texte avant calcul d'empreinte (casse, accents, espaces)
+
+    Args:
+        value: Texte à normaliser
+
+    Returns:
+        Texte normalisé
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
+
+
+def _digest(value: str) -> str:
+    """Calcule l'empreinte HMAC hexadécimale d'une valeur déjà normalisée"""
+    return hmac.new(get_blind_index_key(), value.encode(), hashlib.sha256).hexdigest()
+
+
+def compute_blind_index(value: Optional[str]) -> Optional[str]:
+    """
+    Calcule l'index aveugle d'une valeur pour les recherches d'égalité
+
+    Args:
+        value: Valeur en clair
+
+    Returns:
+        Empreinte hexadécimale, ou None si la valeur est vide
+    """
+    if value is None:
+        return None
+    normalized = normalize_text(str(value))
+    if not normalized:
+        return None
+    return _digest(normalized)
+
+
+def tokenize(value: Optional[str]) -> Set[str]:
+    """
+    Découpe un texte en jetons de recherche (préfixes de chaque mot)
+
+    Args:
+        value: Texte en clair
+
+    Returns:
+        Ensemble des préfixes normalisés, de BLIND_INDEX_MIN_PREFIX à BLIND_INDEX_MAX_PREFIX caractères
+    """
+    if not value:
+        return set()
+
+    tokens = set()
+    for word in _WORD_PATTERN.findall(normalize_text(str(value))):
+        # Les mots plus courts que le préfixe minimal sont indexés tels quels
+        if len(word) < BLIND_INDEX_MIN_PREFIX:
+            tokens.add(word)
+            continue
+        for length in range(BLIND_INDEX_MIN_PREFIX, min(len(word), BLIND_INDEX_MAX_PREFIX) + 1):
+            tokens.add(word[:length])
+    return tokens
+
+
+def compute_search_tokens(value: Optional[str]) -> Set[str]:
+    """
+    Calcule les empreintes des jetons de recherche d'un texte
+
+    Args:
+        value: Texte en clair
+
+    Returns:
+        Ensemble des empreintes de jetons
+    """
+    return {_digest(token) for token in tokenize(value)}
+
+
+def compute_query_tokens(search_query: Optional[str]) -> List[str]:
+    """
+    Calcule les empreintes des mots d'une recherche utilisateur
+
+    Chaque mot est comparé aux préfixes indexés: il est tronqué à BLIND_INDEX_MAX_PREFIX
+    caractères pour correspondre aux jetons stockés.
+
+    Args:
+        search_query: Texte saisi par l'utilisateur
+
+    Returns:
+        Liste des empreintes, une par mot distinct (vide si aucun mot exploitable)
+    """
+    return sorted(_digest(word) for word in query_words(search_query))
+
+
+def query_words(search_query: Optional[str]) -> Set[str]:
+    """
+    Découpe une recherche utilisateur en mots comparables aux jetons de tokenize()
+
+    Args:
+        search_query: Texte saisi par l'utilisateur
+
+    Returns:
+        Mots normalisés distincts, tronqués à BLIND_INDEX_MAX_PREFIX caractères
+    """
+    if not search_query:
+        return set()
+    return {word[:BLIND_INDEX_MAX_PREFIX] for word in _WORD_PATTERN.findall(normalize_text(search_query))}
@@ -1,23 +1,33 @@
 """
 Database configuration with field-level encryption
 """
-import base64
+import hashlib
 import json
 import os
+import re
 import sqlite3
-import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Generator, Dict, Any
+from typing import Generator, Dict, Any, List, Optional, Callable
 
-from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.fernet import InvalidToken
 from sqlalchemy import create_engine, MetaData, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
-from config.app_config import SQLALCHEMY_DATABASE_URL, SECRET_KEY, ENCRYPTION_SALT, DB_PATH
+from config.app_config import (
+    SQLALCHEMY_DATABASE_URL, DB_PATH, bootstrap, reset_secret_keys,
+    DECRYPTION_PARALLEL_THRESHOLD, DECRYPTION_MAX_WORKERS, DECRYPTION_CHUNK_SIZE,
+    DECRYPTION_CACHE_SIZE, SQLITE_PRAGMAS, SQLITE_POOL_SIZE, SQLITE_MAX_OVERFLOW, SQLITE_POOL_TIMEOUT,
+    SQLITE_MAINTENANCE_INTERVAL
+)
+from database.key_ring import key_ring
+from utils.exceptions import KeyVerificationError
 from utils.logger import get_logger
+from utils.lru_cache import LRUCache
+from utils.startup_metrics import measure_startup
 
 # Configure logger
 logger = get_logger(__name__)
@@ -28,58 +38,233 @@ class DataCorruptionError(Exception):
     """Exception raised when encrypted data is corrupted or can't be decrypted properly"""
     pass
 
-# Create SQLAlchemy engine
+# Create SQLAlchemy engine (aucune connexion n'est ouverte avant le premier usage)
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},  # Required for SQLite
+    pool_size=SQLITE_POOL_SIZE,
+    max_overflow=SQLITE_MAX_OVERFLOW,
+    pool_timeout=SQLITE_POOL_TIMEOUT,
 )
 
+# Pragmas acceptés dans le profil de performance (les valeurs sont insérées telles quelles dans la requête)
+_SUPPORTED_PRAGMAS = {
+    "busy_timeout", "journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store",
+    "foreign_keys", "wal_autocheckpoint", "journal_size_limit",
+}
+_PRAGMA_VALUE_PATTERN = re.compile(r"^-?\w+$")
+_CHECKPOINT_MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Applique un profil de pragmas SQLite à une connexion
+
+    Args:
+        dbapi_connection: Connexion sqlite3
+        pragmas: Pragmas à appliquer dans l'ordre (par défaut SQLITE_PRAGMAS)
+
+    Raises:
+        ValueError: Si un pragma n'est pas supporté ou si sa valeur est invalide
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in (SQLITE_PRAGMAS if pragmas is None else pragmas).items():
+            if name not in _SUPPORTED_PRAGMAS or not _PRAGMA_VALUE_PATTERN.match(str(value)):
+                raise ValueError(f"Pragma SQLite non supporté: {name}={value}")
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+# Initialiser l'environnement (dossier de données, logging) juste avant la première connexion
+@event.listens_for(engine, "do_connect")
+def bootstrap_before_connect(dialect, conn_rec, cargs, cparams):
+    bootstrap()
+
+
+# Vérifier les clés sur les données existantes à la première connexion (résultat mis en cache)
+@event.listens_for(engine, "first_connect")
+def verify_keys_on_first_connect(dbapi_connection, connection_record):
+    ensure_keys_verified()
 
-# Activer les contraintes de clé étrangère dans SQLite
+
+# Appliquer le profil de performance SQLite (WAL, cache, contraintes de clé étrangère...)
 @event.listens_for(engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
+    apply_sqlite_pragmas(dbapi_connection)
 
 
-# Function to generate encryption key from secret key
-def get_encryption_key():
-    """Generate an encryption key derived from the main secret and salt"""
+def checkpoint_wal(db_path: str, mode: str = "TRUNCATE") -> Optional[tuple]:
+    """
+    Reporte le journal WAL dans le fichier de base de données
+
+    À appeler avant de copier le fichier de base (sauvegarde, restauration): sans cela,
+    les dernières transactions validées peuvent ne se trouver que dans le fichier -wal.
+
+    Args:
+        db_path: Chemin vers la base de données
+        mode: Mode de point de contrôle (PASSIVE, FULL, RESTART ou TRUNCATE)
+
+    Returns:
+        Tuple (bloqué, pages du journal, pages reportées), ou None si la base n'existe pas
+        ou n'a pas pu être lue
+    """
+    if mode not in _CHECKPOINT_MODES:
+        raise ValueError(f"Mode de point de contrôle inconnu: {mode}")
+    if not os.path.exists(db_path):
+        return None
     try:
-        # Les deux valeurs devraient déjà être des bytes
-        salt = ENCRYPTION_SALT
-        key = SECRET_KEY
-
-        # Create key derivation function
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
+        conn = sqlite3.connect(db_path, timeout=SQLITE_PRAGMAS.get("busy_timeout", 5000) / 1000)
+        try:
+            return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Point de contrôle WAL impossible sur {db_path}: {str(e)}")
+        return None
+
+
+def run_sqlite_maintenance(checkpoint_mode: str = "PASSIVE", target_engine=None) -> Dict[str, Any]:
+    """
+    Maintenance de la base: point de contrôle du journal WAL puis PRAGMA optimize
+
+    Args:
+        checkpoint_mode: Mode de point de contrôle (PASSIVE n'attend aucun verrou)
+        target_engine: Moteur à entretenir (par défaut celui de l'application)
 
-        # Derive and encode key
-        derived_key = kdf.derive(key)
-        result_key = base64.urlsafe_b64encode(derived_key)
+    Returns:
+        Dictionnaire avec busy, wal_frames, checkpointed_frames et duration
+    """
+    if checkpoint_mode not in _CHECKPOINT_MODES:
+        raise ValueError(f"Mode de point de contrôle inconnu: {checkpoint_mode}")
+
+    start = time.perf_counter()
+    with (target_engine or engine).connect() as conn:
+        busy, wal_frames, checkpointed = conn.exec_driver_sql(
+            f"PRAGMA wal_checkpoint({checkpoint_mode})").fetchone()
+        conn.exec_driver_sql("PRAGMA optimize")
+    result = {
+        "busy": bool(busy),
+        "wal_frames": wal_frames,
+        "checkpointed_frames": checkpointed,
+        "duration": time.perf_counter() - start,
+    }
+    logger.info(f"Maintenance SQLite ({checkpoint_mode}): {checkpointed}/{wal_frames} pages reportées "
+                f"en {result['duration'] * 1000:.1f} ms")
+    return result
+
+
+_last_maintenance = time.monotonic()
+_maintenance_lock = threading.Lock()
+
+
+def maybe_run_sqlite_maintenance() -> Optional[Dict[str, Any]]:
+    """
+    Lance la maintenance si SQLITE_MAINTENANCE_INTERVAL est écoulé depuis la précédente
 
-        return result_key
+    Returns:
+        Résultat de la maintenance, ou None si elle n'était pas due (ou déjà en cours)
+    """
+    global _last_maintenance
+    if time.monotonic() - _last_maintenance < SQLITE_MAINTENANCE_INTERVAL:
+        return None
+    if not _maintenance_lock.acquire(blocking=False):
+        return None
+    try:
+        _last_maintenance = time.monotonic()
+        return run_sqlite_maintenance()
+    except Exception as e:
+        logger.warning(f"Maintenance SQLite impossible: {str(e)}")
+        return None
+    finally:
+        _maintenance_lock.release()
+
+
+# Function to generate encryption key from secret key
+def get_encryption_key():
+    """Return the encryption key derived from the main secret and salt (derived once per process)"""
+    try:
+        return key_ring.data_key
     except Exception as e:
         logger.error(f"Error generating encryption key: {str(e)}")
         raise
 
 
-# Initialiser le chiffrement
-try:
-    # Initialisation normale
-    ENCRYPTION_KEY = get_encryption_key()
-    cipher = Fernet(ENCRYPTION_KEY)
-    logger.info("Encryption successfully initialized")
-except Exception as e:
-    error_msg = f"ERREUR FATALE: Impossible d'initialiser le chiffrement: {str(e)}"
-    logger.critical(error_msg)
-    print(error_msg)
-    sys.exit(1)
+# Objet de chiffrement, initialisé paresseusement au premier chiffrement/déchiffrement
+cipher = None
+_cipher_lock = threading.Lock()
+
+
+def get_cipher():
+    """
+    Retourne l'objet de chiffrement des données, en le créant au premier usage
+
+    Raises:
+        ConfigurationError: Si les clés ne peuvent pas être chargées
+    """
+    global cipher
+    if cipher is None:
+        with _cipher_lock:
+            if cipher is None:
+                cipher = key_ring.cipher
+                logger.info("Encryption successfully initialized")
+    return cipher
+
+
+def reset_cipher() -> None:
+    """Oublie les clés et l'objet de chiffrement (ex: après une rotation de clé)"""
+    global cipher
+    with _cipher_lock:
+        reset_secret_keys()
+        key_ring.reset()
+        cipher = None
+    clear_decryption_cache()
+
+
+def __getattr__(name: str):
+    """Accès paresseux à la clé de chiffrement (compatibilité avec ENCRYPTION_KEY)"""
+    if name == "ENCRYPTION_KEY":
+        return get_encryption_key()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Cache des valeurs déchiffrées, indexé par empreinte du texte chiffré
+# Seuls les déchiffrements réussis sont mis en cache (les erreurs restent visibles à chaque lecture)
+_decryption_cache = LRUCache(DECRYPTION_CACHE_SIZE)
+
+_CACHE_KIND_TEXT = "t"
+_CACHE_KIND_JSON = "j"
+
+
+def _decryption_cache_key(kind: str, data: str):
+    """Construit la clé de cache d'un texte chiffré (empreinte liée au chiffreur actif)"""
+    digest = hashlib.blake2b(data.encode(), digest_size=16).digest()
+    return kind, id(get_cipher()), digest
+
+
+def _copy_json(value):
+    """Copie défensive d'une structure JSON (dicts/listes imbriqués de scalaires)"""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def get_decryption_cache_stats() -> Dict[str, Any]:
+    """
+    Retourne les statistiques du cache de déchiffrement
+
+    Returns:
+        Taille, capacité, succès, échecs, évictions et taux de succès
+    """
+    return _decryption_cache.stats()
+
+
+def clear_decryption_cache() -> None:
+    """Vide le cache de déchiffrement (ex: après un changement de clé)"""
+    _decryption_cache.clear()
 
 
 # Functions for encrypting/decrypting sensitive data
@@ -90,18 +275,25 @@ def encrypt_data(data):
     try:
         if not isinstance(data, str):
             data = str(data)
-        return cipher.encrypt(data.encode()).decode()
+        return get_cipher().encrypt(data.encode()).decode()
     except Exception as e:
         logger.error(f"Encryption error: {str(e)}")
         return None
 
 
-def decrypt_data(data):
+def decrypt_data(data, use_cache=True):
     """Decrypt textual data"""
     if data is None:
         return None
+
+    cache_key = _decryption_cache_key(_CACHE_KIND_TEXT, data) if use_cache else None
+    if cache_key is not None:
+        cached = _decryption_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
-        return cipher.decrypt(data.encode()).decode()
+        decrypted = get_cipher().decrypt(data.encode()).decode()
     except InvalidToken:
         logger.error(f"Invalid token during decryption - data might be corrupted")
         return "[Decryption Error]"
@@ -109,6 +301,10 @@ def decrypt_data(data):
         logger.error(f"Decryption error: {str(e)}")
         return "[Decryption Error]"
 
+    if cache_key is not None:
+        _decryption_cache.put(cache_key, decrypted)
+    return decrypted
+
 
 # Functions for encrypting/decrypting JSON dictionaries
 def encrypt_json(data_dict):
@@ -132,7 +328,7 @@ def decrypt_json(encrypted_str, silent_errors=False) -> Dict[str, Any]:
         silent_errors: If True, return empty dict instead of raising exception (for backward compatibility)
 
     Returns:
-        Decrypted dictionary
+        Decrypted dictionary (a fresh copy, safe to mutate)
 
     Raises:
         DataCorruptionError: If decryption fails and silent_errors is False
@@ -140,9 +336,14 @@ def decrypt_json(encrypted_str, silent_errors=False) -> Dict[str, Any]:
     if encrypted_str is None:
         return {}
 
+    cache_key = _decryption_cache_key(_CACHE_KIND_JSON, encrypted_str)
+    cached = _decryption_cache.get(cache_key)
+    if cached is not None:
+        return _copy_json(cached)
+
     try:
-        # Attempt to decrypt
-        json_str = decrypt_data(encrypted_str)
+        # Attempt to decrypt (the parsed dict is cached below, not the JSON text)
+        json_str = decrypt_data(encrypted_str, use_cache=False)
 
         # Handle decryption failure
         if json_str == "[Decryption Error]":
@@ -158,7 +359,8 @@ def decrypt_json(encrypted_str, silent_errors=False) -> Dict[str, Any]:
                 result = json.loads(json_str)
                 # Ensure we got a dictionary
                 if isinstance(result, dict):
-                    return result
+                    _decryption_cache.put(cache_key, result)
+                    return _copy_json(result)
                 else:
                     error_msg = f"Decrypted JSON is not a dictionary, got {type(result)}"
                     logger.error(error_msg)
@@ -183,6 +385,78 @@ def decrypt_json(encrypted_str, silent_errors=False) -> Dict[str, Any]:
         return {}
 
 
+# Pool partagé pour le déchiffrement par lots (créé à la première utilisation)
+_decryption_pool: Optional[ThreadPoolExecutor] = None
+_decryption_pool_lock = threading.Lock()
+
+
+def _get_decryption_pool() -> ThreadPoolExecutor:
+    """Retourne le pool de threads dédié au déchiffrement, en le créant si nécessaire"""
+    global _decryption_pool
+    if _decryption_pool is None:
+        with _decryption_pool_lock:
+            if _decryption_pool is None:
+                _decryption_pool = ThreadPoolExecutor(
+                    max_workers=DECRYPTION_MAX_WORKERS,
+                    thread_name_prefix="decrypt"
+                )
+    return _decryption_pool
+
+
+def _decrypt_chunk(func: Callable, chunk: List[Any]) -> List[Any]:
+    """Applique une fonction de déchiffrement à un segment de valeurs"""
+    return [func(value) for value in chunk]
+
+
+def _map_decryption(func: Callable, values: List[Any]) -> List[Any]:
+    """
+    Applique une fonction de déchiffrement à une liste de valeurs en préservant l'ordre
+
+    Au-delà de DECRYPTION_PARALLEL_THRESHOLD valeurs, le travail est découpé en segments
+    répartis sur le pool de déchiffrement. Les exceptions sont propagées comme en séquentiel.
+    """
+    if len(values) < DECRYPTION_PARALLEL_THRESHOLD or DECRYPTION_MAX_WORKERS <= 1:
+        return _decrypt_chunk(func, values)
+
+    chunks = [values[i:i + DECRYPTION_CHUNK_SIZE] for i in range(0, len(values), DECRYPTION_CHUNK_SIZE)]
+    pool = _get_decryption_pool()
+
+    results = []
+    for chunk_result in pool.map(lambda chunk: _decrypt_chunk(func, chunk), chunks):
+        results.extend(chunk_result)
+    return results
+
+
+def decrypt_data_batch(values: List[Optional[str]]) -> List[Optional[str]]:
+    """
+    Decrypt a list of textual values in bulk
+
+    Args:
+        values: Encrypted values (None allowed)
+
+    Returns:
+        Decrypted values in the same order, with the same error markers as decrypt_data
+    """
+    return _map_decryption(decrypt_data, values)
+
+
+def decrypt_json_batch(values: List[Optional[str]], silent_errors=False) -> List[Dict[str, Any]]:
+    """
+    Decrypt a list of JSON dictionaries in bulk
+
+    Args:
+        values: Encrypted JSON strings (None allowed)
+        silent_errors: Same meaning as in decrypt_json
+
+    Returns:
+        Decrypted dictionaries in the same order
+
+    Raises:
+        DataCorruptionError: If one value cannot be decrypted and silent_errors is False
+    """
+    return _map_decryption(lambda value: decrypt_json(value, silent_errors=silent_errors), values)
+
+
 # Fonction pour vérifier que les clés peuvent déchiffrer des données existantes
 def verify_keys_with_existing_data(db_path: str) -> bool:
     """
@@ -214,7 +488,8 @@ def verify_keys_with_existing_data(db_path: str) -> bool:
                 if row:
                     # Trouver une colonne qui pourrait contenir des données chiffrées
                     for i, value in enumerate(row):
-                        if isinstance(value, str) and len(value) > 64:  # Probablement chiffré
+                        # Jeton Fernet (préfixe de version 0x80 encodé en base64)
+                        if isinstance(value, str) and len(value) > 64 and value.startswith("gAAAAA"):
                             encrypted_data = value
                             break
 
@@ -230,9 +505,10 @@ def verify_keys_with_existing_data(db_path: str) -> bool:
             logger.info("Aucune donnée chiffrée trouvée dans la base de données pour vérification")
             return True
 
-        # Essayer de déchiffrer
+        # Essayer de déchiffrer (decrypt_data signale un échec par une valeur marqueur)
         try:
-            decrypt_data(encrypted_data)
+            if decrypt_data(encrypted_data, use_cache=False) == "[Decryption Error]":
+                raise InvalidToken()
             logger.info("Vérification des clés réussie: déchiffrement des données existantes OK")
 
             # Mettre à jour le timestamp de dernière vérification
@@ -251,14 +527,35 @@ def verify_keys_with_existing_data(db_path: str) -> bool:
         return False
 
 
-# Vérifier la compatibilité avec les données existantes si la base existe
-if os.path.exists(DB_PATH):
-    if not verify_keys_with_existing_data(str(DB_PATH)):
-        error_msg = "ERREUR CRITIQUE: Les clés ne peuvent pas déchiffrer les données existantes!"
+# Résultat de la vérification des clés, mis en cache pour tout le processus
+_keys_verified: Optional[bool] = None
+_keys_verification_lock = threading.Lock()
+
+
+def ensure_keys_verified(db_path: Optional[str] = None) -> None:
+    """
+    Vérifie une seule fois par processus que les clés déchiffrent les données existantes
+
+    Args:
+        db_path: Chemin vers la base de données (par défaut DB_PATH)
+
+    Raises:
+        KeyVerificationError: Si les clés ne correspondent pas aux données existantes
+    """
+    global _keys_verified
+    if _keys_verified is None:
+        with _keys_verification_lock:
+            if _keys_verified is None:
+                with measure_startup("db_config.verify_keys"):
+                    _keys_verified = verify_keys_with_existing_data(str(db_path or DB_PATH))
+
+    if not _keys_verified:
+        error_msg = (
+            "ERREUR CRITIQUE: Les clés ne peuvent pas déchiffrer les données existantes! "
+            "Restaurez les fichiers de clés corrects ou utilisez une sauvegarde de la base de données."
+        )
         logger.critical(error_msg)
-        print(error_msg)
-        print("Restaurez les fichiers de clés corrects ou utilisez une sauvegarde de la base de données.")
-        sys.exit(1)
+        raise KeyVerificationError(error_msg)
 
 
 # Create a SQLAlchemy session
@@ -293,6 +590,7 @@ def get_db_session() -> Generator[Session, None, None]:
         raise
     finally:
         db.close()
+        maybe_run_sqlite_maintenance()
 
 
 def get_db():
@@ -0,0 +1,223 @@
+"""
+Agrégats d'exposition des actifs par catégorie et par zone géographique
+
+La table exposure_aggregates contient, par utilisateur × compte, la valeur en EUR exposée
+à chaque catégorie (zone = '') et à chaque couple catégorie × zone géographique. Les
+allocations étant chiffrées, ces agrégats ne peuvent pas être tenus par des triggers SQL:
+les événements du modèle Asset leur appliquent la différence entre l'ancienne et la
+nouvelle contribution de l'actif à chaque écriture (création, modification, suppression).
+Les répartitions se lisent alors sans charger ni déchiffrer un seul actif.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from database.db_config import decrypt_json, decrypt_json_batch
+
+# Zone des lignes portant le total d'une catégorie
+CATEGORY_TOTAL_ZONE = ""
+
+# Colonnes d'actif dont dépendent les agrégats d'exposition
+EXPOSURE_SOURCE_FIELDS = ("owner_id", "account_id", "value_eur", "valeur_actuelle", "allocation", "geo_allocation")
+
+# Écart toléré entre un agrégat et le recalcul (les deltas successifs accumulent des arrondis)
+EXPOSURE_TOLERANCE = 0.01
+
+# En deçà, une ligne d'agrégat est considérée comme vide et supprimée
+_EMPTY_EPSILON = 1e-6
+
+_SELECT_ASSETS_SQL = (
+    "SELECT owner_id, account_id, value_eur, valeur_actuelle, allocation, geo_allocation FROM assets"
+)
+
+
+def compute_exposure_contributions(
+        value_eur: Optional[float],
+        valeur_actuelle: Optional[float],
+        allocation: Optional[Dict[str, float]],
+        geo_allocation: Optional[Dict[str, Dict[str, float]]]
+) -> Dict[Tuple[str, str], float]:
+    """
+    Calcule la contribution d'un actif aux agrégats d'exposition
+
+    Mêmes règles que les répartitions calculées actif par actif: value_eur, à défaut la
+    valeur actuelle; la répartition géographique n'est comptée que si l'actif a une
+    allocation et une répartition géographique.
+
+    Args:
+        value_eur: Valeur en EUR de l'actif
+        valeur_actuelle: Valeur actuelle (en devise) de l'actif
+        allocation: Allocation par catégorie {categorie: pourcentage}
+        geo_allocation: Répartition géographique {categorie: {zone: pourcentage}}
+
+    Returns:
+        Dictionnaire {(categorie, zone): valeur en EUR}, zone '' pour le total de la catégorie
+    """
+    value = value_eur if value_eur is not None else valeur_actuelle
+    if not value or not allocation or not isinstance(allocation, dict):
+        return {}
+
+    has_geo = bool(geo_allocation) and isinstance(geo_allocation, dict)
+    contributions: Dict[Tuple[str, str], float] = defaultdict(float)
+    for category, percentage in allocation.items():
+        category_value = value * percentage / 100.0
+        contributions[(category, CATEGORY_TOTAL_ZONE)] += category_value
+
+        if has_geo and percentage > 0:
+            for zone, zone_percentage in (geo_allocation.get(category) or {}).items():
+                contributions[(category, zone)] += category_value * zone_percentage / 100.0
+
+    return dict(contributions)
+
+
+def apply_exposure_delta(
+        connection,
+        owner_id: Optional[str],
+        account_id: Optional[str],
+        contributions: Dict[Tuple[str, str], float],
+        sign: int = 1
+) -> None:
+    """
+    Ajoute (sign=1) ou retire (sign=-1) des contributions aux agrégats d'un compte
+
+    Args:
+        connection: Connexion SQLAlchemy (dans la transaction de l'écriture de l'actif)
+        owner_id: ID du propriétaire
+        account_id: ID du compte
+        contributions: Contributions {(categorie, zone): valeur}
+        sign: 1 pour ajouter, -1 pour retirer
+    """
+    if not contributions:
+        return
+
+    key = {"owner_id": owner_id or "", "account_id": account_id or ""}
+    connection.execute(text(
+        "INSERT INTO exposure_aggregates (owner_id, account_id, category, zone, value_eur) "
+        "VALUES (:owner_id, :account_id, :category, :zone, :value_eur) "
+        "ON CONFLICT (owner_id, account_id, category, zone) DO UPDATE SET "
+        "value_eur = value_eur + excluded.value_eur"
+    ), [
+        {**key, "category": category, "zone": zone, "value_eur": sign * value}
+        for (category, zone), value in contributions.items()
+    ])
+    connection.execute(text(
+        "DELETE FROM exposure_aggregates WHERE owner_id = :owner_id AND account_id = :account_id "
+        "AND ABS(value_eur) < :epsilon"
+    ), {**key, "epsilon": _EMPTY_EPSILON})
+
+
+def load_exposure_state(connection, asset_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Lit en base les colonnes d'exposition d'un actif (avant sa modification ou sa suppression)
+
+    Args:
+        connection: Connexion SQLAlchemy
+        asset_id: ID de l'actif
+
+    Returns:
+        Dictionnaire {colonne: valeur} (allocations déchiffrées), None si l'actif n'existe pas
+    """
+    row = connection.execute(text(f"{_SELECT_ASSETS_SQL} WHERE id = :id"), {"id": asset_id}).first()
+    if row is None:
+        return None
+    state = dict(zip(EXPOSURE_SOURCE_FIELDS, row))
+    state["allocation"] = decrypt_json(state["allocation"], silent_errors=True)
+    state["geo_allocation"] = decrypt_json(state["geo_allocation"], silent_errors=True)
+    return state
+
+
+def apply_exposure_state(connection, state: Optional[Dict[str, Any]], sign: int = 1) -> None:
+    """
+    Ajoute (sign=1) ou retire (sign=-1) la contribution d'un actif aux agrégats
+
+    Args:
+        connection: Connexion SQLAlchemy
+        state: Colonnes d'exposition de l'actif (cf. EXPOSURE_SOURCE_FIELDS), None pour ne rien faire
+        sign: 1 pour ajouter, -1 pour retirer
+    """
+    if state is None:
+        return
+    contributions = compute_exposure_contributions(
+        state["value_eur"], state["valeur_actuelle"], state["allocation"], state["geo_allocation"]
+    )
+    apply_exposure_delta(connection, state["owner_id"], state["account_id"], contributions, sign)
+
+
+def _compute_all(connection, owner_id: Optional[str]) -> Dict[Tuple[str, str, str, str], float]:
+    """Recalcule les agrégats à partir de la table assets (déchiffrement par lots)"""
+    where, params = ("", {}) if owner_id is None else (" WHERE owner_id = :owner_id", {"owner_id": owner_id})
+    rows = connection.execute(text(f"{_SELECT_ASSETS_SQL}{where}"), params).fetchall()
+    allocations = decrypt_json_batch([row[4] for row in rows], silent_errors=True)
+    geo_allocations = decrypt_json_batch([row[5] for row in rows], silent_errors=True)
+
+    totals: Dict[Tuple[str, str, str, str], float] = defaultdict(float)
+    for row, allocation, geo_allocation in zip(rows, allocations, geo_allocations):
+        contributions = compute_exposure_contributions(row[2], row[3], allocation, geo_allocation)
+        for (category, zone), value in contributions.items():
+            totals[(row[0] or "", row[1] or "", category, zone)] += value
+    return totals
+
+
+def rebuild_exposures(connection, owner_id: Optional[str] = None) -> int:
+    """
+    Recalcule les agrégats d'exposition à partir des actifs
+
+    Args:
+        connection: Connexion SQLAlchemy (dans une transaction)
+        owner_id: Limiter le recalcul à un utilisateur (tous par défaut)
+
+    Returns:
+        Nombre de lignes d'agrégat écrites
+    """
+    totals = _compute_all(connection, owner_id)
+    where, params = ("", {}) if owner_id is None else (" WHERE owner_id = :owner_id", {"owner_id": owner_id})
+    connection.execute(text(f"DELETE FROM exposure_aggregates{where}"), params)
+
+    values = [
+        {"owner_id": key[0], "account_id": key[1], "category": key[2], "zone": key[3], "value_eur": value}
+        for key, value in totals.items()
+        if abs(value) >= _EMPTY_EPSILON
+    ]
+    if values:
+        connection.execute(text(
+            "INSERT INTO exposure_aggregates (owner_id, account_id, category, zone, value_eur) "
+            "VALUES (:owner_id, :account_id, :category, :zone, :value_eur)"
+        ), values)
+    return len(values)
+
+
+def check_exposures(connection, owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Compare les agrégats d'exposition stockés au recalcul depuis les actifs
+
+    Args:
+        connection: Connexion SQLAlchemy
+        owner_id: Limiter la vérification à un utilisateur (tous par défaut)
+
+    Returns:
+        Liste des écarts (clé de la ligne, valeurs attendue et stockée), vide si tout est cohérent
+    """
+    expected = _compute_all(connection, owner_id)
+    where, params = ("", {}) if owner_id is None else (" WHERE owner_id = :owner_id", {"owner_id": owner_id})
+    stored = {
+        tuple(row[:4]): row[4] or 0.0
+        for row in connection.execute(text(
+            f"SELECT owner_id, account_id, category, zone, value_eur FROM exposure_aggregates{where}"
+        ), params)
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        expected_value = expected.get(key, 0.0)
+        stored_value = stored.get(key, 0.0)
+        if abs(expected_value - stored_value) > EXPOSURE_TOLERANCE:
+            mismatches.append({
+                "owner_id": key[0],
+                "account_id": key[1],
+                "category": key[2],
+                "zone": key[3],
+                "expected": expected_value,
+                "stored": stored_value,
+            })
+    return mismatches
@@ -0,0 +1,242 @@
+"""
+Référentiel local des instruments financiers (table instruments, cf. database.models.Instrument)
+
+Chaque ISIN y est décrit par son symbole Yahoo Finance, sa place, sa devise, son nom et son
+type de produit. Le référentiel est chargé en masse depuis des fichiers CSV ou JSON
+(load_file, script load_instruments.py) et complété à chaque résolution de symbole réussie
+(record_resolution). La résolution des symboles le consulte avant toute requête réseau, et
+le formulaire d'ajout d'actif y cherche les ISIN par préfixe.
+
+Les recherches exacte et par préfixe utilisent la clé primaire (intervalle sur l'ISIN, sans
+LIKE, pour rester indexées).
+"""
+import csv
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import DateTime, bindparam, text
+
+from database.quote_store import _as_datetime
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Champs d'un instrument (hors ISIN)
+INSTRUMENT_FIELDS = ("symbol", "exchange", "currency", "name", "type")
+
+# Type de produit selon le type de cotation Yahoo Finance (quoteType)
+_QUOTE_TYPES = {
+    "EQUITY": "action",
+    "ETF": "etf",
+    "MUTUALFUND": "sicav",
+    "BOND": "obligation",
+    "CRYPTOCURRENCY": "crypto",
+}
+
+_ISIN_PATTERN = re.compile(r"^[A-Z]{2}[A-Z0-9]{9}[0-9]$")
+
+# Les champs absents d'une mise à jour conservent leur valeur
+_UPSERT_INSTRUMENT = text(
+    "INSERT INTO instruments (isin, symbol, exchange, currency, name, type, source, updated_at) "
+    "VALUES (:isin, :symbol, :exchange, :currency, :name, :type, :source, :updated_at) "
+    "ON CONFLICT (isin) DO UPDATE SET symbol = COALESCE(excluded.symbol, instruments.symbol), "
+    "exchange = COALESCE(excluded.exchange, instruments.exchange), "
+    "currency = COALESCE(excluded.currency, instruments.currency), "
+    "name = COALESCE(excluded.name, instruments.name), type = COALESCE(excluded.type, instruments.type), "
+    "source = excluded.source, updated_at = excluded.updated_at"
+).bindparams(bindparam("updated_at", type_=DateTime))
+
+_SELECT_INSTRUMENT = "SELECT isin, symbol, exchange, currency, name, type, source, updated_at FROM instruments "
+
+
+def normalize_isin(value: Any) -> Optional[str]:
+    """
+    Normalise un code ISIN (espaces retirés, majuscules)
+
+    Args:
+        value: Code saisi ou lu dans un fichier
+
+    Returns:
+        ISIN normalisé, ou None s'il n'a pas le format d'un ISIN
+    """
+    if not isinstance(value, str):
+        return None
+    isin = value.strip().replace(" ", "").upper()
+    return isin if _ISIN_PATTERN.match(isin) else None
+
+
+def _instrument_row(record: Dict[str, Any], source: str) -> Optional[Dict[str, Any]]:
+    """Ligne à enregistrer pour un instrument (None si l'ISIN est invalide)"""
+    isin = normalize_isin(record.get("isin"))
+    if isin is None:
+        return None
+    row = {"isin": isin, "source": source, "updated_at": datetime.now()}
+    for field in INSTRUMENT_FIELDS:
+        value = record.get(field)
+        row[field] = (str(value).strip() or None) if value is not None else None
+    if row["currency"]:
+        row["currency"] = row["currency"].upper()
+    return row
+
+
+def _as_instrument(row) -> Dict[str, Any]:
+    """Instrument lu en base (date convertie, les requêtes textuelles la retournent en chaîne)"""
+    return dict(row, updated_at=_as_datetime(row["updated_at"]))
+
+
+class InstrumentReference:
+    """Accès au référentiel local des instruments"""
+
+    def __init__(self, bind=None):
+        """
+        Args:
+            bind: Moteur SQLAlchemy (moteur de l'application si None)
+        """
+        self.bind = bind
+
+    def _engine(self):
+        if self.bind is not None:
+            return self.bind
+        from database.db_config import engine
+        return engine
+
+    def lookup(self, isin: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'instrument d'un ISIN
+
+        Args:
+            isin: Code ISIN
+
+        Returns:
+            Dictionnaire {isin, symbol, exchange, currency, name, type, source, updated_at} ou None
+        """
+        isin = normalize_isin(isin)
+        if isin is None:
+            return None
+        with self._engine().connect() as connection:
+            row = connection.execute(text(_SELECT_INSTRUMENT + "WHERE isin = :isin"), {"isin": isin}).mappings().first()
+        return _as_instrument(row) if row is not None else None
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Recherche les instruments dont l'ISIN commence par un préfixe
+
+        Args:
+            prefix: Début du code ISIN (au moins deux caractères)
+            limit: Nombre maximum de résultats
+
+        Returns:
+            Instruments par ordre d'ISIN
+        """
+        prefix = (prefix or "").strip().replace(" ", "").upper()
+        if len(prefix) < 2:
+            return []
+        # Intervalle [préfixe, préfixe + caractère maximal[ parcouru sur la clé primaire
+        with self._engine().connect() as connection:
+            rows = connection.execute(
+                text(_SELECT_INSTRUMENT + "WHERE isin >= :start AND isin < :end ORDER BY isin LIMIT :limit"),
+                {"start": prefix, "end": prefix + "\uffff", "limit": limit}
+            ).mappings().all()
+        return [_as_instrument(row) for row in rows]
+
+    def upsert(self, records: Iterable[Dict[str, Any]], source: str = "reference") -> int:
+        """
+        Ajoute ou met à jour des instruments en une transaction
+
+        Args:
+            records: Instruments (clés isin et INSTRUMENT_FIELDS; champs absents conservés)
+            source: Origine de la mise à jour (reference ou resolution)
+
+        Returns:
+            Nombre d'instruments enregistrés (ISIN invalides ignorés)
+        """
+        rows = {}
+        for record in records:
+            row = _instrument_row(record, source)
+            if row is None:
+                logger.warning(f"Instrument ignoré (ISIN invalide): {record.get('isin')}")
+                continue
+            rows[row["isin"]] = row
+        if rows:
+            with self._engine().begin() as connection:
+                connection.execute(_UPSERT_INSTRUMENT, list(rows.values()))
+        return len(rows)
+
+    def load_file(self, path: str) -> int:
+        """
+        Charge un fichier de référence CSV ou JSON
+
+        Le CSV a une ligne d'en-tête (isin, symbol, exchange, currency, name, type; colonnes
+        facultatives sauf isin). Le JSON est une liste d'objets de mêmes clés, ou un objet
+        {isin: instrument}.
+
+        Args:
+            path: Chemin du fichier (.csv ou .json)
+
+        Returns:
+            Nombre d'instruments enregistrés
+
+        Raises:
+            ValueError: Si le format du fichier n'est pas reconnu
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                sample = f.read(4096)
+                f.seek(0)
+                try:
+                    dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+                except csv.Error:
+                    dialect = csv.excel
+                records = [{key.strip().lower(): value for key, value in row.items() if key}
+                           for row in csv.DictReader(f, dialect=dialect)]
+        elif extension == ".json":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                records = [dict(record, isin=isin) for isin, record in data.items() if isinstance(record, dict)]
+            elif isinstance(data, list):
+                records = [record for record in data if isinstance(record, dict)]
+            else:
+                raise ValueError(f"Format JSON non reconnu: {path}")
+        else:
+            raise ValueError(f"Format de fichier non reconnu (CSV ou JSON attendu): {path}")
+
+        count = self.upsert(records)
+        logger.info(f"Référentiel des instruments: {count} instruments chargés depuis {path}")
+        return count
+
+    def record_resolution(self, isin: str, symbol: str, info: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Complète le référentiel avec une résolution de symbole réussie
+
+        Args:
+            isin: Code ISIN
+            symbol: Symbole Yahoo Finance trouvé
+            info: Informations de cotation Yahoo Finance du symbole (exchange, currency, longName, quoteType)
+        """
+        info = info or {}
+        record = {
+            "isin": isin,
+            "symbol": symbol,
+            "exchange": info.get("exchange"),
+            "currency": info.get("currency"),
+            "name": info.get("longName") or info.get("shortName"),
+            "type": _QUOTE_TYPES.get(str(info.get("quoteType", "")).upper()),
+        }
+        try:
+            self.upsert([record], source="resolution")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'instrument {isin}: {str(e)}")
+
+    def clear(self) -> None:
+        """Vide le référentiel"""
+        with self._engine().begin() as connection:
+            connection.execute(text("DELETE FROM instruments"))
+
+
+# Créer une instance singleton du référentiel
+instrument_reference = InstrumentReference()
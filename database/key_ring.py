@@ -0,0 +1,222 @@
+"""
+Trousseau de clés du processus
+
+La dérivation PBKDF2 de la clé de chiffrement coûte plusieurs centaines de millisecondes.
+Le trousseau la réalise une seule fois par processus et partage les objets de chiffrement
+(données, sauvegardes, index aveugles, clés précédentes après rotation) avec tous les
+consommateurs: base de données, sauvegardes et scripts en ligne de commande.
+
+Pendant une rotation de clé, le trousseau connaît aussi la clé suivante (sel en cours de
+déploiement) et la clé précédente: il chiffre avec la plus récente et déchiffre avec toutes.
+"""
+import base64
+import hashlib
+import hmac
+import threading
+from typing import List, Optional, Tuple, Union
+
+from cryptography.fernet import Fernet, MultiFernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+from utils.logger import get_logger
+from utils.startup_metrics import measure_startup
+
+logger = get_logger(__name__)
+
+# Nombre d'itérations PBKDF2 (ne pas modifier: les données existantes en dépendent)
+PBKDF2_ITERATIONS = 100000
+
+# Contexte de dérivation de la clé des index aveugles (distincte de la clé de chiffrement)
+BLIND_INDEX_CONTEXT = b"patrimoine-blind-index-v1"
+
+
+def derive_fernet_key(secret_key: bytes, salt: bytes, iterations: int = PBKDF2_ITERATIONS) -> bytes:
+    """
+    Dérive une clé Fernet à partir d'une clé secrète et d'un sel
+
+    Args:
+        secret_key: Clé secrète
+        salt: Sel de dérivation
+        iterations: Nombre d'itérations PBKDF2
+
+    Returns:
+        Clé Fernet encodée en base64
+    """
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(secret_key))
+
+
+class KeyRing:
+    """
+    Trousseau de clés partagé par le processus
+
+    Les clés sont dérivées paresseusement au premier accès puis conservées en mémoire.
+    """
+
+    def __init__(self, secret_key: Optional[bytes] = None, salt: Optional[bytes] = None,
+                 next_salt: Optional[bytes] = None, previous_salt: Optional[bytes] = None):
+        """
+        Args:
+            secret_key: Clé secrète (par défaut celle de la configuration)
+            salt: Sel de dérivation (par défaut celui de la configuration)
+            next_salt: Sel de la rotation en cours (par défaut lu dans la configuration)
+            previous_salt: Sel d'avant la dernière rotation (par défaut lu dans la configuration)
+        """
+        self._secret_key = secret_key
+        self._salt = salt
+        self._next_salt = next_salt
+        self._previous_salt = previous_salt
+        self._lock = threading.RLock()
+        self._data_key: Optional[bytes] = None
+        self._data_cipher: Optional[Fernet] = None
+        self._blind_index_key: Optional[bytes] = None
+        self._previous_keys: List[bytes] = []
+        self._rotation_key: Optional[bytes] = None
+        self._rotation_loaded = False
+        self._cipher = None
+
+    def _get_secrets(self):
+        """Retourne la clé secrète et le sel (lus dans la configuration si non fournis)"""
+        if self._secret_key is None or self._salt is None:
+            from config.app_config import load_secret_keys
+            secret_key, salt = load_secret_keys()
+            return self._secret_key or secret_key, self._salt or salt
+        return self._secret_key, self._salt
+
+    def _get_rotation_salts(self) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """Retourne les sels suivant et précédent (lus dans la configuration si les clés ne sont pas fournies)"""
+        if self._secret_key is None or self._salt is None:
+            from config.app_config import load_rotation_salts
+            return load_rotation_salts()
+        return self._next_salt, self._previous_salt
+
+    @property
+    def data_key(self) -> bytes:
+        """Clé Fernet des données (dérivée une seule fois)"""
+        if self._data_key is None:
+            with self._lock:
+                if self._data_key is None:
+                    secret_key, salt = self._get_secrets()
+                    with measure_startup("key_ring.derive_data_key"):
+                        self._data_key = derive_fernet_key(secret_key, salt)
+        return self._data_key
+
+    @property
+    def data_cipher(self) -> Fernet:
+        """Objet de chiffrement des données"""
+        if self._data_cipher is None:
+            with self._lock:
+                if self._data_cipher is None:
+                    self._data_cipher = Fernet(self.data_key)
+        return self._data_cipher
+
+    @property
+    def backup_key(self) -> bytes:
+        """Clé des sauvegardes (identique à la clé des données pour relire les sauvegardes existantes)"""
+        return self.data_key
+
+    @property
+    def backup_cipher(self) -> Fernet:
+        """Objet de chiffrement des sauvegardes"""
+        return self.data_cipher
+
+    @property
+    def blind_index_key(self) -> bytes:
+        """Clé HMAC des index aveugles, dérivée de la clé secrète dans un contexte dédié"""
+        if self._blind_index_key is None:
+            with self._lock:
+                if self._blind_index_key is None:
+                    secret_key, _ = self._get_secrets()
+                    self._blind_index_key = hmac.new(secret_key, BLIND_INDEX_CONTEXT, hashlib.sha256).digest()
+        return self._blind_index_key
+
+    def _load_rotation_keys(self) -> None:
+        """Dérive les clés suivante et précédente à partir des sels de rotation (une seule fois)"""
+        if self._rotation_loaded:
+            return
+        with self._lock:
+            if self._rotation_loaded:
+                return
+            next_salt, previous_salt = self._get_rotation_salts()
+            secret_key, _ = self._get_secrets()
+            if previous_salt:
+                self.add_previous_key(derive_fernet_key(secret_key, previous_salt))
+            if next_salt:
+                with measure_startup("key_ring.derive_rotation_key"):
+                    self._rotation_key = derive_fernet_key(secret_key, next_salt)
+            self._rotation_loaded = True
+
+    @property
+    def rotation_key(self) -> Optional[bytes]:
+        """Clé Fernet de la rotation en cours (None si aucune rotation n'est en cours)"""
+        self._load_rotation_keys()
+        return self._rotation_key
+
+    @property
+    def cipher(self) -> Union[Fernet, MultiFernet]:
+        """
+        Objet de chiffrement actif des données
+
+        Hors rotation, il s'agit de l'objet de chiffrement des données. Pendant une rotation
+        (ou tant que l'ancienne clé est conservée), il chiffre avec la clé la plus récente
+        et déchiffre avec toutes les clés connues.
+        """
+        if self._cipher is None:
+            with self._lock:
+                if self._cipher is None:
+                    self._cipher = self._build_cipher()
+        return self._cipher
+
+    def _build_cipher(self) -> Union[Fernet, MultiFernet]:
+        """Construit l'objet de chiffrement actif à partir des clés connues"""
+        self._load_rotation_keys()
+        if self._rotation_key is None and not self._previous_keys:
+            return self.data_cipher
+
+        ciphers = [Fernet(self._rotation_key)] if self._rotation_key else []
+        ciphers.append(self.data_cipher)
+        ciphers.extend(Fernet(key) for key in self._previous_keys)
+        return MultiFernet(ciphers)
+
+    def add_previous_key(self, key: bytes) -> None:
+        """
+        Ajoute une ancienne clé Fernet, encore acceptée en déchiffrement (rotation de clés)
+
+        Args:
+            key: Clé Fernet encodée en base64
+        """
+        with self._lock:
+            if key != self.data_key and key not in self._previous_keys:
+                self._previous_keys.append(key)
+                self._cipher = None
+
+    def multi_cipher(self) -> MultiFernet:
+        """
+        Retourne un objet chiffrant avec la clé courante et déchiffrant avec toutes les clés connues
+
+        Returns:
+            MultiFernet (clé courante en premier)
+        """
+        with self._lock:
+            return MultiFernet([self.data_cipher] + [Fernet(key) for key in self._previous_keys])
+
+    def reset(self) -> None:
+        """Oublie toutes les clés dérivées (elles seront recalculées au prochain accès)"""
+        with self._lock:
+            self._data_key = None
+            self._data_cipher = None
+            self._blind_index_key = None
+            self._previous_keys = []
+            self._rotation_key = None
+            self._rotation_loaded = False
+            self._cipher = None
+
+
+# Instance partagée par tout le processus
+key_ring = KeyRing()
@@ -4,10 +4,14 @@ Modèles SQLAlchemy pour la base de données avec chiffrement au niveau des cham
 import datetime
 import uuid
 
-from sqlalchemy import Column, String, Float, Boolean, ForeignKey, DateTime, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Float, Boolean, ForeignKey, DateTime, Index, Integer, event, inspect, select
+from sqlalchemy.orm import Session, relationship, defer, deferred, load_only, undefer
 
+from database.blind_index import compute_blind_index, compute_search_tokens
 from database.db_config import Base
+from database.exposures import EXPOSURE_SOURCE_FIELDS, apply_exposure_state, load_exposure_state
+from database.revisions import bump_all_revisions, bump_revisions
+from database.rollups import install_rollup_triggers
 from utils.crypto import EncryptedJSON, EncryptedString
 
 
@@ -17,6 +21,7 @@ class User(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     username = Column(String, unique=True, index=True)
     email = Column(EncryptedString)  # Chiffré
+    email_bidx = Column(String, nullable=True)  # Index aveugle de l'email (unicité)
     password_hash = Column(String)   # Déjà haché, pas besoin de chiffrer
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.datetime.now)
@@ -24,6 +29,7 @@ class User(Base):
     # Indices optimisés
     __table_args__ = (
         Index('idx_users_username', 'username'),
+        Index('idx_users_email_bidx', 'email_bidx'),
     )
 
 class Bank(Base):
@@ -32,6 +38,7 @@ class Bank(Base):
     id = Column(String, primary_key=True, index=True)
     owner_id = Column(String, ForeignKey("users.id"), index=True)  # Index ajouté
     nom = Column(EncryptedString)    # Chiffré
+    nom_bidx = Column(String, nullable=True)  # Index aveugle du nom
     notes = Column(EncryptedString, nullable=True)  # Chiffré
 
     # Relations
@@ -40,6 +47,7 @@ class Bank(Base):
     # Indices optimisés
     __table_args__ = (
         Index('idx_banks_owner', 'owner_id'),
+        Index('idx_banks_owner_nom_bidx', 'owner_id', 'nom_bidx'),
     )
 
 class Account(Base):
@@ -49,6 +57,7 @@ class Account(Base):
     bank_id = Column(String, ForeignKey("banks.id"), index=True)  # Index ajouté
     type = Column(String, index=True)  # Index ajouté pour le filtrage par type
     libelle = Column(EncryptedString)  # Chiffré
+    libelle_bidx = Column(String, nullable=True)  # Index aveugle du libellé
 
     # Relations
     bank = relationship("Bank", back_populates="accounts")
@@ -58,6 +67,7 @@ class Account(Base):
     __table_args__ = (
         Index('idx_accounts_bank', 'bank_id'),
         Index('idx_accounts_type', 'type'),
+        Index('idx_accounts_libelle_bidx', 'libelle_bidx'),
     )
 
 class Asset(Base):
@@ -67,16 +77,18 @@ class Asset(Base):
     owner_id = Column(String, ForeignKey("users.id"), index=True)  # Index ajouté
     account_id = Column(String, ForeignKey("accounts.id"), index=True)  # Index ajouté
     nom = Column(EncryptedString)  # Chiffré
+    nom_bidx = Column(String, nullable=True)  # Index aveugle du nom
     type_produit = Column(String, index=True)  # Index ajouté pour le filtrage
     categorie = Column(String, index=True)  # Index ajouté pour le filtrage
     allocation = Column(EncryptedJSON)  # Chiffré - dict {categorie: pourcentage}
-    geo_allocation = Column(EncryptedJSON)  # Chiffré - dict {categorie: {zone: pourcentage}}
+    # Colonnes chiffrées volumineuses différées: chargées uniquement si le profil les demande
+    geo_allocation = deferred(Column(EncryptedJSON), group="asset_geo")  # Chiffré - dict {categorie: {zone: pourcentage}}
     valeur_actuelle = Column(Float)  # Sensible mais besoin de faire des calculs
     prix_de_revient = Column(Float)  # Sensible mais besoin de faire des calculs
     devise = Column(String, default="EUR", index=True)  # Index ajouté pour le filtrage par devise
     date_maj = Column(String)  # Non sensible
-    notes = Column(EncryptedString, nullable=True)  # Chiffré
-    todo = Column(EncryptedString, nullable=True)  # Chiffré
+    notes = deferred(Column(EncryptedString, nullable=True), group="asset_text")  # Chiffré
+    todo = deferred(Column(EncryptedString, nullable=True), group="asset_text")  # Chiffré
     isin = Column(String, nullable=True, index=True)  # Code ISIN, index ajouté
     ounces = Column(Float, nullable=True)  # Nombre d'onces pour les métaux précieux
     exchange_rate = Column(Float, default=1.0)  # Taux de change par rapport à l'EUR
@@ -99,17 +111,438 @@ class Asset(Base):
         Index('idx_assets_owner_account', 'owner_id', 'account_id'),
         Index('idx_assets_type_owner', 'type_produit', 'owner_id'),
         Index('idx_assets_value_eur', 'value_eur'),  # Pour les agrégations
+        Index('idx_assets_owner_nom_bidx', 'owner_id', 'nom_bidx'),
     )
 
+
+# Profils de chargement des actifs
+# - "list": colonnes par défaut (notes, todo et geo_allocation restent différées)
+# - "valuation": uniquement les colonnes utiles aux calculs de valeur et d'allocation
+# - "allocation": colonnes par défaut et répartition géographique (notes et todo restent différées)
+# - "full": toutes les colonnes, y compris les colonnes différées
+# - "sync": colonnes par défaut sans le nom (synchronisation des prix, cf. services.sync_planner)
+ASSET_LOAD_PROFILES = ("list", "valuation", "allocation", "full", "sync")
+
+
+def asset_load_options(profile: str = "list") -> list:
+    """
+    Retourne les options de chargement SQLAlchemy d'un profil d'actif
+
+    Args:
+        profile: Nom du profil ("list", "valuation", "allocation", "full" ou "sync")
+
+    Returns:
+        Liste d'options à passer à Query.options()
+
+    Raises:
+        ValueError: Si le profil est inconnu
+    """
+    if profile == "list":
+        return []
+    if profile == "valuation":
+        return [load_only(
+            Asset.id, Asset.owner_id, Asset.account_id, Asset.type_produit, Asset.categorie,
+            Asset.allocation, Asset.valeur_actuelle, Asset.prix_de_revient, Asset.devise,
+            Asset.value_eur, Asset.exchange_rate
+        )]
+    if profile == "allocation":
+        return [undefer(Asset.geo_allocation)]
+    if profile == "full":
+        return [undefer(Asset.geo_allocation), undefer(Asset.notes), undefer(Asset.todo)]
+    if profile == "sync":
+        return [defer(Asset.nom)]
+    raise ValueError(f"Profil de chargement inconnu: {profile} (attendu: {', '.join(ASSET_LOAD_PROFILES)})")
+
+
 class HistoryPoint(Base):
     __tablename__ = "history"
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
+    owner_id = Column(String, ForeignKey("users.id"))
     date = Column(String, index=True)  # Index ajouté pour les recherches par date
     assets = Column(EncryptedJSON)  # Chiffré
     total = Column(Float)  # Sensible mais besoin de faire des calculs
 
     # Indices optimisés
+    # (owner_id, date, total) couvre les séries de totaux: lecture de l'index seul, par utilisateur
     __table_args__ = (
         Index('idx_history_date', 'date'),
-    )
\ No newline at end of file
+        Index('idx_history_owner_date', 'owner_id', 'date', 'total'),
+    )
+
+
+class HistoryValue(Base):
+    """Valeur d'un actif à une date: historique normalisé, lisible sans déchiffrer les points d'historique"""
+    __tablename__ = "history_values"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    date = Column(String, primary_key=True)
+    asset_id = Column(String, primary_key=True)  # Sans clé étrangère: l'historique survit à la suppression de l'actif
+    value_eur = Column(Float)  # Non chiffré, comme Asset.value_eur (calculs SQL)
+
+    # Indices optimisés (la clé primaire couvre les requêtes par utilisateur et par date)
+    __table_args__ = (
+        Index('idx_history_values_user_asset_date', 'user_id', 'asset_id', 'date'),
+    )
+
+
+class AssetRollup(Base):
+    """
+    Agrégat des actifs par utilisateur × compte × type de produit
+
+    Maintenu par des triggers sur la table assets (cf. database.rollups): ne pas écrire directement.
+    Les clés absentes sont stockées en chaîne vide.
+    """
+    __tablename__ = "asset_rollups"
+
+    owner_id = Column(String, primary_key=True)
+    account_id = Column(String, primary_key=True)
+    type_produit = Column(String, primary_key=True)
+    value_eur = Column(Float, default=0.0)  # Valeur totale en EUR
+    cost_basis_eur = Column(Float, default=0.0)  # Prix de revient total en EUR
+    asset_count = Column(Integer, default=0)
+
+
+# Les triggers de maintenance des agrégats sont créés avec la table assets
+event.listen(Asset.__table__, "after_create",
+             lambda target, connection, **kw: install_rollup_triggers(connection))
+
+
+class ExposureAggregate(Base):
+    """
+    Valeur exposée par utilisateur × compte × catégorie × zone géographique
+
+    La zone vide porte le total de la catégorie. Maintenu par les événements du modèle Asset
+    (cf. database.exposures): ne pas écrire directement.
+    """
+    __tablename__ = "exposure_aggregates"
+
+    owner_id = Column(String, primary_key=True)
+    account_id = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    zone = Column(String, primary_key=True)
+    value_eur = Column(Float, default=0.0)
+
+
+class DataRevision(Base):
+    """
+    Révision des données d'un utilisateur
+
+    Incrémentée dans la transaction de chaque écriture sur ses données (cf. database.revisions):
+    ne pas écrire directement.
+    """
+    __tablename__ = "data_revisions"
+
+    user_id = Column(String, primary_key=True)
+    revision = Column(Integer, nullable=False, default=0)
+
+
+class InstrumentSymbol(Base):
+    """
+    Correspondance ISIN - symbole Yahoo Finance (cache partagé, cf. database.quote_store)
+    """
+    __tablename__ = "instrument_symbols"
+
+    isin = Column(String, primary_key=True)
+    symbol = Column(String, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+
+    __table_args__ = (
+        Index('idx_instrument_symbols_updated', 'updated_at'),
+    )
+
+
+class SymbolResolution(Base):
+    """
+    Échecs consécutifs de résolution du symbole d'un ISIN et prochaine tentative autorisée
+    (attente exponentielle, cf. database.quote_store)
+    """
+    __tablename__ = "symbol_resolutions"
+
+    isin = Column(String, primary_key=True)
+    failures = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    last_attempt_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+    retry_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_symbol_resolutions_last_attempt', 'last_attempt_at'),
+    )
+
+
+class SymbolResolutionAttempt(Base):
+    """
+    Historique des tentatives de résolution du symbole d'un ISIN
+    """
+    __tablename__ = "symbol_resolution_attempts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    isin = Column(String, nullable=False)
+    attempted_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+    symbol = Column(String, nullable=True)  # Symbole trouvé (None en cas d'échec)
+    error = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index('idx_symbol_resolution_attempts_isin', 'isin', 'attempted_at'),
+        Index('idx_symbol_resolution_attempts_date', 'attempted_at'),
+    )
+
+
+class Quote(Base):
+    """
+    Dernier prix connu d'un instrument: ISIN ou métal précieux (cache partagé, cf. database.quote_store)
+    """
+    __tablename__ = "quotes"
+
+    code = Column(String, primary_key=True)  # ISIN ou type de métal (gold, silver...)
+    kind = Column(String, nullable=False, default="isin")  # isin | metal
+    symbol = Column(String, nullable=True)
+    price = Column(Float, nullable=False)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+
+    __table_args__ = (
+        Index('idx_quotes_fetched', 'fetched_at'),
+    )
+
+
+class FxRate(Base):
+    """
+    Taux de change d'une devise pour 1 EUR (cache partagé, cf. database.quote_store)
+    """
+    __tablename__ = "fx_rates"
+
+    currency = Column(String, primary_key=True)
+    rate = Column(Float, nullable=False)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+
+    __table_args__ = (
+        Index('idx_fx_rates_fetched', 'fetched_at'),
+    )
+
+
+class Instrument(Base):
+    """
+    Référentiel local des instruments (cf. database.instrument_reference): chargé depuis des
+    fichiers de référence et complété par les résolutions de symboles réussies
+    """
+    __tablename__ = "instruments"
+
+    isin = Column(String, primary_key=True)  # Recherche exacte et par préfixe sur la clé primaire
+    symbol = Column(String, nullable=True)  # Symbole Yahoo Finance
+    exchange = Column(String, nullable=True)
+    currency = Column(String, nullable=True)
+    name = Column(String, nullable=True)
+    type = Column(String, nullable=True)  # Type de produit (cf. PRODUCT_TYPES)
+    source = Column(String, nullable=False, default="reference")  # reference | resolution
+    updated_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+
+
+def _exposure_fields_changed(target) -> bool:
+    """Indique si une colonne d'exposition chargée a été modifiée"""
+    unloaded = inspect(target).unloaded
+    return any(_field_changed(target, field) for field in EXPOSURE_SOURCE_FIELDS if field not in unloaded)
+
+
+def _add_asset_exposure(mapper, connection, target):
+    """Ajoute la contribution d'un nouvel actif aux agrégats d'exposition"""
+    apply_exposure_state(connection, {field: getattr(target, field) for field in EXPOSURE_SOURCE_FIELDS})
+
+
+def _committed_exposure_state(target):
+    """
+    Reconstitue les colonnes d'exposition en base d'un actif depuis l'historique des attributs
+
+    Retourne None si une colonne n'est pas chargée ou a été affectée sans que sa valeur
+    d'origine soit connue: il faut alors la relire en base.
+    """
+    state = inspect(target)
+    if any(field in state.unloaded for field in EXPOSURE_SOURCE_FIELDS):
+        return None
+    committed = {}
+    for field in EXPOSURE_SOURCE_FIELDS:
+        history = state.attrs[field].history
+        if history.unchanged:
+            committed[field] = history.unchanged[0]
+        elif history.deleted:
+            committed[field] = history.deleted[0]
+        else:
+            return None
+    return committed
+
+
+def _update_asset_exposure(mapper, connection, target):
+    """Remplace l'ancienne contribution d'un actif modifié par la nouvelle (avant l'UPDATE)"""
+    if not _exposure_fields_changed(target):
+        return
+    old_state = _committed_exposure_state(target)
+    if old_state is None:
+        old_state = load_exposure_state(connection, target.id)
+        if old_state is None:
+            return
+    # Les colonnes non chargées (géographie différée) sont inchangées: reprises de la base
+    unloaded = inspect(target).unloaded
+    new_state = {
+        field: old_state[field] if field in unloaded else getattr(target, field)
+        for field in EXPOSURE_SOURCE_FIELDS
+    }
+    apply_exposure_state(connection, old_state, -1)
+    apply_exposure_state(connection, new_state)
+
+
+def _remove_asset_exposure(mapper, connection, target):
+    """Retire la contribution d'un actif supprimé (avant le DELETE, valeurs relues en base si besoin)"""
+    old_state = _committed_exposure_state(target)
+    if old_state is None:
+        old_state = load_exposure_state(connection, target.id)
+    apply_exposure_state(connection, old_state, -1)
+
+
+event.listen(Asset, "after_insert", _add_asset_exposure)
+event.listen(Asset, "before_update", _update_asset_exposure)
+event.listen(Asset, "before_delete", _remove_asset_exposure)
+
+
+class SearchToken(Base):
+    """Jeton de recherche aveugle: empreinte HMAC d'un préfixe de mot d'un champ chiffré"""
+    __tablename__ = "search_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    owner_id = Column(String, ForeignKey("users.id"))
+    entity_type = Column(String)  # Type d'entité indexée (ex: "asset")
+    entity_id = Column(String)
+    field = Column(String)  # Champ source du jeton
+    token = Column(String)  # Empreinte HMAC du préfixe
+
+    # Indices optimisés
+    __table_args__ = (
+        Index('idx_search_tokens_lookup', 'owner_id', 'entity_type', 'token', 'entity_id'),
+        Index('idx_search_tokens_entity', 'entity_type', 'entity_id', 'field'),
+    )
+
+
+# Champs chiffrés disposant d'un index aveugle: {modèle: {champ source: colonne d'index}}
+BLIND_INDEXED_FIELDS = {
+    User: {"email": "email_bidx"},
+    Bank: {"nom": "nom_bidx"},
+    Account: {"libelle": "libelle_bidx"},
+    Asset: {"nom": "nom_bidx"},
+}
+
+# Champs chiffrés indexés pour la recherche par mot: {modèle: (type d'entité, champs)}
+SEARCH_INDEXED_FIELDS = {
+    Asset: ("asset", ("nom",)),
+}
+
+
+def _field_changed(target, field: str) -> bool:
+    """Indique si un attribut a été modifié depuis son chargement"""
+    return inspect(target).attrs[field].history.has_changes()
+
+
+def _set_blind_indexes(mapper, connection, target, is_insert: bool):
+    """Met à jour les colonnes d'index aveugle à partir des valeurs en clair"""
+    for field, index_column in BLIND_INDEXED_FIELDS[mapper.class_].items():
+        if is_insert or _field_changed(target, field):
+            setattr(target, index_column, compute_blind_index(getattr(target, field)))
+
+
+def _write_search_tokens(connection, owner_id, entity_type, entity_id, field, value):
+    """Remplace les jetons de recherche d'un champ d'une entité"""
+    table = SearchToken.__table__
+    connection.execute(
+        table.delete().where(
+            table.c.entity_type == entity_type,
+            table.c.entity_id == entity_id,
+            table.c.field == field
+        )
+    )
+    tokens = compute_search_tokens(value)
+    if tokens:
+        connection.execute(table.insert(), [
+            {"owner_id": owner_id, "entity_type": entity_type, "entity_id": entity_id,
+             "field": field, "token": token}
+            for token in tokens
+        ])
+
+
+def _update_search_tokens(mapper, connection, target, is_insert: bool):
+    """Met à jour les jetons de recherche des champs modifiés"""
+    entity_type, fields = SEARCH_INDEXED_FIELDS[mapper.class_]
+    for field in fields:
+        if is_insert or _field_changed(target, field):
+            _write_search_tokens(connection, target.owner_id, entity_type, target.id, field, getattr(target, field))
+
+
+def _delete_search_tokens(mapper, connection, target):
+    """Supprime les jetons de recherche d'une entité supprimée"""
+    entity_type, _ = SEARCH_INDEXED_FIELDS[mapper.class_]
+    table = SearchToken.__table__
+    connection.execute(
+        table.delete().where(table.c.entity_type == entity_type, table.c.entity_id == target.id)
+    )
+
+
+for _model in BLIND_INDEXED_FIELDS:
+    event.listen(_model, "before_insert", lambda m, c, t: _set_blind_indexes(m, c, t, True))
+    event.listen(_model, "before_update", lambda m, c, t: _set_blind_indexes(m, c, t, False))
+
+for _model in SEARCH_INDEXED_FIELDS:
+    event.listen(_model, "after_insert", lambda m, c, t: _update_search_tokens(m, c, t, True))
+    event.listen(_model, "after_update", lambda m, c, t: _update_search_tokens(m, c, t, False))
+    event.listen(_model, "after_delete", _delete_search_tokens)
+
+
+# Révision des données par utilisateur: incrémentée dans la transaction de l'écriture,
+# donc visible des autres processus à la validation et annulée par un rollback
+_REVISION_OWNER_COLUMNS = {
+    Asset: Asset.owner_id,
+    Bank: Bank.owner_id,
+    HistoryPoint: HistoryPoint.owner_id,
+    HistoryValue: HistoryValue.user_id,
+}
+
+
+def _revision_owner(session, obj):
+    """Retourne le propriétaire d'un objet suivi par les révisions (None si non suivi)"""
+    column = _REVISION_OWNER_COLUMNS.get(type(obj))
+    if column is not None:
+        return getattr(obj, column.key)
+    if isinstance(obj, Account):
+        return session.connection().execute(
+            Bank.__table__.select().with_only_columns(Bank.__table__.c.owner_id)
+            .where(Bank.__table__.c.id == obj.bank_id)
+        ).scalar()
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_revisions(session, flush_context):
+    """Incrémente la révision des utilisateurs dont les données ont été écrites par le flush"""
+    owners = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        owner_id = _revision_owner(session, obj)
+        if owner_id:
+            owners.add(owner_id)
+    bump_revisions(session.connection(), owners)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_bulk_revisions(orm_execute_state):
+    """
+    Mises à jour en masse (query.update/delete): les propriétaires des lignes visées sont lus
+    avec le même critère avant l'écriture; à défaut, tous les utilisateurs sont invalidés
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or (mapper.class_ not in _REVISION_OWNER_COLUMNS and mapper.class_ is not Account):
+        return
+
+    connection = orm_execute_state.session.connection()
+    column = _REVISION_OWNER_COLUMNS.get(mapper.class_)
+    whereclause = orm_execute_state.statement.whereclause
+    if column is None or whereclause is None:
+        bump_all_revisions(connection)
+        return
+    owners = connection.execute(select(column).distinct().where(whereclause)).scalars().all()
+    bump_revisions(connection, owners)
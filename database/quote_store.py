@@ -0,0 +1,586 @@
+"""
+Cache partagé des cotations dans SQLite
+
+Tables (cf. database.models):
+- instrument_symbols: symbole Yahoo Finance de chaque ISIN;
+- quotes: dernier prix connu de chaque instrument (ISIN ou métal précieux);
+- fx_rates: taux de change de chaque devise pour 1 EUR;
+- symbol_resolutions / symbol_resolution_attempts: échecs de résolution du symbole d'un ISIN
+  (attente exponentielle avant la tentative suivante) et historique des tentatives.
+
+Lecture traversante: une entrée est servie depuis la mémoire du processus, sinon lue en base
+par clé primaire (entrées écrites par les autres processus) puis mémorisée. Les écritures
+ne modifient que la mémoire; flush() les enregistre en une transaction (UPSERT) et supprime
+les lignes plus anciennes que leur durée de rétention (QUOTE_STORE_RETENTION). La base
+étant partagée, les processus (workers Streamlit, scripts) partagent le cache, et les
+sauvegardes l'incluent.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, bindparam, text
+
+from config.app_config import QUOTE_STORE_RETENTION, SYMBOL_RESOLUTION_BACKOFF_BASE, SYMBOL_RESOLUTION_BACKOFF_MAX
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Anciens fichiers de cache JSON (importés par la migration 9d2e6a1f4c38)
+LEGACY_CACHE_FILES = {
+    "isin_prices": "isin_prices_cache.json",
+    "isin_symbols": "isin_symbol_map.json",
+    "metal_prices": "metals_prices_cache.json",
+    "currency_rates": "currency_rates_cache.json",
+}
+
+# Colonne de date de chaque table (durée de validité et rétention)
+_TIMESTAMP_COLUMNS = {
+    "instrument_symbols": "updated_at",
+    "quotes": "fetched_at",
+    "fx_rates": "fetched_at",
+    "symbol_resolutions": "last_attempt_at",
+    "symbol_resolution_attempts": "attempted_at",
+}
+
+_UPSERT_SYMBOL = text(
+    "INSERT INTO instrument_symbols (isin, symbol, updated_at) VALUES (:isin, :symbol, :updated_at) "
+    "ON CONFLICT (isin) DO UPDATE SET symbol = excluded.symbol, updated_at = excluded.updated_at"
+).bindparams(bindparam("updated_at", type_=DateTime))
+_UPSERT_QUOTE = text(
+    "INSERT INTO quotes (code, kind, symbol, price, fetched_at) "
+    "VALUES (:code, :kind, :symbol, :price, :fetched_at) "
+    "ON CONFLICT (code) DO UPDATE SET kind = excluded.kind, symbol = COALESCE(excluded.symbol, quotes.symbol), "
+    "price = excluded.price, fetched_at = excluded.fetched_at"
+).bindparams(bindparam("fetched_at", type_=DateTime))
+_UPSERT_FX_RATE = text(
+    "INSERT INTO fx_rates (currency, rate, fetched_at) VALUES (:currency, :rate, :fetched_at) "
+    "ON CONFLICT (currency) DO UPDATE SET rate = excluded.rate, fetched_at = excluded.fetched_at"
+).bindparams(bindparam("fetched_at", type_=DateTime))
+_UPSERT_RESOLUTION = text(
+    "INSERT INTO symbol_resolutions (isin, failures, last_error, last_attempt_at, retry_at) "
+    "VALUES (:isin, :failures, :last_error, :last_attempt_at, :retry_at) "
+    "ON CONFLICT (isin) DO UPDATE SET failures = excluded.failures, last_error = excluded.last_error, "
+    "last_attempt_at = excluded.last_attempt_at, retry_at = excluded.retry_at"
+).bindparams(bindparam("last_attempt_at", type_=DateTime), bindparam("retry_at", type_=DateTime))
+_INSERT_ATTEMPT = text(
+    "INSERT INTO symbol_resolution_attempts (isin, attempted_at, symbol, error) "
+    "VALUES (:isin, :attempted_at, :symbol, :error)"
+).bindparams(bindparam("attempted_at", type_=DateTime))
+
+# Marqueur d'une entrée absente de la mémoire (None y signifie "absente en base")
+_MISSING = object()
+
+
+def _is_fresh(timestamp: Optional[datetime], max_age: Optional[float]) -> bool:
+    """Indique si une date est plus récente que max_age secondes (toujours vrai sans max_age)"""
+    if max_age is None:
+        return True
+    return timestamp is not None and datetime.now() - timestamp < timedelta(seconds=max_age)
+
+
+def _retention_cutoffs() -> Dict[str, datetime]:
+    """Date limite de conservation de chaque table ayant une durée de rétention"""
+    now = datetime.now()
+    return {
+        table: now - timedelta(seconds=QUOTE_STORE_RETENTION[table])
+        for table in _TIMESTAMP_COLUMNS
+        if QUOTE_STORE_RETENTION.get(table) is not None
+    }
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Date lue en base (les requêtes textuelles retournent les DATETIME de SQLite en chaîne)"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class QuoteStore:
+    """Cache des symboles, prix et taux de change, en mémoire et dans SQLite"""
+
+    def __init__(self, bind=None):
+        """
+        Args:
+            bind: Moteur SQLAlchemy (moteur de l'application si None)
+        """
+        self.bind = bind
+        self._lock = threading.RLock()
+        self._symbols: Dict[str, Dict[str, Any]] = {}
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        self._fx: Optional[Dict[str, Any]] = None
+        self._dirty_symbols: Dict[str, Dict[str, Any]] = {}
+        self._dirty_quotes: Dict[str, Dict[str, Any]] = {}
+        self._dirty_fx: Optional[Dict[str, Any]] = None
+        self._resolutions: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._dirty_resolutions: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._dirty_attempts: List[Dict[str, Any]] = []
+
+    def _engine(self):
+        if self.bind is not None:
+            return self.bind
+        from database.db_config import engine
+        return engine
+
+    # Symboles
+
+    def get_symbol(self, isin: str) -> Optional[str]:
+        """
+        Retourne le symbole Yahoo Finance enregistré pour un ISIN
+
+        Args:
+            isin: Code ISIN
+
+        Returns:
+            Symbole ou None si inconnu
+        """
+        with self._lock:
+            row = self._symbols.get(isin)
+        if row is None:
+            with self._engine().connect() as connection:
+                row = connection.execute(
+                    text("SELECT isin, symbol, updated_at FROM instrument_symbols WHERE isin = :isin"),
+                    {"isin": isin}
+                ).mappings().first()
+            if row is None:
+                return None
+            row = dict(row)
+            with self._lock:
+                row = self._symbols.setdefault(isin, row)
+        return row["symbol"]
+
+    def set_symbol(self, isin: str, symbol: str) -> None:
+        """
+        Enregistre le symbole d'un ISIN (écrit en base au prochain flush)
+
+        Args:
+            isin: Code ISIN
+            symbol: Symbole Yahoo Finance
+        """
+        row = {"isin": isin, "symbol": symbol, "updated_at": datetime.now()}
+        with self._lock:
+            self._symbols[isin] = row
+            self._dirty_symbols[isin] = row
+
+    def get_suffix_hits(self, country: str) -> Dict[str, int]:
+        """
+        Compte les symboles enregistrés par suffixe de place pour les ISIN d'un pays
+
+        Args:
+            country: Code pays (deux premières lettres de l'ISIN)
+
+        Returns:
+            Nombre de symboles par suffixe (".PA", ... ou "" pour un symbole sans suffixe)
+        """
+        with self._engine().connect() as connection:
+            rows = dict(connection.execute(
+                text("SELECT isin, symbol FROM instrument_symbols WHERE isin LIKE :prefix"),
+                {"prefix": f"{country}%"}
+            ).all())
+        with self._lock:
+            rows.update((isin, row["symbol"]) for isin, row in self._dirty_symbols.items() if isin.startswith(country))
+
+        hits: Dict[str, int] = {}
+        for symbol in rows.values():
+            suffix = f".{symbol.rsplit('.', 1)[1]}" if "." in symbol else ""
+            hits[suffix] = hits.get(suffix, 0) + 1
+        return hits
+
+    # Prix
+
+    def get_quote(self, code: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retourne le dernier prix connu d'un instrument
+
+        Args:
+            code: ISIN ou type de métal
+            max_age: Âge maximum en secondes (None pour accepter un prix expiré)
+
+        Returns:
+            Dictionnaire {price, symbol, kind, fetched_at} ou None si absent ou trop ancien
+        """
+        with self._lock:
+            row = self._quotes.get(code)
+            pending = code in self._dirty_quotes
+        # Prix absent ou expiré en mémoire: un autre processus a pu le rafraîchir
+        if not pending and (row is None or not _is_fresh(row["fetched_at"], max_age)):
+            with self._engine().connect() as connection:
+                stored = connection.execute(
+                    text("SELECT code, kind, symbol, price, fetched_at FROM quotes WHERE code = :code"),
+                    {"code": code}
+                ).mappings().first()
+            if stored is not None:
+                row = dict(stored, fetched_at=_as_datetime(stored["fetched_at"]))
+                with self._lock:
+                    if code not in self._dirty_quotes:
+                        self._quotes[code] = row
+        if row is None or not _is_fresh(row["fetched_at"], max_age):
+            return None
+        return dict(row)
+
+    def set_quote(
+            self,
+            code: str,
+            price: float,
+            kind: str = "isin",
+            symbol: Optional[str] = None,
+            fetched_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Enregistre le prix d'un instrument (écrit en base au prochain flush)
+
+        Args:
+            code: ISIN ou type de métal
+            price: Prix
+            kind: Type d'instrument (isin ou metal)
+            symbol: Symbole Yahoo Finance utilisé
+            fetched_at: Date du prix (maintenant si None)
+        """
+        row = {"code": code, "kind": kind, "symbol": symbol, "price": price,
+               "fetched_at": fetched_at or datetime.now()}
+        with self._lock:
+            self._quotes[code] = row
+            self._dirty_quotes[code] = row
+
+    # Taux de change
+
+    def get_fx_rates(self, max_age: Optional[float] = None) -> Optional[Dict[str, float]]:
+        """
+        Retourne les taux de change enregistrés
+
+        Args:
+            max_age: Âge maximum en secondes du plus ancien taux (None pour accepter des taux expirés)
+
+        Returns:
+            Taux par devise pour 1 EUR, ou None si absents ou trop anciens
+        """
+        with self._lock:
+            fx = self._fx
+            pending = self._dirty_fx is not None
+        if not pending and (fx is None or not _is_fresh(fx["fetched_at"], max_age)):
+            with self._engine().connect() as connection:
+                rows = connection.execute(text("SELECT currency, rate, fetched_at FROM fx_rates")).all()
+            if rows:
+                fx = {
+                    "rates": {currency: rate for currency, rate, _ in rows},
+                    "fetched_at": min(_as_datetime(fetched_at) for _, _, fetched_at in rows),
+                }
+                with self._lock:
+                    if self._dirty_fx is None:
+                        self._fx = fx
+        if fx is None or not _is_fresh(fx["fetched_at"], max_age):
+            return None
+        return dict(fx["rates"])
+
+    def set_fx_rates(self, rates: Dict[str, float], fetched_at: Optional[datetime] = None) -> None:
+        """
+        Enregistre les taux de change (écrits en base au prochain flush)
+
+        Args:
+            rates: Taux par devise pour 1 EUR
+            fetched_at: Date des taux (maintenant si None)
+        """
+        fx = {"rates": dict(rates), "fetched_at": fetched_at or datetime.now()}
+        with self._lock:
+            self._fx = fx
+            self._dirty_fx = fx
+
+    # Résolution des symboles
+
+    def _resolution_state(self, isin: str) -> Optional[Dict[str, Any]]:
+        """Échecs de résolution en cours d'un ISIN (mémoire, sinon base), None si aucun"""
+        with self._lock:
+            state = self._resolutions.get(isin, _MISSING)
+        if state is _MISSING:
+            with self._engine().connect() as connection:
+                row = connection.execute(
+                    text("SELECT isin, failures, last_error, last_attempt_at, retry_at "
+                         "FROM symbol_resolutions WHERE isin = :isin"),
+                    {"isin": isin}
+                ).mappings().first()
+            state = None if row is None else dict(
+                row, last_attempt_at=_as_datetime(row["last_attempt_at"]), retry_at=_as_datetime(row["retry_at"])
+            )
+            with self._lock:
+                state = self._resolutions.setdefault(isin, state)
+        return state
+
+    def get_resolution_backoff(self, isin: str) -> Optional[datetime]:
+        """
+        Retourne la date avant laquelle la résolution du symbole d'un ISIN ne doit pas être retentée
+
+        Args:
+            isin: Code ISIN
+
+        Returns:
+            Date de la prochaine tentative autorisée, ou None si une tentative est autorisée
+        """
+        state = self._resolution_state(isin)
+        if state is not None and state["retry_at"] > datetime.now():
+            return state["retry_at"]
+        return None
+
+    def record_resolution(self, isin: str, symbol: Optional[str] = None, error: Optional[str] = None) -> None:
+        """
+        Enregistre une tentative de résolution du symbole d'un ISIN (écrite en base au prochain flush)
+
+        Un succès enregistre le symbole et efface les échecs; un échec repousse la tentative
+        suivante de SYMBOL_RESOLUTION_BACKOFF_BASE secondes, durée doublée à chaque échec
+        consécutif (au plus SYMBOL_RESOLUTION_BACKOFF_MAX).
+
+        Args:
+            isin: Code ISIN
+            symbol: Symbole trouvé (None en cas d'échec)
+            error: Cause de l'échec
+        """
+        now = datetime.now()
+        attempt = {"isin": isin, "attempted_at": now, "symbol": symbol, "error": None if symbol else error}
+        if symbol:
+            self.set_symbol(isin, symbol)
+            state = None
+        else:
+            previous = self._resolution_state(isin)
+            failures = (previous["failures"] if previous else 0) + 1
+            delay = min(SYMBOL_RESOLUTION_BACKOFF_BASE * 2 ** (failures - 1), SYMBOL_RESOLUTION_BACKOFF_MAX)
+            state = {"isin": isin, "failures": failures, "last_error": error,
+                     "last_attempt_at": now, "retry_at": now + timedelta(seconds=delay)}
+        with self._lock:
+            self._resolutions[isin] = state
+            self._dirty_resolutions[isin] = state
+            self._dirty_attempts.append(attempt)
+
+    def get_resolution_attempts(self, isin: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Retourne l'historique des tentatives de résolution du symbole d'un ISIN
+
+        Args:
+            isin: Code ISIN
+            limit: Nombre maximum de tentatives
+
+        Returns:
+            Tentatives {attempted_at, symbol, error}, de la plus récente à la plus ancienne
+        """
+        with self._engine().connect() as connection:
+            rows = connection.execute(
+                text("SELECT attempted_at, symbol, error FROM symbol_resolution_attempts "
+                     "WHERE isin = :isin ORDER BY attempted_at DESC LIMIT :limit"),
+                {"isin": isin, "limit": limit}
+            ).mappings().all()
+        with self._lock:
+            pending = [
+                {"attempted_at": attempt["attempted_at"], "symbol": attempt["symbol"], "error": attempt["error"]}
+                for attempt in reversed(self._dirty_attempts) if attempt["isin"] == isin
+            ]
+        stored = [dict(row, attempted_at=_as_datetime(row["attempted_at"])) for row in rows]
+        return (pending + stored)[:limit]
+
+    # Persistance
+
+    def flush(self) -> int:
+        """
+        Enregistre les entrées modifiées en une transaction et supprime les lignes expirées
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        with self._lock:
+            symbols = list(self._dirty_symbols.values())
+            quotes = list(self._dirty_quotes.values())
+            fx = self._dirty_fx
+            resolutions = [state for state in self._dirty_resolutions.values() if state is not None]
+            resolved = [isin for isin, state in self._dirty_resolutions.items() if state is None]
+            attempts = list(self._dirty_attempts)
+            if not symbols and not quotes and fx is None and not self._dirty_resolutions and not attempts:
+                return 0
+
+            fx_rows = [] if fx is None else [
+                {"currency": currency, "rate": rate, "fetched_at": fx["fetched_at"]}
+                for currency, rate in fx["rates"].items()
+            ]
+            try:
+                with self._engine().begin() as connection:
+                    if symbols:
+                        connection.execute(_UPSERT_SYMBOL, symbols)
+                    if quotes:
+                        connection.execute(_UPSERT_QUOTE, quotes)
+                    if fx_rows:
+                        connection.execute(_UPSERT_FX_RATE, fx_rows)
+                    if resolutions:
+                        connection.execute(_UPSERT_RESOLUTION, resolutions)
+                    if resolved:
+                        connection.execute(text("DELETE FROM symbol_resolutions WHERE isin = :isin"),
+                                           [{"isin": isin} for isin in resolved])
+                    if attempts:
+                        connection.execute(_INSERT_ATTEMPT, attempts)
+                    self.evict_expired(connection)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'enregistrement du cache des cotations: {str(e)}")
+                return 0
+
+            self._dirty_symbols = {}
+            self._dirty_quotes = {}
+            self._dirty_fx = None
+            self._dirty_resolutions = {}
+            self._dirty_attempts = []
+            # Entrées expirées écrites puis supprimées par la rétention dans la même transaction
+            self._evict_memory()
+        written = len(symbols) + len(quotes) + len(fx_rows) + len(resolutions) + len(resolved) + len(attempts)
+        logger.debug(f"Cache des cotations: {written} lignes enregistrées")
+        return written
+
+    def evict_expired(self, connection=None) -> int:
+        """
+        Supprime les lignes plus anciennes que leur durée de rétention
+
+        Args:
+            connection: Connexion SQLAlchemy (transaction dédiée si None)
+
+        Returns:
+            Nombre de lignes supprimées
+        """
+        if connection is None:
+            with self._engine().begin() as connection:
+                return self.evict_expired(connection)
+
+        deleted = 0
+        for table, cutoff in _retention_cutoffs().items():
+            deleted += connection.execute(
+                text(f"DELETE FROM {table} WHERE {_TIMESTAMP_COLUMNS[table]} < :cutoff")
+                .bindparams(bindparam("cutoff", type_=DateTime)),
+                {"cutoff": cutoff}
+            ).rowcount or 0
+        self._evict_memory()
+        return deleted
+
+    def _evict_memory(self) -> None:
+        """
+        Oublie les entrées en mémoire plus anciennes que la rétention de leur table
+
+        Seules les entrées déjà enregistrées sont concernées: les modifications en attente
+        du prochain flush sont conservées.
+        """
+        cutoffs = _retention_cutoffs()
+
+        def expired(table, timestamp):
+            return table in cutoffs and timestamp is not None and timestamp < cutoffs[table]
+
+        with self._lock:
+            self._symbols = {
+                isin: row for isin, row in self._symbols.items()
+                if isin in self._dirty_symbols or not expired("instrument_symbols", row["updated_at"])
+            }
+            self._quotes = {
+                code: row for code, row in self._quotes.items()
+                if code in self._dirty_quotes or not expired("quotes", row["fetched_at"])
+            }
+            if self._fx is not None and self._dirty_fx is None and expired("fx_rates", self._fx["fetched_at"]):
+                self._fx = None
+            self._resolutions = {
+                isin: state for isin, state in self._resolutions.items()
+                if isin in self._dirty_resolutions or state is None
+                or not expired("symbol_resolutions", state["last_attempt_at"])
+            }
+
+    def clear_memory(self) -> None:
+        """Oublie les entrées en mémoire (les modifications non enregistrées sont perdues)"""
+        with self._lock:
+            self._symbols = {}
+            self._quotes = {}
+            self._fx = None
+            self._dirty_symbols = {}
+            self._dirty_quotes = {}
+            self._dirty_fx = None
+            self._resolutions = {}
+            self._dirty_resolutions = {}
+            self._dirty_attempts = []
+
+    def clear(self) -> None:
+        """Vide le cache (mémoire et tables)"""
+        with self._lock:
+            with self._engine().begin() as connection:
+                for table in _TIMESTAMP_COLUMNS:
+                    connection.execute(text(f"DELETE FROM {table}"))
+            self.clear_memory()
+
+
+def import_json_caches(connection, data_dir: str) -> Dict[str, int]:
+    """
+    Importe les anciens fichiers de cache JSON dans les tables de cotations
+
+    Les lignes déjà présentes sont remplacées. Les fichiers sont laissés en place.
+
+    Args:
+        connection: Connexion SQLAlchemy (dans une transaction)
+        data_dir: Dossier des fichiers de cache
+
+    Returns:
+        Nombre de lignes importées par fichier
+    """
+    def load(name):
+        path = os.path.join(str(data_dir), LEGACY_CACHE_FILES[name])
+        try:
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+        except Exception as e:
+            logger.warning(f"Cache {path} ignoré: {str(e)}")
+        return {}
+
+    def parse_date(value):
+        try:
+            if isinstance(value, (int, float)):
+                return datetime.fromtimestamp(value)
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError, OSError):
+            return None
+
+    counts = {}
+
+    symbols = [
+        {"isin": isin, "symbol": symbol, "updated_at": datetime.now()}
+        for isin, symbol in load("isin_symbols").items() if isinstance(symbol, str) and symbol
+    ]
+
+    quotes = []
+    for name, kind in (("isin_prices", "isin"), ("metal_prices", "metal")):
+        count = 0
+        for code, entry in load(name).items():
+            fetched_at = parse_date(entry.get("timestamp")) if isinstance(entry, dict) else None
+            if fetched_at is None or not isinstance(entry.get("price"), (int, float)):
+                continue
+            quotes.append({"code": code, "kind": kind, "symbol": entry.get("symbol"),
+                           "price": float(entry["price"]), "fetched_at": fetched_at})
+            count += 1
+            # Le symbole d'un prix ISIN complète la correspondance
+            if kind == "isin" and entry.get("symbol"):
+                symbols.append({"isin": code, "symbol": entry["symbol"], "updated_at": fetched_at})
+        counts[name] = count
+
+    currency = load("currency_rates")
+    fetched_at = parse_date(currency.get("timestamp"))
+    fx_rows = [
+        {"currency": code, "rate": float(rate), "fetched_at": fetched_at}
+        for code, rate in (currency.get("rates") or {}).items()
+        if fetched_at is not None and isinstance(rate, (int, float))
+    ]
+    counts["currency_rates"] = len(fx_rows)
+
+    # Les symboles explicites priment sur ceux déduits des prix
+    symbols = list({row["isin"]: row for row in reversed(symbols)}.values())
+    counts["isin_symbols"] = len(symbols)
+
+    if symbols:
+        connection.execute(_UPSERT_SYMBOL, symbols)
+    if quotes:
+        connection.execute(_UPSERT_QUOTE, quotes)
+    if fx_rows:
+        connection.execute(_UPSERT_FX_RATE, fx_rows)
+    return counts
+
+
+# Cache partagé du processus
+quote_store = QuoteStore()
@@ -0,0 +1,64 @@
+"""
+Révision des données par utilisateur
+
+La table data_revisions contient, pour chaque utilisateur, un compteur croissant incrémenté
+par toute écriture sur ses actifs, comptes, banques ou son historique. Le compteur est
+incrémenté dans la transaction de l'écriture (événements de session de database.models):
+il n'est visible des autres processus (workers Streamlit, scripts cron) qu'à la validation
+et disparaît avec un rollback.
+
+Un cache (instantané de portefeuille, résultats de lecture) indexé par
+(user_id, révision) reste ainsi cohérent entre processus au prix d'une lecture par clé
+primaire. Un utilisateur sans ligne est à la révision 0.
+"""
+from typing import Iterable
+
+from sqlalchemy import text
+
+
+def get_revision(bind, user_id: str) -> int:
+    """
+    Retourne la révision courante des données d'un utilisateur (une lecture par clé primaire)
+
+    Args:
+        bind: Session ou connexion SQLAlchemy
+        user_id: ID de l'utilisateur
+
+    Returns:
+        Révision (croissante à chaque écriture validée)
+    """
+    revision = bind.execute(
+        text("SELECT revision FROM data_revisions WHERE user_id = :user_id"), {"user_id": user_id}
+    ).scalar()
+    return revision or 0
+
+
+def bump_revisions(connection, user_ids: Iterable[str]) -> None:
+    """
+    Incrémente la révision de plusieurs utilisateurs
+
+    Args:
+        connection: Connexion SQLAlchemy (dans la transaction de l'écriture)
+        user_ids: IDs des utilisateurs dont les données ont changé
+    """
+    params = [{"user_id": user_id} for user_id in sorted(set(user_ids)) if user_id]
+    if not params:
+        return
+    connection.execute(text(
+        "INSERT INTO data_revisions (user_id, revision) VALUES (:user_id, 1) "
+        "ON CONFLICT (user_id) DO UPDATE SET revision = revision + 1"
+    ), params)
+
+
+def bump_all_revisions(connection) -> None:
+    """
+    Incrémente la révision de tous les utilisateurs (écriture dont le propriétaire est inconnu)
+
+    Args:
+        connection: Connexion SQLAlchemy (dans la transaction de l'écriture)
+    """
+    # "WHERE true" lève l'ambiguïté d'analyse d'un UPSERT alimenté par un SELECT (SQLite)
+    connection.execute(text(
+        "INSERT INTO data_revisions (user_id, revision) SELECT id, 1 FROM users WHERE true "
+        "ON CONFLICT (user_id) DO UPDATE SET revision = revision + 1"
+    ))
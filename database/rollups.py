@@ -0,0 +1,172 @@
+"""
+Agrégats numériques des actifs maintenus par des triggers SQLite
+
+La table asset_rollups contient, par utilisateur × compte × type de produit, la valeur
+totale en EUR, le prix de revient total en EUR et le nombre d'actifs. Ces colonnes
+source étant en clair, des triggers sur la table assets tiennent les agrégats à jour
+à chaque insertion, modification ou suppression: les totaux par compte, banque ou
+type de produit se lisent en O(nombre de groupes) au lieu de O(nombre d'actifs).
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+# Valeur et prix de revient en EUR d'une ligne d'actif ({row} = NEW, OLD ou assets)
+# Même règle que le tableau de bord: value_eur, à défaut la valeur actuelle des actifs en EUR
+_VALUE_EUR_SQL = (
+    "COALESCE({row}.value_eur, CASE WHEN {row}.devise = 'EUR' THEN COALESCE({row}.valeur_actuelle, 0) ELSE 0 END)"
+)
+# Le taux de change est exprimé en devise pour 1 EUR (cf. CurrencyService.convert_to_eur)
+_COST_EUR_SQL = (
+    "CASE WHEN {row}.devise = 'EUR' OR COALESCE({row}.exchange_rate, 0) <= 0 "
+    "THEN COALESCE({row}.prix_de_revient, 0) "
+    "ELSE COALESCE({row}.prix_de_revient, 0) / {row}.exchange_rate END"
+)
+# Les clés NULL sont stockées en chaîne vide (NULL est toujours distinct dans une clé primaire SQLite)
+_KEY_SQL = "COALESCE({row}.owner_id, ''), COALESCE({row}.account_id, ''), COALESCE({row}.type_produit, '')"
+_KEY_MATCH_SQL = (
+    "owner_id = COALESCE({row}.owner_id, '') AND account_id = COALESCE({row}.account_id, '') "
+    "AND type_produit = COALESCE({row}.type_produit, '')"
+)
+
+# Colonnes d'actif dont dépendent les agrégats
+ROLLUP_SOURCE_COLUMNS = (
+    "owner_id", "account_id", "type_produit", "value_eur", "valeur_actuelle",
+    "prix_de_revient", "devise", "exchange_rate",
+)
+
+
+def _add_row_sql(row: str) -> str:
+    """Instruction ajoutant une ligne d'actif à son agrégat"""
+    return (
+        "INSERT INTO asset_rollups (owner_id, account_id, type_produit, value_eur, cost_basis_eur, asset_count) "
+        f"VALUES ({_KEY_SQL.format(row=row)}, {_VALUE_EUR_SQL.format(row=row)}, "
+        f"{_COST_EUR_SQL.format(row=row)}, 1) "
+        "ON CONFLICT (owner_id, account_id, type_produit) DO UPDATE SET "
+        "value_eur = value_eur + excluded.value_eur, "
+        "cost_basis_eur = cost_basis_eur + excluded.cost_basis_eur, "
+        "asset_count = asset_count + 1;"
+    )
+
+
+def _remove_row_sql(row: str) -> str:
+    """Instructions retirant une ligne d'actif de son agrégat (et l'agrégat s'il devient vide)"""
+    return (
+        f"UPDATE asset_rollups SET "
+        f"value_eur = value_eur - {_VALUE_EUR_SQL.format(row=row)}, "
+        f"cost_basis_eur = cost_basis_eur - {_COST_EUR_SQL.format(row=row)}, "
+        f"asset_count = asset_count - 1 "
+        f"WHERE {_KEY_MATCH_SQL.format(row=row)}; "
+        f"DELETE FROM asset_rollups WHERE {_KEY_MATCH_SQL.format(row=row)} AND asset_count <= 0;"
+    )
+
+
+ROLLUP_TRIGGERS = {
+    "trg_asset_rollups_insert": (
+        "CREATE TRIGGER IF NOT EXISTS trg_asset_rollups_insert AFTER INSERT ON assets "
+        f"BEGIN {_add_row_sql('NEW')} END"
+    ),
+    "trg_asset_rollups_delete": (
+        "CREATE TRIGGER IF NOT EXISTS trg_asset_rollups_delete AFTER DELETE ON assets "
+        f"BEGIN {_remove_row_sql('OLD')} END"
+    ),
+    "trg_asset_rollups_update": (
+        f"CREATE TRIGGER IF NOT EXISTS trg_asset_rollups_update "
+        f"AFTER UPDATE OF {', '.join(ROLLUP_SOURCE_COLUMNS)} ON assets "
+        f"BEGIN {_remove_row_sql('OLD')} {_add_row_sql('NEW')} END"
+    ),
+}
+
+_REBUILD_SELECT_SQL = (
+    f"SELECT {_KEY_SQL.format(row='assets')}, SUM({_VALUE_EUR_SQL.format(row='assets')}), "
+    f"SUM({_COST_EUR_SQL.format(row='assets')}), COUNT(*) FROM assets"
+)
+_GROUP_BY_SQL = (
+    " GROUP BY COALESCE(owner_id, ''), COALESCE(account_id, ''), COALESCE(type_produit, '')"
+)
+
+# Écart toléré entre un agrégat et le recalcul (les additions successives accumulent des arrondis)
+ROLLUP_TOLERANCE = 0.01
+
+
+def install_rollup_triggers(connection) -> None:
+    """
+    Crée les triggers de maintenance des agrégats (sans effet s'ils existent déjà)
+
+    Args:
+        connection: Connexion SQLAlchemy
+    """
+    for ddl in ROLLUP_TRIGGERS.values():
+        connection.execute(text(ddl))
+
+
+def drop_rollup_triggers(connection) -> None:
+    """
+    Supprime les triggers de maintenance des agrégats
+
+    Args:
+        connection: Connexion SQLAlchemy
+    """
+    for name in ROLLUP_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+
+
+def rebuild_rollups(connection, owner_id: Optional[str] = None) -> int:
+    """
+    Recalcule les agrégats à partir de la table assets
+
+    Args:
+        connection: Connexion SQLAlchemy (dans une transaction)
+        owner_id: Limiter le recalcul à un utilisateur (tous par défaut)
+
+    Returns:
+        Nombre d'agrégats écrits
+    """
+    where, params = ("", {}) if owner_id is None else (" WHERE owner_id = :owner_id", {"owner_id": owner_id})
+    connection.execute(text(f"DELETE FROM asset_rollups{where}"), params)
+    result = connection.execute(text(
+        "INSERT INTO asset_rollups (owner_id, account_id, type_produit, value_eur, cost_basis_eur, asset_count) "
+        f"{_REBUILD_SELECT_SQL}{where}{_GROUP_BY_SQL}"
+    ), params)
+    return max(result.rowcount, 0)
+
+
+def check_rollups(connection, owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Compare les agrégats stockés au recalcul depuis la table assets
+
+    Args:
+        connection: Connexion SQLAlchemy
+        owner_id: Limiter la vérification à un utilisateur (tous par défaut)
+
+    Returns:
+        Liste des écarts (clé du groupe, valeurs attendues et stockées), vide si tout est cohérent
+    """
+    where, params = ("", {}) if owner_id is None else (" WHERE owner_id = :owner_id", {"owner_id": owner_id})
+    expected = {
+        tuple(row[:3]): tuple(row[3:])
+        for row in connection.execute(text(f"{_REBUILD_SELECT_SQL}{where}{_GROUP_BY_SQL}"), params)
+    }
+    stored = {
+        tuple(row[:3]): tuple(row[3:])
+        for row in connection.execute(text(
+            f"SELECT owner_id, account_id, type_produit, value_eur, cost_basis_eur, asset_count "
+            f"FROM asset_rollups{where}"
+        ), params)
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        expected_values = expected.get(key, (0.0, 0.0, 0))
+        stored_values = stored.get(key, (0.0, 0.0, 0))
+        if (abs((expected_values[0] or 0) - (stored_values[0] or 0)) > ROLLUP_TOLERANCE
+                or abs((expected_values[1] or 0) - (stored_values[1] or 0)) > ROLLUP_TOLERANCE
+                or expected_values[2] != stored_values[2]):
+            mismatches.append({
+                "owner_id": key[0],
+                "account_id": key[1],
+                "type_produit": key[2],
+                "expected": expected_values,
+                "stored": stored_values,
+            })
+    return mismatches
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 from sqlalchemy import func
 
+from config.app_config import bootstrap
 from database.db_config import get_db_session, Base, engine
 from database.models import User, Bank, Account, Asset, HistoryPoint
 from services.account_service import account_service
@@ -18,6 +19,7 @@ from services.bank_service import bank_service
 from services.data_service import DataService
 from utils.logger import get_logger
 from utils.password import hash_password
+from utils.startup_metrics import log_startup_metrics
 
 # Configure logger
 logger = get_logger(__name__)
@@ -207,7 +209,7 @@ def create_asset_data(idx, compte_id):
 
 def check_encryption_system():
     """Vérifie que le système de chiffrement est correctement initialisé"""
-    from database.db_config import cipher, verify_keys_with_existing_data
+    from database.db_config import get_cipher, verify_keys_with_existing_data
     from config.app_config import DATA_DIR, DB_PATH
     from utils.key_manager import KeyManager
     from config.app_config import KEY_BACKUPS_DIR
@@ -223,6 +225,7 @@ def check_encryption_system():
     # Tester l'encryption avec une donnée factice
     try:
         test_data = "Test encryption system"
+        cipher = get_cipher()
         encrypted = cipher.encrypt(test_data.encode()).decode()
         decrypted = cipher.decrypt(encrypted.encode()).decode()
 
@@ -445,9 +448,12 @@ def create_fixtures(reset_db=False):
 
 
 if __name__ == "__main__":
+    bootstrap()
+
     parser = argparse.ArgumentParser(description="Créer des données de test pour l'application")
     parser.add_argument('--reset', action='store_true',
                         help='Réinitialiser la base de données avant de créer les fixtures')
     args = parser.parse_args()
 
-    create_fixtures(reset_db=args.reset)
\ No newline at end of file
+    create_fixtures(reset_db=args.reset)
+    log_startup_metrics()
\ No newline at end of file
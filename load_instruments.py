@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Script de chargement du référentiel local des instruments
+
+Les fichiers de référence (CSV avec en-tête ou JSON) décrivent chaque instrument par son ISIN
+et, facultativement, son symbole Yahoo Finance, sa place, sa devise, son nom et son type
+(cf. database.instrument_reference). Les instruments existants sont mis à jour.
+
+Usage:
+    python load_instruments.py instruments.csv            # charge un fichier
+    python load_instruments.py etf.json actions.csv       # charge plusieurs fichiers
+"""
+import argparse
+import sys
+
+from config.app_config import bootstrap
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    # Initialiser l'environnement (dossiers de données et de logs, logging)
+    bootstrap()
+
+    parser = argparse.ArgumentParser(description="Chargement du référentiel local des instruments")
+    parser.add_argument("files", nargs="+", help="Fichiers de référence (.csv ou .json)")
+    args = parser.parse_args()
+
+    from database.instrument_reference import instrument_reference
+
+    failed = 0
+    for path in args.files:
+        try:
+            count = instrument_reference.load_file(path)
+            print(f"{path}: {count} instrument(s) chargé(s).")
+        except (OSError, ValueError) as e:
+            logger.error(f"Erreur lors du chargement de {path}: {str(e)}")
+            print(f"{path}: échec du chargement ({str(e)}).")
+            failed += 1
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
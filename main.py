@@ -8,8 +8,8 @@ from datetime import datetime
 
 import streamlit as st
 
-from config.app_config import LOGS_DIR, DB_PATH
-from database.db_config import engine, get_db_session
+from config.app_config import DB_PATH, bootstrap, load_secret_keys
+from database.db_config import engine, get_db_session, ensure_keys_verified
 from database.models import Base, User
 # Import du nouveau service d'intégrité
 from services.integrity_service import integrity_service
@@ -22,6 +22,7 @@ from ui.settings import show_settings
 from ui.templates.template_management import show_template_management
 from ui.todos import show_todos
 from utils.error_manager import catch_exceptions
+from utils.exceptions import ConfigurationError
 from utils.logger import get_logger, setup_file_logging
 from utils.migration_manager import migration_manager
 from utils.password import hash_password
@@ -238,8 +239,16 @@ def main():
 
 # Point d'entrée
 if __name__ == "__main__":
-    # S'assurer que les dossiers de logs existent
-    LOGS_DIR.mkdir(exist_ok=True)
+    # Initialiser l'environnement (dossiers, logging): les imports sont sans effet de bord
+    bootstrap()
+
+    # Charger les clés et vérifier qu'elles déchiffrent les données existantes (une fois par processus)
+    try:
+        load_secret_keys()
+        ensure_keys_verified()
+    except ConfigurationError as e:
+        st.error(e.message)
+        st.stop()
 
     # Initialiser la base de données si nécessaire
     initialize_database()
@@ -3,7 +3,6 @@
 Script pour exécuter la vérification d'intégrité de la base de données
 Ce script peut être programmé comme tâche cron/planifiée pour vérification régulière
 """
-import os
 import sys
 from datetime import datetime
 from pathlib import Path
@@ -16,9 +15,10 @@ sys.path.append(str(parent_dir))
 # Imports de l'application
 from database.db_config import get_db_session
 from utils.logger import get_logger, setup_file_logging
+from utils.startup_metrics import log_startup_metrics
 from services.integrity_service import integrity_service
 from services.backup_service import BackupService
-from config.app_config import DB_PATH, LOGS_DIR
+from config.app_config import DB_PATH, bootstrap
 
 # Configurer le logger
 logger = get_logger("integrity_check")
@@ -31,8 +31,8 @@ def main():
     Ce script peut être exécuté en ligne de commande ou via une tâche planifiée
     pour vérifier régulièrement l'intégrité de la base de données.
     """
-    # Assurer que le répertoire de logs existe
-    os.makedirs(LOGS_DIR, exist_ok=True)
+    # Initialiser l'environnement (dossiers de données et de logs, logging)
+    bootstrap()
 
     # Configurer le logging pour ce script
     setup_file_logging("integrity_check")
@@ -85,4 +85,6 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    exit_code = main()
+    log_startup_metrics()
+    sys.exit(exit_code)
@@ -5,6 +5,7 @@ Script de gestion des migrations de base de données
 import argparse
 import sys
 
+from config.app_config import bootstrap
 from utils.logger import get_logger
 from utils.migration_manager import migration_manager
 
@@ -12,6 +13,9 @@ logger = get_logger(__name__)
 
 
 def main():
+    # Initialiser l'environnement (dossiers de données et de logs, logging)
+    bootstrap()
+
     parser = argparse.ArgumentParser(description="Gestion des migrations de base de données")
     subparsers = parser.add_subparsers(dest="command", help="Commande à exécuter")
 
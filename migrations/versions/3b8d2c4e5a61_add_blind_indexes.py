@@ -0,0 +1,116 @@
+"""add blind indexes for encrypted fields
+
+Revision ID: 3b8d2c4e5a61
+Revises: f9047f744082
+Create Date: 2025-06-02 10:12:41.508213
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from database.blind_index import compute_blind_index, compute_search_tokens
+from database.db_config import decrypt_data
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8d2c4e5a61'
+down_revision: Union[str, None] = 'f9047f744082'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, colonne chiffrée, colonne d'index aveugle, colonnes de l'index SQL)
+BLIND_INDEXES = [
+    ("users", "email", "email_bidx", "idx_users_email_bidx", ["email_bidx"]),
+    ("banks", "nom", "nom_bidx", "idx_banks_owner_nom_bidx", ["owner_id", "nom_bidx"]),
+    ("accounts", "libelle", "libelle_bidx", "idx_accounts_libelle_bidx", ["libelle_bidx"]),
+    ("assets", "nom", "nom_bidx", "idx_assets_owner_nom_bidx", ["owner_id", "nom_bidx"]),
+]
+
+# Champs des actifs indexés pour la recherche par mot
+ASSET_SEARCH_FIELDS = ["nom", "notes"]
+
+
+def _decrypt(value):
+    """Déchiffre une valeur, None si elle est vide ou illisible"""
+    if value is None:
+        return None
+    decrypted = decrypt_data(value)
+    return None if decrypted == "[Decryption Error]" else decrypted
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    # 1. Colonnes et index (la base peut déjà avoir été créée avec create_all)
+    for table, _, index_column, index_name, index_columns in BLIND_INDEXES:
+        if table not in tables:
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if index_column not in columns:
+            op.add_column(table, sa.Column(index_column, sa.String(), nullable=True))
+        indexes = {index["name"] for index in inspector.get_indexes(table)}
+        if index_name not in indexes:
+            op.create_index(index_name, table, index_columns)
+
+    if "search_tokens" not in tables:
+        op.create_table(
+            "search_tokens",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("owner_id", sa.String(), sa.ForeignKey("users.id"), nullable=True),
+            sa.Column("entity_type", sa.String(), nullable=True),
+            sa.Column("entity_id", sa.String(), nullable=True),
+            sa.Column("field", sa.String(), nullable=True),
+            sa.Column("token", sa.String(), nullable=True),
+        )
+        op.create_index("idx_search_tokens_lookup", "search_tokens",
+                        ["owner_id", "entity_type", "token", "entity_id"])
+        op.create_index("idx_search_tokens_entity", "search_tokens",
+                        ["entity_type", "entity_id", "field"])
+
+    # 2. Calcul des index aveugles manquants
+    for table, source_column, index_column, _, _ in BLIND_INDEXES:
+        if table not in tables:
+            continue
+        rows = bind.execute(sa.text(
+            f"SELECT id, {source_column} FROM {table} "
+            f"WHERE {index_column} IS NULL AND {source_column} IS NOT NULL"
+        )).fetchall()
+        updates = [
+            {"id": row_id, "bidx": compute_blind_index(_decrypt(value))}
+            for row_id, value in rows
+        ]
+        if updates:
+            bind.execute(sa.text(f"UPDATE {table} SET {index_column} = :bidx WHERE id = :id"), updates)
+
+    # 3. Jetons de recherche des actifs qui n'en ont pas encore
+    if "assets" in tables:
+        rows = bind.execute(sa.text(
+            "SELECT id, owner_id, nom, notes FROM assets "
+            "WHERE id NOT IN (SELECT entity_id FROM search_tokens WHERE entity_type = 'asset')"
+        )).fetchall()
+        tokens = []
+        for asset_id, owner_id, nom, notes in rows:
+            for field, value in zip(ASSET_SEARCH_FIELDS, (nom, notes)):
+                for token in compute_search_tokens(_decrypt(value)):
+                    tokens.append({"owner_id": owner_id, "entity_id": asset_id, "field": field, "token": token})
+        if tokens:
+            bind.execute(sa.text(
+                "INSERT INTO search_tokens (owner_id, entity_type, entity_id, field, token) "
+                "VALUES (:owner_id, 'asset', :entity_id, :field, :token)"
+            ), tokens)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_search_tokens_entity", table_name="search_tokens")
+    op.drop_index("idx_search_tokens_lookup", table_name="search_tokens")
+    op.drop_table("search_tokens")
+
+    for table, _, index_column, index_name, _ in reversed(BLIND_INDEXES):
+        op.drop_index(index_name, table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(index_column)
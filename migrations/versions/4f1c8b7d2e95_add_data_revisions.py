@@ -0,0 +1,36 @@
+"""add per-user data revisions
+
+Revision ID: 4f1c8b7d2e95
+Revises: e8b4d1f6a273
+Create Date: 2025-06-13 10:24:17.482913
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1c8b7d2e95'
+down_revision: Union[str, None] = 'e8b4d1f6a273'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    # La base peut déjà avoir été créée avec create_all; un utilisateur sans ligne est à la révision 0
+    if "data_revisions" not in tables:
+        op.create_table(
+            "data_revisions",
+            sa.Column("user_id", sa.String(), primary_key=True),
+            sa.Column("revision", sa.Integer(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("data_revisions")
@@ -0,0 +1,32 @@
+"""drop search tokens of asset notes
+
+Revision ID: 5e2b9c7a1d46
+Revises: d3a7f5b1e2c9
+Create Date: 2025-06-20 14:05:32.417902
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b9c7a1d46'
+down_revision: Union[str, None] = 'd3a7f5b1e2c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # Seul le nom des actifs est recherché: les préfixes des notes ne font que révéler leur contenu
+    if "search_tokens" in sa.inspect(bind).get_table_names():
+        bind.execute(sa.text("DELETE FROM search_tokens WHERE entity_type = 'asset' AND field = 'notes'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Les jetons supprimés ne sont pas recréés: la recherche n'utilise que ceux du nom
+    pass
@@ -0,0 +1,67 @@
+"""add normalized history values
+
+Revision ID: 7c41e9a2d0b3
+Revises: 3b8d2c4e5a61
+Create Date: 2025-06-05 09:31:17.902544
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from database.db_config import decrypt_json
+
+# revision identifiers, used by Alembic.
+revision: str = '7c41e9a2d0b3'
+down_revision: Union[str, None] = '3b8d2c4e5a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    # 1. Table (la base peut déjà avoir été créée avec create_all)
+    if "history_values" not in tables:
+        op.create_table(
+            "history_values",
+            sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("date", sa.String(), primary_key=True),
+            sa.Column("asset_id", sa.String(), primary_key=True),
+            sa.Column("value_eur", sa.Float(), nullable=True),
+        )
+    indexes = {index["name"] for index in sa.inspect(bind).get_indexes("history_values")}
+    if "idx_history_values_user_asset_date" not in indexes:
+        op.create_index("idx_history_values_user_asset_date", "history_values", ["user_id", "asset_id", "date"])
+
+    # 2. Reprise des points d'historique existants (un JSON chiffré {asset_id: valeur} par date)
+    # Les anciens points ne portent pas d'utilisateur: il est retrouvé par le propriétaire de l'actif
+    if "history" not in tables or "assets" not in tables:
+        return
+
+    owners = dict(bind.execute(sa.text("SELECT id, owner_id FROM assets")).fetchall())
+    rows = bind.execute(sa.text("SELECT date, assets FROM history WHERE assets IS NOT NULL")).fetchall()
+
+    values = []
+    for date, encrypted_assets in rows:
+        for asset_id, value in decrypt_json(encrypted_assets, silent_errors=True).items():
+            owner_id = owners.get(asset_id)
+            if owner_id is None:
+                continue  # Actif supprimé depuis: propriétaire inconnu
+            values.append({"user_id": owner_id, "date": date, "asset_id": asset_id, "value_eur": value})
+
+    if values:
+        bind.execute(sa.text(
+            "INSERT OR IGNORE INTO history_values (user_id, date, asset_id, value_eur) "
+            "VALUES (:user_id, :date, :asset_id, :value_eur)"
+        ), values)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_history_values_user_asset_date", table_name="history_values")
+    op.drop_table("history_values")
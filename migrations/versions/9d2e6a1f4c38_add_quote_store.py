@@ -0,0 +1,66 @@
+"""add shared quote store (symbols, latest quotes, fx rates)
+
+Revision ID: 9d2e6a1f4c38
+Revises: 4f1c8b7d2e95
+Create Date: 2025-06-16 09:41:52.306218
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from config.app_config import DATA_DIR
+from database.quote_store import import_json_caches
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e6a1f4c38'
+down_revision: Union[str, None] = '4f1c8b7d2e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    # 1. Tables (la base peut déjà avoir été créée avec create_all)
+    if "instrument_symbols" not in tables:
+        op.create_table(
+            "instrument_symbols",
+            sa.Column("isin", sa.String(), primary_key=True),
+            sa.Column("symbol", sa.String(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("idx_instrument_symbols_updated", "instrument_symbols", ["updated_at"])
+
+    if "quotes" not in tables:
+        op.create_table(
+            "quotes",
+            sa.Column("code", sa.String(), primary_key=True),
+            sa.Column("kind", sa.String(), nullable=False),
+            sa.Column("symbol", sa.String(), nullable=True),
+            sa.Column("price", sa.Float(), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("idx_quotes_fetched", "quotes", ["fetched_at"])
+
+    if "fx_rates" not in tables:
+        op.create_table(
+            "fx_rates",
+            sa.Column("currency", sa.String(), primary_key=True),
+            sa.Column("rate", sa.Float(), nullable=False),
+            sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("idx_fx_rates_fetched", "fx_rates", ["fetched_at"])
+
+    # 2. Import des anciens fichiers de cache JSON (laissés en place)
+    import_json_caches(bind, DATA_DIR)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("fx_rates")
+    op.drop_table("quotes")
+    op.drop_table("instrument_symbols")
@@ -0,0 +1,90 @@
+"""add owner to history points
+
+Revision ID: a5d3f8c2b917
+Revises: 7c41e9a2d0b3
+Create Date: 2025-06-06 14:02:53.117208
+
+"""
+import uuid
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from database.db_config import decrypt_json, encrypt_json
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d3f8c2b917'
+down_revision: Union[str, None] = '7c41e9a2d0b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "history" not in inspector.get_table_names():
+        return
+
+    # 1. Colonne et index (la base peut déjà avoir été créée avec create_all)
+    columns = {column["name"] for column in inspector.get_columns("history")}
+    if "owner_id" not in columns:
+        op.add_column("history", sa.Column("owner_id", sa.String(), nullable=True))
+    indexes = {index["name"] for index in sa.inspect(bind).get_indexes("history")}
+    if "idx_history_owner_date" not in indexes:
+        op.create_index("idx_history_owner_date", "history", ["owner_id", "date", "total"])
+
+    # 2. Attribution des points existants au propriétaire de leurs actifs
+    owners = dict(bind.execute(sa.text("SELECT id, owner_id FROM assets")).fetchall()) \
+        if "assets" in inspector.get_table_names() else {}
+    user_ids = [row[0] for row in bind.execute(sa.text("SELECT id FROM users")).fetchall()]
+    rows = bind.execute(sa.text("SELECT id, date, assets, total FROM history WHERE owner_id IS NULL")).fetchall()
+
+    for point_id, date, encrypted_assets, total in rows:
+        values = decrypt_json(encrypted_assets, silent_errors=True) if encrypted_assets else {}
+
+        # Regrouper les valeurs par propriétaire (actifs supprimés depuis: propriétaire inconnu)
+        by_owner = {}
+        for asset_id, value in values.items():
+            owner_id = owners.get(asset_id)
+            if owner_id is not None:
+                by_owner.setdefault(owner_id, {})[asset_id] = value
+
+        if not by_owner:
+            # Aucun actif connu: attribuable seulement s'il n'existe qu'un utilisateur
+            if len(user_ids) == 1:
+                bind.execute(sa.text("UPDATE history SET owner_id = :owner_id WHERE id = :id"),
+                             {"owner_id": user_ids[0], "id": point_id})
+            continue
+
+        if len(by_owner) == 1:
+            bind.execute(sa.text("UPDATE history SET owner_id = :owner_id WHERE id = :id"),
+                         {"owner_id": next(iter(by_owner)), "id": point_id})
+            continue
+
+        # Point partagé entre plusieurs utilisateurs: un point par propriétaire
+        for index, (owner_id, owner_values) in enumerate(sorted(by_owner.items())):
+            params = {
+                "id": point_id if index == 0 else str(uuid.uuid4()),
+                "owner_id": owner_id,
+                "date": date,
+                "assets": encrypt_json(owner_values),
+                "total": sum(float(value or 0) for value in owner_values.values()),
+            }
+            if index == 0:
+                bind.execute(sa.text(
+                    "UPDATE history SET owner_id = :owner_id, assets = :assets, total = :total WHERE id = :id"
+                ), params)
+            else:
+                bind.execute(sa.text(
+                    "INSERT INTO history (id, owner_id, date, assets, total) "
+                    "VALUES (:id, :owner_id, :date, :assets, :total)"
+                ), params)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_history_owner_date", table_name="history")
+    with op.batch_alter_table("history") as batch_op:
+        batch_op.drop_column("owner_id")
@@ -0,0 +1,54 @@
+"""add symbol resolution backoff and attempts history
+
+Revision ID: b6e1c9f3a2d7
+Revises: 9d2e6a1f4c38
+Create Date: 2025-06-17 11:08:33.915472
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1c9f3a2d7'
+down_revision: Union[str, None] = '9d2e6a1f4c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    # La base peut déjà avoir été créée avec create_all
+    if "symbol_resolutions" not in tables:
+        op.create_table(
+            "symbol_resolutions",
+            sa.Column("isin", sa.String(), primary_key=True),
+            sa.Column("failures", sa.Integer(), nullable=False),
+            sa.Column("last_error", sa.String(), nullable=True),
+            sa.Column("last_attempt_at", sa.DateTime(), nullable=False),
+            sa.Column("retry_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("idx_symbol_resolutions_last_attempt", "symbol_resolutions", ["last_attempt_at"])
+
+    if "symbol_resolution_attempts" not in tables:
+        op.create_table(
+            "symbol_resolution_attempts",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("isin", sa.String(), nullable=False),
+            sa.Column("attempted_at", sa.DateTime(), nullable=False),
+            sa.Column("symbol", sa.String(), nullable=True),
+            sa.Column("error", sa.String(), nullable=True),
+        )
+        op.create_index("idx_symbol_resolution_attempts_isin", "symbol_resolution_attempts",
+                        ["isin", "attempted_at"])
+        op.create_index("idx_symbol_resolution_attempts_date", "symbol_resolution_attempts", ["attempted_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("symbol_resolution_attempts")
+    op.drop_table("symbol_resolutions")
@@ -0,0 +1,50 @@
+"""add trigger-maintained asset rollups
+
+Revision ID: c2f7a9d4e810
+Revises: a5d3f8c2b917
+Create Date: 2025-06-10 11:48:06.334190
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from database.rollups import drop_rollup_triggers, install_rollup_triggers, rebuild_rollups
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f7a9d4e810'
+down_revision: Union[str, None] = 'a5d3f8c2b917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    # 1. Table (la base peut déjà avoir été créée avec create_all)
+    if "asset_rollups" not in tables:
+        op.create_table(
+            "asset_rollups",
+            sa.Column("owner_id", sa.String(), primary_key=True),
+            sa.Column("account_id", sa.String(), primary_key=True),
+            sa.Column("type_produit", sa.String(), primary_key=True),
+            sa.Column("value_eur", sa.Float(), nullable=True),
+            sa.Column("cost_basis_eur", sa.Float(), nullable=True),
+            sa.Column("asset_count", sa.Integer(), nullable=True),
+        )
+
+    if "assets" not in tables:
+        return
+
+    # 2. Triggers puis recalcul complet (les actifs existants n'ont jamais été agrégés)
+    install_rollup_triggers(bind)
+    rebuild_rollups(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_rollup_triggers(op.get_bind())
+    op.drop_table("asset_rollups")
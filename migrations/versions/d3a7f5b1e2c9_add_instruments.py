@@ -0,0 +1,47 @@
+"""add instrument reference table
+
+Revision ID: d3a7f5b1e2c9
+Revises: b6e1c9f3a2d7
+Create Date: 2025-06-18 09:42:17.508316
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7f5b1e2c9'
+down_revision: Union[str, None] = 'b6e1c9f3a2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+
+    # La base peut déjà avoir été créée avec create_all
+    if "instruments" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "instruments",
+            sa.Column("isin", sa.String(), primary_key=True),
+            sa.Column("symbol", sa.String(), nullable=True),
+            sa.Column("exchange", sa.String(), nullable=True),
+            sa.Column("currency", sa.String(), nullable=True),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("type", sa.String(), nullable=True),
+            sa.Column("source", sa.String(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+    # Amorcer le référentiel avec les correspondances ISIN - symbole déjà résolues
+    bind.execute(sa.text(
+        "INSERT OR IGNORE INTO instruments (isin, symbol, source, updated_at) "
+        "SELECT isin, symbol, 'resolution', updated_at FROM instrument_symbols"
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("instruments")
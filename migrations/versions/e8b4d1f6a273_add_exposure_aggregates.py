@@ -0,0 +1,45 @@
+"""add incrementally maintained exposure aggregates
+
+Revision ID: e8b4d1f6a273
+Revises: c2f7a9d4e810
+Create Date: 2025-06-12 15:02:41.127604
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+from database.exposures import rebuild_exposures
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4d1f6a273'
+down_revision: Union[str, None] = 'c2f7a9d4e810'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    # 1. Table (la base peut déjà avoir été créée avec create_all)
+    if "exposure_aggregates" not in tables:
+        op.create_table(
+            "exposure_aggregates",
+            sa.Column("owner_id", sa.String(), primary_key=True),
+            sa.Column("account_id", sa.String(), primary_key=True),
+            sa.Column("category", sa.String(), primary_key=True),
+            sa.Column("zone", sa.String(), primary_key=True),
+            sa.Column("value_eur", sa.Float(), nullable=True),
+        )
+
+    # 2. Recalcul complet (les actifs existants n'ont jamais été agrégés; allocations déchiffrées)
+    if "assets" in tables:
+        rebuild_exposures(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("exposure_aggregates")
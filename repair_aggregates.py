@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Script de vérification et de reconstruction des agrégats d'actifs
+
+Les agrégats (totaux par compte, banque et type de produit) sont maintenus par des triggers,
+les agrégats d'exposition (catégories et zones géographiques) à chaque écriture d'actif.
+Ce script les compare au recalcul depuis les actifs et les reconstruit si nécessaire.
+
+Usage:
+    python repair_aggregates.py            # vérifie puis reconstruit les agrégats incohérents
+    python repair_aggregates.py --check    # vérifie seulement
+    python repair_aggregates.py --user ID  # limite l'opération à un utilisateur
+"""
+import argparse
+import sys
+
+from config.app_config import bootstrap
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    # Initialiser l'environnement (dossiers de données et de logs, logging)
+    bootstrap()
+
+    parser = argparse.ArgumentParser(description="Vérification et reconstruction des agrégats d'actifs")
+    parser.add_argument("--check", action="store_true", help="Vérifier sans reconstruire")
+    parser.add_argument("--user", type=str, default=None, help="Limiter à un utilisateur")
+    args = parser.parse_args()
+
+    from database.db_config import get_db_session
+    from services.exposure_service import ExposureService
+    from services.rollup_service import RollupService
+
+    incoherent = 0
+    with get_db_session() as db:
+        # Totaux par compte, banque et type de produit
+        mismatches = RollupService.check(db, args.user)
+        for mismatch in mismatches:
+            print(f"Agrégat incohérent: utilisateur={mismatch['owner_id']} compte={mismatch['account_id']} "
+                  f"type={mismatch['type_produit']} attendu={mismatch['expected']} stocké={mismatch['stored']}")
+        if mismatches and not args.check:
+            count = RollupService.rebuild(db, args.user)
+            print(f"Agrégats reconstruits: {count} groupe(s).")
+        incoherent += len(mismatches)
+
+        # Expositions par catégorie et zone géographique
+        mismatches = ExposureService.check(db, args.user)
+        for mismatch in mismatches:
+            print(f"Exposition incohérente: utilisateur={mismatch['owner_id']} compte={mismatch['account_id']} "
+                  f"catégorie={mismatch['category']} zone={mismatch['zone'] or '(total)'} "
+                  f"attendu={mismatch['expected']:.2f} stocké={mismatch['stored']:.2f}")
+        if mismatches and not args.check:
+            count = ExposureService.rebuild(db, args.user)
+            print(f"Expositions reconstruites: {count} ligne(s).")
+        incoherent += len(mismatches)
+
+    if not incoherent:
+        print("Agrégats d'actifs cohérents.")
+    elif args.check:
+        print(f"{incoherent} agrégat(s) incohérent(s).")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
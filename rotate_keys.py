@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Script de rotation de la clé de chiffrement des données
+
+Usage:
+    python rotate_keys.py start    # génère la nouvelle clé (redémarrer ensuite l'application)
+    python rotate_keys.py run      # rechiffre les données (reprend après une interruption)
+    python rotate_keys.py status   # affiche l'avancement
+"""
+import argparse
+import sys
+
+from config.app_config import bootstrap, KEY_ROTATION_CHUNK_SIZE, KEY_ROTATION_MAX_WORKERS
+from utils.exceptions import AppError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _print_progress(report):
+    """Affiche l'avancement du rechiffrement"""
+    eta = report["eta_seconds"]
+    eta_str = f"{eta:.0f}s" if eta is not None else "?"
+    print(f"\r{report['rows_processed']} lignes rechiffrées, {report['rows_per_second']:.0f} lignes/s, "
+          f"{report['remaining_rows']} restantes (environ {eta_str})", end="", flush=True)
+
+
+def main():
+    # Initialiser l'environnement (dossiers de données et de logs, logging)
+    bootstrap()
+
+    parser = argparse.ArgumentParser(description="Rotation de la clé de chiffrement des données")
+    subparsers = parser.add_subparsers(dest="command", help="Commande à exécuter")
+
+    subparsers.add_parser("start", help="Démarrer une rotation (génère la nouvelle clé)")
+
+    run_parser = subparsers.add_parser("run", help="Rechiffrer les données (reprise automatique)")
+    run_parser.add_argument("--chunk-size", type=int, default=KEY_ROTATION_CHUNK_SIZE,
+                            help=f"Lignes par segment et par transaction (défaut: {KEY_ROTATION_CHUNK_SIZE})")
+    run_parser.add_argument("--workers", type=int, default=KEY_ROTATION_MAX_WORKERS,
+                            help=f"Threads de rechiffrement (défaut: {KEY_ROTATION_MAX_WORKERS})")
+    run_parser.add_argument("--max-chunks", type=int, default=None,
+                            help="Nombre maximal de segments à traiter avant de s'arrêter")
+
+    subparsers.add_parser("status", help="Afficher l'état de la rotation")
+
+    args = parser.parse_args()
+
+    from services.key_rotation_service import KeyRotationService
+
+    try:
+        if args.command == "start":
+            service = KeyRotationService()
+            checkpoint = service.start()
+            print(f"Rotation démarrée depuis la version {checkpoint['from_version']}.")
+            print("Redémarrez l'application puis lancez: python rotate_keys.py run")
+
+        elif args.command == "run":
+            service = KeyRotationService(chunk_size=args.chunk_size, max_workers=args.workers)
+            report = service.run(progress_callback=_print_progress, max_chunks=args.max_chunks)
+            print()
+            print(f"{report['rows_processed']} lignes traitées en {report['elapsed_seconds']:.1f}s "
+                  f"({report['rows_per_second']:.0f} lignes/s), {report['errors']} valeur(s) illisible(s)")
+            if report["completed"]:
+                print(f"Rotation terminée: clés en version {report['version']}.")
+            else:
+                print(f"Rotation interrompue: {report['remaining_rows']} lignes restantes. "
+                      "Relancez la commande pour reprendre.")
+
+        elif args.command == "status":
+            status = KeyRotationService().status()
+            print(f"Version des clés: {status['version']}")
+            if not status["in_progress"]:
+                print("Aucune rotation en cours.")
+            else:
+                print("Rotation en cours:")
+                for table, state in (status["checkpoint"] or {}).get("tables", {}).items():
+                    state_str = "terminée" if state["completed"] else "en cours"
+                    print(f"  {table}: {state['rows_done']} lignes ({state_str}, {state['errors']} erreur(s))")
+
+        else:
+            parser.print_help()
+    except AppError as e:
+        logger.error(e.message)
+        print(f"Erreur: {e.message}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,10 @@ import os
 import time
 from datetime import datetime
 
+from config.app_config import bootstrap
 from services.backup_service import BackupService
 from utils.logger import get_logger
+from utils.startup_metrics import log_startup_metrics
 
 # Configure logger
 logger = get_logger(__name__)
@@ -60,6 +62,13 @@ def run_scheduled_backup():
                 except Exception as e:
                     logger.error(f"Erreur lors de la sauvegarde des clés: {str(e)}")
 
+            # Maintenance de la base (journal WAL vidé, statistiques du planificateur à jour)
+            try:
+                from database.db_config import run_sqlite_maintenance
+                run_sqlite_maintenance(checkpoint_mode="TRUNCATE")
+            except Exception as e:
+                logger.error(f"Erreur lors de la maintenance de la base: {str(e)}")
+
             # Gérer la rotation des sauvegardes de clés (garder 30 jours)
             # Cette partie reste inchangée car elle est déjà bien gérée
 
@@ -73,6 +82,9 @@ def run_scheduled_backup():
 
 
 if __name__ == "__main__":
+    # Initialiser l'environnement (dossiers de données et de logs, logging)
+    bootstrap()
+
     # Enregistrer le début de l'opération
     start_time = time.time()
     logger.info("Démarrage du script de sauvegarde automatique")
@@ -84,4 +96,7 @@ if __name__ == "__main__":
     if success:
         logger.info(f"Sauvegarde automatique terminée avec succès en {duration:.2f} secondes")
     else:
-        logger.error(f"Sauvegarde automatique terminée avec des erreurs après {duration:.2f} secondes")
\ No newline at end of file
+        logger.error(f"Sauvegarde automatique terminée avec des erreurs après {duration:.2f} secondes")
+
+    # Coût d'initialisation (dérivation des clés) pour suivre les performances du script
+    log_startup_metrics()
\ No newline at end of file
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from database.models import Account, Asset, Bank
 from services.base_service import BaseService
+from services.rollup_service import RollupService
 from utils.error_manager import catch_exceptions  # Changé de handle_exceptions
 from utils.logger import get_logger
 
@@ -172,11 +173,11 @@ class AccountService(BaseService[Account]):
         if bank_id:
             query = query.filter(Account.bank_id == bank_id)
 
+        # Valeurs totales de tous les comptes en une lecture des agrégats
+        account_values = RollupService.get_values_by_account(db, user_id, bank_id) or {}
+
         for account, bank in query.all():
-            # Calculer la valeur totale des actifs dans ce compte
-            total_value = db.query(Asset).filter(Asset.account_id == account.id).with_entities(
-                func.sum(func.coalesce(Asset.value_eur, 0.0))
-            ).scalar() or 0.0
+            total_value = account_values.get(account.id, 0.0)
 
             data.append([
                 account.id,
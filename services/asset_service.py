@@ -7,11 +7,13 @@ from typing import List, Optional, Dict, Any
 
 from sqlalchemy.orm import Session, joinedload
 
-from database.models import Asset, Account
+from database.models import Asset, Account, asset_load_options
 from services.base_service import BaseService
 from utils.calculations import calculate_asset_performance
+from utils.crypto import load_decrypted
 from utils.error_manager import catch_exceptions
 from utils.logger import get_logger
+from utils.read_cache import invalidate_cached_reads
 
 logger = get_logger(__name__)
 
@@ -27,7 +29,8 @@ class AssetService(BaseService[Asset]):
             self, db: Session,
             user_id: str,
             account_id: Optional[str] = None,
-            category: Optional[str] = None
+            category: Optional[str] = None,
+            profile: str = "list"
     ) -> List[Asset]:
         """
         Get all assets for a user with optional filters
@@ -37,6 +40,7 @@ class AssetService(BaseService[Asset]):
             user_id: User ID
             account_id: Account ID (optional)
             category: Asset category (optional)
+            profile: Column load profile ("list", "valuation" or "full")
 
         Returns:
             List of assets
@@ -44,7 +48,8 @@ class AssetService(BaseService[Asset]):
         try:
             # OPTIMIZATION: Use eager loading to load relations in a single query
             query = db.query(Asset).options(
-                joinedload(Asset.account).joinedload(Account.bank)
+                joinedload(Asset.account).joinedload(Account.bank),
+                *asset_load_options(profile)
             ).filter(Asset.owner_id == user_id)
 
             if account_id:
@@ -54,7 +59,8 @@ class AssetService(BaseService[Asset]):
             if category:
                 query = query.filter(Asset.allocation.has_key(category))  # Using SQLAlchemy's has_key for JSON
 
-            result = query.all()
+            # Batch decryption of encrypted columns (assets, accounts and banks)
+            result = load_decrypted(query)
             return result if result is not None else []
         except Exception as e:
             logger.error(f"Error getting assets: {str(e)}")
@@ -224,6 +230,7 @@ class AssetService(BaseService[Asset]):
 
             # Save changes
             db.commit()
+            invalidate_cached_reads(asset.owner_id)
             logger.info(f"Manual price update for asset {asset_id}: {new_price}")
             return True
         except Exception as e:
@@ -246,7 +253,9 @@ class AssetService(BaseService[Asset]):
         try:
             # Directly update the todo field without reloading the entire asset
             result = db.query(Asset).filter(Asset.id == asset_id).update({"todo": ""})
+            owner_id = db.query(Asset.owner_id).filter(Asset.id == asset_id).scalar()
             db.commit()
+            invalidate_cached_reads(owner_id)
             logger.info(f"Todo cleared for asset {asset_id}")
             return result > 0
         except Exception as e:
@@ -3,17 +3,21 @@ Service spécialisé pour la synchronisation des prix des actifs
 """
 from datetime import datetime
 # Imports de la bibliothèque standard
-from typing import Optional, Callable
+import time
+from typing import Any, Dict, Optional, Callable, Tuple
 
 # Imports de bibliothèques tierces
 from sqlalchemy.orm import Session
 
 # Imports de l'application
-from database.models import Asset
+from database.models import Asset, asset_load_options
 from services.currency_service import CurrencyService
 from services.price_service import PriceService
+from services.sync_planner import SyncPlan, SyncPlanner, metal_type_from_name
 from utils.error_manager import catch_exceptions  # Changé de handle_exceptions
+from utils.fetch_executor import FetchExecutor
 from utils.logger import get_logger
+from utils.read_cache import invalidate_cached_reads
 
 logger = get_logger(__name__)
 
@@ -35,7 +39,8 @@ class AssetSyncService:
             db: Session,
             filter_func: Callable,
             update_func: Callable,
-            asset_id: Optional[str] = None
+            asset_id: Optional[str] = None,
+            prefetch_func: Optional[Callable] = None
     ) -> int:
         """
         Méthode générique de synchronisation des actifs
@@ -45,12 +50,14 @@ class AssetSyncService:
             filter_func: Fonction de filtrage pour sélectionner les actifs à synchroniser
             update_func: Fonction de mise à jour d'un actif individuel
             asset_id: ID de l'actif spécifique à synchroniser (tous si None)
+            prefetch_func: Fonction appelée une fois avec tous les actifs sélectionnés,
+                avant les mises à jour (récupération groupée des données externes)
 
         Returns:
             Nombre d'actifs mis à jour
         """
-        # Construire la requête de base
-        query = db.query(Asset)
+        # Construire la requête de base (sans le nom chiffré, inutile aux mises à jour)
+        query = db.query(Asset).options(*asset_load_options("sync"))
 
         # Appliquer le filtre par ID si spécifié
         if asset_id:
@@ -61,6 +68,8 @@ class AssetSyncService:
 
         # Récupérer les actifs
         assets = query.all()
+        if prefetch_func and assets:
+            prefetch_func(assets)
         updated_count = 0
         error_updated = False  # Pour suivre si des erreurs ont été mises à jour
 
@@ -82,24 +91,51 @@ class AssetSyncService:
         # Sauvegarder toutes les modifications en une seule fois
         # Commit si des actifs ont été mis à jour ou si des erreurs ont été définies
         if updated_count > 0 or error_updated:
+            # Propriétaires lus avant la validation (les objets expirent au commit)
+            owner_ids = {asset.owner_id for asset in assets}
             db.commit()
+            for owner_id in owner_ids:
+                invalidate_cached_reads(owner_id)
+
+        # Enregistrer en une fois les prix récupérés (caches en mémoire du service de prix)
+        self.price_service.flush_caches()
 
         return updated_count
 
+    @staticmethod
+    def _metal_type(asset: Asset) -> str:
+        """
+        Détermine le type de métal d'un actif d'après son nom (or par défaut)
+
+        Args:
+            asset: Actif de type métal
+
+        Returns:
+            Type de métal (gold, silver, platinum, palladium)
+        """
+        return metal_type_from_name(asset.nom)
+
     @catch_exceptions  # Changé de handle_exceptions
-    def sync_currency_rates(self, db: Session, asset_id: Optional[str] = None) -> int:
+    def sync_currency_rates(
+            self,
+            db: Session,
+            asset_id: Optional[str] = None,
+            rates: Optional[Dict[str, float]] = None
+    ) -> int:
         """
         Synchronise les taux de change pour un actif ou tous les actifs
 
         Args:
             db: Session de base de données
             asset_id: ID de l'actif à synchroniser (tous les actifs si None)
+            rates: Taux de change déjà récupérés (récupérés ici si None)
 
         Returns:
             Nombre d'actifs mis à jour
         """
         # Récupérer les taux de change une seule fois
-        rates = self.currency_service.get_exchange_rates()
+        if rates is None:
+            rates = self.currency_service.get_exchange_rates()
 
         # Définir la fonction de filtrage
         def filter_assets(query):
@@ -139,28 +175,54 @@ class AssetSyncService:
         return self._sync_assets(db, filter_assets, update_asset, asset_id)
 
     @catch_exceptions  # Changé de handle_exceptions
-    def sync_price_by_isin(self, db: Session, asset_id: Optional[str] = None) -> int:
+    def sync_price_by_isin(
+            self,
+            db: Session,
+            asset_id: Optional[str] = None,
+            isin_prices: Optional[Tuple[Dict[str, float], Dict[str, str]]] = None
+    ) -> int:
         """
         Synchronise les prix à partir des codes ISIN pour un actif ou tous les actifs
 
         Args:
             db: Session de base de données
             asset_id: ID de l'actif à synchroniser (tous les actifs si None)
+            isin_prices: Tuple (prix par ISIN, erreurs par ISIN) déjà récupéré
+                (cf. PriceService.get_prices_by_isins; récupéré ici si None)
 
         Returns:
             Nombre d'actifs mis à jour
         """
 
+        # Prix et erreurs par ISIN, récupérés en une fois pour tous les actifs sélectionnés
+        prices, errors = {}, {}
+
         # Définir la fonction de filtrage
         def filter_assets(query):
             return query.filter(Asset.isin != None, Asset.isin != "")
 
+        # Définir la fonction de récupération groupée
+        def prefetch_prices(assets):
+            if isin_prices is not None:
+                prices.update(isin_prices[0])
+                errors.update(isin_prices[1])
+                return
+            try:
+                batch_prices, batch_errors = self.price_service.get_prices_by_isins(
+                    asset.isin for asset in assets if asset.isin
+                )
+                prices.update(batch_prices)
+                errors.update(batch_errors)
+            except Exception as e:
+                logger.error(f"Erreur lors de la récupération groupée des prix par ISIN: {str(e)}")
+                errors.update({asset.isin: str(e) for asset in assets if asset.isin})
+
         # Définir la fonction de mise à jour
         def update_asset(asset):
             if asset.isin:
                 try:
-                    # Récupérer le prix
-                    price = self.price_service.get_price_by_isin(asset.isin)
+                    # Prix récupéré lors de la requête groupée
+                    price = prices.get(asset.isin)
 
                     if price and price > 0:
                         # Mettre à jour l'actif
@@ -177,7 +239,7 @@ class AssetSyncService:
 
                         return True
                     else:
-                        asset.sync_error = f"Prix non disponible pour ISIN {asset.isin}"
+                        asset.sync_error = errors.get(asset.isin, f"Prix non disponible pour ISIN {asset.isin}")
                         return False
                 except Exception as e:
                     asset.sync_error = str(e)
@@ -185,20 +247,36 @@ class AssetSyncService:
                     return False
             return False
 
-        return self._sync_assets(db, filter_assets, update_asset, asset_id)
+        return self._sync_assets(db, filter_assets, update_asset, asset_id, prefetch_prices)
 
     @catch_exceptions  # Changé de handle_exceptions
-    def sync_metal_prices(self, db: Session, asset_id: Optional[str] = None) -> int:
+    def sync_metal_prices(
+            self,
+            db: Session,
+            asset_id: Optional[str] = None,
+            metal_prices: Optional[Dict[str, Optional[float]]] = None,
+            plan: Optional[SyncPlan] = None
+    ) -> int:
         """
         Synchronise les prix des métaux précieux pour un actif ou tous les actifs de type métal
 
         Args:
             db: Session de base de données
             asset_id: ID de l'actif à synchroniser (tous les actifs métal si None)
+            metal_prices: Prix par once déjà récupérés, par type de métal (récupérés ici si None)
+            plan: Plan de synchronisation donnant le type de métal des actifs (construit ici si None)
 
         Returns:
             Nombre d'actifs mis à jour
         """
+        if plan is None:
+            plan = SyncPlanner.build(db, asset_id)
+
+        # Un prix par type de métal, quel que soit le nombre d'actifs
+        if metal_prices is None:
+            metal_prices = {
+                metal_type: self.price_service.get_metal_price(metal_type) for metal_type in plan.keys("metal")
+            }
 
         # Définir la fonction de filtrage
         def filter_assets(query):
@@ -208,19 +286,13 @@ class AssetSyncService:
         def update_asset(asset):
             if asset.type_produit == "metal" and asset.ounces:
                 try:
-                    # Déterminer le type de métal (or par défaut)
-                    metal_type = "gold"  # Par défaut
-                    if asset.nom:
-                        nom_lower = asset.nom.lower()
-                        if "silver" in nom_lower or "argent" in nom_lower:
-                            metal_type = "silver"
-                        elif "platinum" in nom_lower or "platine" in nom_lower:
-                            metal_type = "platinum"
-                        elif "palladium" in nom_lower:
-                            metal_type = "palladium"
-
-                    # Récupérer le prix par once
-                    price_per_ounce = self.price_service.get_metal_price(metal_type)
+                    # Type de métal planifié (déterminé d'après le nom pour un actif ajouté depuis)
+                    metal_type = plan.metal_types.get(asset.id) or self._metal_type(asset)
+
+                    # Prix par once récupéré une fois pour le type de métal
+                    price_per_ounce = metal_prices.get(metal_type)
+                    if price_per_ounce is None and metal_type not in metal_prices:
+                        price_per_ounce = metal_prices[metal_type] = self.price_service.get_metal_price(metal_type)
 
                     if price_per_ounce and price_per_ounce > 0:
                         # Calculer la valeur totale
@@ -255,25 +327,99 @@ class AssetSyncService:
         """
         Synchronise tous les types d'actifs en une seule opération
 
+        Un plan (cf. services.sync_planner) regroupe d'abord les actifs de tous les utilisateurs
+        par ISIN, type de métal et devise: chaque clé est récupérée une seule fois, puis son
+        résultat est appliqué à tous les actifs qui la portent. Les données externes (taux de
+        change, prix par ISIN, prix de chaque métal) sont indépendantes et récupérées en
+        parallèle; les mises à jour sont ensuite appliquées dans l'ordre (les valeurs en EUR
+        dépendent des taux de change) dans la session de l'appelant, qui n'est pas partagée
+        entre threads. Une récupération en échec n'est pas relancée: les actifs concernés
+        reçoivent l'erreur.
+
         Args:
             db: Session de base de données
 
         Returns:
-            Dictionnaire avec les compteurs par type
+            Dictionnaire avec les compteurs par type, les ISIN dont le symbole est en attente de
+            résolution (date de la prochaine tentative), le résumé du plan (cf. SyncPlan.summary)
+            et les durées de récupération (temps réel, somme des durées des tâches et durée par
+            tâche, en secondes)
         """
-        # Effectuer toutes les synchronisations dans l'ordre
+        # Clés uniques à récupérer
+        plan = SyncPlanner.build(db)
+        logger.info(f"Plan de synchronisation: {plan.describe()}")
+        isins = plan.keys("isin")
+        metal_types = plan.keys("metal")
+
+        tasks = {}
+        if plan.keys("currency"):
+            tasks["currency_rates"] = self.currency_service.get_exchange_rates
+        if isins:
+            tasks["isin_prices"] = lambda: self.price_service.get_prices_by_isins(isins)
+        for metal_type in metal_types:
+            tasks[f"metal_{metal_type}"] = lambda metal_type=metal_type: self.price_service.get_metal_price(metal_type)
+
+        # Récupération parallèle, chaque tâche étant chronométrée (les requêtes ont leurs propres délais)
+        durations: Dict[str, float] = {}
+
+        def timed(name, task):
+            def run():
+                start = time.perf_counter()
+                try:
+                    return task()
+                finally:
+                    durations[name] = time.perf_counter() - start
+            return run
+
+        start = time.perf_counter()
+        fetched = FetchExecutor(timeout=None).run({name: timed(name, task) for name, task in tasks.items()})
+        wall_time = time.perf_counter() - start
+
+        fetched_values: Dict[str, Any] = {}
+        fetch_errors: Dict[str, str] = {}
+        for name, value in fetched.items():
+            if isinstance(value, BaseException):
+                logger.error(f"Erreur lors de la récupération {name}: {str(value)}")
+                fetch_errors[name] = str(value)
+                value = None
+            fetched_values[name] = value
+
+        # Une récupération en échec n'est pas relancée: les actifs de ses clés reçoivent l'erreur
+        isin_prices = fetched_values.get("isin_prices")
+        if isin_prices is None:
+            isin_prices = ({}, {isin: fetch_errors["isin_prices"] for isin in isins} if isins else {})
+
+        # Application des résultats à tous les actifs de chaque clé, dans l'ordre
         results = {
-            "currency_rates": self.sync_currency_rates(db),
-            "isin_prices": self.sync_price_by_isin(db),
-            "metal_prices": self.sync_metal_prices(db),
+            "currency_rates": self.sync_currency_rates(db, rates=fetched_values.get("currency_rates") or {}),
+            "isin_prices": self.sync_price_by_isin(db, isin_prices=isin_prices),
+            "metal_prices": self.sync_metal_prices(db, plan=plan, metal_prices={
+                metal_type: fetched_values[f"metal_{metal_type}"] for metal_type in metal_types
+            }),
         }
 
         # Déterminer si des actifs ont été mis à jour
-        total_updates = sum(results.values())
+        total_updates = sum(count or 0 for count in results.values())
+
+        timings = {
+            "wall_time": wall_time,
+            "sequential_time": sum(durations.values()),
+            "tasks": durations,
+        }
+        logger.info(f"Récupérations de la synchronisation complète: {timings['wall_time']:.2f}s en parallèle "
+                    f"pour {timings['sequential_time']:.2f}s en séquentiel ({len(tasks)} tâches)")
+
+        # ISIN non sondés (ou en échec lors de cette synchronisation): nouvelle tentative différée
+        pending_isins = self.price_service.get_pending_isins(isins)
+        if pending_isins:
+            logger.info(f"{len(pending_isins)} ISIN en attente de résolution du symbole")
 
         return {
             "updated_count": total_updates,
-            "details": results
+            "details": results,
+            "pending_isins": pending_isins,
+            "plan": plan.summary(),
+            "timings": timings
         }
 
 
@@ -7,7 +7,8 @@ from typing import Dict, Optional, Any
 import jwt
 from sqlalchemy.orm import Session
 
-from config.app_config import SECRET_KEY, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from config.app_config import JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, load_secret_keys
+from database.blind_index import compute_blind_index
 from database.models import User
 from utils.error_manager import catch_exceptions
 from utils.exceptions import AuthenticationError, ValidationError
@@ -70,7 +71,7 @@ class AuthService:
             L'utilisateur créé ou None si le nom d'utilisateur existe déjà
 
         Raises:
-            ValidationError: Si le mot de passe est trop court
+            ValidationError: Si le mot de passe est trop court ou l'email vide
         """
         try:
             # Vérifier la force du mot de passe (minimal)
@@ -84,13 +85,17 @@ class AuthService:
                 logger.warning(f"Tentative de création d'un utilisateur avec un nom existant: {username}")
                 return None
 
-            # Vérifier si l'email existe déjà - en utilisant une autre approche
-            # Puisque email est chiffré, nous devons vérifier autrement
-            all_users = db.query(User).all()
-            for user in all_users:
-                if user.email == email:  # La comparaison fonctionnera grâce au déchiffrement automatique
-                    logger.warning(f"Tentative de création d'un utilisateur avec un email existant: {email}")
-                    return None
+            # Un email vide une fois normalisé n'a pas d'index aveugle: il est invalide
+            email_bidx = compute_blind_index(email)
+            if email_bidx is None:
+                logger.warning(f"Tentative de création d'utilisateur avec un email invalide: {username}")
+                raise ValidationError("L'adresse email est invalide")
+
+            # Vérifier si l'email existe déjà via son index aveugle (email chiffré)
+            existing_email = db.query(User.id).filter(User.email_bidx == email_bidx).first()
+            if existing_email:
+                logger.warning(f"Tentative de création d'un utilisateur avec un email existant: {email}")
+                return None
 
             # Hacher le mot de passe
             password_hash = hash_password(password)
@@ -198,7 +203,7 @@ class AuthService:
         to_encode.update({"exp": expire})
 
         # Encoder le token
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=JWT_ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, load_secret_keys()[0], algorithm=JWT_ALGORITHM)
 
         return encoded_jwt
 
@@ -214,7 +219,7 @@ class AuthService:
             Données du token ou None si invalide
         """
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+            payload = jwt.decode(token, load_secret_keys()[0], algorithms=[JWT_ALGORITHM])
             return payload
         except jwt.PyJWTError as e:
             logger.warning(f"Vérification de token échouée: {str(e)}")
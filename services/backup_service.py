@@ -10,10 +10,9 @@ import tempfile
 import zipfile
 from datetime import datetime
 
-from cryptography.fernet import Fernet
-
 from config.app_config import DATA_DIR
-from database.db_config import get_encryption_key
+from database.db_config import checkpoint_wal
+from database.key_ring import key_ring
 
 # Configurer le logging
 logging.basicConfig(
@@ -29,13 +28,14 @@ class BackupService:
     @staticmethod
     def generate_backup_key() -> bytes:
         """
-        Génère une clé de chiffrement pour les sauvegardes basée sur la clé secrète
+        Retourne la clé de chiffrement des sauvegardes basée sur la clé secrète
+
+        La clé est dérivée une seule fois par processus par le trousseau de clés partagé.
 
         Returns:
             Clé de chiffrement
         """
-        # Réutiliser la fonction de la configuration DB pour consistance
-        return get_encryption_key()
+        return key_ring.backup_key
 
     @staticmethod
     def create_backup(db_path: str, output_path: str = None) -> str:
@@ -60,6 +60,9 @@ class BackupService:
                 logger.error(f"La base de données {db_path} n'existe pas!")
                 return None
 
+            # Reporter le journal WAL dans le fichier de base avant de le copier
+            checkpoint_wal(db_path)
+
             # Calculer le hash SHA-256 de la base de données pour vérification d'intégrité
             with open(db_path, 'rb') as f:
                 db_hash = hashlib.sha256(f.read()).hexdigest()
@@ -96,9 +99,8 @@ class BackupService:
                 zipf.write(temp_db_path, os.path.basename(db_path))
                 zipf.write(metadata_path, "metadata.json")
 
-            # Chiffrer le fichier zip
-            key = BackupService.generate_backup_key()
-            f = Fernet(key)
+            # Chiffrer le fichier zip (objet de chiffrement partagé, sans nouvelle dérivation)
+            f = key_ring.backup_cipher
 
             try:
                 with open(zip_path, 'rb') as file:
@@ -130,7 +132,9 @@ class BackupService:
 
         try:
             # Créer une sauvegarde de la base actuelle avant restauration
+            # (journal WAL reporté et vidé: la copie est complète et le journal ne sera pas rejoué sur la base restaurée)
             if os.path.exists(db_path):
+                checkpoint_wal(db_path)
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 backup_before_restore = os.path.join(DATA_DIR, f"pre_restore_backup_{timestamp}.db")
                 shutil.copy2(db_path, backup_before_restore)
@@ -138,9 +142,9 @@ class BackupService:
 
             # Créer un répertoire temporaire pour la restauration
             with tempfile.TemporaryDirectory() as temp_dir:
-                # Déchiffrer le fichier de sauvegarde
-                key = BackupService.generate_backup_key()
-                f = Fernet(key)
+                # Déchiffrer le fichier de sauvegarde (toutes les clés connues: une sauvegarde
+                # antérieure à une rotation de clé reste restaurable)
+                f = key_ring.cipher
 
                 try:
                     with open(backup_path, 'rb') as file:
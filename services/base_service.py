@@ -10,6 +10,7 @@ from database.models import Base
 from utils.error_manager import catch_exceptions  # Changé de handle_exceptions
 from utils.exceptions import DatabaseError, ValidationError
 from utils.logger import get_logger
+from utils.read_cache import invalidate_cached_reads
 
 # Type générique pour les modèles SQLAlchemy
 T = TypeVar('T', bound=Base)
@@ -95,6 +96,7 @@ class BaseService(Generic[T]):
             item = self.model_class(**data)
             db.add(item)
             db.commit()
+            invalidate_cached_reads(getattr(item, "owner_id", None))
             db.refresh(item)
             return item
         except SQLAlchemyError as e:
@@ -128,6 +130,7 @@ class BaseService(Generic[T]):
                     setattr(item, key, value)
 
             db.commit()
+            invalidate_cached_reads(getattr(item, "owner_id", None))
             db.refresh(item)
             return item
         except SQLAlchemyError as e:
@@ -155,8 +158,11 @@ class BaseService(Generic[T]):
             if not item:
                 return False
 
+            # Propriétaire lu avant la suppression (None: toutes les lectures en cache sont invalidées)
+            owner_id = getattr(item, "owner_id", None)
             db.delete(item)
             db.commit()
+            invalidate_cached_reads(owner_id)
             return True
         except SQLAlchemyError as e:
             db.rollback()
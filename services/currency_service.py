@@ -3,27 +3,24 @@ Service de gestion des devises et de conversion monétaire
 """
 import requests
 from typing import Dict
-import time
-import json
-import os
+
+from database.quote_store import quote_store
+from services.price_providers import YahooPriceProvider, get_provider
 
 
 class CurrencyService:
     """Service pour la gestion des devises et la conversion monétaire"""
 
-    # URL de l'API de taux de change (Open Exchange Rates, vous devrez vous inscrire pour obtenir une clé)
-    API_URL = "https://open.er-api.com/v6/latest/EUR"
+    # URL de l'API de taux de change du fournisseur en ligne (Open Exchange Rates)
+    API_URL = YahooPriceProvider.FX_API_URL
 
     # Durée de validité du cache en secondes (1 heure)
     CACHE_VALIDITY = 3600
 
-    # Chemin du fichier de cache
-    CACHE_FILE = "data/currency_rates_cache.json"
-
     @staticmethod
     def get_exchange_rates() -> Dict[str, float]:
         """
-        Récupère les taux de change actuels depuis l'API ou le cache
+        Récupère les taux de change actuels depuis le fournisseur de données ou le cache
 
         Returns:
             Dictionnaire des taux de change par rapport à l'EUR
@@ -32,25 +29,18 @@ class CurrencyService:
         if CurrencyService._is_cache_valid():
             return CurrencyService._load_cache()
 
-        # Sinon, appeler l'API
+        # Sinon, interroger le fournisseur (API open.er-api.com par défaut)
         try:
-            response = requests.get(CurrencyService.API_URL, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-            rates = data.get("rates", {})
+            rates = get_provider().get_fx_rates()
 
             # Sauvegarder le cache
             CurrencyService._save_cache(rates)
 
             return rates
-        except requests.RequestException as e:
+        except (requests.RequestException, TimeoutError) as e:
             # En cas d'erreur, charger le cache même s'il est expiré
-            if os.path.exists(CurrencyService.CACHE_FILE):
-                return CurrencyService._load_cache()
-
-            # Si pas de cache, retourner un dictionnaire avec EUR = 1
-            return {"EUR": 1.0}
+            # (si pas de cache, retourner un dictionnaire avec EUR = 1)
+            return CurrencyService._load_cache()
 
     @staticmethod
     def convert_to_eur(amount: float, currency: str) -> float:
@@ -83,41 +73,22 @@ class CurrencyService:
     @staticmethod
     def _is_cache_valid() -> bool:
         """
-        Vérifie si le cache de taux de change est valide
+        Vérifie si les taux de change en cache sont valides
 
         Returns:
-            True si le cache existe et est valide, False sinon
+            True si des taux de moins de CACHE_VALIDITY secondes sont en cache, False sinon
         """
-        if not os.path.exists(CurrencyService.CACHE_FILE):
-            return False
-
-        try:
-            with open(CurrencyService.CACHE_FILE, "r") as f:
-                cache = json.load(f)
-
-            # Vérifier la date de mise à jour
-            timestamp = cache.get("timestamp", 0)
-            current_time = time.time()
-
-            return (current_time - timestamp) < CurrencyService.CACHE_VALIDITY
-        except (json.JSONDecodeError, KeyError, ValueError):
-            return False
+        return quote_store.get_fx_rates(max_age=CurrencyService.CACHE_VALIDITY) is not None
 
     @staticmethod
     def _load_cache() -> Dict[str, float]:
         """
-        Charge les taux de change depuis le cache
+        Charge les taux de change depuis le cache, même expirés
 
         Returns:
             Dictionnaire des taux de change
         """
-        try:
-            with open(CurrencyService.CACHE_FILE, "r") as f:
-                cache = json.load(f)
-
-            return cache.get("rates", {"EUR": 1.0})
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {"EUR": 1.0}
+        return quote_store.get_fx_rates() or {"EUR": 1.0}
 
     @staticmethod
     def _save_cache(rates: Dict[str, float]) -> None:
@@ -127,16 +98,4 @@ class CurrencyService:
         Args:
             rates: Dictionnaire des taux de change
         """
-        try:
-            os.makedirs(os.path.dirname(CurrencyService.CACHE_FILE), exist_ok=True)
-
-            cache = {
-                "rates": rates,
-                "timestamp": time.time()
-            }
-
-            with open(CurrencyService.CACHE_FILE, "w") as f:
-                json.dump(cache, f)
-        except (IOError, OSError):
-            # En cas d'erreur, ignorer silencieusement
-            pass
\ No newline at end of file
+        quote_store.set_fx_rates(rates)
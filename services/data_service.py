@@ -2,14 +2,16 @@
 Service de chargement et sauvegarde des données avec SQLAlchemy
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from database.models import Asset, HistoryPoint
+from database.models import Asset, HistoryPoint, HistoryValue, asset_load_options
 from utils.common import safe_float_conversion
 from utils.error_manager import catch_exceptions  # Changé de handle_exceptions
 from utils.logger import get_logger
+from utils.read_cache import invalidate_cached_reads
 
 logger = get_logger(__name__)
 
@@ -31,11 +33,14 @@ class DataService:
         """
         current_date = datetime.now().strftime("%Y-%m-%d")
 
-        # Récupérer tous les actifs de l'utilisateur
-        assets = db.query(Asset).filter(Asset.owner_id == user_id).all()
+        # Récupérer tous les actifs de l'utilisateur (seules les valeurs sont nécessaires)
+        assets = db.query(Asset).options(*asset_load_options("valuation")).filter(Asset.owner_id == user_id).all()
 
-        # Vérifier si on a déjà un enregistrement pour aujourd'hui
-        existing_entry = db.query(HistoryPoint).filter(HistoryPoint.date == current_date).first()
+        # Vérifier si l'utilisateur a déjà un enregistrement pour aujourd'hui
+        existing_entry = db.query(HistoryPoint).filter(
+            HistoryPoint.owner_id == user_id,
+            HistoryPoint.date == current_date
+        ).first()
 
         # Utiliser value_eur pour l'historique
         assets_dict = {}
@@ -47,48 +52,168 @@ class DataService:
             assets_dict[asset.id] = value
             total_value += value
 
+        # Historique normalisé: remplacer les valeurs du jour de l'utilisateur
+        db.query(HistoryValue).filter(
+            HistoryValue.user_id == user_id,
+            HistoryValue.date == current_date
+        ).delete(synchronize_session=False)
+        db.bulk_insert_mappings(HistoryValue, [
+            {"user_id": user_id, "date": current_date, "asset_id": asset_id, "value_eur": value}
+            for asset_id, value in assets_dict.items()
+        ])
+
         if existing_entry:
             # Mettre à jour l'entrée existante
             existing_entry.assets = assets_dict
             existing_entry.total = total_value
             db.commit()
+            invalidate_cached_reads(user_id)
             db.refresh(existing_entry)
             logger.info(f"Point d'historique mis à jour pour {current_date}")
             return existing_entry
         else:
             # Créer une nouvelle entrée
             new_entry = HistoryPoint(
+                owner_id=user_id,
                 date=current_date,
                 assets=assets_dict,
                 total=total_value
             )
             db.add(new_entry)
             db.commit()
+            invalidate_cached_reads(user_id)
             db.refresh(new_entry)
             logger.info(f"Nouveau point d'historique créé pour {current_date}")
             return new_entry
 
     @staticmethod
     @catch_exceptions  # Changé de handle_exceptions
-    def get_history(db: Session, days: Optional[int] = None) -> List[HistoryPoint]:
+    def get_history(db: Session, user_id: str, days: Optional[int] = None) -> List[HistoryPoint]:
         """
-        Récupère l'historique des valeurs
+        Récupère l'historique des valeurs d'un utilisateur
 
         Args:
             db: Session de base de données
+            user_id: ID de l'utilisateur
             days: Nombre de jours à récupérer (None pour tout l'historique)
 
         Returns:
             Liste des points d'historique
         """
-        query = db.query(HistoryPoint).order_by(HistoryPoint.date)
+        query = db.query(HistoryPoint).filter(HistoryPoint.owner_id == user_id)
 
         if days:
             # Récupérer uniquement les N derniers jours
-            query = query.order_by(HistoryPoint.date.desc()).limit(days)
-            result = query.all()
+            result = query.order_by(HistoryPoint.date.desc()).limit(days).all()
             # Réordonner par date croissante
             result.reverse()
             return result
 
-        return query.all()
\ No newline at end of file
+        return query.order_by(HistoryPoint.date).all()
+
+    @staticmethod
+    @catch_exceptions
+    def get_history_totals(db: Session, user_id: str, days: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Récupère la série des valeurs totales d'un utilisateur (lecture de l'index seul, sans déchiffrement)
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            days: Nombre de points à récupérer (None pour tout l'historique)
+
+        Returns:
+            Liste de tuples (date, total) triée par date croissante
+        """
+        query = db.query(HistoryPoint.date, HistoryPoint.total).filter(HistoryPoint.owner_id == user_id)
+
+        if days:
+            rows = query.order_by(HistoryPoint.date.desc()).limit(days).all()
+            rows.reverse()
+        else:
+            rows = query.order_by(HistoryPoint.date).all()
+        return [(date, total or 0.0) for date, total in rows]
+
+    @staticmethod
+    @catch_exceptions
+    def get_asset_history(db: Session, user_id: str, asset_id: str,
+                          start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Récupère la série de valeurs d'un actif (sans déchiffrement)
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            asset_id: ID de l'actif
+            start_date: Date de début incluse (YYYY-MM-DD, optionnelle)
+            end_date: Date de fin incluse (YYYY-MM-DD, optionnelle)
+
+        Returns:
+            Liste de tuples (date, valeur en EUR) triée par date
+        """
+        query = db.query(HistoryValue.date, HistoryValue.value_eur).filter(
+            HistoryValue.user_id == user_id,
+            HistoryValue.asset_id == asset_id
+        )
+        if start_date:
+            query = query.filter(HistoryValue.date >= start_date)
+        if end_date:
+            query = query.filter(HistoryValue.date <= end_date)
+        return [(date, value or 0.0) for date, value in query.order_by(HistoryValue.date).all()]
+
+    @staticmethod
+    @catch_exceptions
+    def get_account_history(db: Session, user_id: str, account_id: str,
+                            start_date: Optional[str] = None, end_date: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Récupère la série des valeurs totales d'un compte (actifs actuellement rattachés au compte)
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            account_id: ID du compte
+            start_date: Date de début incluse (YYYY-MM-DD, optionnelle)
+            end_date: Date de fin incluse (YYYY-MM-DD, optionnelle)
+
+        Returns:
+            Liste de tuples (date, valeur totale en EUR) triée par date
+        """
+        query = db.query(HistoryValue.date, func.sum(HistoryValue.value_eur)).join(
+            Asset, Asset.id == HistoryValue.asset_id
+        ).filter(
+            HistoryValue.user_id == user_id,
+            Asset.account_id == account_id
+        )
+        if start_date:
+            query = query.filter(HistoryValue.date >= start_date)
+        if end_date:
+            query = query.filter(HistoryValue.date <= end_date)
+        rows = query.group_by(HistoryValue.date).order_by(HistoryValue.date).all()
+        return [(date, total or 0.0) for date, total in rows]
+
+    @staticmethod
+    @catch_exceptions
+    def get_portfolio_as_of(db: Session, user_id: str, as_of_date: str) -> Dict[str, float]:
+        """
+        Récupère la composition du patrimoine au dernier point d'historique antérieur ou égal à une date
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            as_of_date: Date de référence (YYYY-MM-DD)
+
+        Returns:
+            Dictionnaire {asset_id: valeur en EUR} (vide si aucun historique avant cette date)
+        """
+        snapshot_date = db.query(func.max(HistoryValue.date)).filter(
+            HistoryValue.user_id == user_id,
+            HistoryValue.date <= as_of_date
+        ).scalar()
+        if snapshot_date is None:
+            return {}
+
+        rows = db.query(HistoryValue.asset_id, HistoryValue.value_eur).filter(
+            HistoryValue.user_id == user_id,
+            HistoryValue.date == snapshot_date
+        ).all()
+        return {asset_id: value or 0.0 for asset_id, value in rows}
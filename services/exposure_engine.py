@@ -0,0 +1,234 @@
+"""
+Moteur vectorisé de calcul des expositions (NumPy)
+
+Les actifs d'un utilisateur sont convertis une fois en tableaux denses:
+- un vecteur des valeurs en EUR (n actifs);
+- une matrice des poids par catégorie (n × ASSET_CATEGORIES);
+- un tenseur des poids géographiques (n × catégories × GEO_ZONES).
+Toute répartition filtrée (banque, compte, catégorie) se calcule ensuite par
+produits matriciels masqués, sans boucle Python sur les actifs.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config.app_config import ASSET_CATEGORIES, GEO_ZONES
+
+
+class ExposureEngine:
+    """
+    Tableaux d'exposition d'un ensemble d'actifs
+
+    Mêmes règles que le calcul actif par actif: valeur = value_eur, à défaut la valeur
+    actuelle; la répartition géographique n'est comptée que pour les catégories
+    d'allocation positive d'un actif ayant une répartition géographique.
+    """
+
+    def __init__(
+            self,
+            values: np.ndarray,
+            weights: np.ndarray,
+            geo_weights: np.ndarray,
+            account_ids: List[Optional[str]],
+            bank_ids: List[Optional[str]],
+            types: List[Optional[str]],
+            categories: List[str] = None,
+            zones: List[str] = None,
+            has_category: Optional[np.ndarray] = None
+    ):
+        """
+        Initialise le moteur à partir de tableaux déjà construits
+
+        Args:
+            values: Valeurs en EUR (n,)
+            weights: Poids par catégorie, en fraction (n, C)
+            geo_weights: Poids géographiques par catégorie, en fraction (n, C, Z)
+            account_ids: Compte de chaque actif
+            bank_ids: Banque de chaque actif
+            types: Type de produit de chaque actif
+            categories: Catégories des colonnes (ASSET_CATEGORIES par défaut)
+            zones: Zones géographiques (GEO_ZONES par défaut)
+            has_category: Catégories présentes dans l'allocation (n, C), poids non nuls par défaut
+        """
+        self.categories = list(categories if categories is not None else ASSET_CATEGORIES)
+        self.zones = list(zones if zones is not None else GEO_ZONES)
+        self.values = values
+        self.weights = weights
+        self.geo_weights = geo_weights
+        # Clés de regroupement en chaînes (chaîne vide pour une clé absente)
+        self.account_ids = np.asarray([key or "" for key in account_ids], dtype=str)
+        self.bank_ids = np.asarray([key or "" for key in bank_ids], dtype=str)
+        self.types = np.asarray([key or "" for key in types], dtype=str)
+        # Actifs dont l'allocation mentionne la catégorie (même à 0%): filtre "catégorie" de l'analyse
+        self.has_category = has_category if has_category is not None else weights != 0
+
+    @classmethod
+    def from_assets(
+            cls,
+            assets: Iterable,
+            bank_by_account: Optional[Dict[str, str]] = None,
+            categories: List[str] = None,
+            zones: List[str] = None
+    ) -> "ExposureEngine":
+        """
+        Construit le moteur à partir d'actifs déchiffrés
+
+        Args:
+            assets: Actifs (value_eur, valeur_actuelle, allocation, geo_allocation, account_id, type_produit)
+            bank_by_account: Correspondance {account_id: bank_id} pour le filtre par banque
+            categories: Catégories retenues (ASSET_CATEGORIES par défaut)
+            zones: Zones géographiques retenues (GEO_ZONES par défaut)
+
+        Returns:
+            Moteur d'exposition
+        """
+        categories = list(categories if categories is not None else ASSET_CATEGORIES)
+        zones = list(zones if zones is not None else GEO_ZONES)
+        category_index = {category: i for i, category in enumerate(categories)}
+        zone_index = {zone: i for i, zone in enumerate(zones)}
+        bank_by_account = bank_by_account or {}
+
+        assets = list(assets)
+        n = len(assets)
+        values = np.zeros(n)
+        weights = np.zeros((n, len(categories)))
+        has_category = np.zeros((n, len(categories)), dtype=bool)
+        geo_weights = np.zeros((n, len(categories), len(zones)))
+        account_ids, bank_ids, types = [], [], []
+
+        for row, asset in enumerate(assets):
+            account_ids.append(asset.account_id)
+            bank_ids.append(bank_by_account.get(asset.account_id))
+            types.append(asset.type_produit)
+
+            value = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
+            values[row] = value or 0.0
+
+            allocation = asset.allocation if isinstance(asset.allocation, dict) else {}
+            for category, percentage in allocation.items():
+                column = category_index.get(category)
+                if column is not None:
+                    weights[row, column] = percentage / 100.0
+                    has_category[row, column] = True
+
+            geo_allocation = getattr(asset, "geo_allocation", None)
+            if not allocation or not isinstance(geo_allocation, dict):
+                continue
+            for category, geo_zones in geo_allocation.items():
+                column = category_index.get(category)
+                if column is None or allocation.get(category, 0) <= 0 or not isinstance(geo_zones, dict):
+                    continue
+                for zone, percentage in geo_zones.items():
+                    depth = zone_index.get(zone)
+                    if depth is not None:
+                        geo_weights[row, column, depth] = percentage / 100.0
+
+        return cls(values, weights, geo_weights, account_ids, bank_ids, types, categories, zones, has_category)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def mask(
+            self,
+            bank_id: Optional[str] = None,
+            account_id: Optional[str] = None,
+            category: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Calcule le masque des actifs retenus par les filtres
+
+        Args:
+            bank_id: Filtre par banque (optionnel)
+            account_id: Filtre par compte (optionnel)
+            category: Actifs dont l'allocation mentionne cette catégorie (optionnel)
+
+        Returns:
+            Masque booléen (n,)
+        """
+        selected = np.ones(len(self.values), dtype=bool)
+        if bank_id:
+            selected &= self.bank_ids == bank_id
+        if account_id:
+            selected &= self.account_ids == account_id
+        if category:
+            if category not in self.categories:
+                return np.zeros(len(self.values), dtype=bool)
+            selected &= self.has_category[:, self.categories.index(category)]
+        return selected
+
+    def total(self, mask: Optional[np.ndarray] = None) -> float:
+        """
+        Valeur totale des actifs retenus
+
+        Args:
+            mask: Masque des actifs (tous par défaut)
+
+        Returns:
+            Somme des valeurs en EUR
+        """
+        values = self.values if mask is None else self.values[mask]
+        return float(values.sum())
+
+    def category_values(self, mask: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Répartition par catégorie: valeurs × matrice des poids
+
+        Args:
+            mask: Masque des actifs (tous par défaut)
+
+        Returns:
+            Dictionnaire {categorie: valeur en EUR}
+        """
+        values, weights = (self.values, self.weights) if mask is None else (self.values[mask], self.weights[mask])
+        return dict(zip(self.categories, (values @ weights).tolist()))
+
+    def geo_values(self, mask: Optional[np.ndarray] = None, category: Optional[str] = None) -> Dict[str, float]:
+        """
+        Répartition géographique: contraction des valeurs pondérées avec le tenseur géographique
+
+        Args:
+            mask: Masque des actifs (tous par défaut)
+            category: Limiter à la part des actifs allouée à cette catégorie (optionnel)
+
+        Returns:
+            Dictionnaire {zone: valeur en EUR}
+        """
+        if category is not None and category not in self.categories:
+            return {zone: 0.0 for zone in self.zones}
+
+        values, weights, geo_weights = (self.values, self.weights, self.geo_weights) if mask is None else \
+            (self.values[mask], self.weights[mask], self.geo_weights[mask])
+
+        if category is None:
+            # Σ_n Σ_c valeur[n] × poids[n, c] × géo[n, c, z]
+            zone_values = np.einsum("nc,ncz->z", values[:, None] * weights, geo_weights)
+        else:
+            column = self.categories.index(category)
+            zone_values = (values * weights[:, column]) @ geo_weights[:, column, :]
+        return dict(zip(self.zones, zone_values.tolist()))
+
+    def group_values(self, key: str, mask: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Valeur totale par banque, compte ou type de produit
+
+        Args:
+            key: "bank", "account" ou "type"
+            mask: Masque des actifs (tous par défaut)
+
+        Returns:
+            Dictionnaire {clé: valeur en EUR}, chaîne vide pour les actifs sans clé
+
+        Raises:
+            ValueError: Si la clé de regroupement est inconnue
+        """
+        labels = {"bank": self.bank_ids, "account": self.account_ids, "type": self.types}.get(key)
+        if labels is None:
+            raise ValueError(f"Regroupement inconnu: {key} (attendu: bank, account ou type)")
+
+        values = self.values if mask is None else self.values[mask]
+        labels = labels if mask is None else labels[mask]
+        if len(values) == 0:
+            return {}
+        uniques, codes = np.unique(labels, return_inverse=True)
+        sums = np.bincount(codes, weights=values, minlength=len(uniques))
+        return {str(label): float(total) for label, total in zip(uniques, sums)}
@@ -0,0 +1,109 @@
+"""
+Service de lecture des agrégats d'exposition (répartition par catégorie et par zone géographique)
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.exposures import CATEGORY_TOTAL_ZONE, check_exposures, rebuild_exposures
+from database.models import ExposureAggregate
+from utils.error_manager import catch_exceptions
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExposureService:
+    """
+    Service d'accès aux agrégats d'exposition maintenus à chaque écriture d'actif
+
+    Chaque lecture parcourt les agrégats de l'utilisateur (compte × catégorie × zone),
+    sans charger ni déchiffrer les actifs.
+    """
+
+    @staticmethod
+    @catch_exceptions
+    def get_category_values(db: Session, user_id: str, account_id: Optional[str] = None) -> Dict[str, float]:
+        """
+        Récupère la valeur exposée à chaque catégorie
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            account_id: Filtre par compte (optionnel)
+
+        Returns:
+            Dictionnaire {categorie: valeur en EUR}
+        """
+        query = db.query(ExposureAggregate.category, func.sum(ExposureAggregate.value_eur)).filter(
+            ExposureAggregate.owner_id == user_id,
+            ExposureAggregate.zone == CATEGORY_TOTAL_ZONE
+        )
+        if account_id:
+            query = query.filter(ExposureAggregate.account_id == account_id)
+        return {category: value or 0.0 for category, value in query.group_by(ExposureAggregate.category).all()}
+
+    @staticmethod
+    @catch_exceptions
+    def get_geo_values(db: Session, user_id: str, account_id: Optional[str] = None,
+                       category: Optional[str] = None) -> Dict[str, float]:
+        """
+        Récupère la valeur exposée à chaque zone géographique
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            account_id: Filtre par compte (optionnel)
+            category: Limiter à la part des actifs allouée à cette catégorie (optionnel)
+
+        Returns:
+            Dictionnaire {zone: valeur en EUR}
+        """
+        query = db.query(ExposureAggregate.zone, func.sum(ExposureAggregate.value_eur)).filter(
+            ExposureAggregate.owner_id == user_id,
+            ExposureAggregate.zone != CATEGORY_TOTAL_ZONE
+        )
+        if account_id:
+            query = query.filter(ExposureAggregate.account_id == account_id)
+        if category:
+            query = query.filter(ExposureAggregate.category == category)
+        return {zone: value or 0.0 for zone, value in query.group_by(ExposureAggregate.zone).all()}
+
+    @staticmethod
+    def rebuild(db: Session, user_id: Optional[str] = None) -> int:
+        """
+        Reconstruit les agrégats d'exposition à partir des actifs (réparation)
+
+        Args:
+            db: Session de base de données
+            user_id: Limiter la reconstruction à un utilisateur (tous par défaut)
+
+        Returns:
+            Nombre de lignes d'agrégat écrites
+        """
+        count = rebuild_exposures(db.connection(), user_id)
+        db.commit()
+        logger.info(f"Agrégats d'exposition reconstruits: {count} lignes")
+        return count
+
+    @staticmethod
+    def check(db: Session, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Vérifie la cohérence des agrégats d'exposition avec les actifs
+
+        Args:
+            db: Session de base de données
+            user_id: Limiter la vérification à un utilisateur (tous par défaut)
+
+        Returns:
+            Liste des écarts, vide si les agrégats sont cohérents
+        """
+        mismatches = check_exposures(db.connection(), user_id)
+        if mismatches:
+            logger.warning(f"{len(mismatches)} agrégat(s) d'exposition incohérent(s)")
+        return mismatches
+
+
+# Créer une instance singleton du service
+exposure_service = ExposureService()
@@ -4,7 +4,7 @@ Service de vérification de l'intégrité des données
 from sqlalchemy.orm import Session
 
 from database.db_config import DataCorruptionError
-from database.models import Asset, Bank, Account, User
+from database.models import Asset, Bank, Account, User, asset_load_options
 from utils.error_manager import catch_exceptions
 from utils.logger import get_logger
 
@@ -31,7 +31,7 @@ class IntegrityService:
         """
         try:
             # Échantillonnage de données chiffrées pour vérifier le déchiffrement
-            assets = db.query(Asset).limit(5).all()
+            assets = db.query(Asset).options(*asset_load_options("full")).limit(5).all()
             banks = db.query(Bank).limit(5).all()
             accounts = db.query(Account).limit(5).all()
             users = db.query(User).limit(3).all()
@@ -94,7 +94,7 @@ class IntegrityService:
 
         try:
             # Scan complet des actifs
-            assets = db.query(Asset).all()
+            assets = db.query(Asset).options(*asset_load_options("full")).all()
             results["total_scanned"] += len(assets)
 
             for asset in assets:
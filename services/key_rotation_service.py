@@ -0,0 +1,345 @@
+"""
+Service de rotation de la clé de chiffrement
+
+Le rechiffrement parcourt chaque table par segments paginés sur la clé primaire
+(pagination par curseur, sans OFFSET). Chaque segment est lu, rechiffré en parallèle
+(déchiffrement avec l'ancienne clé, chiffrement avec la nouvelle) puis écrit dans sa
+propre transaction courte: l'application reste utilisable pendant la rotation.
+Un point de reprise est enregistré après chaque segment pour reprendre après un arrêt.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cryptography.fernet import InvalidToken, MultiFernet
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from config.app_config import (
+    DATA_DIR, KEY_BACKUPS_DIR, KEY_ROTATION_CHUNK_SIZE, KEY_ROTATION_MAX_WORKERS
+)
+from database.db_config import engine as default_engine, reset_cipher
+from database.key_ring import key_ring
+from database.models import Base
+from utils.crypto import EncryptedJSON, EncryptedString
+from utils.exceptions import KeyRotationError
+from utils.key_manager import KeyManager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fichier de point de reprise de la rotation en cours
+CHECKPOINT_FILE = DATA_DIR / ".key_rotation_checkpoint.json"
+
+
+def get_encrypted_columns() -> Dict[str, Tuple[str, List[str]]]:
+    """
+    Liste les colonnes chiffrées de chaque table
+
+    Returns:
+        Dictionnaire {table: (colonne de clé primaire, colonnes chiffrées)}
+    """
+    columns = {}
+    for table in Base.metadata.sorted_tables:
+        encrypted = [column.name for column in table.columns
+                     if isinstance(column.type, (EncryptedString, EncryptedJSON))]
+        primary_key = list(table.primary_key.columns)
+        if encrypted and len(primary_key) == 1:
+            columns[table.name] = (primary_key[0].name, encrypted)
+    return columns
+
+
+class KeyRotationService:
+    """Service de rechiffrement des données lors d'une rotation de la clé de chiffrement"""
+
+    def __init__(self, engine: Optional[Engine] = None, key_manager: Optional[KeyManager] = None,
+                 checkpoint_path: Optional[Path] = None, chunk_size: int = KEY_ROTATION_CHUNK_SIZE,
+                 max_workers: int = KEY_ROTATION_MAX_WORKERS):
+        """
+        Args:
+            engine: Moteur de la base à rechiffrer (par défaut celui de l'application)
+            key_manager: Gestionnaire des fichiers de clés
+            checkpoint_path: Fichier de point de reprise
+            chunk_size: Nombre de lignes par segment (et par transaction)
+            max_workers: Nombre de threads de rechiffrement
+        """
+        self.engine = engine or default_engine
+        self._key_manager = key_manager
+        self.checkpoint_path = Path(checkpoint_path or CHECKPOINT_FILE)
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max(1, max_workers)
+
+    @property
+    def key_manager(self) -> KeyManager:
+        """Gestionnaire des fichiers de clés (créé au premier usage)"""
+        if self._key_manager is None:
+            self._key_manager = KeyManager(DATA_DIR, KEY_BACKUPS_DIR)
+        return self._key_manager
+
+    # Point de reprise
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Charge le point de reprise de la rotation en cours
+
+        Returns:
+            Point de reprise, ou None s'il n'y en a pas
+        """
+        if not self.checkpoint_path.exists():
+            return None
+        with open(self.checkpoint_path, "r") as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """Enregistre le point de reprise de manière atomique (fichier temporaire puis renommage)"""
+        checkpoint["updated_at"] = datetime.now().isoformat()
+        temp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _new_checkpoint(self) -> Dict[str, Any]:
+        """Crée un point de reprise initial couvrant toutes les tables chiffrées"""
+        return {
+            "from_version": self.key_manager.current_version,
+            "started_at": datetime.now().isoformat(),
+            "tables": {
+                table: {"last_id": None, "rows_done": 0, "errors": 0, "completed": False}
+                for table in get_encrypted_columns()
+            }
+        }
+
+    # Rotation
+
+    def start(self) -> Dict[str, Any]:
+        """
+        Démarre une rotation: génère le sel de la nouvelle clé et crée le point de reprise
+
+        Les processus démarrés ensuite chiffrent avec la nouvelle clé et déchiffrent avec
+        les deux: l'application doit être redémarrée après cet appel.
+
+        Returns:
+            Point de reprise de la rotation
+        """
+        self.key_manager.start_rotation()
+        reset_cipher()
+
+        checkpoint = self.load_checkpoint()
+        if checkpoint is None:
+            checkpoint = self._new_checkpoint()
+            self._save_checkpoint(checkpoint)
+        return checkpoint
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Retourne l'état de la rotation
+
+        Returns:
+            Dictionnaire avec "in_progress", "version" et le point de reprise éventuel
+        """
+        return {
+            "in_progress": self.key_manager.read_next_salt() is not None,
+            "version": self.key_manager.current_version,
+            "checkpoint": self.load_checkpoint()
+        }
+
+    def _get_rotation_cipher(self) -> MultiFernet:
+        """Retourne l'objet de rotation (nouvelle clé en premier, puis les anciennes)"""
+        if self.key_manager.read_next_salt() is None:
+            raise KeyRotationError("Aucune rotation de clé en cours: appelez start() d'abord")
+        reset_cipher()
+        rotation_cipher = key_ring.cipher
+        if key_ring.rotation_key is None or not isinstance(rotation_cipher, MultiFernet):
+            raise KeyRotationError("La clé de rotation n'a pas pu être chargée")
+        return rotation_cipher
+
+    @staticmethod
+    def _rotate_rows(rotation_cipher: MultiFernet, columns: List[str],
+                     rows: List[Tuple]) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Rechiffre un lot de lignes
+
+        Args:
+            rotation_cipher: Objet de rotation
+            columns: Colonnes chiffrées (dans l'ordre des lignes, après la clé primaire)
+            rows: Lignes (clé primaire, valeurs chiffrées...)
+
+        Returns:
+            Tuple (paramètres de mise à jour, nombre de valeurs illisibles)
+        """
+        params = []
+        errors = 0
+        for row in rows:
+            values = {"_pk": row[0]}
+            for index, column in enumerate(columns, start=1):
+                value = row[index]
+                values[f"_old_{column}"] = value
+                if value is None:
+                    values[column] = None
+                    continue
+                try:
+                    values[column] = rotation_cipher.rotate(value.encode()).decode()
+                except InvalidToken:
+                    # Valeur illisible avec toutes les clés: laissée intacte
+                    logger.error(f"Valeur illisible lors de la rotation: {column} (id={row[0]})")
+                    values[column] = value
+                    errors += 1
+            params.append(values)
+        return params, errors
+
+    def _rotate_chunk(self, pool: ThreadPoolExecutor, rotation_cipher: MultiFernet,
+                      columns: List[str], rows: List[Tuple]) -> Tuple[List[Dict[str, Any]], int]:
+        """Répartit le rechiffrement d'un segment sur le pool de threads"""
+        if self.max_workers <= 1 or len(rows) < 2 * self.max_workers:
+            return self._rotate_rows(rotation_cipher, columns, rows)
+
+        size = -(-len(rows) // self.max_workers)
+        slices = [rows[i:i + size] for i in range(0, len(rows), size)]
+        params, errors = [], 0
+        for slice_params, slice_errors in pool.map(
+                lambda rows_slice: self._rotate_rows(rotation_cipher, columns, rows_slice), slices):
+            params.extend(slice_params)
+            errors += slice_errors
+        return params, errors
+
+    def _count_remaining(self, checkpoint: Dict[str, Any],
+                         encrypted_columns: Dict[str, Tuple[str, List[str]]]) -> int:
+        """Compte les lignes restant à rechiffrer (pour l'estimation du temps restant)"""
+        remaining = 0
+        with self.engine.connect() as conn:
+            for table, state in checkpoint["tables"].items():
+                if state["completed"] or table not in encrypted_columns:
+                    continue
+                primary_key = encrypted_columns[table][0]
+                if state["last_id"] is None:
+                    query, params = f"SELECT COUNT(*) FROM {table}", {}
+                else:
+                    query, params = f"SELECT COUNT(*) FROM {table} WHERE {primary_key} > :last_id", \
+                        {"last_id": state["last_id"]}
+                remaining += conn.execute(text(query), params).scalar() or 0
+        return remaining
+
+    def run(self, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+            max_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Rechiffre les données avec la nouvelle clé, en reprenant au dernier point de reprise
+
+        Chaque ligne n'est mise à jour que si ses valeurs chiffrées n'ont pas changé depuis
+        sa lecture: une valeur modifiée entre-temps par l'application (déjà chiffrée avec
+        la nouvelle clé) n'est jamais écrasée.
+
+        Args:
+            progress_callback: Fonction appelée après chaque segment avec le rapport courant
+            max_chunks: Nombre maximal de segments à traiter (None pour aller jusqu'au bout)
+
+        Returns:
+            Rapport: lignes traitées, débit (lignes/s), lignes restantes, temps restant estimé
+
+        Raises:
+            KeyRotationError: Si aucune rotation n'est en cours
+        """
+        rotation_cipher = self._get_rotation_cipher()
+        encrypted_columns = get_encrypted_columns()
+
+        checkpoint = self.load_checkpoint() or self._new_checkpoint()
+        for table in encrypted_columns:
+            checkpoint["tables"].setdefault(
+                table, {"last_id": None, "rows_done": 0, "errors": 0, "completed": False})
+
+        remaining = self._count_remaining(checkpoint, encrypted_columns)
+        report = {
+            "rows_processed": 0,
+            "rows_updated": 0,
+            "errors": 0,
+            "remaining_rows": remaining,
+            "elapsed_seconds": 0.0,
+            "rows_per_second": 0.0,
+            "eta_seconds": None,
+            "completed": False,
+            "version": self.key_manager.current_version,
+            "tables": checkpoint["tables"],
+        }
+
+        logger.info(f"Rotation de clé: {remaining} lignes à rechiffrer")
+        start = time.perf_counter()
+        chunks = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rotate") as pool:
+            for table, (primary_key, columns) in encrypted_columns.items():
+                state = checkpoint["tables"][table]
+                select_columns = ", ".join([primary_key] + columns)
+                update = text(
+                    f"UPDATE {table} SET " + ", ".join(f"{c} = :{c}" for c in columns) +
+                    f" WHERE {primary_key} = :_pk AND " + " AND ".join(f"{c} IS :_old_{c}" for c in columns)
+                )
+
+                while not state["completed"]:
+                    if max_chunks is not None and chunks >= max_chunks:
+                        break
+
+                    # Lecture hors transaction d'écriture
+                    with self.engine.connect() as conn:
+                        if state["last_id"] is None:
+                            rows = conn.execute(text(
+                                f"SELECT {select_columns} FROM {table} ORDER BY {primary_key} LIMIT :limit"
+                            ), {"limit": self.chunk_size}).fetchall()
+                        else:
+                            rows = conn.execute(text(
+                                f"SELECT {select_columns} FROM {table} WHERE {primary_key} > :last_id "
+                                f"ORDER BY {primary_key} LIMIT :limit"
+                            ), {"last_id": state["last_id"], "limit": self.chunk_size}).fetchall()
+
+                    if not rows:
+                        state["completed"] = True
+                        self._save_checkpoint(checkpoint)
+                        break
+
+                    params, errors = self._rotate_chunk(pool, rotation_cipher, columns, rows)
+
+                    # Écriture dans une transaction courte, propre au segment
+                    with self.engine.begin() as conn:
+                        result = conn.execute(update, params)
+                        updated = max(result.rowcount, 0)
+
+                    state["last_id"] = rows[-1][0]
+                    state["rows_done"] += len(rows)
+                    state["errors"] += errors
+                    if len(rows) < self.chunk_size:
+                        state["completed"] = True
+                    self._save_checkpoint(checkpoint)
+                    chunks += 1
+
+                    elapsed = time.perf_counter() - start
+                    report["rows_processed"] += len(rows)
+                    report["rows_updated"] += updated
+                    report["errors"] += errors
+                    report["remaining_rows"] = max(remaining - report["rows_processed"], 0)
+                    report["elapsed_seconds"] = elapsed
+                    report["rows_per_second"] = report["rows_processed"] / elapsed if elapsed > 0 else 0.0
+                    report["eta_seconds"] = (report["remaining_rows"] / report["rows_per_second"]
+                                             if report["rows_per_second"] > 0 else None)
+                    if progress_callback:
+                        progress_callback(report)
+
+        if all(state["completed"] for state in checkpoint["tables"].values()):
+            report["version"] = self.key_manager.complete_rotation()
+            self.checkpoint_path.unlink(missing_ok=True)
+            reset_cipher()
+            report["completed"] = True
+            report["remaining_rows"] = 0
+            report["eta_seconds"] = 0.0
+
+        report["elapsed_seconds"] = time.perf_counter() - start
+        logger.info(
+            f"Rotation de clé: {report['rows_processed']} lignes en {report['elapsed_seconds']:.1f}s "
+            f"({report['rows_per_second']:.0f} lignes/s), {report['remaining_rows']} restantes"
+        )
+        return report
+
+
+# Créer une instance singleton du service
+key_rotation_service = KeyRotationService()
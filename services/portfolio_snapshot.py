@@ -0,0 +1,305 @@
+"""
+Instantané de portefeuille partagé entre les pages d'une session
+
+Les pages en lecture seule (tableau de bord, analyses, actifs, tâches, banques et comptes)
+s'affichent à partir d'un instantané compact des données déchiffrées de l'utilisateur,
+construit une seule fois puis conservé dans la session Streamlit. Il est reconstruit
+uniquement lorsque la révision des données de l'utilisateur change: naviguer entre les
+pages ne coûte alors ni requête d'actifs ni déchiffrement.
+"""
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.blind_index import compute_query_tokens
+from database.models import Account, Asset, Bank, SearchToken, asset_load_options
+from database.revisions import get_revision
+from services.exposure_engine import ExposureEngine
+from utils.crypto import load_decrypted
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Clé de l'instantané dans la session Streamlit
+SNAPSHOT_SESSION_KEY = "portfolio_snapshot"
+
+
+class AssetRow:
+    """Actif déchiffré en lecture seule (mêmes noms d'attributs que le modèle Asset)"""
+    __slots__ = (
+        "id", "nom", "account_id", "bank_id", "type_produit", "categorie", "allocation", "geo_allocation",
+        "valeur_actuelle", "prix_de_revient", "devise", "value_eur", "exchange_rate", "isin", "ounces",
+        "date_maj", "sync_error", "is_template", "template_id",
+    )
+
+    def __init__(self, asset: Asset, bank_id: Optional[str]):
+        for field in self.__slots__:
+            if field != "bank_id":
+                setattr(self, field, getattr(asset, field))
+        self.bank_id = bank_id
+
+    @property
+    def value(self) -> float:
+        """Valeur retenue pour les totaux: value_eur, à défaut la valeur actuelle"""
+        value = self.value_eur if self.value_eur is not None else self.valeur_actuelle
+        return value or 0.0
+
+
+class AccountRow:
+    """Compte en lecture seule"""
+    __slots__ = ("id", "bank_id", "type", "libelle")
+
+    def __init__(self, account: Account):
+        self.id = account.id
+        self.bank_id = account.bank_id
+        self.type = account.type
+        self.libelle = account.libelle
+
+
+class BankRow:
+    """Banque en lecture seule"""
+    __slots__ = ("id", "nom", "notes")
+
+    def __init__(self, bank: Bank):
+        self.id = bank.id
+        self.nom = bank.nom
+        self.notes = bank.notes
+
+
+class PortfolioSnapshot:
+    """
+    Données déchiffrées d'un utilisateur à une révision donnée
+
+    Les lignes sont indexées par ID; le moteur d'exposition (vecteurs d'allocation)
+    est construit à la première répartition demandée. Les textes chiffrés des actifs
+    (notes, tâches) ne font pas partie de l'instantané: les tâches sont lues à la demande.
+    """
+
+    def __init__(self, user_id: str, revision: int, banks: List[BankRow], accounts: List[AccountRow],
+                 assets: List[AssetRow]):
+        self.user_id = user_id
+        self.revision = revision
+        self.banks = banks
+        self.accounts = accounts
+        self.assets = assets
+        self.banks_by_id = {bank.id: bank for bank in banks}
+        self.accounts_by_id = {account.id: account for account in accounts}
+        self.assets_by_id = {asset.id: asset for asset in assets}
+        self._engine = None
+        self._todos = None
+
+    @property
+    def engine(self) -> ExposureEngine:
+        """Moteur d'exposition des actifs de l'instantané"""
+        if self._engine is None:
+            self._engine = ExposureEngine.from_assets(
+                self.assets, {account.id: account.bank_id for account in self.accounts}
+            )
+        return self._engine
+
+    @property
+    def total_value(self) -> float:
+        """Valeur totale du patrimoine en EUR"""
+        return sum(asset.value for asset in self.assets)
+
+    def get_accounts(self, bank_id: Optional[str] = None) -> List[AccountRow]:
+        """
+        Liste les comptes, éventuellement d'une seule banque
+
+        Args:
+            bank_id: Filtre par banque (optionnel)
+
+        Returns:
+            Comptes de l'utilisateur
+        """
+        return [account for account in self.accounts if not bank_id or account.bank_id == bank_id]
+
+    def account_label(self, account_id: Optional[str]) -> Optional[str]:
+        """Libellé d'un compte (None s'il est inconnu)"""
+        account = self.accounts_by_id.get(account_id)
+        return account.libelle if account else None
+
+    def bank_name(self, bank_id: Optional[str]) -> Optional[str]:
+        """Nom d'une banque (None si elle est inconnue)"""
+        bank = self.banks_by_id.get(bank_id)
+        return bank.nom if bank else None
+
+    def account_counts(self) -> Dict[str, int]:
+        """Nombre de comptes de chaque banque"""
+        counts = {bank.id: 0 for bank in self.banks}
+        for account in self.accounts:
+            counts[account.bank_id] = counts.get(account.bank_id, 0) + 1
+        return counts
+
+    def account_values(self) -> Dict[str, float]:
+        """Valeur totale en EUR de chaque compte"""
+        values = {account.id: 0.0 for account in self.accounts}
+        for asset in self.assets:
+            values[asset.account_id] = values.get(asset.account_id, 0.0) + asset.value
+        return values
+
+    def todos(self, db: Session) -> List[Tuple[AssetRow, str]]:
+        """
+        Actifs ayant une tâche à faire, lues en base au premier appel puis conservées
+
+        Args:
+            db: Session de base de données
+
+        Returns:
+            Liste de couples (actif, tâche)
+        """
+        if self._todos is None:
+            rows = load_decrypted(
+                db.query(Asset.id, Asset.todo).filter(Asset.owner_id == self.user_id, Asset.todo.isnot(None))
+            )
+            self._todos = [
+                (self.assets_by_id[row.id], row.todo)
+                for row in rows
+                if row.todo and row.id in self.assets_by_id
+            ]
+        return self._todos
+
+    def top_assets(self, count: int = 5) -> List[AssetRow]:
+        """Actifs de plus grande valeur en EUR"""
+        return sorted(self.assets, key=lambda asset: asset.value_eur or 0.0, reverse=True)[:count]
+
+    def filter_assets(
+            self,
+            bank_id: Optional[str] = None,
+            account_id: Optional[str] = None,
+            category: Optional[str] = None,
+            product_type: Optional[str] = None,
+            search_query: Optional[str] = None,
+            search_ids: Optional[Set[str]] = None
+    ) -> List[AssetRow]:
+        """
+        Filtre les actifs de l'instantané
+
+        Args:
+            bank_id: Filtre par banque
+            account_id: Filtre par compte
+            category: Actifs dont l'allocation contient cette catégorie
+            product_type: Filtre par type de produit
+            search_query: Recherche par ISIN (sous-chaîne)
+            search_ids: IDs des actifs dont le nom correspond à la recherche (cf. search_asset_ids)
+
+        Returns:
+            Actifs correspondants
+        """
+        search_ids = search_ids or set()
+        isin_pattern = search_query.lower() if search_query else None
+
+        results = []
+        for asset in self.assets:
+            if bank_id and asset.bank_id != bank_id:
+                continue
+            if account_id and asset.account_id != account_id:
+                continue
+            if product_type and asset.type_produit != product_type:
+                continue
+            if category and category not in (asset.allocation or {}):
+                continue
+            if search_query:
+                isin_match = bool(asset.isin) and isin_pattern in asset.isin.lower()
+                if not isin_match and asset.id not in search_ids:
+                    continue
+            results.append(asset)
+        return results
+
+
+class PortfolioSnapshotService:
+    """Service de construction et de partage de l'instantané de portefeuille"""
+
+    @staticmethod
+    def build_snapshot(db: Session, user_id: str, revision: Optional[int] = None) -> PortfolioSnapshot:
+        """
+        Construit l'instantané d'un utilisateur (une requête par table, déchiffrement par lots)
+
+        Les actifs sont chargés avec le profil "allocation": ni les notes ni les tâches
+        ne sont déchiffrées.
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            revision: Révision des données à enregistrer (révision courante par défaut)
+
+        Returns:
+            Instantané de portefeuille
+        """
+        # La révision est lue avant les données: une écriture concurrente rendra l'instantané périmé
+        revision = get_revision(db, user_id) if revision is None else revision
+
+        banks = [BankRow(bank) for bank in load_decrypted(db.query(Bank).filter(Bank.owner_id == user_id))]
+        accounts = [
+            AccountRow(account)
+            for account in load_decrypted(db.query(Account).join(Bank).filter(Bank.owner_id == user_id))
+        ]
+        bank_by_account = {account.id: account.bank_id for account in accounts}
+        assets = [
+            AssetRow(asset, bank_by_account.get(asset.account_id))
+            for asset in load_decrypted(
+                db.query(Asset).options(*asset_load_options("allocation")).filter(Asset.owner_id == user_id)
+            )
+        ]
+
+        logger.info(f"Instantané de portefeuille construit: {len(assets)} actifs, révision {revision}")
+        return PortfolioSnapshot(user_id, revision, banks, accounts, assets)
+
+    @staticmethod
+    def search_asset_ids(db: Session, user_id: str, search_query: Optional[str]) -> Set[str]:
+        """
+        Recherche les actifs par mot ou début de mot du nom, via les jetons de l'index aveugle
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            search_query: Texte saisi par l'utilisateur
+
+        Returns:
+            IDs des actifs dont le nom contient tous les mots recherchés
+        """
+        query_tokens = compute_query_tokens(search_query)
+        if not query_tokens:
+            return set()
+
+        rows = (
+            db.query(SearchToken.entity_id)
+            .filter(
+                SearchToken.owner_id == user_id,
+                SearchToken.entity_type == "asset",
+                SearchToken.token.in_(query_tokens)
+            )
+            .group_by(SearchToken.entity_id)
+            # Tous les mots de la recherche doivent être présents
+            .having(func.count(func.distinct(SearchToken.token)) == len(query_tokens))
+        )
+        return {row.entity_id for row in rows}
+
+    @staticmethod
+    def get_snapshot(db: Session, user_id: str, store: Any = None) -> PortfolioSnapshot:
+        """
+        Retourne l'instantané de la session, reconstruit si la révision des données a changé
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            store: Stockage de session (get/set), session_manager par défaut
+
+        Returns:
+            Instantané de portefeuille à jour
+        """
+        if store is None:
+            from utils.session_manager import session_manager
+            store = session_manager
+
+        revision = get_revision(db, user_id)
+        snapshot = store.get(SNAPSHOT_SESSION_KEY)
+        if snapshot is None or snapshot.user_id != user_id or snapshot.revision != revision:
+            snapshot = PortfolioSnapshotService.build_snapshot(db, user_id, revision)
+            store.set(SNAPSHOT_SESSION_KEY, snapshot)
+        return snapshot
+
+
+# Créer une instance singleton du service
+portfolio_snapshot_service = PortfolioSnapshotService()
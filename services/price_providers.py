@@ -0,0 +1,404 @@
+"""
+Fournisseurs des données de marché: cotations, métaux précieux, taux de change et recherche de symboles
+
+- PriceProvider: interface utilisée par PriceService et CurrencyService;
+- YahooPriceProvider: Yahoo Finance (yfinance et API de recherche), taux de change d'open.er-api.com;
+- LocalPriceProvider: rejoue un répertoire de fixtures ou un CSV, sans réseau, avec une latence
+  et un taux d'erreur configurables (benchmarks et tests de charge hors ligne).
+
+Le fournisseur actif est choisi par PRICE_PROVIDER (ou la variable d'environnement du même nom)
+et peut être remplacé par set_provider().
+"""
+import csv
+import json
+import os
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+import yfinance as yf
+
+from config.app_config import (
+    FETCH_TIMEOUT, PRICE_PROVIDER, PRICE_PROVIDER_ERROR_RATE, PRICE_PROVIDER_FIXTURES, PRICE_PROVIDER_LATENCY
+)
+from utils import fetch_executor
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Symboles Yahoo Finance des métaux précieux (contrats à terme)
+METAL_SYMBOLS = {
+    "gold": "GC=F",
+    "silver": "SI=F",
+    "platinum": "PL=F",
+    "palladium": "PA=F",
+}
+
+# Champs de prix des informations de cotation, par ordre de préférence
+QUOTE_PRICE_FIELDS = ["currentPrice", "regularMarketPrice", "previousClose", "ask", "bid"]
+METAL_PRICE_FIELDS = ["regularMarketPrice", "previousClose", "ask", "bid"]
+
+
+class PriceProvider(ABC):
+    """
+    Source des données de marché
+
+    Les méthodes lèvent une exception en cas d'erreur réseau (TimeoutError pour un délai ou
+    une limite de débit dépassés); un symbole inconnu n'est pas une erreur.
+    """
+
+    name = "abstract"
+
+    @abstractmethod
+    def get_symbol_info(self, symbol: str) -> Dict[str, Any]:
+        """
+        Retourne les informations de cotation d'un symbole
+
+        Args:
+            symbol: Symbole Yahoo Finance
+
+        Returns:
+            Informations (regularMarketPrice, currentPrice, currency, exchange, longName, quoteType...),
+            vides si le symbole est inconnu
+        """
+
+    @abstractmethod
+    def get_last_close(self, symbol: str) -> Optional[float]:
+        """
+        Retourne le dernier cours de clôture d'un symbole (historique récent)
+
+        Args:
+            symbol: Symbole Yahoo Finance
+
+        Returns:
+            Cours ou None si non disponible
+        """
+
+    @abstractmethod
+    def get_closes(self, symbols: List[str]) -> Dict[str, float]:
+        """
+        Retourne les derniers cours de clôture de plusieurs symboles en une requête
+
+        Args:
+            symbols: Symboles Yahoo Finance (un lot de PRICE_BATCH_SIZE au plus)
+
+        Returns:
+            Dernier cours par symbole (symboles sans cours absents)
+        """
+
+    @abstractmethod
+    def search_symbols(self, query: str) -> List[str]:
+        """
+        Recherche les symboles correspondant à un ISIN ou un nom
+
+        Args:
+            query: Texte recherché
+
+        Returns:
+            Symboles trouvés, du plus au moins pertinent
+        """
+
+    @abstractmethod
+    def get_fx_rates(self) -> Dict[str, float]:
+        """
+        Retourne les taux de change actuels
+
+        Returns:
+            Taux de chaque devise pour 1 EUR
+        """
+
+    def get_price(self, symbol: str, fields: Optional[List[str]] = None) -> Optional[float]:
+        """
+        Retourne le prix d'un symbole: premier champ de prix renseigné, sinon dernière clôture
+
+        Args:
+            symbol: Symbole Yahoo Finance
+            fields: Champs de prix par ordre de préférence (QUOTE_PRICE_FIELDS par défaut)
+
+        Returns:
+            Prix ou None si non disponible
+        """
+        info = self.get_symbol_info(symbol)
+
+        # Yahoo Finance peut renvoyer différents types de prix selon l'actif
+        price = None
+        for price_field in fields or QUOTE_PRICE_FIELDS:
+            if info.get(price_field) is not None:
+                price = float(info[price_field])
+                break
+
+        if price is None or price <= 0:
+            # Si aucun prix n'est trouvé, essayer de récupérer l'historique récent
+            price = self.get_last_close(symbol)
+        return price
+
+    def get_metal_price(self, metal_type: str) -> Optional[float]:
+        """
+        Retourne le prix par once d'un métal précieux
+
+        Args:
+            metal_type: Type de métal (gold, silver, platinum, palladium)
+
+        Returns:
+            Prix par once en USD ou None si non disponible
+        """
+        symbol = METAL_SYMBOLS.get(metal_type.lower())
+        return self.get_price(symbol, METAL_PRICE_FIELDS) if symbol else None
+
+
+class YahooPriceProvider(PriceProvider):
+    """Données de marché en ligne: Yahoo Finance et open.er-api.com (avec limitation de débit par hôte)"""
+
+    name = "yahoo"
+
+    SEARCH_URL = "https://query2.finance.yahoo.com/v1/finance/search?q={query}"
+    FX_API_URL = "https://open.er-api.com/v6/latest/EUR"
+
+    def get_symbol_info(self, symbol: str) -> Dict[str, Any]:
+        fetch_executor.acquire("yahoo_quote")
+        return yf.Ticker(symbol).info or {}
+
+    def get_last_close(self, symbol: str) -> Optional[float]:
+        fetch_executor.acquire("yahoo_quote")
+        hist = yf.Ticker(symbol).history(period="1d")
+        if not hist.empty and "Close" in hist.columns:
+            return float(hist["Close"].iloc[-1])
+        return None
+
+    def get_closes(self, symbols: List[str]) -> Dict[str, float]:
+        fetch_executor.acquire("yahoo_quote")
+        data = yf.download(symbols, period="5d", interval="1d", group_by="ticker",
+                           auto_adjust=False, progress=False, timeout=FETCH_TIMEOUT)
+        quotes: Dict[str, float] = {}
+        if data is None or data.empty:
+            return quotes
+
+        for symbol in symbols:
+            try:
+                if getattr(data.columns, "nlevels", 1) > 1:
+                    closes = data[symbol]["Close"]
+                elif len(symbols) == 1:
+                    closes = data["Close"]
+                else:
+                    continue
+                closes = closes.dropna()
+            except KeyError:
+                continue
+            if not closes.empty and float(closes.iloc[-1]) > 0:
+                quotes[symbol] = float(closes.iloc[-1])
+        return quotes
+
+    def search_symbols(self, query: str) -> List[str]:
+        fetch_executor.acquire("yahoo_search")
+        response = requests.get(self.SEARCH_URL.format(query=query), timeout=FETCH_TIMEOUT)
+        if response.status_code != 200:
+            raise RuntimeError(f"recherche indisponible (HTTP {response.status_code})")
+        return [quote["symbol"] for quote in response.json().get("quotes", []) if "symbol" in quote]
+
+    def get_fx_rates(self) -> Dict[str, float]:
+        fetch_executor.acquire("open_er_api")
+        response = requests.get(self.FX_API_URL, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.json().get("rates", {})
+
+
+class LocalPriceProvider(PriceProvider):
+    """
+    Données de marché rejouées depuis des fixtures locales
+
+    Fixtures: un CSV de cotations, ou un répertoire contenant quotes.csv et, facultativement,
+    fx_rates.csv (colonnes currency, rate) ou fx_rates.json ({devise: taux}). Colonnes de
+    quotes.csv: symbol, price (obligatoires), isin, currency, exchange, name, quote_type.
+    La recherche retrouve les symboles par ISIN, symbole ou nom.
+
+    Chaque appel attend `latency` secondes. Une proportion `error_rate` des clés (symbole,
+    recherche, taux de change) échoue en TimeoutError; le tirage, dérivé de la clé et de
+    `seed`, est identique d'une exécution à l'autre quel que soit l'ordre des appels.
+    """
+
+    name = "local"
+
+    def __init__(
+            self,
+            fixtures: Optional[str] = None,
+            latency: float = 0.0,
+            error_rate: float = 0.0,
+            seed: int = 0,
+            quotes: Optional[List[Dict[str, Any]]] = None,
+            fx_rates: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            fixtures: Répertoire de fixtures ou fichier CSV de cotations
+            latency: Latence simulée par appel (secondes)
+            error_rate: Proportion des clés en erreur (0 à 1)
+            seed: Graine du tirage des erreurs
+            quotes: Cotations supplémentaires (mêmes clés que les colonnes de quotes.csv)
+            fx_rates: Taux de change supplémentaires pour 1 EUR
+        """
+        self.latency = max(0.0, float(latency))
+        self.error_rate = min(1.0, max(0.0, float(error_rate)))
+        self.seed = seed
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        self._fx_rates: Dict[str, float] = {"EUR": 1.0}
+
+        if fixtures:
+            self._load_fixtures(Path(fixtures))
+        for quote in quotes or []:
+            self._add_quote(quote)
+        self._fx_rates.update(fx_rates or {})
+
+    def _load_fixtures(self, path: Path) -> None:
+        """Charge les cotations et taux de change d'un répertoire ou d'un CSV de fixtures"""
+        quotes_path = path / "quotes.csv" if path.is_dir() else path
+        with open(quotes_path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                self._add_quote(row)
+
+        if path.is_dir():
+            if (path / "fx_rates.csv").exists():
+                with open(path / "fx_rates.csv", "r", encoding="utf-8-sig", newline="") as f:
+                    self._fx_rates.update({row["currency"]: float(row["rate"]) for row in csv.DictReader(f)})
+            elif (path / "fx_rates.json").exists():
+                with open(path / "fx_rates.json", "r", encoding="utf-8") as f:
+                    self._fx_rates.update({currency: float(rate) for currency, rate in json.load(f).items()})
+        logger.info(f"Fournisseur local: {len(self._quotes)} cotations chargées depuis {path}")
+
+    def _add_quote(self, quote: Dict[str, Any]) -> None:
+        """Ajoute une cotation (lignes sans symbole ou sans prix numérique ignorées)"""
+        symbol = (quote.get("symbol") or "").strip()
+        try:
+            price = float(quote.get("price"))
+        except (TypeError, ValueError):
+            return
+        if symbol:
+            self._quotes[symbol] = {key: value for key, value in quote.items() if value not in (None, "")}
+            self._quotes[symbol]["price"] = price
+
+    def _call(self, key: str) -> None:
+        """Simule un appel réseau: latence, puis erreur pour les clés tirées en échec"""
+        with self._calls_lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fails(key):
+            raise TimeoutError(f"Erreur simulée pour {key}")
+
+    def fails(self, key: str) -> bool:
+        """
+        Indique si les appels pour une clé échouent
+
+        Args:
+            key: Symbole, "search:<texte>" ou "fx"
+
+        Returns:
+            True si la clé fait partie de la proportion error_rate tirée en échec
+        """
+        if not self.error_rate:
+            return False
+        return zlib.crc32(f"{self.seed}:{key}".encode()) % 10000 < self.error_rate * 10000
+
+    def get_symbol_info(self, symbol: str) -> Dict[str, Any]:
+        self._call(symbol)
+        quote = self._quotes.get(symbol)
+        if quote is None:
+            return {}
+        return {
+            "symbol": symbol,
+            "regularMarketPrice": quote["price"],
+            "currency": quote.get("currency"),
+            "exchange": quote.get("exchange"),
+            "longName": quote.get("name"),
+            "quoteType": quote.get("quote_type"),
+        }
+
+    def get_last_close(self, symbol: str) -> Optional[float]:
+        self._call(symbol)
+        quote = self._quotes.get(symbol)
+        return quote["price"] if quote else None
+
+    def get_closes(self, symbols: List[str]) -> Dict[str, float]:
+        # Une requête pour le lot: les symboles en échec en sont absents
+        self._call("batch")
+        return {
+            symbol: self._quotes[symbol]["price"]
+            for symbol in symbols if symbol in self._quotes and not self.fails(symbol)
+        }
+
+    def search_symbols(self, query: str) -> List[str]:
+        self._call(f"search:{query}")
+        query = query.strip().lower()
+        if not query:
+            return []
+        return [
+            symbol for symbol, quote in self._quotes.items()
+            if query in (symbol.lower(), str(quote.get("isin", "")).lower())
+            or query in str(quote.get("name", "")).lower()
+        ]
+
+    def get_fx_rates(self) -> Dict[str, float]:
+        self._call("fx")
+        return dict(self._fx_rates)
+
+
+# Fournisseur actif (créé au premier accès)
+_provider: Optional[PriceProvider] = None
+_provider_lock = threading.Lock()
+
+
+def create_provider(name: Optional[str] = None) -> PriceProvider:
+    """
+    Crée un fournisseur selon la configuration
+
+    Args:
+        name: "yahoo" ou "local" (PRICE_PROVIDER ou variable d'environnement du même nom si None)
+
+    Returns:
+        Fournisseur configuré
+
+    Raises:
+        ValueError: Si le fournisseur est inconnu
+    """
+    name = (name or os.environ.get("PRICE_PROVIDER") or PRICE_PROVIDER).lower()
+    if name == "yahoo":
+        return YahooPriceProvider()
+    if name == "local":
+        return LocalPriceProvider(
+            fixtures=os.environ.get("PRICE_PROVIDER_FIXTURES") or str(PRICE_PROVIDER_FIXTURES),
+            latency=float(os.environ.get("PRICE_PROVIDER_LATENCY") or PRICE_PROVIDER_LATENCY),
+            error_rate=float(os.environ.get("PRICE_PROVIDER_ERROR_RATE") or PRICE_PROVIDER_ERROR_RATE),
+        )
+    raise ValueError(f"Fournisseur de prix inconnu: {name}")
+
+
+def get_provider() -> PriceProvider:
+    """Retourne le fournisseur actif"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = create_provider()
+                logger.info(f"Fournisseur des données de marché: {_provider.name}")
+    return _provider
+
+
+def set_provider(provider: Optional[PriceProvider]) -> Optional[PriceProvider]:
+    """
+    Remplace le fournisseur actif
+
+    Args:
+        provider: Nouveau fournisseur (None pour revenir à la configuration)
+
+    Returns:
+        Fournisseur précédent
+    """
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
@@ -1,18 +1,22 @@
 """
-Service pour la récupération des prix des actifs financiers avec Yahoo Finance
+Service pour la récupération des prix des actifs financiers
+
+Les données de marché proviennent du fournisseur actif (Yahoo Finance par défaut, cf.
+services.price_providers).
 """
-import requests
-from typing import Dict, Any, Optional
-import json
-import os
-from datetime import datetime, timedelta
-import yfinance as yf
+import atexit
+from datetime import datetime
+from concurrent.futures import CancelledError
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 
-# Chemins des fichiers cache
-ISIN_CACHE_FILE = "data/isin_prices_cache.json"
-ISIN_SYMBOL_MAP_FILE = "data/isin_symbol_map.json"
-METALS_CACHE_FILE = "data/metals_prices_cache.json"
+from config.app_config import (
+    EXCHANGE_SUFFIXES, ISIN_COUNTRY_EXCHANGES, ISIN_PRICE_CACHE_TTL, METAL_PRICE_CACHE_TTL, PRICE_BATCH_SIZE
+)
+from database.instrument_reference import instrument_reference
+from database.quote_store import quote_store
+from services.price_providers import METAL_SYMBOLS, get_provider
+from utils.fetch_executor import FetchExecutor
 
 # Configurer le logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -33,56 +37,28 @@ class PriceService:
         Returns:
             Prix de l'actif ou None si non disponible
         """
-        # Essayer de charger depuis le cache
-        cache_data = PriceService._load_isin_cache()
-
         # Vérifier si le prix est dans le cache et s'il est valide (moins de 24h)
-        if not force_refresh and cache_data and isin in cache_data:
-            price_data = cache_data[isin]
-            cache_time = datetime.fromisoformat(price_data["timestamp"])
-            if datetime.now() - cache_time < timedelta(hours=24):
-                return price_data.get("price")
+        price_data = None if force_refresh else quote_store.get_quote(isin, max_age=ISIN_PRICE_CACHE_TTL)
+        if price_data:
+            return price_data["price"]
 
-        # Récupérer le symbole Yahoo Finance correspondant à cet ISIN
-        symbol = PriceService._get_yahoo_symbol_for_isin(isin)
+        try:
+            # Récupérer le symbole Yahoo Finance correspondant à cet ISIN
+            symbol = PriceService._get_yahoo_symbol_for_isin(isin)
 
-        if not symbol:
-            logger.warning(f"Symbole Yahoo Finance non trouvé pour l'ISIN: {isin}")
-            return None
+            if not symbol:
+                logger.warning(f"Symbole Yahoo Finance non trouvé pour l'ISIN: {isin}")
+                return None
 
-        try:
             # Récupérer les données de Yahoo Finance
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-
-            # Récupérer le prix actuel
-            # Yahoo Finance peut renvoyer différents types de prix selon l'actif
-            price = None
-            for price_field in ["currentPrice", "regularMarketPrice", "previousClose", "ask", "bid"]:
-                if price_field in info and info[price_field] is not None:
-                    price = float(info[price_field])
-                    break
-
-            if price is None or price <= 0:
-                # Si aucun prix n'est trouvé, essayer de récupérer l'historique récent
-                hist = ticker.history(period="1d")
-                if not hist.empty and "Close" in hist.columns:
-                    price = float(hist["Close"].iloc[-1])
+            price = PriceService._fetch_ticker_price(symbol)
 
             # Si on a un prix valide, mettre à jour le cache
             if price and price > 0:
-                if cache_data is None:
-                    cache_data = {}
-
-                cache_data[isin] = {
-                    "timestamp": datetime.now().isoformat(),
-                    "price": price,
-                    "symbol": symbol
-                }
-                PriceService._save_isin_cache(cache_data)
+                quote_store.set_quote(isin, price, symbol=symbol)
 
                 # Enregistrer le symbole dans la correspondance ISIN-Symbole
-                PriceService._save_isin_symbol_mapping(isin, symbol)
+                quote_store.set_symbol(isin, symbol)
 
                 return price
 
@@ -92,264 +68,382 @@ class PriceService:
             logger.error(f"Erreur lors de la récupération du prix pour {isin}: {str(e)}")
 
             # En cas d'exception, utiliser le cache si disponible
-            if cache_data and isin in cache_data:
-                return cache_data[isin].get("price")
-            return None
+            price_data = quote_store.get_quote(isin)
+            return price_data["price"] if price_data else None
 
     @staticmethod
-    def _get_yahoo_symbol_for_isin(isin: str) -> Optional[str]:
+    def get_prices_by_isins(
+            isins: Iterable[str],
+            force_refresh: bool = False
+    ) -> Tuple[Dict[str, float], Dict[str, str]]:
         """
-        Trouve le symbole Yahoo Finance correspondant à un ISIN
+        Récupère les prix de plusieurs actifs par ISIN en requêtes groupées
+
+        Les prix encore valides sont lus dans le cache; les symboles des ISIN restants sont
+        résolus, puis leurs cotations sont téléchargées par lots de PRICE_BATCH_SIZE symboles
+        au lieu d'un appel Yahoo Finance par actif. Les symboles absents d'un lot sont
+        interrogés individuellement, en parallèle (cf. FetchExecutor). Les symboles sont résolus
+        un ISIN après l'autre, chaque résolution sondant les places en parallèle: un seul pool
+        de sondages à la fois attend les jetons du limiteur de débit, et aucune résolution
+        abandonnée n'écrit dans le cache après son enregistrement. Les ISIN dont le symbole
+        reste introuvable ne sont pas sondés pendant leur délai d'attente (cf.
+        get_pending_isins). Les prix obtenus sont enregistrés dans le cache des cotations
+        (cf. flush_caches).
 
         Args:
-            isin: Code ISIN
+            isins: Codes ISIN (doublons ignorés)
+            force_refresh: Forcer le rafraîchissement du cache (et la résolution des symboles en attente)
 
         Returns:
-            Symbole Yahoo Finance ou None si non trouvé
+            Tuple (prix par ISIN, message d'erreur par ISIN sans prix)
         """
-        # Charger la correspondance ISIN-Symbole depuis le fichier
-        mapping = PriceService._load_isin_symbol_map()
-
-        # Si l'ISIN est déjà dans la correspondance, utiliser le symbole enregistré
-        if mapping and isin in mapping:
-            return mapping[isin]
-
-        # Essayer différents suffixes d'exchanges courants pour les actions européennes
-        exchanges = ["", ".PA", ".DE", ".L", ".MI", ".AS", ".BR", ".VI", ".MC", ".LS", ".SW", ".ST"]
-
-        for exchange in exchanges:
+        isins = list(dict.fromkeys(isin for isin in isins if isin))
+        prices: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+
+        # 1. Prix encore valides (moins de 24h) lus dans le cache
+        stale = []
+        for isin in isins:
+            price_data = None if force_refresh else quote_store.get_quote(isin, max_age=ISIN_PRICE_CACHE_TTL)
+            if price_data:
+                prices[isin] = price_data["price"]
+            else:
+                stale.append(isin)
+        cached = len(isins) - len(stale)
+
+        # 2. ISIN au symbole introuvable, dans leur délai d'attente: pas de nouvelle tentative
+        pending = {} if force_refresh else PriceService.get_pending_isins(stale)
+        for isin, retry_at in pending.items():
+            errors[isin] = (f"Symbole Yahoo Finance introuvable pour l'ISIN {isin}, "
+                            f"nouvelle tentative après le {retry_at:%d/%m/%Y %H:%M}")
+        stale = [isin for isin in stale if isin not in pending]
+
+        # 3. Résolution des symboles des ISIN à rafraîchir, un ISIN à la fois (sondages parallèles)
+        symbols: Dict[str, str] = {}
+        # Les ISIN en attente ont été écartés; un rafraîchissement forcé ignore le délai
+        resolve = PriceService._get_yahoo_symbol_for_isin
+        if force_refresh:
+            resolve = lambda isin: PriceService._get_yahoo_symbol_for_isin(isin, force=True)
+        for isin in stale:
+            try:
+                symbol = resolve(isin)
+            except TimeoutError:
+                logger.warning(f"Délai dépassé lors de la résolution du symbole de l'ISIN: {isin}")
+                errors[isin] = f"Délai dépassé lors de la résolution du symbole Yahoo Finance de l'ISIN {isin}"
+                continue
+            except Exception as e:
+                logger.error(f"Erreur lors de la résolution du symbole de l'ISIN {isin}: {str(e)}")
+                errors[isin] = f"Erreur lors de la résolution du symbole Yahoo Finance de l'ISIN {isin}: {str(e)}"
+                continue
+            if symbol:
+                symbols[isin] = symbol
+            else:
+                logger.warning(f"Symbole Yahoo Finance non trouvé pour l'ISIN: {isin}")
+                errors[isin] = f"Symbole Yahoo Finance non trouvé pour l'ISIN {isin}"
+
+        # 4. Cotations groupées, puis appels individuels en parallèle pour les symboles absents des lots
+        quotes = PriceService._download_quotes(sorted(set(symbols.values())))
+        missing = [symbol for symbol in symbols.values() if symbol not in quotes]
+        quotes.update(FetchExecutor().map(PriceService._fetch_ticker_price, missing))
+        for isin, symbol in symbols.items():
             try:
-                # Essayer avec l'ISIN directement + suffixe exchange
-                test_symbol = f"{isin}{exchange}"
-                ticker = yf.Ticker(test_symbol)
-                info = ticker.info
-
-                # Vérifier si on a récupéré des infos valides
-                if "regularMarketPrice" in info or "currentPrice" in info:
-                    # Enregistrer la correspondance trouvée
-                    PriceService._save_isin_symbol_mapping(isin, test_symbol)
-                    return test_symbol
-            except:
+                price = quotes.get(symbol)
+                if isinstance(price, BaseException):
+                    raise price
+            except Exception as e:
+                logger.error(f"Erreur lors de la récupération du prix pour {isin}: {str(e)}")
+                # En cas d'exception, utiliser le cache si disponible
+                price_data = quote_store.get_quote(isin)
+                if price_data:
+                    prices[isin] = price_data["price"]
+                else:
+                    errors[isin] = str(e)
                 continue
 
-        # Si aucun symbole n'est trouvé, rechercher via l'API de recherche de Yahoo Finance
-        try:
-            search_url = f"https://query2.finance.yahoo.com/v1/finance/search?q={isin}"
-            response = requests.get(search_url)
-            if response.status_code == 200:
-                data = response.json()
-                quotes = data.get("quotes", [])
-
-                # Chercher le premier résultat valide
-                for quote in quotes:
-                    if "symbol" in quote:
-                        symbol = quote["symbol"]
-                        # Vérifier que le symbole est valide
-                        ticker = yf.Ticker(symbol)
-                        info = ticker.info
-                        if "regularMarketPrice" in info or "currentPrice" in info:
-                            # Enregistrer la correspondance trouvée
-                            PriceService._save_isin_symbol_mapping(isin, symbol)
-                            return symbol
-        except:
-            pass
-
-        # Aucun symbole trouvé
-        return None
+            if price and price > 0:
+                prices[isin] = price
+                quote_store.set_quote(isin, price, symbol=symbol)
+            else:
+                errors[isin] = f"Prix non disponible pour ISIN {isin}"
+
+        logger.info(f"Prix par ISIN: {len(prices)} obtenus ({cached} depuis le cache), "
+                    f"{len(errors)} en erreur dont {len(pending)} en attente")
+        return prices, errors
 
     @staticmethod
-    def get_metal_price(metal_type: str, force_refresh: bool = False) -> Optional[float]:
+    def _download_quotes(symbols: List[str]) -> Dict[str, float]:
         """
-        Récupère le prix d'un métal précieux
+        Télécharge les derniers cours de clôture de plusieurs symboles par lots
+
+        Les lots sont téléchargés l'un après l'autre: yf.download parallélise déjà chaque lot
+        et partage un état global entre ses appels (cf. YahooPriceProvider.get_closes).
 
         Args:
-            metal_type: Type de métal (gold, silver, platinum, palladium)
-            force_refresh: Forcer le rafraîchissement du cache
+            symbols: Symboles Yahoo Finance
 
         Returns:
-            Prix par once en USD ou None si non disponible
+            Dernier cours par symbole (symboles sans cours absents)
         """
-        # Correspondance entre métaux et leurs symboles Yahoo Finance
-        metals_symbols = {
-            "gold": "GC=F",      # Contrat à terme sur l'or
-            "silver": "SI=F",    # Contrat à terme sur l'argent
-            "platinum": "PL=F",  # Contrat à terme sur le platine
-            "palladium": "PA=F"  # Contrat à terme sur le palladium
-        }
+        quotes: Dict[str, float] = {}
+        for start in range(0, len(symbols), PRICE_BATCH_SIZE):
+            chunk = symbols[start:start + PRICE_BATCH_SIZE]
+            try:
+                quotes.update(get_provider().get_closes(chunk))
+            except Exception as e:
+                logger.error(f"Erreur lors du téléchargement groupé de {len(chunk)} cotations: {str(e)}")
+        return quotes
 
-        symbol = metals_symbols.get(metal_type.lower())
-        if not symbol:
-            return None
+    @staticmethod
+    def _fetch_ticker_price(symbol: str) -> Optional[float]:
+        """
+        Récupère le prix d'un symbole par un appel individuel au fournisseur de données
 
-        # Essayer de charger depuis le cache
-        cache_data = PriceService._load_metals_cache()
+        Args:
+            symbol: Symbole Yahoo Finance
 
-        # Vérifier si le prix est dans le cache et s'il est valide (moins de 1h)
-        if not force_refresh and cache_data and metal_type in cache_data:
-            price_data = cache_data[metal_type]
-            cache_time = datetime.fromisoformat(price_data["timestamp"])
-            if datetime.now() - cache_time < timedelta(hours=1):
-                return price_data.get("price")
+        Returns:
+            Prix ou None si non disponible
+        """
+        return get_provider().get_price(symbol)
 
-        try:
-            # Récupérer les données de Yahoo Finance
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-
-            # Récupérer le prix actuel
-            price = None
-            for price_field in ["regularMarketPrice", "previousClose", "ask", "bid"]:
-                if price_field in info and info[price_field] is not None:
-                    price = float(info[price_field])
-                    break
-
-            if price is None or price <= 0:
-                # Si aucun prix n'est trouvé, essayer de récupérer l'historique récent
-                hist = ticker.history(period="1d")
-                if not hist.empty and "Close" in hist.columns:
-                    price = float(hist["Close"].iloc[-1])
+    @staticmethod
+    def get_pending_isins(isins: Iterable[str]) -> Dict[str, datetime]:
+        """
+        Retourne les ISIN dont le symbole est introuvable et dont la résolution est en attente
 
-            # Si on a un prix valide, mettre à jour le cache
-            if price and price > 0:
-                if cache_data is None:
-                    cache_data = {}
+        Après un échec de résolution, l'ISIN n'est plus sondé avant un délai doublé à chaque
+        échec consécutif (cf. QuoteStore.record_resolution).
 
-                cache_data[metal_type] = {
-                    "timestamp": datetime.now().isoformat(),
-                    "price": price
-                }
-                PriceService._save_metals_cache(cache_data)
+        Args:
+            isins: Codes ISIN
 
-                return price
+        Returns:
+            Date de la prochaine tentative par ISIN en attente
+        """
+        pending = {}
+        for isin in dict.fromkeys(isins):
+            if isin and not quote_store.get_symbol(isin):
+                retry_at = quote_store.get_resolution_backoff(isin)
+                # Un symbole du référentiel local est utilisé sans sonder Yahoo Finance
+                if retry_at and not (instrument_reference.lookup(isin) or {}).get("symbol"):
+                    pending[isin] = retry_at
+        return pending
 
-            return None
+    @staticmethod
+    def get_resolution_attempts(isin: str, limit: int = 10) -> List[Dict]:
+        """
+        Retourne l'historique des tentatives de résolution du symbole d'un ISIN
 
-        except Exception as e:
-            logger.error(f"Erreur lors de la récupération du prix pour {metal_type}: {str(e)}")
+        Args:
+            isin: Code ISIN
+            limit: Nombre maximum de tentatives
 
-            # En cas d'exception, utiliser le cache si disponible
-            if cache_data and metal_type in cache_data:
-                return cache_data[metal_type].get("price")
-            return None
+        Returns:
+            Tentatives {attempted_at, symbol, error}, de la plus récente à la plus ancienne
+        """
+        return quote_store.get_resolution_attempts(isin, limit)
 
     @staticmethod
-    def _load_isin_cache() -> Optional[Dict[str, Any]]:
+    def search_instruments(prefix: str, limit: int = 10) -> List[Dict]:
         """
-        Charge les prix ISIN depuis le cache
+        Recherche dans le référentiel local les instruments dont l'ISIN commence par un préfixe
+
+        Args:
+            prefix: Début du code ISIN
+            limit: Nombre maximum de résultats
 
         Returns:
-            Données du cache ou None si le cache n'existe pas
+            Instruments {isin, symbol, exchange, currency, name, type}, sans requête réseau
         """
-        try:
-            if os.path.exists(ISIN_CACHE_FILE):
-                with open(ISIN_CACHE_FILE, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement du cache ISIN: {str(e)}")
-        return None
+        return instrument_reference.search(prefix, limit)
 
     @staticmethod
-    def _save_isin_cache(data: Dict[str, Any]) -> bool:
+    def _get_yahoo_symbol_for_isin(isin: str, force: bool = False) -> Optional[str]:
         """
-        Sauvegarde les prix ISIN dans le cache
+        Trouve le symbole Yahoo Finance correspondant à un ISIN
+
+        Le référentiel local des instruments est consulté avant toute requête réseau. Sinon,
+        les places (classées par _rank_exchanges) et l'API de recherche sont sondées en
+        parallèle: la résolution dure environ un aller-retour au lieu de la somme des essais.
+        Chaque résolution (succès ou échec) est enregistrée dans l'historique des tentatives;
+        un ISIN en attente après des échecs n'est pas sondé (cf. get_pending_isins). Un échec
+        n'est enregistré que si tous les sondages et la recherche ont abouti sans trouver de
+        symbole: après une erreur réseau ou un délai dépassé, l'état de la résolution est inchangé.
 
         Args:
-            data: Données à sauvegarder
+            isin: Code ISIN
+            force: Sonder même si l'ISIN est en attente
 
         Returns:
-            True si la sauvegarde a réussi, False sinon
+            Symbole Yahoo Finance ou None si non trouvé
+
+        Raises:
+            TimeoutError: Si un sondage ou la recherche a dépassé son délai (ou la limite de débit)
+            Exception: Erreur d'un sondage ou de la recherche n'ayant pas abouti
         """
-        try:
-            # Créer le répertoire si nécessaire
-            os.makedirs(os.path.dirname(ISIN_CACHE_FILE), exist_ok=True)
+        # Si l'ISIN est déjà dans la correspondance, utiliser le symbole enregistré
+        symbol = quote_store.get_symbol(isin)
+        if symbol:
+            return symbol
 
-            with open(ISIN_CACHE_FILE, 'w') as f:
-                json.dump(data, f)
-            return True
-        except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde du cache ISIN: {str(e)}")
-            return False
+        # Sinon consulter le référentiel local des instruments (sans requête réseau)
+        instrument = instrument_reference.lookup(isin)
+        if instrument and instrument["symbol"]:
+            quote_store.set_symbol(isin, instrument["symbol"])
+            return instrument["symbol"]
+
+        if not force and quote_store.get_resolution_backoff(isin):
+            return None
+
+        # Sonder en parallèle l'ISIN sur les places courantes et l'API de recherche de Yahoo
+        # Finance: le premier symbole valide est retenu et les autres requêtes annulées
+        exchanges = PriceService._rank_exchanges(isin)
+        executor = FetchExecutor()
+        tasks = {
+            exchange: (lambda symbol=f"{isin}{exchange}": PriceService._probe_symbol(symbol, executor))
+            for exchange in exchanges
+        }
+        tasks["search"] = lambda: PriceService._search_symbol(isin, executor)
+        results = executor.run(tasks, until=lambda result: isinstance(result, dict))
+
+        # Premier symbole valide selon le classement (plusieurs peuvent arriver ensemble)
+        found = next((results[key] for key in tasks if isinstance(results.get(key), dict)), None)
+        if found:
+            # Enregistrer la correspondance trouvée et compléter le référentiel
+            quote_store.record_resolution(isin, symbol=found["symbol"])
+            instrument_reference.record_resolution(isin, found["symbol"], found["info"])
+            return found["symbol"]
+
+        # Sondage ou recherche sans réponse: le symbole existe peut-être, pas de délai d'attente
+        failures = [result for result in results.values() if isinstance(result, BaseException)]
+        if failures:
+            raise next((failure for failure in failures if isinstance(failure, TimeoutError)), failures[0])
+
+        # Aucun symbole trouvé: attendre avant la prochaine tentative
+        quote_store.record_resolution(
+            isin, error=f"Aucun symbole trouvé ({len(exchanges)} places testées, aucun résultat de recherche valide)"
+        )
+        return None
 
     @staticmethod
-    def _load_metals_cache() -> Optional[Dict[str, Any]]:
+    def _rank_exchanges(isin: str) -> List[str]:
         """
-        Charge les prix des métaux depuis le cache
+        Classe les suffixes de places à sonder pour un ISIN
+
+        Les places où ont été trouvés le plus de symboles d'ISIN du même pays passent en
+        premier, puis la place par défaut du pays (FR -> .PA), puis l'ordre de EXCHANGE_SUFFIXES.
+
+        Args:
+            isin: Code ISIN
 
         Returns:
-            Données du cache ou None si le cache n'existe pas
+            Suffixes du plus au moins probable
         """
-        try:
-            if os.path.exists(METALS_CACHE_FILE):
-                with open(METALS_CACHE_FILE, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement du cache métaux: {str(e)}")
-        return None
+        country = isin[:2].upper()
+        hits = quote_store.get_suffix_hits(country)
+        default = ISIN_COUNTRY_EXCHANGES.get(country)
+        return sorted(EXCHANGE_SUFFIXES, key=lambda exchange: (-hits.get(exchange, 0), exchange != default))
 
     @staticmethod
-    def _save_metals_cache(data: Dict[str, Any]) -> bool:
+    def _probe_symbol(symbol: str, executor: FetchExecutor) -> Optional[Dict]:
         """
-        Sauvegarde les prix des métaux dans le cache
+        Vérifie qu'un symbole Yahoo Finance a une cotation
 
         Args:
-            data: Données à sauvegarder
+            symbol: Symbole à tester
+            executor: Exécution en cours (la requête n'est pas envoyée si elle est annulée)
 
         Returns:
-            True si la sauvegarde a réussi, False sinon
-        """
-        try:
-            # Créer le répertoire si nécessaire
-            os.makedirs(os.path.dirname(METALS_CACHE_FILE), exist_ok=True)
+            Dictionnaire {symbol, info} si le symbole est coté, None sinon
 
-            with open(METALS_CACHE_FILE, 'w') as f:
-                json.dump(data, f)
-            return True
-        except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde du cache métaux: {str(e)}")
-            return False
+        Raises:
+            CancelledError: Si un autre symbole a été trouvé entre-temps
+        """
+        if executor.cancelled:
+            raise CancelledError()
+        info = get_provider().get_symbol_info(symbol)
+        if "regularMarketPrice" in info or "currentPrice" in info:
+            return {"symbol": symbol, "info": info}
+        return None
 
     @staticmethod
-    def _load_isin_symbol_map() -> Optional[Dict[str, str]]:
+    def _search_symbol(isin: str, executor: FetchExecutor) -> Optional[Dict]:
         """
-        Charge la correspondance ISIN-Symbole depuis le fichier
+        Recherche le symbole d'un ISIN via la recherche du fournisseur de données
+
+        Args:
+            isin: Code ISIN
+            executor: Exécution en cours (les requêtes ne sont pas envoyées si elle est annulée)
 
         Returns:
-            Correspondance ISIN-Symbole ou None si le fichier n'existe pas
+            Dictionnaire {symbol, info} du premier symbole coté parmi les résultats, None si aucun
+
+        Raises:
+            RuntimeError: Si la recherche est indisponible
         """
-        try:
-            if os.path.exists(ISIN_SYMBOL_MAP_FILE):
-                with open(ISIN_SYMBOL_MAP_FILE, 'r') as f:
-                    return json.load(f)
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement de la correspondance ISIN-Symbole: {str(e)}")
-        return {}
+        if executor.cancelled:
+            raise CancelledError()
+
+        # Chercher le premier résultat valide
+        for symbol in get_provider().search_symbols(isin):
+            found = PriceService._probe_symbol(symbol, executor)
+            if found:
+                return found
+        return None
 
     @staticmethod
-    def _save_isin_symbol_mapping(isin: str, symbol: str) -> bool:
+    def get_metal_price(metal_type: str, force_refresh: bool = False) -> Optional[float]:
         """
-        Enregistre une correspondance ISIN-Symbole
+        Récupère le prix d'un métal précieux
 
         Args:
-            isin: Code ISIN
-            symbol: Symbole Yahoo Finance
+            metal_type: Type de métal (gold, silver, platinum, palladium)
+            force_refresh: Forcer le rafraîchissement du cache
 
         Returns:
-            True si la sauvegarde a réussi, False sinon
+            Prix par once en USD ou None si non disponible
         """
+        # Symbole Yahoo Finance du contrat à terme sur le métal
+        symbol = METAL_SYMBOLS.get(metal_type.lower())
+        if not symbol:
+            return None
+
+        # Vérifier si le prix est dans le cache et s'il est valide (moins de 1h)
+        price_data = None if force_refresh else quote_store.get_quote(metal_type, max_age=METAL_PRICE_CACHE_TTL)
+        if price_data:
+            return price_data["price"]
+
         try:
-            # Charger la correspondance existante
-            mapping = PriceService._load_isin_symbol_map() or {}
+            # Récupérer le prix actuel auprès du fournisseur de données
+            price = get_provider().get_metal_price(metal_type)
 
-            # Ajouter/mettre à jour la correspondance
-            mapping[isin] = symbol
+            # Si on a un prix valide, mettre à jour le cache
+            if price and price > 0:
+                quote_store.set_quote(metal_type, price, kind="metal", symbol=symbol)
 
-            # Créer le répertoire si nécessaire
-            os.makedirs(os.path.dirname(ISIN_SYMBOL_MAP_FILE), exist_ok=True)
+                return price
+
+            return None
 
-            # Enregistrer la correspondance mise à jour
-            with open(ISIN_SYMBOL_MAP_FILE, 'w') as f:
-                json.dump(mapping, f)
-            return True
         except Exception as e:
-            logger.error(f"Erreur lors de la sauvegarde de la correspondance ISIN-Symbole: {str(e)}")
-            return False
\ No newline at end of file
+            logger.error(f"Erreur lors de la récupération du prix pour {metal_type}: {str(e)}")
+
+            # En cas d'exception, utiliser le cache si disponible
+            price_data = quote_store.get_quote(metal_type)
+            return price_data["price"] if price_data else None
+
+    @staticmethod
+    def flush_caches() -> int:
+        """
+        Enregistre les prix et symboles récupérés dans le cache des cotations (une transaction)
+
+        Appelée en fin de synchronisation et à l'arrêt du processus.
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        return quote_store.flush()
+
+
+# Enregistrer les prix encore en mémoire à l'arrêt du processus
+atexit.register(PriceService.flush_caches)
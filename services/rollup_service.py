@@ -0,0 +1,150 @@
+"""
+Service de lecture des agrégats d'actifs (totaux par compte, banque et type de produit)
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from database.models import Account, AssetRollup, Bank
+from database.rollups import check_rollups, rebuild_rollups
+from utils.error_manager import catch_exceptions
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RollupService:
+    """
+    Service d'accès aux agrégats maintenus par triggers
+
+    Chaque lecture parcourt les agrégats de l'utilisateur (un par compte × type de produit),
+    jamais la table des actifs.
+    """
+
+    @staticmethod
+    @catch_exceptions
+    def get_totals(db: Session, user_id: str) -> Dict[str, Any]:
+        """
+        Récupère les totaux du patrimoine d'un utilisateur
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+
+        Returns:
+            Dictionnaire avec value_eur, cost_basis_eur et asset_count
+        """
+        value, cost, count = db.query(
+            func.coalesce(func.sum(AssetRollup.value_eur), 0.0),
+            func.coalesce(func.sum(AssetRollup.cost_basis_eur), 0.0),
+            func.coalesce(func.sum(AssetRollup.asset_count), 0)
+        ).filter(AssetRollup.owner_id == user_id).one()
+        return {"value_eur": value, "cost_basis_eur": cost, "asset_count": count}
+
+    @staticmethod
+    @catch_exceptions
+    def get_values_by_account(db: Session, user_id: str, bank_id: Optional[str] = None) -> Dict[str, float]:
+        """
+        Récupère la valeur totale en EUR de chaque compte
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            bank_id: Filtre par banque (optionnel)
+
+        Returns:
+            Dictionnaire {account_id: valeur en EUR}
+        """
+        query = db.query(AssetRollup.account_id, func.sum(AssetRollup.value_eur)).filter(
+            AssetRollup.owner_id == user_id
+        )
+        if bank_id:
+            query = query.join(Account, Account.id == AssetRollup.account_id).filter(Account.bank_id == bank_id)
+        return {account_id: value or 0.0 for account_id, value in query.group_by(AssetRollup.account_id).all()}
+
+    @staticmethod
+    @catch_exceptions
+    def get_values_by_bank(db: Session, user_id: str, account_id: Optional[str] = None) -> Dict[str, float]:
+        """
+        Récupère la valeur totale en EUR de chaque banque
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            account_id: Filtre par compte (optionnel)
+
+        Returns:
+            Dictionnaire {bank_id: valeur en EUR}
+        """
+        query = db.query(Bank.id, func.sum(AssetRollup.value_eur)).join(
+            Account, Account.id == AssetRollup.account_id
+        ).join(
+            Bank, Bank.id == Account.bank_id
+        ).filter(AssetRollup.owner_id == user_id)
+        if account_id:
+            query = query.filter(AssetRollup.account_id == account_id)
+        return {bank_id: value or 0.0 for bank_id, value in query.group_by(Bank.id).all()}
+
+    @staticmethod
+    @catch_exceptions
+    def get_values_by_type(db: Session, user_id: str, bank_id: Optional[str] = None,
+                           account_id: Optional[str] = None) -> Dict[str, float]:
+        """
+        Récupère la valeur totale en EUR de chaque type de produit
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            bank_id: Filtre par banque (optionnel)
+            account_id: Filtre par compte (optionnel)
+
+        Returns:
+            Dictionnaire {type_produit: valeur en EUR}
+        """
+        query = db.query(AssetRollup.type_produit, func.sum(AssetRollup.value_eur)).filter(
+            AssetRollup.owner_id == user_id
+        )
+        if bank_id:
+            query = query.join(Account, Account.id == AssetRollup.account_id).filter(Account.bank_id == bank_id)
+        if account_id:
+            query = query.filter(AssetRollup.account_id == account_id)
+        return {type_produit: value or 0.0 for type_produit, value in query.group_by(AssetRollup.type_produit).all()}
+
+    @staticmethod
+    def rebuild(db: Session, user_id: Optional[str] = None) -> int:
+        """
+        Reconstruit les agrégats à partir des actifs (réparation)
+
+        Args:
+            db: Session de base de données
+            user_id: Limiter la reconstruction à un utilisateur (tous par défaut)
+
+        Returns:
+            Nombre d'agrégats écrits
+        """
+        count = rebuild_rollups(db.connection(), user_id)
+        db.commit()
+        logger.info(f"Agrégats d'actifs reconstruits: {count} groupes")
+        return count
+
+    @staticmethod
+    def check(db: Session, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Vérifie la cohérence des agrégats avec les actifs
+
+        Args:
+            db: Session de base de données
+            user_id: Limiter la vérification à un utilisateur (tous par défaut)
+
+        Returns:
+            Liste des écarts, vide si les agrégats sont cohérents
+        """
+        mismatches = check_rollups(db.connection(), user_id)
+        if mismatches:
+            logger.warning(f"{len(mismatches)} agrégat(s) d'actifs incohérent(s)")
+        return mismatches
+
+
+# Créer une instance singleton du service
+rollup_service = RollupService()
@@ -0,0 +1,198 @@
+"""
+Planification de la synchronisation des prix et taux de change
+
+Avant toute récupération, les actifs à synchroniser (de tous les utilisateurs) sont regroupés
+par clé unique: ISIN, type de métal et devise. Chaque clé n'est récupérée qu'une fois, puis son
+résultat est appliqué à tous les actifs qui la portent (un même ETF détenu sur plusieurs
+comptes, tous les lingots d'or...). Le plan indique, par type de clé, les clés servies par le
+cache des cotations, celles à récupérer et les ISIN en attente de résolution du symbole.
+
+Les actifs sont lus sans leurs colonnes chiffrées. Le type de métal, déduit du nom, est mémorisé
+par index aveugle du nom: un nom n'est déchiffré que la première fois qu'il est planifié.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from config.app_config import ISIN_PRICE_CACHE_TTL, METAL_PRICE_CACHE_TTL, METAL_TYPE_CACHE_MAX_ENTRIES
+from database.models import Asset
+from database.quote_store import quote_store
+from services.currency_service import CurrencyService
+from services.price_service import PriceService
+from utils.logger import get_logger
+from utils.lru_cache import LRUCache
+
+logger = get_logger(__name__)
+
+# Types de clés d'un plan de synchronisation
+SYNC_KEY_KINDS = ("isin", "metal", "currency")
+
+# Type de métal par index aveugle du nom (les noms identiques une fois normalisés partagent leur type)
+_metal_type_cache = LRUCache(METAL_TYPE_CACHE_MAX_ENTRIES)
+
+
+def metal_type_from_name(name: Optional[str]) -> str:
+    """
+    Détermine le type de métal d'après le nom d'un actif (or par défaut)
+
+    Args:
+        name: Nom de l'actif en clair
+
+    Returns:
+        Type de métal (gold, silver, platinum, palladium)
+    """
+    metal_type = "gold"  # Par défaut
+    if name:
+        nom_lower = name.lower()
+        if "silver" in nom_lower or "argent" in nom_lower:
+            metal_type = "silver"
+        elif "platinum" in nom_lower or "platine" in nom_lower:
+            metal_type = "platinum"
+        elif "palladium" in nom_lower:
+            metal_type = "palladium"
+    return metal_type
+
+
+class SyncPlan:
+    """Clés uniques d'une synchronisation et actifs auxquels appliquer leurs résultats"""
+
+    def __init__(self):
+        # Identifiants des actifs par clé, pour chaque type de clé
+        self.assets: Dict[str, Dict[str, List[str]]] = {kind: {} for kind in SYNC_KEY_KINDS}
+        # Type de métal de chaque actif métal
+        self.metal_types: Dict[str, str] = {}
+        # Clés servies par le cache des cotations et clés à récupérer
+        self.cache_hits: Dict[str, List[str]] = {kind: [] for kind in SYNC_KEY_KINDS}
+        self.fetches: Dict[str, List[str]] = {kind: [] for kind in SYNC_KEY_KINDS}
+        # ISIN sans symbole en attente de nouvelle tentative (date de la prochaine tentative)
+        self.pending_isins: Dict[str, datetime] = {}
+        # Noms déchiffrés pour déterminer le type de métal (les autres sont retrouvés en cache)
+        self.decrypted_names = 0
+
+    def keys(self, kind: str) -> List[str]:
+        """
+        Retourne les clés uniques d'un type
+
+        Args:
+            kind: Type de clé (isin, metal ou currency)
+
+        Returns:
+            Clés triées
+        """
+        return sorted(self.assets[kind])
+
+    def asset_count(self) -> int:
+        """Nombre d'actifs distincts concernés par le plan"""
+        return len({asset_id for keys in self.assets.values() for ids in keys.values() for asset_id in ids})
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Résume le plan pour la journalisation et l'affichage
+
+        Returns:
+            Dictionnaire {assets, decrypted_names, isin, metal, currency}, chaque type de clé
+            donnant {assets, keys, cache_hits, fetches} (et pending pour les ISIN)
+        """
+        summary: Dict[str, Any] = {"assets": self.asset_count(), "decrypted_names": self.decrypted_names}
+        for kind in SYNC_KEY_KINDS:
+            summary[kind] = {
+                "assets": sum(len(ids) for ids in self.assets[kind].values()),
+                "keys": len(self.assets[kind]),
+                "cache_hits": len(self.cache_hits[kind]),
+                "fetches": len(self.fetches[kind]),
+            }
+        summary["isin"]["pending"] = len(self.pending_isins)
+        return summary
+
+    def describe(self) -> str:
+        """Résumé du plan sur une ligne"""
+        summary = self.summary()
+        parts = []
+        for kind, label in (("isin", "ISIN"), ("metal", "métaux"), ("currency", "devises")):
+            counts = summary[kind]
+            parts.append(f"{label}: {counts['keys']} clés pour {counts['assets']} actifs, "
+                         f"{counts['cache_hits']} en cache, {counts['fetches']} à récupérer")
+        if self.pending_isins:
+            parts.append(f"{len(self.pending_isins)} ISIN en attente")
+        return f"{summary['assets']} actifs; " + "; ".join(parts)
+
+
+class SyncPlanner:
+    """Construction des plans de synchronisation"""
+
+    @staticmethod
+    def build(db: Session, asset_id: Optional[str] = None) -> SyncPlan:
+        """
+        Construit le plan de synchronisation des actifs
+
+        Args:
+            db: Session de base de données
+            asset_id: ID de l'actif à planifier (tous les actifs si None)
+
+        Returns:
+            Plan de synchronisation
+        """
+        plan = SyncPlan()
+
+        # Colonnes non chiffrées uniquement (le nom n'est lu que pour les types de métal inconnus)
+        query = db.query(Asset.id, Asset.isin, Asset.devise, Asset.type_produit, Asset.ounces, Asset.nom_bidx)
+        if asset_id:
+            query = query.filter(Asset.id == asset_id)
+
+        unnamed_metals: Dict[str, Optional[str]] = {}  # id -> index aveugle du nom
+        for row in query:
+            if row.isin:
+                plan.assets["isin"].setdefault(row.isin, []).append(row.id)
+            if row.devise and row.devise != "EUR":
+                plan.assets["currency"].setdefault(row.devise, []).append(row.id)
+            if row.type_produit == "metal" and row.ounces is not None:
+                metal_type = _metal_type_cache.get(row.nom_bidx) if row.nom_bidx else None
+                if metal_type is None:
+                    unnamed_metals[row.id] = row.nom_bidx
+                else:
+                    plan.metal_types[row.id] = metal_type
+
+        if unnamed_metals:
+            for asset_key, name in db.query(Asset.id, Asset.nom).filter(Asset.id.in_(list(unnamed_metals))):
+                metal_type = metal_type_from_name(name)
+                plan.metal_types[asset_key] = metal_type
+                if unnamed_metals[asset_key]:
+                    _metal_type_cache.put(unnamed_metals[asset_key], metal_type)
+            plan.decrypted_names = len(unnamed_metals)
+
+        for asset_key, metal_type in plan.metal_types.items():
+            plan.assets["metal"].setdefault(metal_type, []).append(asset_key)
+
+        SyncPlanner._check_caches(plan)
+        return plan
+
+    @staticmethod
+    def _check_caches(plan: SyncPlan) -> None:
+        """
+        Répartit les clés du plan entre celles servies par le cache des cotations et celles à récupérer
+
+        Args:
+            plan: Plan dont les clés sont déjà regroupées
+        """
+        missing_isins = []
+        for isin in plan.keys("isin"):
+            if quote_store.get_quote(isin, max_age=ISIN_PRICE_CACHE_TTL):
+                plan.cache_hits["isin"].append(isin)
+            else:
+                missing_isins.append(isin)
+        # Les ISIN dont la résolution du symbole est différée ne seront pas interrogés
+        plan.pending_isins = PriceService.get_pending_isins(missing_isins)
+        plan.fetches["isin"] = [isin for isin in missing_isins if isin not in plan.pending_isins]
+
+        for metal_type in plan.keys("metal"):
+            cached = quote_store.get_quote(metal_type, max_age=METAL_PRICE_CACHE_TTL)
+            (plan.cache_hits if cached else plan.fetches)["metal"].append(metal_type)
+
+        rates = quote_store.get_fx_rates(max_age=CurrencyService.CACHE_VALIDITY) or {}
+        for currency in plan.keys("currency"):
+            (plan.cache_hits if currency in rates else plan.fetches)["currency"].append(currency)
+
+
+# Créer une instance singleton du service
+sync_planner = SyncPlanner()
@@ -5,8 +5,10 @@ from typing import List
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from database.models import Asset
+from database.models import Asset, asset_load_options
+from utils.crypto import load_decrypted
 from utils.logger import get_logger
+from utils.read_cache import cached_read, invalidate_cached_reads
 
 logger = get_logger(__name__)
 
@@ -38,6 +40,7 @@ class TemplateService:
             asset.template_name = template_name
 
             db.commit()
+            invalidate_cached_reads(asset.owner_id)
             logger.info(f"Actif {asset_id} désigné comme modèle: {template_name}")
             return True
         except Exception as e:
@@ -78,6 +81,7 @@ class TemplateService:
                 asset.date_maj = datetime.now().strftime("%Y-%m-%d")
 
             db.commit()
+            invalidate_cached_reads(asset.owner_id)
             logger.info(f"Actif {asset_id} lié au modèle {template_id}")
             return True
         except Exception as e:
@@ -108,6 +112,7 @@ class TemplateService:
             asset.sync_allocations = False
 
             db.commit()
+            invalidate_cached_reads(asset.owner_id)
             logger.info(f"Actif {asset_id} délié de son modèle")
             return True
         except Exception as e:
@@ -151,6 +156,7 @@ class TemplateService:
                 update_count += 1
 
             db.commit()
+            invalidate_cached_reads(template.owner_id)
             logger.info(f"Modèle {template_id} propagé à {update_count} actifs")
             return update_count
         except Exception as e:
@@ -159,6 +165,7 @@ class TemplateService:
             return 0
 
     @staticmethod
+    @cached_read()
     def get_templates(db: Session, user_id: str) -> List[Asset]:
         """
         Récupère tous les modèles d'un utilisateur
@@ -168,12 +175,12 @@ class TemplateService:
             user_id: ID de l'utilisateur
 
         Returns:
-            Liste des actifs marqués comme modèles
+            Liste des actifs marqués comme modèles (détachés, allocations chargées, sans notes ni tâche)
         """
-        return db.query(Asset).filter(
+        return load_decrypted(db.query(Asset).options(*asset_load_options("allocation")).filter(
             Asset.owner_id == user_id,
             Asset.is_template == True
-        ).all()
+        ))
 
     @staticmethod
     def get_linked_assets(db: Session, template_id: str) -> List[Asset]:
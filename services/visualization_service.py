@@ -4,10 +4,14 @@ Service pour les visualisations avec SQLAlchemy
 import matplotlib.pyplot as plt
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
-from database.models import Asset, HistoryPoint
+from database.models import Account, Asset, Bank, asset_load_options
+from services.data_service import DataService
+from services.exposure_engine import ExposureEngine
+from utils.crypto import load_decrypted
 from utils.logger import get_logger
+from utils.read_cache import cached_read
 
 logger = get_logger(__name__)
 
@@ -160,6 +164,7 @@ class VisualizationService:
     @staticmethod
     def create_time_series_chart(
             db: Session,
+            user_id: str,
             title: str = "Évolution du patrimoine",
             days: Optional[int] = None,
             figsize: Tuple[int, int] = (12, 6)
@@ -169,6 +174,7 @@ class VisualizationService:
 
         Args:
             db: Session de base de données
+            user_id: ID de l'utilisateur
             title: Titre du graphique
             days: Nombre de jours à afficher (None pour tout l'historique)
             figsize: Taille du graphique (largeur, hauteur)
@@ -176,18 +182,8 @@ class VisualizationService:
         Returns:
             Figure matplotlib ou None si moins de 2 points d'historique
         """
-        # OPTIMISATION: Utiliser directement les indices et limiter les champs récupérés
-        query = db.query(HistoryPoint.date, HistoryPoint.total).order_by(HistoryPoint.date)
-
-        if days:
-            # Récupérer uniquement les N derniers points de manière optimisée
-            # SQLite ne supporte pas LIMIT avec OFFSET, donc on doit utiliser une sous-requête
-            subquery = db.query(HistoryPoint.id).order_by(HistoryPoint.date.desc()).limit(days).subquery()
-            query = db.query(HistoryPoint.date, HistoryPoint.total).filter(
-                HistoryPoint.id.in_(subquery)
-            ).order_by(HistoryPoint.date)
-
-        history_data = query.all()
+        # OPTIMISATION: Parcours de l'index (owner_id, date, total) de l'utilisateur, sans déchiffrement
+        history_data = DataService.get_history_totals(db, user_id, days)
 
         if not history_data or len(history_data) < 2:
             return None
@@ -233,6 +229,40 @@ class VisualizationService:
 
         return fig
 
+    @staticmethod
+    @cached_read()
+    def build_exposure_engine(
+            db: Session,
+            user_id: str,
+            categories: List[str] = None,
+            zones: List[str] = None
+    ) -> ExposureEngine:
+        """
+        Charge les actifs d'un utilisateur dans le moteur d'exposition vectorisé
+
+        Les allocations sont déchiffrées une seule fois par révision des données: le moteur
+        est mémoïsé et toutes les répartitions filtrées (banque, compte, catégorie) sont
+        ensuite calculées sur ses tableaux.
+
+        Args:
+            db: Session de base de données
+            user_id: ID de l'utilisateur
+            categories: Catégories retenues (ASSET_CATEGORIES par défaut)
+            zones: Zones géographiques retenues (GEO_ZONES par défaut)
+
+        Returns:
+            Moteur d'exposition des actifs de l'utilisateur
+        """
+        assets = load_decrypted(
+            db.query(Asset).options(
+                *asset_load_options("valuation"), undefer(Asset.geo_allocation)
+            ).filter(Asset.owner_id == user_id)
+        )
+        bank_by_account = dict(
+            db.query(Account.id, Account.bank_id).join(Bank).filter(Bank.owner_id == user_id).all()
+        )
+        return ExposureEngine.from_assets(assets, bank_by_account, categories, zones)
+
     @staticmethod
     def calculate_category_values(
             db: Session,
@@ -241,8 +271,7 @@ class VisualizationService:
             asset_categories: List[str] = None
     ) -> Dict[str, float]:
         """
-        Calcule la répartition par catégorie avec traitement Python
-        (résout le problème de JSON malformé avec SQLite)
+        Calcule la répartition par catégorie avec le moteur d'exposition vectorisé
 
         Args:
             db: Session de base de données
@@ -254,43 +283,13 @@ class VisualizationService:
             Dictionnaire avec les valeurs par catégorie
         """
         try:
+            from config.app_config import ASSET_CATEGORIES, GEO_ZONES
             if asset_categories is None:
-                from config.app_config import ASSET_CATEGORIES
                 asset_categories = ASSET_CATEGORIES
 
-            # Initialiser le dictionnaire des valeurs par catégorie
-            category_values = {cat: 0.0 for cat in asset_categories}
-
-            # Récupérer les actifs avec leur valeur et leur allocation
-            query = db.query(Asset).filter(Asset.owner_id == user_id)
-
-            # Appliquer le filtre par compte si nécessaire
-            if account_id:
-                query = query.filter(Asset.account_id == account_id)
-
-            # Récupérer tous les actifs - SQLAlchemy déchiffrera automatiquement les JSON
-            assets = query.all()
-
-            # Traiter les résultats en Python après déchiffrement par SQLAlchemy
-            for asset in assets:
-                # Utiliser value_eur s'il existe, sinon valeur_actuelle
-                value = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
-
-                # Ignorer les actifs sans valeur
-                if not value:
-                    continue
-
-                # S'assurer que l'allocation est un dictionnaire valide
-                if not asset.allocation or not isinstance(asset.allocation, dict):
-                    continue
-
-                # Calculer la contribution à chaque catégorie
-                for category in asset_categories:
-                    if category in asset.allocation:
-                        percentage = asset.allocation.get(category, 0.0)
-                        category_values[category] += value * percentage / 100.0
-
-            return category_values
+            # OPTIMISATION: Moteur partagé avec calculate_geo_values, produit valeurs × poids sur les actifs du compte
+            engine = VisualizationService.build_exposure_engine(db, user_id, asset_categories, GEO_ZONES)
+            return engine.category_values(engine.mask(account_id=account_id))
 
         except Exception as e:
             logger.error(f"Erreur lors du calcul des valeurs par catégorie: {str(e)}")
@@ -306,8 +305,7 @@ class VisualizationService:
             geo_zones: List[str] = None
     ) -> Dict[str, float]:
         """
-        Calcule la répartition géographique avec traitement Python
-        (résout le problème de JSON malformé avec SQLite)
+        Calcule la répartition géographique avec le moteur d'exposition vectorisé
 
         Args:
             db: Session de base de données
@@ -320,70 +318,15 @@ class VisualizationService:
             Dictionnaire avec les valeurs par zone géographique
         """
         try:
+            from config.app_config import ASSET_CATEGORIES, GEO_ZONES
             if geo_zones is None:
-                from config.app_config import GEO_ZONES
                 geo_zones = GEO_ZONES
 
-            # Initialiser le dictionnaire des valeurs par zone géographique
-            geo_values = {zone: 0.0 for zone in geo_zones}
-
-            # Récupérer les actifs
-            query = db.query(Asset).filter(Asset.owner_id == user_id)
-
-            # Appliquer des filtres supplémentaires si nécessaire
-            if account_id:
-                query = query.filter(Asset.account_id == account_id)
-
-            # Exécuter la requête et récupérer tous les actifs
-            assets = query.all()
-
-            # Traiter les résultats en Python après déchiffrement par SQLAlchemy
-            for asset in assets:
-                # Ignorer les actifs sans allocations ou répartitions géographiques
-                if not asset.allocation or not isinstance(asset.allocation, dict) or \
-                   not asset.geo_allocation or not isinstance(asset.geo_allocation, dict):
-                    continue
-
-                # Utiliser value_eur s'il existe, sinon valeur_actuelle
-                value_to_use = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
-
-                # Ignorer les actifs sans valeur
-                if not value_to_use:
-                    continue
-
-                # Si une catégorie est spécifiée, ne considérer que cette partie de l'actif
-                if category:
-                    if category not in asset.allocation:
-                        continue
-
-                    # Valeur allouée à cette catégorie
-                    category_value = value_to_use * asset.allocation[category] / 100
-
-                    # Répartition géographique pour cette catégorie
-                    geo_zones_dict = asset.geo_allocation.get(category, {})
-
-                    for zone, percentage in geo_zones_dict.items():
-                        if zone in geo_values:
-                            geo_values[zone] += category_value * percentage / 100
-                else:
-                    # Pour tous les actifs, ventiler selon les allocations et répartitions géographiques
-                    for cat, allocation_pct in asset.allocation.items():
-                        # Ignorer les catégories sans allocation
-                        if allocation_pct <= 0:
-                            continue
-
-                        category_value = value_to_use * allocation_pct / 100
-
-                        # Utiliser la répartition géographique spécifique à cette catégorie si disponible
-                        geo_zones_dict = asset.geo_allocation.get(cat, {})
-
-                        for zone, percentage in geo_zones_dict.items():
-                            if zone in geo_values:
-                                geo_values[zone] += category_value * percentage / 100
-
-            return geo_values
+            # OPTIMISATION: Moteur partagé avec calculate_category_values, contraction avec le tenseur géographique
+            engine = VisualizationService.build_exposure_engine(db, user_id, ASSET_CATEGORIES, geo_zones)
+            return engine.geo_values(engine.mask(account_id=account_id), category)
 
         except Exception as e:
             logger.error(f"Erreur lors du calcul des valeurs géographiques: {str(e)}")
             # Retourner un dictionnaire vide en cas d'erreur
-            return {zone: 0.0 for zone in geo_zones} if geo_zones else {}
\ No newline at end of file
+            return {zone: 0.0 for zone in geo_zones} if geo_zones else {}
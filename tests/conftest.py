@@ -166,6 +166,62 @@ def test_asset(db_session, test_user, test_account) -> Asset:
     return asset
 
 
+@pytest.fixture(scope="function")
+def test_mixed_asset(db_session, test_user, test_account) -> Asset:
+    """
+    Crée un fonds mixte de test (actions et obligations, plusieurs zones géographiques)
+    """
+    # Générer un ID unique pour l'actif
+    unique_suffix = str(uuid.uuid4())[:8]
+    asset_id = f"test-mixed-asset-id-{unique_suffix}"
+
+    asset = Asset(
+        id=asset_id,
+        owner_id=test_user.id,
+        account_id=test_account.id,
+        nom="Fonds mixte",
+        type_produit="opcvm",
+        categorie="actions",
+        allocation={"actions": 60, "obligations": 40},
+        geo_allocation={"actions": {"amerique_nord": 50, "europe_zone_euro": 50},
+                        "obligations": {"europe_zone_euro": 100}},
+        valeur_actuelle=1000.0,
+        prix_de_revient=800.0,
+        devise="EUR",
+        value_eur=1000.0,
+        exchange_rate=1.0
+    )
+    db_session.add(asset)
+    db_session.commit()
+    db_session.refresh(asset)
+    return asset
+
+
+@pytest.fixture(autouse=True)
+def quote_store(test_engine, monkeypatch):
+    """
+    Redirige le cache partagé des cotations vers la base de test (vide à chaque test)
+    """
+    from database.quote_store import quote_store as store
+
+    monkeypatch.setattr(store, "bind", test_engine)
+    store.clear()
+    yield store
+    store.clear_memory()
+
+
+@pytest.fixture(autouse=True)
+def instrument_reference(test_engine, monkeypatch):
+    """
+    Redirige le référentiel local des instruments vers la base de test (vide à chaque test)
+    """
+    from database.instrument_reference import instrument_reference as reference
+
+    monkeypatch.setattr(reference, "bind", test_engine)
+    reference.clear()
+    return reference
+
+
 @pytest.fixture
 def mock_encryption_key(monkeypatch):
     """
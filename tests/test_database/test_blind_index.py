@@ -0,0 +1,71 @@
+"""
+Tests pour les index aveugles des champs chiffrés
+"""
+from database.blind_index import (
+    normalize_text, compute_blind_index, tokenize, compute_search_tokens, compute_query_tokens
+)
+from database.models import Bank, SearchToken
+
+
+class TestBlindIndex:
+    """Tests pour le calcul des index aveugles et des jetons de recherche"""
+
+    def test_normalize_text(self):
+        """La normalisation ignore la casse, les accents et les espaces superflus"""
+        assert normalize_text("  Société   Générale ") == "societe generale"
+
+    def test_compute_blind_index(self):
+        """L'index est déterministe, insensible à la casse et n'expose pas la valeur"""
+        index = compute_blind_index("Alice@Example.com")
+
+        assert index == compute_blind_index("alice@example.com")
+        assert index != compute_blind_index("bob@example.com")
+        assert "alice" not in index
+        assert compute_blind_index(None) is None
+        assert compute_blind_index("   ") is None
+
+    def test_tokenize(self):
+        """Chaque mot est découpé en préfixes"""
+        tokens = tokenize("MSCI World")
+
+        assert {"ms", "msc", "msci", "wo", "wor", "worl", "world"} == tokens
+        assert tokenize(None) == set()
+
+    def test_query_tokens_match_search_tokens(self):
+        """Les mots (ou débuts de mots) d'une recherche correspondent aux jetons stockés"""
+        stored = compute_search_tokens("Amundi MSCI World")
+
+        assert set(compute_query_tokens("amun wor")) <= stored
+        assert not set(compute_query_tokens("nasdaq")) & stored
+        assert compute_query_tokens("") == []
+
+    def test_indexes_maintained_on_write(self, db_session, test_asset, test_bank):
+        """Les index et jetons sont mis à jour automatiquement à l'écriture"""
+        assert test_asset.nom_bidx == compute_blind_index("Actif Test")
+        assert test_bank.nom_bidx == compute_blind_index("Banque Test")
+
+        def asset_tokens():
+            return {
+                row.token for row in db_session.query(SearchToken).filter(
+                    SearchToken.entity_type == "asset", SearchToken.entity_id == test_asset.id
+                )
+            }
+
+        assert compute_search_tokens("Actif Test") <= asset_tokens()
+
+        # Modification du nom: index et jetons recalculés
+        test_asset.nom = "Lyxor Nasdaq"
+        db_session.commit()
+
+        assert test_asset.nom_bidx == compute_blind_index("lyxor nasdaq")
+        assert compute_search_tokens("Lyxor Nasdaq") <= asset_tokens()
+        assert not compute_search_tokens("Actif") & asset_tokens()
+
+        # Recherche d'égalité indexée
+        found = db_session.query(Bank).filter(Bank.nom_bidx == compute_blind_index("banque test")).all()
+        assert test_bank.id in [bank.id for bank in found]
+
+        # Suppression: jetons supprimés
+        db_session.delete(test_asset)
+        db_session.commit()
+        assert asset_tokens() == set()
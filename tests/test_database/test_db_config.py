@@ -1,11 +1,20 @@
 """
 Tests pour la configuration de la base de données
 """
+import os
+import shutil
+import sqlite3
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import create_engine, event
 
-from database.db_config import encrypt_data, decrypt_data, encrypt_json, decrypt_json, DataCorruptionError
+from config.app_config import SQLITE_PRAGMAS
+from database.db_config import (
+    encrypt_data, decrypt_data, encrypt_json, decrypt_json, DataCorruptionError,
+    decrypt_data_batch, decrypt_json_batch, get_decryption_cache_stats, clear_decryption_cache,
+    apply_sqlite_pragmas, checkpoint_wal, run_sqlite_maintenance
+)
 
 
 class TestDbConfig:
@@ -71,3 +80,127 @@ class TestDbConfig:
             # Vérifier qu'un dict vide est retourné en mode silencieux
             result = decrypt_json("non_dict_json", silent_errors=True)
             assert result == {}
+
+    def test_decrypt_data_batch(self, mock_cipher):
+        """Test du déchiffrement par lots de données textuelles"""
+        values = [encrypt_data(f"valeur {i}") for i in range(10)] + [None]
+
+        assert decrypt_data_batch(values) == [f"valeur {i}" for i in range(10)] + [None]
+        assert decrypt_data_batch([]) == []
+
+    def test_decrypt_batch_parallel_preserves_order(self, mock_cipher, monkeypatch):
+        """Test du chemin parallèle: l'ordre des résultats est conservé"""
+        monkeypatch.setattr('database.db_config.DECRYPTION_PARALLEL_THRESHOLD', 2)
+        monkeypatch.setattr('database.db_config.DECRYPTION_MAX_WORKERS', 4)
+        monkeypatch.setattr('database.db_config.DECRYPTION_CHUNK_SIZE', 3)
+
+        values = [encrypt_data(f"valeur {i}") for i in range(20)]
+        assert decrypt_data_batch(values) == [f"valeur {i}" for i in range(20)]
+
+        json_values = [encrypt_json({"index": i}) for i in range(20)]
+        assert decrypt_json_batch(json_values) == [{"index": i} for i in range(20)]
+
+    def test_decrypt_json_batch_corruption(self, mock_cipher, monkeypatch):
+        """Test de la détection de corruption dans le déchiffrement JSON par lots"""
+        monkeypatch.setattr('database.db_config.DECRYPTION_PARALLEL_THRESHOLD', 2)
+        monkeypatch.setattr('database.db_config.DECRYPTION_MAX_WORKERS', 2)
+
+        values = [encrypt_json({"a": 1}), "corrupted_data", encrypt_json({"b": 2})]
+
+        # L'exception d'un segment est propagée à l'appelant
+        with pytest.raises(DataCorruptionError):
+            decrypt_json_batch(values)
+
+        # En mode silencieux, la valeur corrompue devient un dict vide
+        assert decrypt_json_batch(values, silent_errors=True) == [{"a": 1}, {}, {"b": 2}]
+
+    def test_decryption_cache(self, mock_cipher):
+        """Test du cache de déchiffrement: succès, copies défensives et erreurs non mises en cache"""
+        clear_decryption_cache()
+        before = get_decryption_cache_stats()
+
+        encrypted = encrypt_json({"actions": 60, "zones": {"europe": 100}})
+        first = decrypt_json(encrypted)
+        second = decrypt_json(encrypted)
+
+        after = get_decryption_cache_stats()
+        assert after["hits"] == before["hits"] + 1
+        assert first == second
+        assert first is not second
+
+        # Modifier le résultat ne doit pas altérer le cache
+        first["actions"] = 0
+        first["zones"]["europe"] = 0
+        assert decrypt_json(encrypted) == {"actions": 60, "zones": {"europe": 100}}
+
+        # Les échecs de déchiffrement ne sont pas mis en cache
+        decrypt_data("corrupted_data")
+        decrypt_data("corrupted_data")
+        assert get_decryption_cache_stats()["size"] == after["size"]
+
+
+class TestSqliteProfile:
+    """Tests pour le profil de performance SQLite"""
+
+    @pytest.fixture
+    def profiled_engine(self, test_dir):
+        """Moteur sur un fichier temporaire, avec le profil de performance appliqué"""
+        engine = create_engine(f"sqlite:///{test_dir / 'profile.db'}")
+        event.listen(engine, "connect", lambda conn, record: apply_sqlite_pragmas(conn))
+        yield engine
+        engine.dispose()
+
+    def test_profile_applied_on_connect(self, profiled_engine):
+        """Le profil par défaut est appliqué à chaque connexion"""
+        with profiled_engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == SQLITE_PRAGMAS["busy_timeout"]
+            assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == SQLITE_PRAGMAS["cache_size"]
+            assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2  # MEMORY
+
+    def test_profile_override(self):
+        """Un profil personnalisé remplace le profil par défaut"""
+        conn = sqlite3.connect(":memory:")
+        apply_sqlite_pragmas(conn, {"cache_size": -2000, "foreign_keys": "OFF"})
+
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -2000
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 0
+        conn.close()
+
+    @pytest.mark.parametrize("pragmas", [{"key": "secret"}, {"cache_size": "1; DROP TABLE users"}])
+    def test_invalid_pragma_rejected(self, pragmas):
+        """Les pragmas inconnus et les valeurs invalides sont refusés"""
+        conn = sqlite3.connect(":memory:")
+        with pytest.raises(ValueError):
+            apply_sqlite_pragmas(conn, pragmas)
+        conn.close()
+
+    def test_maintenance_checkpoints_wal(self, profiled_engine, test_dir):
+        """La maintenance reporte le journal WAL dans la base"""
+        with profiled_engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE t (v TEXT)")
+            conn.exec_driver_sql("INSERT INTO t VALUES ('a')")
+
+        result = run_sqlite_maintenance(checkpoint_mode="TRUNCATE", target_engine=profiled_engine)
+
+        assert not result["busy"]
+        assert os.path.getsize(test_dir / "profile.db-wal") == 0
+
+    def test_checkpoint_before_copy(self, profiled_engine, test_dir):
+        """Après checkpoint_wal, une copie du seul fichier de base contient les dernières écritures"""
+        with profiled_engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE t (v TEXT)")
+            conn.exec_driver_sql("INSERT INTO t VALUES ('a')")
+
+        checkpoint_wal(str(test_dir / "profile.db"))
+        shutil.copy2(test_dir / "profile.db", test_dir / "copy.db")
+
+        copy = sqlite3.connect(test_dir / "copy.db")
+        assert copy.execute("SELECT v FROM t").fetchall() == [("a",)]
+        copy.close()
+
+    def test_checkpoint_missing_database(self, test_dir):
+        """Le point de contrôle d'une base inexistante ne fait rien"""
+        assert checkpoint_wal(str(test_dir / "absent.db")) is None
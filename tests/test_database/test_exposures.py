@@ -0,0 +1,83 @@
+"""
+Tests pour les agrégats d'exposition par catégorie et zone géographique
+"""
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import inspect, text
+
+from database.models import Asset, ExposureAggregate
+from services.exposure_service import ExposureService
+
+
+class TestExposures:
+    """Tests de la maintenance incrémentale des agrégats d'exposition"""
+
+    def test_deltas_follow_asset_changes(self, db_session, test_user, test_mixed_asset):
+        """Les agrégats suivent les créations, modifications de valeur et d'allocation et suppressions"""
+        assert ExposureService.get_category_values(db_session, test_user.id) == \
+               pytest.approx({"actions": 600.0, "obligations": 400.0})
+        assert ExposureService.get_geo_values(db_session, test_user.id) == \
+               pytest.approx({"amerique_nord": 300.0, "europe_zone_euro": 700.0})
+        assert ExposureService.get_geo_values(db_session, test_user.id, category="actions") == \
+               pytest.approx({"amerique_nord": 300.0, "europe_zone_euro": 300.0})
+
+        # Mise à jour de valeur (synchronisation) avec la répartition géographique non chargée
+        asset_id = test_mixed_asset.id
+        db_session.expunge_all()
+        asset = db_session.query(Asset).filter(Asset.id == asset_id).one()
+        assert "geo_allocation" in inspect(asset).unloaded
+        asset.value_eur = 2000.0
+        db_session.commit()
+        assert ExposureService.get_geo_values(db_session, test_user.id) == \
+               pytest.approx({"amerique_nord": 600.0, "europe_zone_euro": 1400.0})
+
+        # Remplacement des allocations (propagation d'un modèle)
+        asset.allocation = {"cash": 100}
+        asset.geo_allocation = {"cash": {"europe_zone_euro": 100}}
+        db_session.commit()
+        assert ExposureService.get_category_values(db_session, test_user.id) == pytest.approx({"cash": 2000.0})
+        assert ExposureService.get_geo_values(db_session, test_user.id) == \
+               pytest.approx({"europe_zone_euro": 2000.0})
+
+        # Suppression: plus aucune ligne d'agrégat
+        db_session.delete(asset)
+        db_session.commit()
+        assert db_session.query(ExposureAggregate).filter(ExposureAggregate.owner_id == test_user.id).count() == 0
+
+    def test_loaded_asset_not_reread(self, db_session, test_user, test_mixed_asset):
+        """Colonnes d'exposition chargées: l'ancienne contribution vient de l'historique, sans relecture"""
+        assert test_mixed_asset.geo_allocation is not None
+        with patch("database.models.load_exposure_state") as mock_load:
+            test_mixed_asset.value_eur = 500.0
+            db_session.commit()
+            assert mock_load.call_count == 0
+        assert ExposureService.get_category_values(db_session, test_user.id) == \
+               pytest.approx({"actions": 300.0, "obligations": 200.0})
+
+        db_session.refresh(test_mixed_asset)
+        assert test_mixed_asset.geo_allocation is not None
+        with patch("database.models.load_exposure_state") as mock_load:
+            db_session.delete(test_mixed_asset)
+            db_session.commit()
+            assert mock_load.call_count == 0
+        assert ExposureService.get_category_values(db_session, test_user.id) == {}
+
+    def test_account_filter(self, db_session, test_user, test_account, test_mixed_asset):
+        """Les lectures filtrées par compte"""
+        assert ExposureService.get_category_values(db_session, test_user.id, test_account.id) == \
+               pytest.approx({"actions": 600.0, "obligations": 400.0})
+        assert ExposureService.get_category_values(db_session, test_user.id, "autre") == {}
+
+    def test_check_and_rebuild(self, db_session, test_user, test_mixed_asset):
+        """La vérification détecte un agrégat faussé et la reconstruction le répare"""
+        assert ExposureService.check(db_session, test_user.id) == []
+
+        db_session.execute(text("DELETE FROM exposure_aggregates WHERE owner_id = :owner_id AND zone = ''"),
+                           {"owner_id": test_user.id})
+        db_session.commit()
+        mismatches = ExposureService.check(db_session, test_user.id)
+        assert {mismatch["category"] for mismatch in mismatches} == {"actions", "obligations"}
+
+        assert ExposureService.rebuild(db_session, test_user.id) == 5
+        assert ExposureService.check(db_session, test_user.id) == []
@@ -0,0 +1,48 @@
+"""
+Tests pour le référentiel local des instruments
+"""
+import json
+
+from database.instrument_reference import normalize_isin
+
+
+class TestInstrumentReference:
+    """Tests du chargement, de la recherche et de la mise à jour du référentiel"""
+
+    def test_load_files_and_lookup(self, instrument_reference, tmp_path):
+        """Chargement CSV et JSON, recherche exacte et par préfixe"""
+        csv_path = tmp_path / "instruments.csv"
+        csv_path.write_text(
+            "ISIN;Symbol;Exchange;Currency;Name;Type\n"
+            "FR0000120271;TTE.PA;PAR;eur;TotalEnergies;action\n"
+            "FR0010315770;CW8.PA;PAR;EUR;Amundi MSCI World;etf\n"
+            "invalide;XXX;;;;\n",
+            encoding="utf-8"
+        )
+        json_path = tmp_path / "instruments.json"
+        json_path.write_text(json.dumps({
+            "IE00B4L5Y983": {"symbol": "IWDA.AS", "currency": "EUR", "name": "iShares Core MSCI World"},
+        }))
+
+        assert instrument_reference.load_file(str(csv_path)) == 2
+        assert instrument_reference.load_file(str(json_path)) == 1
+
+        instrument = instrument_reference.lookup(" fr0000120271 ")
+        assert instrument["symbol"] == "TTE.PA" and instrument["currency"] == "EUR"
+        assert instrument["source"] == "reference"
+        assert [i["isin"] for i in instrument_reference.search("fr00")] == ["FR0000120271", "FR0010315770"]
+        assert [i["isin"] for i in instrument_reference.search("IE", limit=1)] == ["IE00B4L5Y983"]
+        assert instrument_reference.search("F") == []
+        assert normalize_isin("XX") is None
+
+    def test_resolution_completes_reference(self, instrument_reference):
+        """Une résolution réussie complète l'instrument sans effacer les champs connus"""
+        instrument_reference.upsert([{"isin": "FR0010315770", "name": "Amundi MSCI World", "type": "etf"}])
+        instrument_reference.record_resolution(
+            "FR0010315770", "CW8.PA", {"exchange": "PAR", "currency": "EUR", "quoteType": "ETF"}
+        )
+
+        instrument = instrument_reference.lookup("FR0010315770")
+        assert instrument["symbol"] == "CW8.PA" and instrument["exchange"] == "PAR"
+        assert instrument["name"] == "Amundi MSCI World"
+        assert instrument["source"] == "resolution"
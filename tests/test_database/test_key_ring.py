@@ -0,0 +1,54 @@
+"""
+Tests pour le trousseau de clés du processus
+"""
+from unittest.mock import patch
+
+from cryptography.fernet import Fernet
+
+from database.key_ring import KeyRing, derive_fernet_key
+from utils.startup_metrics import get_startup_metrics
+
+
+class TestKeyRing:
+    """Tests pour le trousseau de clés"""
+
+    def test_key_derived_once(self):
+        """La clé n'est dérivée qu'une seule fois, quel que soit le nombre de consommateurs"""
+        ring = KeyRing(secret_key=b"secret", salt=b"salt")
+
+        with patch('database.key_ring.derive_fernet_key', wraps=derive_fernet_key) as derive:
+            data_key = ring.data_key
+            assert ring.data_key == data_key
+            assert ring.backup_key == data_key
+            assert ring.data_cipher is ring.data_cipher
+            assert ring.backup_cipher is ring.data_cipher
+
+        derive.assert_called_once()
+        assert "key_ring.derive_data_key" in get_startup_metrics()
+
+    def test_key_compatible_with_previous_derivation(self):
+        """La clé dérivée reste compatible avec les données existantes"""
+        ring = KeyRing(secret_key=b"secret", salt=b"salt")
+        token = Fernet(derive_fernet_key(b"secret", b"salt")).encrypt(b"valeur")
+
+        assert ring.data_cipher.decrypt(token) == b"valeur"
+
+    def test_blind_index_key_is_distinct(self):
+        """La clé des index aveugles est distincte de la clé de chiffrement"""
+        ring = KeyRing(secret_key=b"secret", salt=b"salt")
+
+        assert len(ring.blind_index_key) == 32
+        assert ring.blind_index_key != ring.data_key
+
+    def test_multi_cipher_with_previous_key(self):
+        """Les anciennes clés restent utilisables en déchiffrement après rotation"""
+        old_key = Fernet.generate_key()
+        ring = KeyRing(secret_key=b"secret", salt=b"salt")
+        ring.add_previous_key(old_key)
+
+        token = Fernet(old_key).encrypt(b"ancienne valeur")
+        multi = ring.multi_cipher()
+
+        assert multi.decrypt(token) == b"ancienne valeur"
+        # Le chiffrement utilise la clé courante
+        assert ring.data_cipher.decrypt(multi.encrypt(b"nouvelle")) == b"nouvelle"
@@ -0,0 +1,100 @@
+"""
+Tests pour le cache partagé des cotations
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from config.app_config import SYMBOL_RESOLUTION_BACKOFF_BASE
+from database.quote_store import QuoteStore, import_json_caches
+
+
+class TestQuoteStore:
+    """Tests de la lecture traversante, de l'écriture différée et de la rétention"""
+
+    def test_shared_between_processes_after_flush(self, quote_store, test_engine):
+        """Les écritures restent en mémoire jusqu'au flush, puis sont lues par les autres processus"""
+        other = QuoteStore(test_engine)
+        quote_store.set_symbol("FR0000000001", "AAA.PA")
+        quote_store.set_quote("FR0000000001", 12.5, symbol="AAA.PA")
+        quote_store.set_fx_rates({"USD": 1.1, "EUR": 1.0})
+
+        assert quote_store.get_quote("FR0000000001", max_age=60)["price"] == 12.5
+        assert other.get_quote("FR0000000001") is None
+        assert other.get_fx_rates() is None
+
+        assert quote_store.flush() == 4
+        assert other.get_symbol("FR0000000001") == "AAA.PA"
+        assert other.get_quote("FR0000000001", max_age=60)["price"] == 12.5
+        assert other.get_fx_rates(max_age=60) == {"USD": 1.1, "EUR": 1.0}
+
+        # Prix expiré: non servi comme valide, mais disponible comme repli
+        quote_store.set_quote("gold", 2000.0, kind="metal", fetched_at=datetime.now() - timedelta(hours=2))
+        quote_store.flush()
+        assert other.get_quote("gold", max_age=3600) is None
+        assert other.get_quote("gold")["kind"] == "metal"
+
+    def test_retention_eviction(self, quote_store, test_engine):
+        """Les lignes plus anciennes que leur rétention sont supprimées, en base et en mémoire"""
+        quote_store.set_quote("FR0000000009", 1.0, fetched_at=datetime.now() - timedelta(days=400))
+        quote_store.set_quote("FR0000000008", 2.0)
+        quote_store.flush()
+
+        with test_engine.connect() as connection:
+            codes = connection.execute(text("SELECT code FROM quotes")).scalars().all()
+        assert codes == ["FR0000000008"]
+        assert quote_store.get_quote("FR0000000009") is None
+
+        # Éviction hors flush: les entrées expirées non enregistrées sont conservées
+        quote_store.set_quote("FR0000000007", 3.0, fetched_at=datetime.now() - timedelta(days=400))
+        quote_store.evict_expired()
+        assert quote_store.get_quote("FR0000000007")["price"] == 3.0
+        assert quote_store.get_quote("FR0000000008")["price"] == 2.0
+        assert quote_store.flush() == 1
+
+    def test_resolution_backoff_and_history(self, quote_store, test_engine):
+        """Les échecs de résolution repoussent la tentative suivante (délai doublé); un succès les efface"""
+        quote_store.record_resolution("XX0000000001", error="introuvable")
+        first_retry = quote_store.get_resolution_backoff("XX0000000001")
+        quote_store.record_resolution("XX0000000001", error="toujours introuvable")
+        second_retry = quote_store.get_resolution_backoff("XX0000000001")
+        assert first_retry > datetime.now()
+        assert second_retry - datetime.now() > timedelta(seconds=SYMBOL_RESOLUTION_BACKOFF_BASE * 1.5)
+        quote_store.flush()
+
+        # Partagé avec les autres processus
+        other = QuoteStore(test_engine)
+        assert other.get_resolution_backoff("XX0000000001") == second_retry
+        assert [a["error"] for a in other.get_resolution_attempts("XX0000000001")] == \
+            ["toujours introuvable", "introuvable"]
+
+        quote_store.record_resolution("XX0000000001", symbol="XX.PA")
+        assert quote_store.get_resolution_backoff("XX0000000001") is None
+        assert quote_store.get_resolution_attempts("XX0000000001")[0]["symbol"] == "XX.PA"
+        quote_store.flush()
+        assert QuoteStore(test_engine).get_resolution_backoff("XX0000000001") is None
+        assert QuoteStore(test_engine).get_symbol("XX0000000001") == "XX.PA"
+
+    def test_import_json_caches(self, quote_store, test_engine, tmp_path):
+        """Les anciens fichiers de cache JSON sont importés (migration)"""
+        now = datetime.now().isoformat()
+        (tmp_path / "isin_prices_cache.json").write_text(json.dumps({
+            "FR0000000001": {"timestamp": now, "price": 50.0, "symbol": "AAA.PA"},
+            "FR0000000002": {"timestamp": "invalide", "price": 10.0},
+        }))
+        (tmp_path / "isin_symbol_map.json").write_text(json.dumps({"FR0000000001": "AAA.DE"}))
+        (tmp_path / "metals_prices_cache.json").write_text(json.dumps({"gold": {"timestamp": now, "price": 2000.0}}))
+        (tmp_path / "currency_rates_cache.json").write_text(json.dumps({
+            "timestamp": time.time(), "rates": {"USD": 1.1, "EUR": 1.0}
+        }))
+
+        with test_engine.begin() as connection:
+            counts = import_json_caches(connection, tmp_path)
+
+        assert counts == {"isin_prices": 1, "metal_prices": 1, "currency_rates": 2, "isin_symbols": 1}
+        assert quote_store.get_symbol("FR0000000001") == "AAA.DE"
+        assert quote_store.get_quote("FR0000000001", max_age=60)["price"] == 50.0
+        assert quote_store.get_quote("gold")["price"] == 2000.0
+        assert quote_store.get_fx_rates(max_age=60)["USD"] == 1.1
@@ -0,0 +1,63 @@
+"""
+Tests pour les révisions de données par utilisateur
+"""
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from database.models import Account, Asset, User
+from database.revisions import bump_all_revisions, get_revision
+
+
+class TestRevisions:
+    """Tests du compteur de révision persistant"""
+
+    def test_visible_to_other_sessions_on_commit_only(self, db_session, test_engine, test_user, test_asset):
+        """Une autre session voit la révision à la validation; un rollback l'annule"""
+        other = sessionmaker(bind=test_engine)()
+        try:
+            revision = get_revision(other, test_user.id)
+            test_asset.valeur_actuelle = 1200.0
+            db_session.commit()
+            assert get_revision(other, test_user.id) > revision
+
+            revision = get_revision(db_session, test_user.id)
+            test_asset.valeur_actuelle = 1500.0
+            db_session.flush()
+            assert get_revision(db_session, test_user.id) > revision
+            db_session.rollback()
+            assert get_revision(db_session, test_user.id) == revision
+            assert get_revision(other, test_user.id) == revision
+        finally:
+            other.close()
+
+    def test_account_write_bumps_bank_owner(self, db_session, test_user, test_account):
+        """Un compte n'a pas de propriétaire direct: la révision du propriétaire de la banque change"""
+        revision = get_revision(db_session, test_user.id)
+        account = db_session.query(Account).filter_by(id=test_account.id).first()
+        account.libelle = "Compte renommé"
+        db_session.commit()
+        assert get_revision(db_session, test_user.id) > revision
+
+    def test_bulk_update_bumps_targeted_owners(self, db_session, test_user, test_asset):
+        """query().update() n'incrémente que les propriétaires des lignes visées"""
+        other_user = User(id=f"revision-user-{uuid.uuid4().hex[:8]}", username=f"rev-{uuid.uuid4().hex[:8]}",
+                          email="rev@example.com", password_hash="x")
+        db_session.add(other_user)
+        db_session.commit()
+
+        revision = get_revision(db_session, test_user.id)
+        other_revision = get_revision(db_session, other_user.id)
+        db_session.query(Asset).filter(Asset.id == test_asset.id).update({"todo": "Vérifier"})
+        db_session.commit()
+        assert get_revision(db_session, test_user.id) > revision
+        assert get_revision(db_session, other_user.id) == other_revision
+
+        # Propriétaire inconnu: tous les utilisateurs, y compris sans révision enregistrée
+        bump_all_revisions(db_session.connection())
+        db_session.commit()
+        assert get_revision(db_session, other_user.id) > other_revision
+
+    def test_unknown_user_is_at_revision_zero(self, db_session):
+        """Un utilisateur sans écriture est à la révision 0"""
+        assert get_revision(db_session, "utilisateur-inconnu") == 0
@@ -0,0 +1,79 @@
+"""
+Tests pour les agrégats d'actifs maintenus par triggers
+"""
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from database.models import Asset, AssetRollup
+from services.rollup_service import RollupService
+
+
+class TestRollups:
+    """Tests des agrégats par compte, banque et type de produit"""
+
+    def test_triggers_follow_asset_changes(self, db_session, test_user, test_account, test_bank, test_asset):
+        """Les agrégats suivent les insertions, modifications et suppressions d'actifs"""
+        usd = Asset(
+            id=f"rollup-asset-{uuid.uuid4().hex[:8]}",
+            owner_id=test_user.id,
+            account_id=test_account.id,
+            nom="Action US",
+            type_produit="action",
+            categorie="actions",
+            allocation={"actions": 100},
+            valeur_actuelle=110.0,
+            prix_de_revient=55.0,
+            devise="USD",
+            value_eur=100.0,
+            exchange_rate=1.1
+        )
+        db_session.add(usd)
+        db_session.commit()
+
+        totals = RollupService.get_totals(db_session, test_user.id)
+        assert totals["asset_count"] == 2
+        assert totals["value_eur"] == pytest.approx(1100.0)
+        assert totals["cost_basis_eur"] == pytest.approx(950.0)
+        assert RollupService.get_values_by_type(db_session, test_user.id) == \
+               pytest.approx({"etf": 1000.0, "action": 100.0})
+
+        # Modification d'une valeur puis changement de type
+        test_asset.value_eur = 1500.0
+        db_session.commit()
+        usd.type_produit = "etf"
+        db_session.commit()
+        assert RollupService.get_values_by_type(db_session, test_user.id) == pytest.approx({"etf": 1600.0})
+        assert RollupService.get_values_by_account(db_session, test_user.id) == \
+               pytest.approx({test_account.id: 1600.0})
+        assert RollupService.get_values_by_bank(db_session, test_user.id) == pytest.approx({test_bank.id: 1600.0})
+
+        # Suppression: l'agrégat vide disparaît
+        db_session.delete(test_asset)
+        db_session.delete(usd)
+        db_session.commit()
+        assert db_session.query(AssetRollup).filter(AssetRollup.owner_id == test_user.id).count() == 0
+        assert RollupService.get_totals(db_session, test_user.id)["asset_count"] == 0
+
+    def test_filters(self, db_session, test_user, test_account, test_bank, test_asset):
+        """Les lectures filtrées par banque ou par compte"""
+        assert RollupService.get_values_by_account(db_session, test_user.id, bank_id=test_bank.id) == \
+               pytest.approx({test_account.id: 1000.0})
+        assert RollupService.get_values_by_account(db_session, test_user.id, bank_id="autre") == {}
+        assert RollupService.get_values_by_type(db_session, test_user.id, account_id=test_account.id) == \
+               pytest.approx({"etf": 1000.0})
+
+    def test_check_and_rebuild(self, db_session, test_user, test_asset):
+        """La vérification détecte un agrégat faussé et la reconstruction le répare"""
+        assert RollupService.check(db_session, test_user.id) == []
+
+        db_session.execute(text("UPDATE asset_rollups SET value_eur = 0 WHERE owner_id = :owner_id"),
+                           {"owner_id": test_user.id})
+        db_session.commit()
+        mismatches = RollupService.check(db_session, test_user.id)
+        assert len(mismatches) == 1
+        assert mismatches[0]["expected"][0] == pytest.approx(1000.0)
+
+        assert RollupService.rebuild(db_session, test_user.id) == 1
+        assert RollupService.check(db_session, test_user.id) == []
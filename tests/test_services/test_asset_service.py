@@ -5,9 +5,11 @@ Tests pour le service de gestion des actifs
 import uuid
 from datetime import datetime
 
+import pytest
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
-from database.models import Asset, User, Account
+from database.models import Asset, User, Account, asset_load_options
 from services.asset_service import AssetService, asset_service
 
 
@@ -215,4 +217,43 @@ class TestAssetService:
 
         assert performance["value"] == -100.0
         assert performance["percent"] == -10.0
-        assert performance["is_positive"] is False
\ No newline at end of file
+        assert performance["is_positive"] is False
+
+    def test_get_assets_load_profiles(self, db_session: Session, test_asset: Asset):
+        """Test des profils de chargement: les colonnes lourdes ne sont chargées que sur demande"""
+        db_session.expunge_all()
+
+        # Profil "list": notes, todo et répartition géographique restent différées
+        assets = asset_service.get_assets(db_session, test_asset.owner_id, profile="list")
+        state = inspect(assets[0])
+        assert {"notes", "todo", "geo_allocation"} <= state.unloaded
+        assert "nom" not in state.unloaded
+
+        # L'accès à une colonne différée la charge à la demande
+        assert assets[0].notes == "Notes de test"
+
+        # Profil "valuation": uniquement les colonnes de calcul
+        db_session.expunge_all()
+        assets = asset_service.get_assets(db_session, test_asset.owner_id, profile="valuation")
+        state = inspect(assets[0])
+        assert "nom" in state.unloaded
+        assert "allocation" not in state.unloaded
+        assert "value_eur" not in state.unloaded
+
+        # Profil "allocation": répartition géographique chargée, textes différés
+        db_session.expunge_all()
+        assets = asset_service.get_assets(db_session, test_asset.owner_id, profile="allocation")
+        state = inspect(assets[0])
+        assert "geo_allocation" not in state.unloaded
+        assert {"notes", "todo"} <= state.unloaded
+
+        # Profil "full": tout est chargé
+        db_session.expunge_all()
+        assets = asset_service.get_assets(db_session, test_asset.owner_id, profile="full")
+        state = inspect(assets[0])
+        assert not {"notes", "todo", "geo_allocation"} & state.unloaded
+        assert assets[0].geo_allocation == {"actions": {"amerique_nord": 100}}
+
+        # Profil inconnu
+        with pytest.raises(ValueError):
+            asset_load_options("unknown")
@@ -4,6 +4,7 @@ Tests pour le service de synchronisation des prix des actifs
 from datetime import datetime, timedelta
 from unittest.mock import patch
 
+import pytest
 from sqlalchemy.orm import Session
 
 from database.models import Asset, User, Account
@@ -96,10 +97,10 @@ class TestAssetSyncService:
         db_session.add(isin_asset)
         db_session.commit()
 
-        # Mock la méthode get_price_by_isin du service de prix
-        with patch('services.price_service.PriceService.get_price_by_isin') as mock_price:
+        # Mock la récupération groupée des prix par ISIN
+        with patch('services.price_service.PriceService.get_prices_by_isins') as mock_price:
             # Configurer le mock pour retourner un prix spécifique
-            mock_price.return_value = 105.75
+            mock_price.return_value = ({"FR0000000001": 105.75}, {})
 
             # Exécuter la synchronisation
             updated_count = asset_sync_service.sync_price_by_isin(db_session, isin_asset.id)
@@ -199,11 +200,11 @@ class TestAssetSyncService:
 
         # Mock tous les services de données externe
         with patch('services.currency_service.CurrencyService.get_exchange_rates') as mock_rates, \
-                patch('services.price_service.PriceService.get_price_by_isin') as mock_isin, \
+                patch('services.price_service.PriceService.get_prices_by_isins') as mock_isin, \
                 patch('services.price_service.PriceService.get_metal_price') as mock_metal:
             # Configurer les mocks
             mock_rates.return_value = {"USD": 0.9, "EUR": 1.0}
-            mock_isin.return_value = 105.0
+            mock_isin.side_effect = lambda isins: ({isin: 105.0 for isin in isins}, {})
             mock_metal.return_value = 1950.0
 
             # Exécuter la synchronisation complète
@@ -220,6 +221,16 @@ class TestAssetSyncService:
             assert result["details"]["isin_prices"] >= 0
             assert result["details"]["metal_prices"] >= 0
 
+            assert result["pending_isins"] == {}
+            assert result["plan"]["isin"]["keys"] == len(mock_isin.call_args.args[0])
+            assert mock_metal.call_count == result["plan"]["metal"]["keys"]
+
+            # Durées des récupérations parallèles
+            timings = result["timings"]
+            assert {"currency_rates", "isin_prices", "metal_gold"} <= set(timings["tasks"])
+            assert timings["sequential_time"] == pytest.approx(sum(timings["tasks"].values()))
+            assert timings["wall_time"] >= 0
+
     def test_sync_error_handling(self, db_session: Session, test_user: User, test_account: Account):
         """Test de gestion des erreurs lors de la synchronisation"""
         # Créer un actif pour le test
@@ -240,7 +251,7 @@ class TestAssetSyncService:
         db_session.commit()
 
         # Mock qui lève une exception
-        with patch('services.price_service.PriceService.get_price_by_isin') as mock_price:
+        with patch('services.price_service.PriceService.get_prices_by_isins') as mock_price:
             mock_price.side_effect = Exception("API Error")
 
             # La synchronisation ne devrait pas échouer malgré l'erreur
@@ -255,3 +266,32 @@ class TestAssetSyncService:
             # Vérifier que le champ sync_error contient le message d'erreur
             assert error_asset.sync_error is not None
             assert "API Error" in error_asset.sync_error
+
+    def test_sync_price_by_isin_batch_errors(self, db_session: Session, test_user: User, test_account: Account):
+        """Une seule récupération groupée; les erreurs restent rapportées actif par actif"""
+        assets = [
+            Asset(id=f"test-batch-asset-{i}", owner_id=test_user.id, account_id=test_account.id,
+                  nom=f"Batch Asset {i}", type_produit="etf", categorie="actions", allocation={"actions": 100},
+                  valeur_actuelle=100.0, prix_de_revient=90.0, devise="EUR", isin=isin)
+            for i, isin in enumerate(["FR0000000010", "FR0000000011", "FR0000000010"])
+        ]
+        db_session.add_all(assets)
+        db_session.commit()
+
+        with patch('services.price_service.PriceService.get_prices_by_isins') as mock_price:
+            mock_price.return_value = (
+                {"FR0000000010": 110.0},
+                {"FR0000000011": "Symbole Yahoo Finance non trouvé pour l'ISIN FR0000000011"}
+            )
+
+            updated_count = asset_sync_service.sync_price_by_isin(db_session)
+
+            assert mock_price.call_count == 1
+            assert updated_count == 2
+
+            for asset in assets:
+                db_session.refresh(asset)
+            assert assets[0].valeur_actuelle == 110.0 and assets[0].sync_error is None
+            assert assets[2].valeur_actuelle == 110.0
+            assert assets[1].valeur_actuelle == 100.0
+            assert "Symbole Yahoo Finance non trouvé" in assets[1].sync_error
@@ -98,6 +98,16 @@ class TestAuthService:
                 "short"
             )
 
+        # Cas 5: Email vide (pas d'index aveugle): jamais recherché avec None
+        for invalid_email in ("", "   "):
+            with pytest.raises(ValidationError):
+                AuthService.create_user(
+                    db_session,
+                    f"validuser_{uuid.uuid4().hex[:8]}",
+                    invalid_email,
+                    "password123"
+                )
+
     def test_authenticate_user(self, db_session: Session, test_user: User, monkeypatch):
         """Test d'authentification d'un utilisateur"""
         # Cas 1: Authentification réussie
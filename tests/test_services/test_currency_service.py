@@ -1,34 +1,18 @@
 """
 Tests pour le service de devises et de conversion monétaire
 """
-import json
-import os
-import time
+from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
 import requests
 
+from database.quote_store import QuoteStore
 from services.currency_service import CurrencyService
 
 
 class TestCurrencyService:
     """Tests pour le service de devises et conversion monétaire"""
 
-    def setup_method(self):
-        """Préparation avant chaque test"""
-        # Créer un fichier de cache temporaire pour les tests
-        self.original_cache_file = CurrencyService.CACHE_FILE
-        CurrencyService.CACHE_FILE = "test_currency_cache.json"
-
-    def teardown_method(self):
-        """Nettoyage après chaque test"""
-        # Supprimer le fichier de cache temporaire
-        if os.path.exists(CurrencyService.CACHE_FILE):
-            os.remove(CurrencyService.CACHE_FILE)
-
-        # Restaurer le chemin du fichier de cache
-        CurrencyService.CACHE_FILE = self.original_cache_file
-
     @patch('services.currency_service.requests.get')
     @patch('services.currency_service.CurrencyService._is_cache_valid')
     @patch('services.currency_service.CurrencyService._load_cache')
@@ -102,21 +86,18 @@ class TestCurrencyService:
         assert rates2["EUR"] == 1.0
 
     @patch('services.currency_service.requests.get')
-    def test_get_exchange_rates_api_error(self, mock_get):
+    def test_get_exchange_rates_api_error(self, mock_get, quote_store):
         """Test de gestion des erreurs d'API"""
         # Simuler une erreur d'API
         mock_get.side_effect = requests.RequestException("Erreur API")
 
-        # Créer d'abord un cache valide
-        with open(CurrencyService.CACHE_FILE, "w") as f:
-            json.dump({
-                "timestamp": time.time(),
-                "rates": {
-                    "USD": 1.10,
-                    "GBP": 0.84,
-                    "EUR": 1.0
-                }
-            }, f)
+        # Créer d'abord un cache expiré
+        quote_store.set_fx_rates({
+            "USD": 1.10,
+            "GBP": 0.84,
+            "EUR": 1.0
+        }, fetched_at=datetime.now() - timedelta(days=1))
+        quote_store.flush()
 
         # Appeler la fonction à tester
         rates = CurrencyService.get_exchange_rates()
@@ -127,7 +108,7 @@ class TestCurrencyService:
         assert rates["USD"] == 1.10
 
         # Supprimons le cache et testons sans cache
-        os.remove(CurrencyService.CACHE_FILE)
+        quote_store.clear()
 
         # Appeler à nouveau
         rates_no_cache = CurrencyService.get_exchange_rates()
@@ -137,19 +118,26 @@ class TestCurrencyService:
         assert "EUR" in rates_no_cache
         assert rates_no_cache["EUR"] == 1.0
 
-    def test_convert_to_eur(self):
+    def test_saved_rates_written_behind(self, quote_store, test_engine):
+        """Les taux récupérés sont servis depuis la mémoire et enregistrés au prochain flush"""
+        CurrencyService._save_cache({"USD": 1.10, "EUR": 1.0})
+
+        assert CurrencyService._load_cache()["USD"] == 1.10
+        assert QuoteStore(test_engine).get_fx_rates() is None
+
+        quote_store.flush()
+        assert QuoteStore(test_engine).get_fx_rates()["USD"] == 1.10
+
+    def test_convert_to_eur(self, quote_store):
         """Test de conversion vers l'euro"""
         # Créer un cache avec des taux connus pour le test
-        with open(CurrencyService.CACHE_FILE, "w") as f:
-            json.dump({
-                "timestamp": time.time(),
-                "rates": {
-                    "USD": 1.10,  # 1 EUR = 1.10 USD, donc 1 USD = 1/1.10 EUR
-                    "GBP": 0.85,  # 1 EUR = 0.85 GBP, donc 1 GBP = 1/0.85 EUR
-                    "JPY": 150.0,  # 1 EUR = 150 JPY, donc 1 JPY = 1/150 EUR
-                    "EUR": 1.0
-                }
-            }, f)
+        quote_store.set_fx_rates({
+            "USD": 1.10,  # 1 EUR = 1.10 USD, donc 1 USD = 1/1.10 EUR
+            "GBP": 0.85,  # 1 EUR = 0.85 GBP, donc 1 GBP = 1/0.85 EUR
+            "JPY": 150.0,  # 1 EUR = 150 JPY, donc 1 JPY = 1/150 EUR
+            "EUR": 1.0
+        })
+        quote_store.flush()
 
         # Tester différentes conversions
         # Pour l'USD: 1 USD = 1/1.10 EUR ≈ 0.909 EUR
@@ -169,12 +157,8 @@ class TestCurrencyService:
 
         # Pour un taux de change 0 (devrait être traité comme 1.0 pour éviter division par 0)
         # Modifions le cache pour simuler un taux à 0
-        with open(CurrencyService.CACHE_FILE, "w") as f:
-            json.dump({
-                "timestamp": time.time(),
-                "rates": {
-                    "ZZZ": 0.0,
-                    "EUR": 1.0
-                }
-            }, f)
+        quote_store.set_fx_rates({
+            "ZZZ": 0.0,
+            "EUR": 1.0
+        })
         assert CurrencyService.convert_to_eur(100.0, "ZZZ") == 100.0
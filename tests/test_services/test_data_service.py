@@ -0,0 +1,59 @@
+"""
+Tests pour le service de données (historique)
+"""
+import uuid
+from datetime import datetime
+
+from database.models import HistoryValue, User
+from services.data_service import DataService
+
+
+class TestDataService:
+    """Tests pour l'historique normalisé"""
+
+    def test_record_history_writes_values(self, db_session, test_user, test_asset):
+        """L'enregistrement d'un point d'historique écrit une valeur par actif, sans doublon"""
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        DataService.record_history_entry(db_session, test_user.id)
+        test_asset.value_eur = 1200.0
+        db_session.commit()
+        DataService.record_history_entry(db_session, test_user.id)
+
+        rows = db_session.query(HistoryValue).filter(HistoryValue.user_id == test_user.id).all()
+        assert [(row.date, row.asset_id, row.value_eur) for row in rows] == [(today, test_asset.id, 1200.0)]
+
+    def test_history_queries(self, db_session, test_user, test_asset):
+        """Séries par actif et par compte, et patrimoine à une date"""
+        db_session.add_all([
+            HistoryValue(user_id=test_user.id, date="2024-01-01", asset_id=test_asset.id, value_eur=900.0),
+            HistoryValue(user_id=test_user.id, date="2024-02-01", asset_id=test_asset.id, value_eur=950.0),
+            HistoryValue(user_id=test_user.id, date="2024-03-01", asset_id=test_asset.id, value_eur=1000.0),
+            HistoryValue(user_id=test_user.id, date="2024-02-01", asset_id="deleted-asset", value_eur=50.0),
+        ])
+        db_session.commit()
+
+        assert DataService.get_asset_history(db_session, test_user.id, test_asset.id, start_date="2024-02-01") == \
+               [("2024-02-01", 950.0), ("2024-03-01", 1000.0)]
+        assert DataService.get_account_history(db_session, test_user.id, test_asset.account_id,
+                                               end_date="2024-02-15") == \
+               [("2024-01-01", 900.0), ("2024-02-01", 950.0)]
+        assert DataService.get_portfolio_as_of(db_session, test_user.id, "2024-02-20") == \
+               {test_asset.id: 950.0, "deleted-asset": 50.0}
+        assert DataService.get_portfolio_as_of(db_session, test_user.id, "2023-12-31") == {}
+
+    def test_history_scoped_per_user(self, db_session, test_user, test_asset):
+        """Le point du jour d'un utilisateur n'écrase pas celui d'un autre"""
+        other = User(id=f"other-{uuid.uuid4().hex[:8]}", username=f"other_{uuid.uuid4().hex[:8]}",
+                     email="other@example.com", password_hash="x", is_active=True)
+        db_session.add(other)
+        db_session.commit()
+
+        mine = DataService.record_history_entry(db_session, test_user.id)
+        theirs = DataService.record_history_entry(db_session, other.id)
+
+        assert mine.id != theirs.id
+        assert mine.owner_id == test_user.id and theirs.owner_id == other.id
+        assert mine.total == 1000.0 and theirs.total == 0.0
+        assert [point.id for point in DataService.get_history(db_session, test_user.id)] == [mine.id]
+        assert DataService.get_history_totals(db_session, other.id, days=5) == [(theirs.date, 0.0)]
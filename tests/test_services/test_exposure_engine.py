@@ -0,0 +1,111 @@
+"""
+Tests pour le moteur d'exposition vectorisé
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from database.exposures import compute_exposure_contributions
+from database.models import Asset
+from services.exposure_engine import ExposureEngine
+from services.visualization_service import VisualizationService
+from utils.read_cache import get_read_cache_stats
+
+
+def _asset(account_id, value_eur, allocation, geo_allocation=None, type_produit="etf", valeur_actuelle=None):
+    """Actif minimal pour le moteur"""
+    return SimpleNamespace(account_id=account_id, type_produit=type_produit, value_eur=value_eur,
+                           valeur_actuelle=valeur_actuelle, allocation=allocation, geo_allocation=geo_allocation)
+
+
+ASSETS = [
+    _asset("acc-1", 1000.0, {"actions": 60, "obligations": 40},
+           {"actions": {"amerique_nord": 50, "japon": 50}, "obligations": {"europe_zone_euro": 100}}),
+    _asset("acc-2", None, {"actions": 100}, {"actions": {"amerique_nord": 100}}, "action", valeur_actuelle=500.0),
+    _asset("acc-2", 200.0, {"cash": 100, "crypto": 0}, None, "livret"),
+    _asset("acc-3", 300.0, {}, None),
+]
+BANK_BY_ACCOUNT = {"acc-1": "bank-1", "acc-2": "bank-2", "acc-3": "bank-2"}
+
+
+class TestExposureEngine:
+    """Tests des répartitions calculées par produits matriciels"""
+
+    def test_matches_per_asset_contributions(self):
+        """Les répartitions du moteur égalent la somme des contributions actif par actif"""
+        engine = ExposureEngine.from_assets(ASSETS, BANK_BY_ACCOUNT)
+
+        expected_categories, expected_zones = {}, {}
+        for asset in ASSETS:
+            contributions = compute_exposure_contributions(
+                asset.value_eur, asset.valeur_actuelle, asset.allocation, asset.geo_allocation)
+            for (category, zone), value in contributions.items():
+                if not value:
+                    continue
+                target, key = (expected_categories, category) if zone == "" else (expected_zones, zone)
+                target[key] = target.get(key, 0.0) + value
+
+        category_values = engine.category_values()
+        assert {k: v for k, v in category_values.items() if v} == pytest.approx(expected_categories)
+        geo_values = engine.geo_values()
+        assert {k: v for k, v in geo_values.items() if v} == pytest.approx(expected_zones)
+        assert engine.total() == pytest.approx(2000.0)
+
+    def test_masked_breakdowns(self):
+        """Filtres banque, compte et catégorie appliqués par masque"""
+        engine = ExposureEngine.from_assets(ASSETS, BANK_BY_ACCOUNT)
+
+        bank_2 = engine.mask(bank_id="bank-2")
+        assert engine.total(bank_2) == pytest.approx(1000.0)
+        assert engine.category_values(bank_2)["actions"] == pytest.approx(500.0)
+
+        # Une catégorie à 0% reste un critère de sélection de l'actif
+        crypto = engine.mask(category="crypto")
+        assert engine.total(crypto) == pytest.approx(200.0)
+
+        actions = engine.mask(category="actions")
+        assert engine.geo_values(actions, "actions")["amerique_nord"] == pytest.approx(800.0)
+        assert engine.geo_values(actions, "actions")["europe_zone_euro"] == 0.0
+
+        assert engine.group_values("account", engine.mask(account_id="acc-2")) == pytest.approx({"acc-2": 700.0})
+        assert engine.group_values("bank", actions) == pytest.approx({"bank-1": 1000.0, "bank-2": 500.0})
+        assert engine.group_values("type") == pytest.approx({"etf": 1300.0, "action": 500.0, "livret": 200.0})
+        with pytest.raises(ValueError):
+            engine.group_values("devise")
+
+    def test_empty_and_unknown_category(self):
+        """Un moteur vide et une catégorie inconnue donnent des répartitions nulles"""
+        engine = ExposureEngine.from_assets([])
+        assert engine.total() == 0.0
+        assert set(engine.category_values().values()) == {0.0}
+        assert engine.group_values("bank") == {}
+
+        engine = ExposureEngine.from_assets(ASSETS, BANK_BY_ACCOUNT)
+        assert not engine.mask(category="inconnue").any()
+        assert set(engine.geo_values(category="inconnue").values()) == {0.0}
+
+    def test_visualization_breakdowns_use_engine(self, db_session, test_user, test_account, test_bank):
+        """Les répartitions du service de visualisation sont calculées par le moteur construit depuis la base"""
+        db_session.add(Asset(
+            id="engine-asset-1", owner_id=test_user.id, account_id=test_account.id, nom="Fonds",
+            type_produit="opcvm", categorie="actions", allocation={"actions": 70, "cash": 30},
+            geo_allocation={"actions": {"amerique_nord": 100}, "cash": {"europe_zone_euro": 100}},
+            valeur_actuelle=2000.0, prix_de_revient=1500.0, devise="EUR", value_eur=2000.0
+        ))
+        db_session.commit()
+
+        engine = VisualizationService.build_exposure_engine(db_session, test_user.id)
+        selected = engine.mask(bank_id=test_bank.id)
+        assert engine.category_values(selected)["actions"] == pytest.approx(1400.0)
+
+        misses = get_read_cache_stats()[VisualizationService.build_exposure_engine.name]["misses"]
+        category_values = VisualizationService.calculate_category_values(db_session, test_user.id, test_account.id)
+        assert {k: v for k, v in category_values.items() if v} == pytest.approx({"actions": 1400.0, "cash": 600.0})
+        geo_values = VisualizationService.calculate_geo_values(db_session, test_user.id)
+        assert {k: v for k, v in geo_values.items() if v} == \
+            pytest.approx({"amerique_nord": 1400.0, "europe_zone_euro": 600.0})
+        assert VisualizationService.calculate_geo_values(
+            db_session, test_user.id, category="cash")["europe_zone_euro"] == pytest.approx(600.0)
+
+        # Un seul moteur construit (allocations déchiffrées une fois) pour les deux répartitions
+        assert get_read_cache_stats()[VisualizationService.build_exposure_engine.name]["misses"] == misses + 1
@@ -0,0 +1,159 @@
+"""
+Tests pour le service de rotation de la clé de chiffrement
+"""
+import secrets
+
+import pytest
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+import config.app_config as app_config
+from database.db_config import decrypt_data, reset_cipher
+from database.key_ring import derive_fernet_key
+from database.models import Base, Bank, User
+from services.key_rotation_service import KeyRotationService
+from utils.exceptions import KeyRotationError
+from utils.key_manager import KeyManager
+
+
+@pytest.fixture
+def key_dir(test_dir, monkeypatch):
+    """Répertoire de clés isolé, utilisé par la configuration et le trousseau de clés"""
+    secret_key = secrets.token_bytes(32)
+    salt = secrets.token_bytes(16)
+    (test_dir / ".key").write_bytes(secret_key)
+    (test_dir / ".salt").write_bytes(salt)
+
+    monkeypatch.setattr(app_config, "_bootstrapped", True)
+    monkeypatch.setattr(app_config, "_secret_keys", None)
+    monkeypatch.setattr(app_config, "DATA_DIR", test_dir)
+    monkeypatch.setattr(app_config, "KEY_BACKUPS_DIR", test_dir / "key_backups")
+    monkeypatch.setattr(app_config, "key_file", test_dir / ".key")
+    monkeypatch.setattr(app_config, "salt_file", test_dir / ".salt")
+    monkeypatch.setattr("database.db_config.cipher", None)
+    reset_cipher()
+    yield test_dir
+    reset_cipher()
+
+
+@pytest.fixture
+def rotation_db(key_dir):
+    """Base contenant des banques chiffrées avec la clé courante"""
+    engine = create_engine(f"sqlite:///{key_dir / 'rotation.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        user = User(id="rotation-user", username="rotation", email="rotation@example.com",
+                    password_hash="x", is_active=True)
+        session.add(user)
+        session.flush()
+        for i in range(23):
+            session.add(Bank(id=f"bank-{i:03d}", owner_id=user.id, nom=f"Banque {i}",
+                             notes=None if i % 2 else f"Notes {i}"))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+def _service(engine, key_dir, **kwargs) -> KeyRotationService:
+    """Crée un service de rotation travaillant dans le répertoire de test"""
+    key_manager = KeyManager(key_dir, key_dir / "key_backups")
+    return KeyRotationService(engine=engine, key_manager=key_manager,
+                              checkpoint_path=key_dir / ".checkpoint.json", **kwargs)
+
+
+def _bank_names(engine):
+    """Lit les noms chiffrés des banques, triés par identifiant"""
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(text("SELECT nom FROM banks ORDER BY id"))]
+
+
+class TestKeyRotationService:
+    """Tests pour le service de rotation de clé"""
+
+    def test_run_without_rotation_raises(self, rotation_db, key_dir):
+        """Le rechiffrement exige une rotation démarrée"""
+        with pytest.raises(KeyRotationError):
+            _service(rotation_db, key_dir).run()
+
+    def test_rotation_resumes_from_checkpoint(self, rotation_db, key_dir):
+        """Une rotation interrompue reprend au dernier segment et se termine avec la nouvelle clé"""
+        secret_key = (key_dir / ".key").read_bytes()
+        old_key = derive_fernet_key(secret_key, (key_dir / ".salt").read_bytes())
+        service = _service(rotation_db, key_dir, chunk_size=5, max_workers=2)
+
+        service.start()
+        new_key = derive_fernet_key(secret_key, (key_dir / ".salt.next").read_bytes())
+
+        # Interruption après trois segments (l'utilisateur, puis deux segments de banques)
+        progress = []
+        report = service.run(progress_callback=lambda r: progress.append(dict(r)), max_chunks=3)
+        assert not report["completed"]
+        assert report["rows_processed"] == 11
+        assert progress[-1]["rows_per_second"] > 0
+        assert progress[-1]["remaining_rows"] == report["remaining_rows"]
+        assert service.load_checkpoint()["tables"]["banks"]["rows_done"] == 10
+
+        # Pendant la rotation, l'application lit les deux clés
+        assert [decrypt_data(value) for value in _bank_names(rotation_db)] == \
+               [f"Banque {i}" for i in range(23)]
+
+        # Reprise jusqu'au bout
+        report = service.run()
+        assert report["completed"]
+        assert report["rows_processed"] == 13
+        assert report["errors"] == 0
+        assert report["version"] == 2
+        assert service.load_checkpoint() is None
+        assert (key_dir / ".salt").read_bytes() != (key_dir / ".salt.previous").read_bytes()
+        assert not (key_dir / ".salt.next").exists()
+
+        names = _bank_names(rotation_db)
+        assert Fernet(new_key).decrypt(names[0].encode()) == b"Banque 0"
+        with pytest.raises(InvalidToken):
+            Fernet(old_key).decrypt(names[-1].encode())
+
+    def test_previous_key_still_readable(self, rotation_db, key_dir):
+        """Une valeur écrite avec l'ancienne clé reste lisible après la rotation"""
+        stale_value = Fernet(derive_fernet_key(
+            (key_dir / ".key").read_bytes(), (key_dir / ".salt").read_bytes())).encrypt(b"ancienne")
+
+        service = _service(rotation_db, key_dir)
+        service.start()
+        assert service.run()["completed"]
+
+        assert decrypt_data(stale_value.decode(), use_cache=False) == "ancienne"
+
+    def test_unreadable_value_left_untouched(self, rotation_db, key_dir):
+        """Une valeur illisible est comptée en erreur sans bloquer la rotation"""
+        foreign = Fernet(Fernet.generate_key()).encrypt(b"autre").decode()
+        with rotation_db.begin() as conn:
+            conn.execute(text("UPDATE banks SET nom = :nom WHERE id = 'bank-005'"), {"nom": foreign})
+
+        service = _service(rotation_db, key_dir, chunk_size=100)
+        service.start()
+        report = service.run()
+
+        assert report["completed"]
+        assert report["errors"] == 1
+        assert foreign in _bank_names(rotation_db)
+
+    def test_concurrent_write_not_overwritten(self, rotation_db, key_dir):
+        """Une ligne modifiée entre la lecture et l'écriture d'un segment n'est pas écrasée"""
+        service = _service(rotation_db, key_dir, chunk_size=100, max_workers=1)
+        service.start()
+        replacement = Fernet(Fernet.generate_key()).encrypt(b"modifiee").decode()
+
+        original_rotate = service._rotate_rows
+
+        def rotate_then_concurrent_write(*args):
+            result = original_rotate(*args)
+            with rotation_db.begin() as conn:
+                conn.execute(text("UPDATE banks SET nom = :nom WHERE id = 'bank-000'"),
+                             {"nom": replacement})
+            return result
+
+        service._rotate_rows = rotate_then_concurrent_write
+        service.run()
+
+        assert _bank_names(rotation_db)[0] == replacement
@@ -0,0 +1,71 @@
+"""
+Tests pour l'instantané de portefeuille partagé entre les pages
+"""
+import pytest
+
+from services.portfolio_snapshot import PortfolioSnapshotService, SNAPSHOT_SESSION_KEY
+
+
+class DictStore(dict):
+    """Stockage de session minimal (get/set)"""
+
+    def set(self, key, value):
+        self[key] = value
+
+
+class TestPortfolioSnapshot:
+    """Tests de l'instantané et de son invalidation par révision"""
+
+    def test_snapshot_reused_until_data_changes(self, db_session, test_user, test_account, test_bank, test_asset,
+                                                test_mixed_asset):
+        """L'instantané de la session est réutilisé puis reconstruit après une écriture"""
+        store = DictStore()
+
+        snapshot = PortfolioSnapshotService.get_snapshot(db_session, test_user.id, store)
+        assert store[SNAPSHOT_SESSION_KEY] is snapshot
+        assert PortfolioSnapshotService.get_snapshot(db_session, test_user.id, store) is snapshot
+        assert snapshot.total_value == pytest.approx(2000.0)
+        assert snapshot.account_counts() == {test_bank.id: 1}
+        assert snapshot.bank_name(test_bank.id) == test_bank.nom
+
+        test_mixed_asset.value_eur = 500.0
+        db_session.commit()
+        rebuilt = PortfolioSnapshotService.get_snapshot(db_session, test_user.id, store)
+        assert rebuilt is not snapshot
+        assert rebuilt.account_values() == pytest.approx({test_account.id: 1500.0})
+        assert [asset.id for asset in rebuilt.top_assets(1)] == [test_asset.id]
+
+    def test_todos_loaded_on_demand(self, db_session, test_user, test_asset, test_mixed_asset):
+        """Les textes chiffrés ne sont pas dans l'instantané; les tâches sont lues une fois à la demande"""
+        test_mixed_asset.todo = "Arbitrer vers les obligations"
+        db_session.commit()
+
+        snapshot = PortfolioSnapshotService.build_snapshot(db_session, test_user.id)
+        assert not hasattr(snapshot.assets_by_id[test_asset.id], "notes")
+
+        todos = snapshot.todos(db_session)
+        assert [(asset.id, todo) for asset, todo in todos] == \
+               [(test_mixed_asset.id, "Arbitrer vers les obligations")]
+        assert snapshot.todos(db_session) is todos
+
+    def test_filter_assets(self, db_session, test_user, test_account, test_bank, test_asset, test_mixed_asset):
+        """Filtres par banque, compte, catégorie et type de produit; recherche par ISIN ou jetons du nom"""
+        snapshot = PortfolioSnapshotService.build_snapshot(db_session, test_user.id)
+
+        def ids(**filters):
+            return sorted(asset.id for asset in snapshot.filter_assets(**filters))
+
+        def search(query):
+            search_ids = PortfolioSnapshotService.search_asset_ids(db_session, test_user.id, query)
+            return ids(search_query=query, search_ids=search_ids)
+
+        both = sorted([test_asset.id, test_mixed_asset.id])
+        assert ids(bank_id=test_bank.id) == both
+        assert ids(bank_id="autre-banque") == []
+        assert ids(category="obligations") == both
+        assert ids(account_id=test_account.id, product_type="opcvm") == [test_mixed_asset.id]
+        assert search("fr0000") == [test_asset.id]
+        assert search("fond mix") == [test_mixed_asset.id]
+        assert search("actif mixte") == []
+        # Les notes ne sont pas indexées
+        assert search("notes") == []
@@ -0,0 +1,75 @@
+"""
+Tests pour les fournisseurs de données de marché
+"""
+import time
+
+import pytest
+
+from services import price_providers
+from services.currency_service import CurrencyService
+from services.price_providers import LocalPriceProvider, YahooPriceProvider, create_provider
+from services.price_service import PriceService
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path):
+    """Répertoire de fixtures: deux cotations, l'or et un taux de change"""
+    (tmp_path / "quotes.csv").write_text(
+        "symbol,price,isin,currency,exchange,name,quote_type\n"
+        "AAA.PA,12.5,FR0000000001,EUR,PAR,Alpha,EQUITY\n"
+        "BBB.AS,40,NL0000000002,EUR,AMS,Beta,ETF\n"
+        "GC=F,2300,,USD,CMX,Or,FUTURE\n",
+        encoding="utf-8"
+    )
+    (tmp_path / "fx_rates.json").write_text('{"USD": 1.1}', encoding="utf-8")
+    return tmp_path
+
+
+class TestLocalPriceProvider:
+    """Tests du rejeu de fixtures, de la latence et de l'injection d'erreurs"""
+
+    def test_replays_fixtures(self, fixtures_dir):
+        """Cotations, recherche, métaux et taux de change lus depuis le répertoire ou le CSV"""
+        provider = LocalPriceProvider(fixtures=str(fixtures_dir))
+        assert provider.get_symbol_info("AAA.PA")["regularMarketPrice"] == 12.5
+        assert provider.get_symbol_info("ZZZ.PA") == {}
+        assert provider.get_closes(["AAA.PA", "BBB.AS", "ZZZ.PA"]) == {"AAA.PA": 12.5, "BBB.AS": 40.0}
+        assert provider.search_symbols("nl0000000002") == ["BBB.AS"]
+        assert provider.get_metal_price("gold") == 2300.0
+        assert provider.get_fx_rates() == {"EUR": 1.0, "USD": 1.1}
+        assert provider.calls == 6
+
+        csv_only = LocalPriceProvider(fixtures=str(fixtures_dir / "quotes.csv"))
+        assert csv_only.get_price("BBB.AS") == 40.0
+        assert csv_only.get_fx_rates() == {"EUR": 1.0}
+
+    def test_latency_and_deterministic_errors(self):
+        """La latence s'applique à chaque appel; les mêmes clés échouent d'une exécution à l'autre"""
+        quotes = [{"symbol": f"S{i}.PA", "price": 1.0} for i in range(200)]
+        provider = LocalPriceProvider(quotes=quotes, error_rate=0.25, seed=7)
+        failing = {quote["symbol"] for quote in quotes if provider.fails(quote["symbol"])}
+        assert 25 < len(failing) < 75
+        assert failing == {q["symbol"] for q in quotes if LocalPriceProvider(error_rate=0.25, seed=7).fails(q["symbol"])}
+        assert set(provider.get_closes([quote["symbol"] for quote in quotes])) == \
+            {quote["symbol"] for quote in quotes} - failing
+        with pytest.raises(TimeoutError):
+            provider.get_symbol_info(sorted(failing)[0])
+
+        slow = LocalPriceProvider(quotes=quotes, latency=0.05)
+        start = time.monotonic()
+        slow.get_price("S1.PA")
+        assert time.monotonic() - start >= 0.05
+
+    def test_services_use_active_provider(self, fixtures_dir, monkeypatch):
+        """PriceService et CurrencyService interrogent le fournisseur actif, sans réseau"""
+        monkeypatch.setattr(price_providers, "_provider", LocalPriceProvider(fixtures=str(fixtures_dir)))
+
+        prices, errors = PriceService.get_prices_by_isins(["FR0000000001", "NL0000000002", "XX0000000003"])
+        assert prices == {"FR0000000001": 12.5, "NL0000000002": 40.0}
+        assert set(errors) == {"XX0000000003"}
+        assert PriceService.get_metal_price("gold") == 2300.0
+        assert CurrencyService.get_exchange_rates()["USD"] == 1.1
+
+        assert isinstance(create_provider("yahoo"), YahooPriceProvider)
+        with pytest.raises(ValueError):
+            create_provider("inconnu")
@@ -0,0 +1,179 @@
+"""
+Tests pour le service de récupération des prix
+"""
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from config.app_config import EXCHANGE_SUFFIXES
+from database.quote_store import QuoteStore
+from services.price_service import PriceService
+from utils import fetch_executor
+
+
+def _quotes_frame(closes):
+    """Résultat de yf.download(group_by="ticker") pour des cours de clôture donnés"""
+    index = pd.date_range("2025-06-10", periods=2, freq="D")
+    columns = pd.MultiIndex.from_product([list(closes), ["Open", "Close"]])
+    data = [[value for close in closes.values() for value in (close[i], close[i])] for i in range(2)]
+    return pd.DataFrame(data, index=index, columns=columns)
+
+
+class TestPriceService:
+    """Tests de la récupération groupée des prix par ISIN"""
+
+    def test_batch_prices_use_cache_and_grouped_download(self, quote_store, test_engine):
+        """Cache valide lu directement, une requête groupée pour les autres, erreurs par ISIN"""
+        quote_store.set_quote("FR0000000001", 50.0, symbol="AAA.PA")
+        quote_store.set_quote("FR0000000002", 10.0, fetched_at=datetime.now() - timedelta(days=2))
+        quote_store.flush()
+        symbols = {"FR0000000002": "BBB.PA", "FR0000000003": "CCC.PA", "FR0000000004": "DDD.PA"}
+
+        with patch.object(PriceService, "_get_yahoo_symbol_for_isin", side_effect=symbols.get), \
+                patch("services.price_providers.yf.download") as mock_download, \
+                patch.object(PriceService, "_fetch_ticker_price", return_value=None) as mock_single:
+            mock_download.return_value = _quotes_frame({"BBB.PA": [11.0, 12.0], "CCC.PA": [20.0, float("nan")]})
+
+            prices, errors = PriceService.get_prices_by_isins(
+                ["FR0000000001", "FR0000000002", "FR0000000003", "FR0000000004", "FR0000000005", "FR0000000002"]
+            )
+
+        assert mock_download.call_count == 1
+        assert sorted(mock_download.call_args[0][0]) == ["BBB.PA", "CCC.PA", "DDD.PA"]
+        # Seul le symbole absent du lot est interrogé individuellement
+        mock_single.assert_called_once_with("DDD.PA")
+
+        assert prices == {"FR0000000001": 50.0, "FR0000000002": 12.0, "FR0000000003": 20.0}
+        assert set(errors) == {"FR0000000004", "FR0000000005"}
+        assert "Symbole Yahoo Finance non trouvé" in errors["FR0000000005"]
+
+        # Prix servis depuis la mémoire; base écrite une seule fois, à l'enregistrement
+        other_process = QuoteStore(test_engine)
+        assert other_process.get_quote("FR0000000002")["price"] == 10.0
+        assert PriceService.get_prices_by_isins(["FR0000000003"]) == ({"FR0000000003": 20.0}, {})
+        assert PriceService.flush_caches() == 2
+        assert PriceService.flush_caches() == 0
+
+        other_process.clear_memory()
+        assert other_process.get_quote("FR0000000002", max_age=3600)["price"] == 12.0
+        assert other_process.get_quote("FR0000000003")["symbol"] == "CCC.PA"
+
+    def test_batch_failure_falls_back_to_cached_price(self, quote_store):
+        """Une erreur réseau conserve le dernier prix connu, sinon l'erreur est rapportée"""
+        quote_store.set_quote("FR0000000002", 10.0, fetched_at=datetime.now() - timedelta(days=2))
+        quote_store.flush()
+        quote_store.clear_memory()
+
+        with patch.object(PriceService, "_get_yahoo_symbol_for_isin", side_effect=lambda isin: isin + ".PA"), \
+                patch("services.price_providers.yf.download", side_effect=Exception("timeout")), \
+                patch.object(PriceService, "_fetch_ticker_price", side_effect=Exception("timeout")):
+            prices, errors = PriceService.get_prices_by_isins(["FR0000000002", "FR0000000003"])
+
+        assert prices == {"FR0000000002": 10.0}
+        assert errors == {"FR0000000003": "timeout"}
+
+    def test_symbol_resolutions_run_one_at_a_time(self, quote_store):
+        """Une résolution à la fois (pas de pools imbriqués); un délai dépassé est rapporté comme tel"""
+        running, overlaps = [], []
+
+        def resolve(isin):
+            running.append(isin)
+            overlaps.append(len(running))
+            time.sleep(0.05)
+            running.remove(isin)
+            if isin == "FR0000000002":
+                raise TimeoutError("Limite de débit atteinte pour yahoo_quote")
+            return isin + ".PA"
+
+        with patch.object(PriceService, "_get_yahoo_symbol_for_isin", side_effect=resolve), \
+                patch.object(PriceService, "_download_quotes", side_effect=lambda symbols: {s: 10.0 for s in symbols}):
+            prices, errors = PriceService.get_prices_by_isins(["FR0000000001", "FR0000000002", "FR0000000003"])
+
+        assert max(overlaps) == 1
+        assert set(prices) == {"FR0000000001", "FR0000000003"}
+        assert "Délai dépassé" in errors["FR0000000002"]
+
+    def test_unresolvable_isin_is_not_probed_again(self, quote_store):
+        """Un ISIN sans symbole est sondé une fois, puis signalé en attente sans appel réseau"""
+        with patch("services.price_providers.yf.Ticker") as mock_ticker, \
+                patch("services.price_providers.requests.get") as mock_search, \
+                patch("services.price_providers.yf.download") as mock_download:
+            mock_ticker.return_value.info = {}
+            mock_search.return_value.status_code = 200
+            mock_search.return_value.json.return_value = {"quotes": []}
+
+            prices, errors = PriceService.get_prices_by_isins(["XX0000000001"])
+            assert prices == {} and "non trouvé" in errors["XX0000000001"]
+            probes = mock_ticker.call_count
+            assert probes > 1 and mock_search.call_count == 1
+
+            prices, errors = PriceService.get_prices_by_isins(["XX0000000001"])
+            assert "nouvelle tentative" in errors["XX0000000001"]
+            assert mock_ticker.call_count == probes and mock_search.call_count == 1
+            mock_download.assert_not_called()
+
+        assert set(PriceService.get_pending_isins(["XX0000000001", "FR0000000001"])) == {"XX0000000001"}
+        assert PriceService.get_resolution_attempts("XX0000000001")[0]["symbol"] is None
+
+    def test_network_failure_does_not_back_off(self, quote_store):
+        """Des sondages sans réponse laissent l'ISIN sans délai d'attente et sont rapportés en délai dépassé"""
+        with patch("services.price_providers.yf.Ticker", side_effect=TimeoutError("Limite de débit atteinte")), \
+                patch("services.price_providers.requests.get") as mock_search:
+            mock_search.return_value.status_code = 200
+            mock_search.return_value.json.return_value = {"quotes": []}
+
+            prices, errors = PriceService.get_prices_by_isins(["FR0000000003"])
+
+        assert prices == {} and "Délai dépassé" in errors["FR0000000003"]
+        assert quote_store.get_resolution_backoff("FR0000000003") is None
+        assert PriceService.get_resolution_attempts("FR0000000003") == []
+
+    def test_symbol_resolution_probes_exchanges_in_parallel(self, quote_store, monkeypatch):
+        """Places classées selon les symboles connus du pays, sondées en parallèle jusqu'au premier trouvé"""
+        monkeypatch.setattr(fetch_executor, "_buckets", {})
+        quote_store.set_symbol("DE0000000001", "AAA.MI")
+        quote_store.set_symbol("DE0000000002", "BBB.MI")
+        assert PriceService._rank_exchanges("DE0000000003")[:2] == [".MI", ".DE"]
+        assert PriceService._rank_exchanges("FR0000000001")[:2] == [".PA", ""]
+
+        def ticker(symbol):
+            time.sleep(0.2)
+            return MagicMock(info={"regularMarketPrice": 10.0} if symbol == "FR0000000001.DE" else {})
+
+        with patch("services.price_providers.yf.Ticker", side_effect=ticker) as mock_ticker, \
+                patch("services.price_providers.requests.get") as mock_search:
+            mock_search.return_value.status_code = 200
+            mock_search.return_value.json.return_value = {"quotes": []}
+
+            start = time.monotonic()
+            assert PriceService._get_yahoo_symbol_for_isin("FR0000000001") == "FR0000000001.DE"
+            assert time.monotonic() - start < 1.0
+
+        assert mock_ticker.call_count < len(EXCHANGE_SUFFIXES)
+        assert quote_store.get_symbol("FR0000000001") == "FR0000000001.DE"
+
+    def test_symbol_resolution_uses_reference_first(self, quote_store, instrument_reference):
+        """Un ISIN du référentiel local est résolu sans requête; une résolution réussie le complète"""
+        instrument_reference.upsert([{"isin": "FR0000120271", "symbol": "TTE.PA"}])
+
+        def ticker(symbol):
+            info = {"regularMarketPrice": 10.0, "currency": "EUR", "longName": "Exemple"} \
+                if symbol == "FR0000000001.PA" else {}
+            return MagicMock(info=info)
+
+        with patch("services.price_providers.yf.Ticker", side_effect=ticker) as mock_ticker, \
+                patch("services.price_providers.requests.get") as mock_search:
+            mock_search.return_value.status_code = 200
+            mock_search.return_value.json.return_value = {"quotes": []}
+
+            assert PriceService._get_yahoo_symbol_for_isin("FR0000120271") == "TTE.PA"
+            mock_ticker.assert_not_called()
+
+            assert PriceService._get_yahoo_symbol_for_isin("FR0000000001") == "FR0000000001.PA"
+
+        instrument = instrument_reference.lookup("FR0000000001")
+        assert instrument["symbol"] == "FR0000000001.PA" and instrument["name"] == "Exemple"
+        assert [i["isin"] for i in PriceService.search_instruments("FR0000")] == ["FR0000000001", "FR0000120271"]
+
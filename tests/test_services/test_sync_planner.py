@@ -0,0 +1,143 @@
+"""
+Tests pour la planification de la synchronisation
+"""
+from unittest.mock import patch
+
+from sqlalchemy.orm import Session
+
+from database.models import Asset, User, Account
+from database.quote_store import quote_store
+from services.asset_sync_service import asset_sync_service
+from services.sync_planner import SyncPlanner
+
+
+class TestSyncPlanner:
+    """Tests pour le regroupement des actifs par clé de synchronisation"""
+
+    def test_plan_groups_assets_by_unique_key(self, db_session: Session, test_user: User, test_account: Account):
+        """Chaque ISIN, métal et devise n'apparaît qu'une fois, avec tous ses actifs"""
+        db_session.add_all([
+            Asset(
+                id="plan-isin-1",
+                owner_id=test_user.id,
+                account_id=test_account.id,
+                nom="ETF Monde",
+                type_produit="etf",
+                categorie="actions",
+                allocation={"actions": 100},
+                valeur_actuelle=100.0,
+                devise="EUR",
+                isin="FR0000000101"
+            ),
+            Asset(
+                id="plan-isin-2",
+                owner_id=test_user.id,
+                account_id=test_account.id,
+                nom="ETF Monde",
+                type_produit="etf",
+                categorie="actions",
+                allocation={"actions": 100},
+                valeur_actuelle=100.0,
+                devise="USD",
+                isin="FR0000000101"
+            ),
+            Asset(
+                id="plan-isin-3",
+                owner_id=test_user.id,
+                account_id=test_account.id,
+                nom="ETF Europe",
+                type_produit="etf",
+                categorie="actions",
+                allocation={"actions": 100},
+                valeur_actuelle=100.0,
+                devise="EUR",
+                isin="FR0000000102"
+            ),
+            Asset(
+                id="plan-gold-1",
+                owner_id=test_user.id,
+                account_id=test_account.id,
+                nom="Lingot or",
+                type_produit="metal",
+                categorie="metaux",
+                allocation={"metaux": 100},
+                valeur_actuelle=0.0,
+                devise="EUR",
+                ounces=1.0
+            ),
+            Asset(
+                id="plan-silver-1",
+                owner_id=test_user.id,
+                account_id=test_account.id,
+                nom="Pièces argent",
+                type_produit="metal",
+                categorie="metaux",
+                allocation={"metaux": 100},
+                valeur_actuelle=0.0,
+                devise="EUR",
+                ounces=10.0
+            ),
+            Asset(
+                id="plan-silver-2",
+                owner_id=test_user.id,
+                account_id=test_account.id,
+                nom="Pièces argent",
+                type_produit="metal",
+                categorie="metaux",
+                allocation={"metaux": 100},
+                valeur_actuelle=0.0,
+                devise="EUR",
+                ounces=5.0
+            )
+        ])
+        db_session.commit()
+        quote_store.set_quote("FR0000000101", 50.0, symbol="TEST.PA")
+
+        plan = SyncPlanner.build(db_session)
+
+        assert plan.assets["isin"]["FR0000000101"] == ["plan-isin-1", "plan-isin-2"]
+        assert "plan-isin-2" in plan.assets["currency"]["USD"]
+        assert {"plan-silver-1", "plan-silver-2"} <= set(plan.assets["metal"]["silver"])
+        assert plan.metal_types["plan-gold-1"] == "gold"
+        assert "FR0000000101" in plan.cache_hits["isin"]
+        assert "FR0000000102" in plan.fetches["isin"]
+
+        summary = plan.summary()
+        assert summary["isin"]["keys"] == len(plan.assets["isin"])
+        assert summary["isin"]["cache_hits"] + summary["isin"]["fetches"] + summary["isin"]["pending"] \
+            == summary["isin"]["keys"]
+
+        # Types de métal retrouvés par index aveugle du nom, sans déchiffrement
+        assert SyncPlanner.build(db_session).decrypted_names == 0
+
+    def test_metal_price_fetched_once_per_type(self, db_session: Session, test_user: User, test_account: Account):
+        """Le prix d'un métal est récupéré une fois, quel que soit le nombre d'actifs"""
+        db_session.add_all([
+            Asset(
+                id=f"plan-platinum-{i}",
+                owner_id=test_user.id,
+                account_id=test_account.id,
+                nom=f"Platine {i}",
+                type_produit="metal",
+                categorie="metaux",
+                allocation={"metaux": 100},
+                valeur_actuelle=0.0,
+                devise="EUR",
+                ounces=1.0 + i
+            )
+            for i in range(3)
+        ])
+        db_session.commit()
+
+        with patch('services.price_service.PriceService.get_metal_price') as mock_price:
+            mock_price.return_value = 1000.0
+
+            asset_sync_service.sync_metal_prices(db_session)
+
+            metal_types = [call.args[0] for call in mock_price.call_args_list]
+            assert metal_types.count("platinum") == 1
+            assert len(metal_types) == len(set(metal_types))
+
+        asset = db_session.get(Asset, "plan-platinum-2")
+        db_session.refresh(asset)
+        assert asset.valeur_actuelle == 3000.0
@@ -273,7 +273,7 @@ class TestVisualizationService:
         assert fig is None, "Avec des données vides, le résultat devrait être None"
 
     @patch('services.visualization_service.datetime')
-    def test_create_time_series_chart(self, mock_datetime, db_session: Session):
+    def test_create_time_series_chart(self, mock_datetime, db_session: Session, test_user):
         """Test de création d'un graphique d'évolution temporelle"""
         # Créer des points d'historique pour le test
         from database.models import HistoryPoint
@@ -285,6 +285,7 @@ class TestVisualizationService:
         history_points = [
             HistoryPoint(
                 id=f"history-{i}",
+                owner_id=test_user.id,
                 date=f"2023-0{i + 1}-01",  # 2023-01-01, 2023-02-01, etc.
                 assets={"asset1": 1000 * (1 + i * 0.05), "asset2": 2000 * (1 + i * 0.03)},
                 total=1000 * (1 + i * 0.05) + 2000 * (1 + i * 0.03)
@@ -296,20 +297,23 @@ class TestVisualizationService:
         db_session.commit()
 
         # Créer le graphique
-        fig = VisualizationService.create_time_series_chart(db_session, "Évolution du patrimoine")
+        fig = VisualizationService.create_time_series_chart(db_session, test_user.id, "Évolution du patrimoine")
 
         # Vérifier que le graphique a été créé
         assert fig is not None, "Le graphique d'évolution n'a pas été créé"
 
         # Tester avec limitation de période
-        fig_limited = VisualizationService.create_time_series_chart(db_session, "Évolution récente", days=3)
+        fig_limited = VisualizationService.create_time_series_chart(db_session, test_user.id, "Évolution récente", days=3)
         assert fig_limited is not None, "Le graphique limité n'a pas été créé"
 
+        # L'historique est propre à chaque utilisateur
+        assert VisualizationService.create_time_series_chart(db_session, "autre-utilisateur") is None
+
         # Tester cas limites
         # Supprimer les données historiques
         db_session.query(HistoryPoint).delete()
         db_session.commit()
 
         # Tester avec une base vide
-        fig_empty = VisualizationService.create_time_series_chart(db_session)
+        fig_empty = VisualizationService.create_time_series_chart(db_session, test_user.id)
         assert fig_empty is None, "Avec des données vides, le résultat devrait être None"
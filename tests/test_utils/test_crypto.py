@@ -0,0 +1,93 @@
+"""
+Tests pour les types chiffrés et le déchiffrement par lots
+"""
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+from database.db_config import decrypt_data_batch
+from sqlalchemy.orm import joinedload
+
+from database.models import Asset, Account, Bank
+from utils.crypto import load_decrypted, PendingDecryption
+
+
+class TestLoadDecrypted:
+    """Tests du chargement des résultats avec déchiffrement par lots"""
+
+    def test_load_decrypted_entities(self, db_session, test_asset):
+        """Les entités et leurs relations jointes sont entièrement déchiffrées"""
+        db_session.expunge_all()
+
+        query = db_session.query(Asset).options(
+            joinedload(Asset.account).joinedload(Account.bank)
+        ).filter(Asset.id == test_asset.id)
+        assets = load_decrypted(query)
+
+        assert len(assets) == 1
+        asset = assets[0]
+        assert asset.nom == "Actif Test"
+        assert asset.allocation["actions"] == 100
+        assert asset.geo_allocation == {"actions": {"amerique_nord": 100}}
+        assert asset.account.libelle == "Compte Test"
+        assert asset.account.bank.nom == "Banque Test"
+        # Les valeurs chargées sont propres: aucune modification en attente
+        assert not db_session.dirty
+
+    def test_load_decrypted_uses_batch(self, db_session, test_asset):
+        """Les valeurs sont déchiffrées en une seule passe et non ligne par ligne"""
+        db_session.expunge_all()
+
+        with patch('utils.crypto.decrypt_data_batch', wraps=decrypt_data_batch) as batch:
+            load_decrypted(db_session.query(Asset).filter(Asset.id == test_asset.id))
+
+        batch.assert_called_once()
+
+    def test_load_decrypted_columns(self, db_session, test_bank):
+        """Les colonnes chiffrées sélectionnées individuellement sont déchiffrées"""
+        rows = load_decrypted(db_session.query(Bank.id, Bank.nom).filter(Bank.id == test_bank.id))
+
+        assert rows == [(test_bank.id, "Banque Test")]
+        assert rows[0].nom == "Banque Test"
+        assert rows[0]._mapping["id"] == test_bank.id
+
+    def test_load_decrypted_no_pending_left(self, db_session, test_asset):
+        """Aucune valeur en attente ne subsiste après le chargement, même en mode normal"""
+        db_session.expunge_all()
+        load_decrypted(db_session.query(Asset))
+
+        for instance in db_session.identity_map.values():
+            for value in vars(instance).values():
+                assert not isinstance(value, PendingDecryption)
+
+        # Hors de load_decrypted, le déchiffrement reste immédiat
+        db_session.expunge_all()
+        asset = db_session.query(Asset).filter(Asset.id == test_asset.id).one()
+        assert asset.nom == "Actif Test"
+
+    def test_load_decrypted_failure_discards_pending(self, db_session, test_user, test_asset, test_mixed_asset):
+        """Un chargement échoué ne déchiffre rien et ne laisse aucune valeur en attente"""
+        owner_id = test_user.id
+        db_session.expunge_all()
+
+        loaded = []
+
+        def fail_on_second_load(target, context):
+            loaded.append(target)
+            if len(loaded) > 1:
+                raise RuntimeError("échec du chargement")
+
+        event.listen(Asset, "load", fail_on_second_load)
+        try:
+            with patch("utils.crypto._decrypt_pending") as decrypt, pytest.raises(RuntimeError):
+                load_decrypted(db_session.query(Asset).filter(Asset.owner_id == owner_id))
+        finally:
+            event.remove(Asset, "load", fail_on_second_load)
+
+        decrypt.assert_not_called()
+        for instance in loaded:
+            for value in vars(instance).values():
+                assert not isinstance(value, PendingDecryption)
+        # Les attributs expirés sont rechargés (et déchiffrés) au prochain accès
+        assert loaded[0].nom in {"Actif Test", "Fonds mixte"}
@@ -0,0 +1,88 @@
+"""
+Tests pour l'exécution concurrente des récupérations réseau
+"""
+import threading
+import time
+from concurrent.futures import CancelledError
+
+from utils.fetch_executor import FetchExecutor, TokenBucket
+
+
+class TestTokenBucket:
+    """Tests du seau à jetons"""
+
+    def test_burst_then_rate_limited(self):
+        """La rafale est servie immédiatement, puis le débit est limité"""
+        bucket = TokenBucket(rate=20, capacity=2)
+        assert bucket.acquire(timeout=0)
+        assert bucket.acquire(timeout=0)
+        assert not bucket.acquire(timeout=0)
+
+        start = time.monotonic()
+        assert bucket.acquire(timeout=1)
+        assert time.monotonic() - start >= 0.03
+
+
+class TestFetchExecutor:
+    """Tests du pool de récupérations"""
+
+    def test_run_in_parallel(self):
+        """Les tâches s'exécutent en parallèle; les exceptions sont retournées par clé"""
+        def slow(value):
+            time.sleep(0.2)
+            if value == "error":
+                raise ValueError(value)
+            return value.upper()
+
+        start = time.monotonic()
+        results = FetchExecutor(max_workers=4).map(slow, ["a", "b", "c", "error", "a"])
+        assert time.monotonic() - start < 0.6
+
+        assert results["a"] == "A" and results["c"] == "C"
+        assert isinstance(results["error"], ValueError)
+
+    def test_timeout_and_cancellation(self):
+        """Une tâche trop longue est rapportée en TimeoutError; cancel() annule les tâches non démarrées"""
+        release = threading.Event()
+        results = FetchExecutor(max_workers=2, timeout=0.1).run({
+            "fast": lambda: 1,
+            "slow": lambda: release.wait(5),
+        })
+        release.set()
+        assert results["fast"] == 1
+        assert isinstance(results["slow"], TimeoutError)
+
+        executor = FetchExecutor(max_workers=2, timeout=None)
+        started = []
+
+        def task(name):
+            started.append(name)
+            if name == "first":
+                executor.cancel()
+            time.sleep(0.05)
+            return name
+
+        results = executor.run({name: (lambda name=name: task(name)) for name in ["first", "second", "third", "fourth"]})
+        assert results["first"] == "first"
+        assert "fourth" not in started
+        assert isinstance(results["fourth"], CancelledError)
+
+    def test_run_until_first_success(self):
+        """Le premier résultat satisfaisant arrête l'exécution; les autres tâches sont annulées"""
+        def probe(delay, result):
+            time.sleep(delay)
+            return result
+
+        start = time.monotonic()
+        results = FetchExecutor(max_workers=3).run({
+            "slow": lambda: probe(1, "slow"),
+            "miss": lambda: probe(0, None),
+            "hit": lambda: probe(0.1, "hit"),
+            "queued": lambda: probe(0.3, "queued"),
+        }, until=lambda result: result is not None)
+        assert time.monotonic() - start < 0.5
+
+        assert results["hit"] == "hit" and results["miss"] is None
+        assert isinstance(results["slow"], CancelledError)
+        assert isinstance(results["queued"], CancelledError)
+
@@ -0,0 +1,58 @@
+"""
+Tests pour le cache LRU borné
+"""
+from utils.lru_cache import LRUCache
+
+
+class TestLRUCache:
+    """Tests pour le cache LRU"""
+
+    def test_get_put_and_stats(self):
+        """Test des succès/échecs et du taux de succès"""
+        cache = LRUCache(2)
+
+        assert cache.get("a") is None
+        cache.put("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_eviction_order(self):
+        """L'entrée la moins récemment utilisée est évincée en premier"""
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        # "a" devient la plus récente
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_disabled_cache(self):
+        """Un cache de taille 0 ne conserve rien"""
+        cache = LRUCache(0)
+        cache.put("a", 1)
+
+        assert len(cache) == 0
+        assert cache.get("a", "default") == "default"
+
+    def test_clear(self):
+        """Test du vidage du cache et de la remise à zéro des compteurs"""
+        cache = LRUCache(4)
+        cache.put("a", 1)
+        cache.get("a")
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 1
+
+        cache.clear(reset_stats=True)
+        assert cache.stats()["hits"] == 0
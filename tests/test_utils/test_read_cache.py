@@ -0,0 +1,114 @@
+"""
+Tests pour la mémoïsation des lectures de services
+"""
+import uuid
+from unittest.mock import MagicMock
+
+from sqlalchemy import inspect
+
+from database.models import Asset, Bank
+from services.template_service import TemplateService
+from utils.read_cache import cached_read, get_read_cache_stats, invalidate_cached_reads
+
+
+def _make_reader(**options):
+    """Crée une lecture mémoïsée comptant ses exécutions"""
+    calls = []
+
+    @cached_read(**options)
+    def read_banks(db, user_id, prefix=None):
+        calls.append(user_id)
+        return [bank for bank in db.query(Bank).filter(Bank.owner_id == user_id).all()
+                if not prefix or bank.nom.startswith(prefix)]
+
+    return read_banks, calls
+
+
+class TestReadCache:
+    """Tests du cache indexé par utilisateur et révision"""
+
+    def test_cached_until_revision_changes(self, db_session, test_user, test_bank):
+        """Une lecture répétée est servie par le cache jusqu'à la prochaine écriture validée"""
+        read_banks, calls = _make_reader()
+
+        first = read_banks(db_session, test_user.id)
+        second = read_banks(db_session, test_user.id)
+        assert len(calls) == 1
+        assert [bank.nom for bank in second] == [test_bank.nom]
+        assert first is not second  # copie de l'entrée en cache
+
+        # Objets détachés et copiés à chaque appel: indépendants de la session et des autres appelants
+        assert inspect(second[0]).detached
+        assert second[0] is not first[0]
+        assert second[0] is not db_session.get(Bank, test_bank.id)
+        second[0].nom = "Modifiée localement"
+        assert read_banks(db_session, test_user.id)[0].nom == test_bank.nom
+
+        read_banks(db_session, test_user.id, prefix="Autre")
+        assert len(calls) == 2
+
+        test_bank.notes = "Modifiée"
+        db_session.commit()
+        read_banks(db_session, test_user.id)
+        assert len(calls) == 3
+
+        stats = get_read_cache_stats()[read_banks.name]
+        assert stats["hits"] == 2
+        assert stats["misses"] == 3
+
+    def test_ttl_eviction_and_invalidation(self, db_session, test_user, test_bank):
+        """Expiration, éviction LRU et invalidation explicite"""
+        read_banks, calls = _make_reader(ttl=0)
+        read_banks(db_session, test_user.id)
+        read_banks(db_session, test_user.id)
+        assert len(calls) == 2
+        assert get_read_cache_stats()[read_banks.name]["expirations"] == 1
+
+        read_banks, calls = _make_reader(max_entries=1)
+        read_banks(db_session, test_user.id, prefix="A")
+        read_banks(db_session, test_user.id, prefix="B")
+        assert get_read_cache_stats()[read_banks.name]["evictions"] == 1
+
+        invalidate_cached_reads(test_user.id)
+        read_banks(db_session, test_user.id, prefix="B")
+        assert len(calls) == 3
+
+    def test_bypass_without_real_session(self, db_session, test_user):
+        """Sessions simulées et modifications en attente ne passent pas par le cache"""
+        read_banks, calls = _make_reader()
+        mock_db = MagicMock()
+        read_banks(mock_db, test_user.id)
+        read_banks(mock_db, test_user.id)
+        assert len(calls) == 2
+
+        db_session.add(Bank(id=f"pending-{uuid.uuid4().hex[:8]}", owner_id=test_user.id, nom="En attente"))
+        read_banks(db_session, test_user.id)
+        assert len(calls) == 3
+        assert get_read_cache_stats()[read_banks.name]["bypasses"] == 3
+        db_session.rollback()
+
+    def test_cached_templates_are_readable_detached(self, db_session, test_user, test_account):
+        """Les modèles en cache restent lisibles une fois détachés (répartition géographique incluse)"""
+        db_session.add(Asset(
+            id=f"template-{uuid.uuid4().hex[:8]}", owner_id=test_user.id, account_id=test_account.id,
+            nom="Modèle", type_produit="etf", categorie="actions", allocation={"actions": 100},
+            geo_allocation={"actions": {"monde": 100}}, valeur_actuelle=100.0, prix_de_revient=100.0,
+            devise="EUR", is_template=True, template_name="Monde"
+        ))
+        db_session.commit()
+
+        templates = TemplateService.get_templates(db_session, test_user.id)
+        cached = TemplateService.get_templates(db_session, test_user.id)[0]
+        assert cached is not templates[0]
+        assert templates[0].geo_allocation == {"actions": {"monde": 100}}
+
+        # Les valeurs mutables ne sont pas partagées entre appels
+        cached.geo_allocation["actions"]["monde"] = 0
+        assert TemplateService.get_templates(db_session, test_user.id)[0].geo_allocation == \
+               {"actions": {"monde": 100}}
+
+        # Rattachement d'une copie pour modification
+        template = db_session.merge(templates[0], load=False)
+        template.template_name = "Monde (modifié)"
+        db_session.commit()
+        assert TemplateService.get_templates(db_session, test_user.id)[0].template_name == "Monde (modifié)"
@@ -0,0 +1,89 @@
+"""
+Tests du démarrage: imports sans effet de bord et budget de temps d'import
+"""
+import json
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from cryptography.fernet import Fernet
+
+import database.db_config as db_config
+from utils.exceptions import KeyVerificationError
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Budget de temps d'import par module (secondes, mesuré dans un processus neuf)
+IMPORT_TIME_BUDGETS = {
+    "config.app_config": 0.5,
+    "database.db_config": 1.5,
+    "database.models": 2.0,
+    "main": 6.0,
+    "manual_integrity_check": 3.0,
+    "scheduled_backup": 3.0,
+    "fixtures": 4.0,
+    "tests.conftest": 4.0,
+}
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+import config.app_config as app_config
+from database.key_ring import key_ring
+print(json.dumps({
+    "elapsed": elapsed,
+    "bootstrapped": app_config._bootstrapped,
+    "keys_loaded": app_config._secret_keys is not None,
+    "key_derived": key_ring._data_key is not None,
+}))
+"""
+
+
+def _probe_import(module: str) -> dict:
+    """Importe un module dans un processus neuf et retourne la mesure"""
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE, module],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Tests du démarrage de l'application"""
+
+    @pytest.mark.parametrize("module", sorted(IMPORT_TIME_BUDGETS))
+    def test_import_is_lazy_and_within_budget(self, module):
+        """L'import ne lit pas les clés, ne dérive rien et respecte son budget de temps"""
+        probe = _probe_import(module)
+
+        assert not probe["bootstrapped"]
+        assert not probe["keys_loaded"]
+        assert not probe["key_derived"]
+        assert probe["elapsed"] < IMPORT_TIME_BUDGETS[module], \
+            f"Import de {module}: {probe['elapsed']:.2f}s (budget {IMPORT_TIME_BUDGETS[module]}s)"
+
+    def test_key_verification_cached_and_raises(self, mock_cipher, monkeypatch, test_dir):
+        """Une clé incorrecte lève KeyVerificationError, et la vérification n'est faite qu'une fois"""
+        db_path = Path(test_dir) / "other_key.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE banks (id TEXT, nom TEXT)")
+        conn.execute("INSERT INTO banks VALUES ('b1', ?)",
+                     (Fernet(Fernet.generate_key()).encrypt(b"Banque").decode(),))
+        conn.commit()
+        conn.close()
+
+        monkeypatch.setattr(db_config, "_keys_verified", None)
+        with patch.object(db_config, "verify_keys_with_existing_data",
+                          wraps=db_config.verify_keys_with_existing_data) as verify:
+            with pytest.raises(KeyVerificationError):
+                db_config.ensure_keys_verified(str(db_path))
+            with pytest.raises(KeyVerificationError):
+                db_config.ensure_keys_verified(str(db_path))
+
+        verify.assert_called_once()
@@ -4,12 +4,11 @@ Interface d'analyse et visualisations
 # Imports de bibliothèques tierces
 import pandas as pd
 import streamlit as st
-from sqlalchemy import func
 
 # Imports de l'application
-from config.app_config import ASSET_CATEGORIES, GEO_ZONES
+from config.app_config import ASSET_CATEGORIES
 from database.db_config import get_db_session  # Au lieu de get_db
-from database.models import Bank, Account, Asset
+from services.portfolio_snapshot import PortfolioSnapshotService
 from services.visualization_service import VisualizationService
 from utils.session_manager import session_manager
 from utils.visualizations import get_geo_zone_display_name
@@ -30,10 +29,11 @@ def show_analysis():
 
     # Utiliser le gestionnaire de contexte pour la session DB
     with get_db_session() as db:
-        # Vérifier si l'utilisateur a des actifs
-        asset_count = db.query(Asset).filter(Asset.owner_id == user_id).count()
+        # Données déchiffrées partagées entre les pages (reconstruites si les données ont changé)
+        snapshot = PortfolioSnapshotService.get_snapshot(db, user_id)
 
-        if asset_count == 0:
+        # Vérifier si l'utilisateur a des actifs
+        if not snapshot.assets:
             st.info("Ajoutez des actifs pour voir les analyses.")
             return
 
@@ -52,7 +52,7 @@ def show_analysis():
             st.markdown("### Filtres")
 
             # Récupérer les banques de l'utilisateur
-            banks = db.query(Bank).filter(Bank.owner_id == user_id).all()
+            banks = snapshot.banks
 
             filter_bank = st.selectbox(
                 "Banque",
@@ -64,7 +64,7 @@ def show_analysis():
 
             # Comptes disponibles selon la banque sélectionnée
             if filter_bank != "Toutes":
-                bank_accounts = db.query(Account).filter(Account.bank_id == filter_bank).all()
+                bank_accounts = snapshot.get_accounts(filter_bank)
                 account_options = ["Tous"] + [acc.id for acc in bank_accounts]
                 account_format = lambda x: "Tous" if x == "Tous" else next(
                     (acc.libelle for acc in bank_accounts if acc.id == x), "")
@@ -87,41 +87,19 @@ def show_analysis():
 
         with col2:
             try:
-                # 1. Récupérer tous les actifs pertinents d'abord (sans filtres JSON)
-                assets_query = db.query(Asset).filter(Asset.owner_id == user_id)
-
-                # Appliquer les filtres non-JSON
-                if filter_bank != "Toutes":
-                    assets_query = assets_query.join(Account, Asset.account_id == Account.id)
-                    assets_query = assets_query.filter(Account.bank_id == filter_bank)
-
-                if filter_account != "Tous":
-                    assets_query = assets_query.filter(Asset.account_id == filter_account)
-
-                # Récupérer les actifs - SQLAlchemy déchiffrera les JSON automatiquement
-                assets = assets_query.all()
-
-                # 2. Filtrer en Python après déchiffrement
-                filtered_assets = []
-                total_filtered = 0.0
-
-                for asset in assets:
-                    # Appliquer filtre par catégorie si nécessaire
-                    if filter_category != "Toutes":
-                        if not asset.allocation or not isinstance(asset.allocation,
-                                                                  dict) or filter_category not in asset.allocation:
-                            continue
-
-                    # Ajouter l'actif à la liste filtrée
-                    filtered_assets.append(asset)
+                # 1. Moteur d'exposition vectorisé de l'instantané (construit une fois par révision)
+                engine = snapshot.engine
 
-                    # Calculer la valeur totale
-                    value = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
-                    if value:
-                        total_filtered += value
+                # 2. Filtres banque, compte et catégorie appliqués par masque
+                selected = engine.mask(
+                    bank_id=filter_bank if filter_bank != "Toutes" else None,
+                    account_id=filter_account if filter_account != "Tous" else None,
+                    category=filter_category if filter_category != "Toutes" else None
+                )
+                total_filtered = engine.total(selected)
 
                 # Calculer le pourcentage
-                total_all = sum(asset.value_eur or asset.valeur_actuelle or 0.0 for asset in assets)
+                total_all = engine.total()
                 percentage = (total_filtered / total_all * 100) if total_all > 0 else 0
 
                 st.markdown(
@@ -130,15 +108,10 @@ def show_analysis():
 
                 # Créer les visualisations selon le groupby sélectionné
                 if analysis_groupby == "Catégorie":
-                    # OPTIMISATION: Utiliser la fonction optimisée pour les catégories
+                    # OPTIMISATION: Produit valeurs × poids par catégorie sur les actifs sélectionnés
                     st.subheader("Répartition par catégorie d'actif")
 
-                    category_values = VisualizationService.calculate_category_values(
-                        db,
-                        user_id,
-                        account_id=filter_account if filter_account != "Tous" else None,
-                        asset_categories=ASSET_CATEGORIES
-                    )
+                    category_values = engine.category_values(selected)
 
                     # Filtrer les catégories avec des valeurs > 0
                     category_values = {k.capitalize(): v for k, v in category_values.items() if v > 0}
@@ -184,13 +157,10 @@ def show_analysis():
                         | Global/Non classé | Pour cas exceptionnels non ventilés |
                         """)
 
-                    # Calculer les valeurs par zone géographique
-                    geo_values = VisualizationService.calculate_geo_values(
-                        db,
-                        user_id,
-                        account_id=filter_account if filter_account != "Tous" else None,
-                        category=filter_category if filter_category != "Toutes" else None,
-                        geo_zones=GEO_ZONES
+                    # Calculer les valeurs par zone géographique (contraction avec le tenseur géographique)
+                    geo_values = engine.geo_values(
+                        selected,
+                        category=filter_category if filter_category != "Toutes" else None
                     )
 
                     # Filtrer les zones avec des valeurs > 0 et utiliser des noms affichables
@@ -218,52 +188,15 @@ def show_analysis():
                         st.info("Aucune donnée à afficher pour la répartition géographique.")
 
                 elif analysis_groupby == "Banque":
-                    # OPTIMISATION: Utiliser une requête d'agrégation pour les banques
+                    # OPTIMISATION: Regroupement vectorisé des actifs sélectionnés par banque
                     st.subheader("Répartition par banque")
 
-                    # Requête d'agrégation optimisée pour les banques
-                    bank_values_query = db.query(
-                        Bank.nom,
-                        func.sum(func.coalesce(Asset.value_eur, 0.0)).label('total_value')
-                    ).join(
-                        Account, Asset.account_id == Account.id
-                    ).join(
-                        Bank, Account.bank_id == Bank.id
-                    ).filter(
-                        Asset.owner_id == user_id
-                    )
-
-                    # Appliquer les mêmes filtres que la requête de base
-                    if filter_account != "Tous":
-                        bank_values_query = bank_values_query.filter(Account.id == filter_account)
-
-                    if filter_category != "Toutes":
-                        # Cette partie utilise JSON qui est problématique, on ne l'applique pas ici
-                        # Nous filtrerons manuellement après
-                        pass
-
-                    # Grouper par banque et exécuter la requête
-                    bank_values_query = bank_values_query.group_by(Bank.nom)
-                    bank_values_result = bank_values_query.all()
-
-                    # Convertir le résultat en dictionnaire pour le graphique
-                    bank_values = {row[0]: row[1] for row in bank_values_result}
-
-                    # Si un filtre de catégorie est actif, nous devons refiltrer manuellement
-                    if filter_category != "Toutes":
-                        # Calcul manuel des valeurs par banque pour la catégorie sélectionnée
-                        corrected_bank_values = {}
-                        for asset in filtered_assets:
-                            # Trouver la banque de cet actif
-                            account = next((acc for acc in assets_query.all() if acc.id == asset.account_id), None)
-                            if account:
-                                bank = next((b for b in banks if b.id == account.bank_id), None)
-                                if bank:
-                                    value = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
-                                    if bank.nom not in corrected_bank_values:
-                                        corrected_bank_values[bank.nom] = 0
-                                    corrected_bank_values[bank.nom] += value
-                        bank_values = corrected_bank_values
+                    # Valeurs par banque des actifs sélectionnés, regroupées par le moteur
+                    bank_values = {}
+                    for bank_id, value in engine.group_values("bank", selected).items():
+                        bank_name = snapshot.bank_name(bank_id)
+                        if bank_name is not None:
+                            bank_values[bank_name] = bank_values.get(bank_name, 0.0) + value
 
                     if bank_values:
                         # Créer le graphique en camembert
@@ -287,48 +220,15 @@ def show_analysis():
                         st.info("Aucune donnée à afficher pour la répartition par banque.")
 
                 elif analysis_groupby == "Compte":
-                    # OPTIMISATION: Utiliser une requête d'agrégation pour les comptes
+                    # OPTIMISATION: Regroupement vectorisé des actifs sélectionnés par compte
                     st.subheader("Répartition par compte")
 
-                    # Requête d'agrégation optimisée pour les comptes
-                    account_values_query = db.query(
-                        Account.libelle,
-                        func.sum(func.coalesce(Asset.value_eur, 0.0)).label('total_value')
-                    ).join(
-                        Asset, Asset.account_id == Account.id
-                    ).filter(
-                        Asset.owner_id == user_id
-                    )
-
-                    # Appliquer les filtres
-                    if filter_bank != "Toutes":
-                        account_values_query = account_values_query.filter(Account.bank_id == filter_bank)
-
-                    if filter_category != "Toutes":
-                        # Cette partie utilise JSON qui est problématique, on ne l'applique pas ici
-                        # Nous filtrerons manuellement après
-                        pass
-
-                    # Grouper par compte et exécuter la requête
-                    account_values_query = account_values_query.group_by(Account.libelle)
-                    account_values_result = account_values_query.all()
-
-                    # Convertir le résultat en dictionnaire pour le graphique
-                    account_values = {row[0]: row[1] for row in account_values_result}
-
-                    # Si un filtre de catégorie est actif, nous devons refiltrer manuellement
-                    if filter_category != "Toutes":
-                        # Calcul manuel des valeurs par compte pour la catégorie sélectionnée
-                        corrected_account_values = {}
-                        for asset in filtered_assets:
-                            # Trouver le compte de cet actif
-                            account = next((acc for acc in db.query(Account).all() if acc.id == asset.account_id), None)
-                            if account:
-                                value = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
-                                if account.libelle not in corrected_account_values:
-                                    corrected_account_values[account.libelle] = 0
-                                corrected_account_values[account.libelle] += value
-                        account_values = corrected_account_values
+                    # Valeurs par compte des actifs sélectionnés, regroupées par le moteur
+                    account_values = {}
+                    for account_id, value in engine.group_values("account", selected).items():
+                        account_name = snapshot.account_label(account_id)
+                        if account_name is not None:
+                            account_values[account_name] = account_values.get(account_name, 0.0) + value
 
                     if account_values:
                         # Créer le graphique en camembert
@@ -352,48 +252,14 @@ def show_analysis():
                         st.info("Aucune donnée à afficher pour la répartition par compte.")
 
                 elif analysis_groupby == "Type de produit":
-                    # OPTIMISATION: Utiliser une requête d'agrégation pour les types de produit
+                    # OPTIMISATION: Regroupement vectorisé des actifs sélectionnés par type de produit
                     st.subheader("Répartition par type de produit")
 
-                    # Requête d'agrégation optimisée pour les types de produit
-                    type_values_query = db.query(
-                        Asset.type_produit,
-                        func.sum(func.coalesce(Asset.value_eur, 0.0)).label('total_value')
-                    ).filter(
-                        Asset.owner_id == user_id
-                    )
-
-                    # Appliquer les filtres
-                    if filter_bank != "Toutes":
-                        type_values_query = type_values_query.join(Account, Asset.account_id == Account.id)
-                        type_values_query = type_values_query.filter(Account.bank_id == filter_bank)
-
-                    if filter_account != "Tous":
-                        type_values_query = type_values_query.filter(Asset.account_id == filter_account)
-
-                    if filter_category != "Toutes":
-                        # Cette partie utilise JSON qui est problématique, on ne l'applique pas ici
-                        # Nous filtrerons manuellement après
-                        pass
-
-                    # Grouper par type de produit et exécuter la requête
-                    type_values_query = type_values_query.group_by(Asset.type_produit)
-                    type_values_result = type_values_query.all()
-
-                    # Convertir le résultat en dictionnaire pour le graphique, avec type capitalisé
-                    type_values = {row[0].capitalize(): row[1] for row in type_values_result}
-
-                    # Si un filtre de catégorie est actif, nous devons refiltrer manuellement
-                    if filter_category != "Toutes":
-                        # Calcul manuel des valeurs par type pour la catégorie sélectionnée
-                        corrected_type_values = {}
-                        for asset in filtered_assets:
-                            type_name = asset.type_produit.capitalize()
-                            value = asset.value_eur if asset.value_eur is not None else asset.valeur_actuelle
-                            if type_name not in corrected_type_values:
-                                corrected_type_values[type_name] = 0
-                            corrected_type_values[type_name] += value
-                        type_values = corrected_type_values
+                    # Valeurs par type de produit des actifs sélectionnés, avec type capitalisé
+                    type_values = {}
+                    for type_produit, value in engine.group_values("type", selected).items():
+                        type_name = (type_produit or "autre").capitalize()
+                        type_values[type_name] = type_values.get(type_name, 0.0) + value
 
                     if type_values:
                         # Créer le graphique en camembert
@@ -418,7 +284,7 @@ def show_analysis():
 
                 # Évolution historique
                 st.subheader("Évolution temporelle")
-                fig = VisualizationService.create_time_series_chart(db)
+                fig = VisualizationService.create_time_series_chart(db, user_id)
                 if fig:
                     st.pyplot(fig)
                 else:
@@ -3,13 +3,11 @@
 Point d'entrée principal pour l'interface de gestion des actifs
 """
 import streamlit as st
-from sqlalchemy import func, or_
 
 # Imports de l'application
 from config.app_config import ASSET_CATEGORIES, PRODUCT_TYPES
 from database.db_config import get_db_session  # Utilisation du gestionnaire de contexte
-# Importer les modèles de base de données nécessaires
-from database.models import Asset, Bank, Account
+from services.portfolio_snapshot import PortfolioSnapshotService
 from utils.session_manager import session_manager  # Utilisation du gestionnaire de session
 from .add_form import show_add_asset_form
 from .detail_view import display_asset_details
@@ -38,26 +36,21 @@ def show_asset_management():
     # Utiliser le gestionnaire de contexte pour la session DB
     with get_db_session() as db:
         with tab1:
-            # OPTIMISATION: Ne récupérer que le nombre d'actifs d'abord
-            asset_count = db.query(func.count(Asset.id)).filter(Asset.owner_id == user_id).scalar() or 0
-            bank_count = db.query(func.count(Bank.id)).filter(Bank.owner_id == user_id).scalar() or 0
+            # Données déchiffrées partagées entre les pages (reconstruites si les données ont changé)
+            snapshot = PortfolioSnapshotService.get_snapshot(db, user_id)
 
-            if asset_count == 0:
+            if not snapshot.assets:
                 st.info("Aucun actif n'a encore été ajouté.")
             else:
-                # Interface de filtrage et affichage des actifs
-                # Au lieu de récupérer tous les actifs d'abord, on utilise une requête filtrée
-                filtered_query = build_filtered_query(db, user_id)
-
-                # Exécute la requête seulement maintenant, après tous les filtres appliqués
-                filtered_assets = filtered_query.all()
+                # Interface de filtrage, puis filtrage et tri en mémoire sur l'instantané
+                filtered_assets = build_filtered_assets(db, snapshot)
 
                 # Afficher le nombre de résultats
                 st.write(f"**{len(filtered_assets)}** actifs correspondent à vos critères")
 
                 if filtered_assets:
                     # Utiliser notre nouvelle fonction avec options de modification/suppression
-                    display_assets_table_with_actions(db, filtered_assets, user_id)
+                    display_assets_table_with_actions(db, filtered_assets, user_id, snapshot)
                 else:
                     st.info("Aucun actif ne correspond aux filtres sélectionnés.")
 
@@ -74,21 +67,20 @@ def show_asset_management():
             show_sync_options(db, user_id)
 
 
-def build_filtered_query(db, user_id):
+def build_filtered_assets(db, snapshot):
     """
-    Construit une requête filtrée pour les actifs selon les critères de l'utilisateur
+    Affiche les filtres et retourne les actifs de l'instantané correspondant aux critères de l'utilisateur
 
     Args:
         db: Session de base de données
-        user_id: ID de l'utilisateur
+        snapshot: Instantané de portefeuille de l'utilisateur
 
     Returns:
-        Requête SQLAlchemy filtrée
+        Liste des actifs filtrés et triés
     """
     # Interface de filtrage améliorée
     with st.expander("🔍 Filtres", expanded=True):
-        # Récupérer les banques une seule fois
-        banks = db.query(Bank).filter(Bank.owner_id == user_id).all()
+        banks = snapshot.banks
 
         col1, col2, col3, col4 = st.columns([1.5, 1.5, 1.5, 1])
 
@@ -103,7 +95,7 @@ def build_filtered_query(db, user_id):
 
         with col2:
             # Filtrer les comptes selon la banque sélectionnée
-            accounts = get_filtered_accounts(db, user_id, filter_bank)
+            accounts = snapshot.get_accounts(None if filter_bank == "Toutes les banques" else filter_bank)
             account_options = ["Tous les comptes"] + [acc.id for acc in accounts]
             account_format = lambda x: "Tous les comptes" if x == "Tous les comptes" else next(
                 (acc.libelle for acc in accounts if acc.id == x), "")
@@ -145,33 +137,31 @@ def build_filtered_query(db, user_id):
             )
 
     # Interface de recherche
-    search_query = st.text_input("🔎 Rechercher un actif", placeholder="Nom d'actif, ISIN, description...")
+    search_query = st.text_input("🔎 Rechercher un actif", placeholder="Nom d'actif, ISIN...")
 
-    # OPTIMISATION: Construire et exécuter une requête SQL optimisée
-    return filter_and_sort_assets(db, user_id, filter_bank, filter_account,
+    return filter_and_sort_assets(db, snapshot, filter_bank, filter_account,
                                   filter_category, filter_product_type, search_query, sort_by)
 
 
-def get_filtered_accounts(db, user_id, filter_bank):
-    """
-    Récupère les comptes filtrés par banque de manière optimisée
-    """
-    if filter_bank != "Toutes les banques":
-        # OPTIMISATION: Ajouter un index sur bank_id pour cette requête
-        return db.query(Account).filter(Account.bank_id == filter_bank).all()
-    else:
-        # OPTIMISATION: Utiliser une jointure pour récupérer seulement les comptes de l'utilisateur
-        return db.query(Account).join(Bank).filter(Bank.owner_id == user_id).all()
+def _performance(asset) -> float:
+    """Plus-value latente en pourcentage du prix de revient"""
+    if not asset.prix_de_revient or asset.prix_de_revient <= 0:
+        return 0.0
+    return (asset.valeur_actuelle - asset.prix_de_revient) / asset.prix_de_revient
 
 
-def filter_and_sort_assets(db, user_id, filter_bank, filter_account,
+def filter_and_sort_assets(db, snapshot, filter_bank, filter_account,
                            filter_category, filter_product_type, search_query, sort_by):
     """
-    Filtre et trie les actifs selon les critères spécifiés au niveau SQL
+    Filtre et trie les actifs de l'instantané selon les critères spécifiés
+
+    Nom et allocation étant chiffrés en base, filtrer et trier les lignes déjà déchiffrées
+    de l'instantané donne un tri par nom correct; la recherche par nom passe par les jetons
+    de l'index aveugle (une requête indexée).
 
     Args:
         db: Session de base de données
-        user_id: ID de l'utilisateur
+        snapshot: Instantané de portefeuille de l'utilisateur
         filter_bank: Filtre par banque
         filter_account: Filtre par compte
         filter_category: Filtre par catégorie
@@ -180,51 +170,28 @@ def filter_and_sort_assets(db, user_id, filter_bank, filter_account,
         sort_by: Critère de tri
 
     Returns:
-        Requête SQLAlchemy filtrée et triée
+        Liste des actifs filtrés et triés
     """
-    # OPTIMISATION: Eager loading pour charger les relations en une seule requête
-    query = db.query(Asset).filter(Asset.owner_id == user_id)
-
-    # OPTIMISATION: Appliquer les filtres au niveau SQL
-    if filter_bank != "Toutes les banques":
-        # Jointure optimisée au lieu de sous-requêtes
-        query = query.join(Account, Asset.account_id == Account.id)
-        query = query.filter(Account.bank_id == filter_bank)
-
-    if filter_account != "Tous les comptes":
-        query = query.filter(Asset.account_id == filter_account)
-
-    if filter_product_type != "Tous les types":
-        query = query.filter(Asset.type_produit == filter_product_type)
-
-    # OPTIMISATION: Filtrage sur JSON pour les catégories en SQLite
-    if filter_category != "Toutes les catégories":
-        # Pour SQLite, utiliser json_extract
-        query = query.filter(func.json_extract(Asset.allocation, f'$.{filter_category}').isnot(None))
-
-    # OPTIMISATION: Filtrage par recherche textuelle au niveau SQL
-    if search_query:
-        search_pattern = f"%{search_query.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Asset.nom).like(search_pattern),
-                func.lower(Asset.isin or '').like(search_pattern),
-                func.lower(Asset.notes or '').like(search_pattern)
-            )
-        )
+    assets = snapshot.filter_assets(
+        bank_id=None if filter_bank == "Toutes les banques" else filter_bank,
+        account_id=None if filter_account == "Tous les comptes" else filter_account,
+        category=None if filter_category == "Toutes les catégories" else filter_category,
+        product_type=None if filter_product_type == "Tous les types" else filter_product_type,
+        search_query=search_query or None,
+        search_ids=PortfolioSnapshotService.search_asset_ids(db, snapshot.user_id, search_query)
+    )
 
-    # OPTIMISATION: Tri au niveau SQL
     if sort_by == "Valeur ▼":
-        query = query.order_by(Asset.valeur_actuelle.desc())
+        assets.sort(key=lambda asset: asset.valeur_actuelle or 0.0, reverse=True)
     elif sort_by == "Valeur ▲":
-        query = query.order_by(Asset.valeur_actuelle)
+        assets.sort(key=lambda asset: asset.valeur_actuelle or 0.0)
     elif sort_by == "Nom A-Z":
-        query = query.order_by(func.lower(Asset.nom))
+        assets.sort(key=lambda asset: (asset.nom or "").lower())
     elif sort_by == "Nom Z-A":
-        query = query.order_by(func.lower(Asset.nom).desc())
-    # Pour le tri par performance, il faudra encore le faire en Python car c'est un calcul complexe
-    elif sort_by in ["Performance ▼", "Performance ▲"]:
-        # Ce tri sera fait en Python après récupération des résultats
-        pass
+        assets.sort(key=lambda asset: (asset.nom or "").lower(), reverse=True)
+    elif sort_by == "Performance ▼":
+        assets.sort(key=_performance, reverse=True)
+    elif sort_by == "Performance ▲":
+        assets.sort(key=_performance)
 
-    return query
\ No newline at end of file
+    return assets
@@ -10,6 +10,7 @@ from config.app_config import PRODUCT_TYPES, CURRENCIES
 from database.models import Bank, Account
 from services.asset_service import asset_service
 from services.data_service import DataService
+from services.price_service import PriceService
 from services.template_service import template_service
 from ui.components import apply_button_styling
 from ui.components.validation import display_form_errors
@@ -234,6 +235,42 @@ def show_add_asset_form(db: Session, user_id: str):
                 st.error(f"❌ Erreur inattendue: {str(e)}")
 
 
+def suggest_isin(isin_input: str) -> str:
+    """
+    Propose les ISIN du référentiel local commençant par la saisie (sans requête réseau)
+
+    Args:
+        isin_input: Code ISIN saisi, éventuellement partiel
+
+    Returns:
+        ISIN choisi parmi les suggestions, sinon la saisie
+    """
+    isin_input = (isin_input or "").strip().upper()
+    instruments = PriceService.search_instruments(isin_input)
+    if not instruments:
+        return isin_input
+
+    exact = next((instrument for instrument in instruments if instrument["isin"] == isin_input), None)
+    if exact is None:
+        selected = st.selectbox(
+            "Instruments correspondants",
+            options=[""] + [instrument["isin"] for instrument in instruments],
+            format_func=lambda isin: next(
+                (f"{i['isin']} - {i['name'] or i['symbol'] or ''}" for i in instruments if i["isin"] == isin),
+                "Sélectionner un instrument..."
+            ),
+            key="new_asset_isin_suggestion"
+        )
+        exact = next((instrument for instrument in instruments if instrument["isin"] == selected), None)
+
+    if exact is None:
+        return isin_input
+    details = [value for value in (exact["name"], exact["symbol"], exact["exchange"], exact["currency"]) if value]
+    if details:
+        st.caption(" · ".join(details))
+    return exact["isin"]
+
+
 def collect_basic_asset_info(db, user_id):
     """
     Collecte les informations de base d'un actif
@@ -258,6 +295,7 @@ def collect_basic_asset_info(db, user_id):
         asset_isin = st.text_input("Code ISIN (optionnel)",
                                    key="new_asset_isin",
                                    help="Pour les ETF, actions et obligations")
+        asset_isin = suggest_isin(asset_isin)
 
         # Champs spécifiques selon le type
         if asset_type == "metal":
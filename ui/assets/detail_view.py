@@ -6,7 +6,7 @@ import streamlit as st
 import matplotlib.pyplot as plt
 from sqlalchemy.orm import Session
 
-from database.models import Asset, Account, Bank
+from database.models import Asset, Account, Bank, asset_load_options
 from services.asset_service import asset_service
 from datetime import datetime
 
@@ -15,7 +15,7 @@ def display_asset_details(db: Session, asset_id: str):
     """
     Affiche les détails complets d'un actif
     """
-    asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    asset = db.query(Asset).options(*asset_load_options("full")).filter(Asset.id == asset_id).first()
     if not asset:
         st.error("Actif introuvable.")
         return
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 # Imports de l'application
 from config.app_config import PRODUCT_TYPES, CURRENCIES
-from database.models import Asset, Account, Bank
+from database.models import Asset, Account, Bank, asset_load_options
 from services.asset_service import asset_service
 from services.data_service import DataService
 from ui.components import apply_button_styling
@@ -25,7 +25,9 @@ def show_edit_asset_form(db: Session, asset_id: str, user_id: str):
         user_id: ID de l'utilisateur propriétaire
     """
     # Récupérer l'actif
-    asset = db.query(Asset).filter(Asset.id == asset_id, Asset.owner_id == user_id).first()
+    asset = db.query(Asset).options(*asset_load_options("full")).filter(
+        Asset.id == asset_id, Asset.owner_id == user_id
+    ).first()
 
     if not asset:
         st.error("Actif introuvable.")
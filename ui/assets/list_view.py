@@ -15,7 +15,7 @@ from services.data_service import DataService
 from utils.session_manager import session_manager  # Utilisation du gestionnaire de session
 
 
-def display_assets_table_with_actions(db: Session, assets, user_id):
+def display_assets_table_with_actions(db: Session, assets, user_id, snapshot=None):
     """
     Affiche les actifs en mode tableau avec options de modification et suppression
 
@@ -23,6 +23,7 @@ def display_assets_table_with_actions(db: Session, assets, user_id):
         db: Session de base de données
         assets: Liste des actifs à afficher
         user_id: ID de l'utilisateur
+        snapshot: Instantané de portefeuille fournissant comptes et banques (optionnel)
     """
     # Préparation des données
     data = []
@@ -32,7 +33,13 @@ def display_assets_table_with_actions(db: Session, assets, user_id):
     asset_ids = [asset.id for asset in assets]
     account_bank_map = {}
 
-    if asset_ids:
+    if snapshot is not None:
+        # Comptes et banques déjà en mémoire dans l'instantané: aucune requête
+        for asset in assets:
+            account = snapshot.accounts_by_id.get(asset.account_id)
+            bank = snapshot.banks_by_id.get(account.bank_id) if account else None
+            account_bank_map[asset.id] = (account, bank)
+    elif asset_ids:
         # Jointure optimisée pour récupérer toutes les relations en une seule requête
         account_bank_query = (
             db.query(Account, Bank, Asset.id)
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from database.models import Asset
 from services.asset_sync_service import asset_sync_service
 from services.data_service import DataService
+from services.price_service import PriceService
 
 
 def show_sync_options(db: Session, user_id: str):
@@ -40,6 +41,37 @@ def show_sync_options(db: Session, user_id: str):
     # Afficher les cartes de synchronisation
     show_sync_cards(db, user_id, isin_count, forex_count, metal_count)
 
+    # ISIN dont le symbole n'a pas pu être résolu
+    show_pending_isins(db, user_id)
+
+
+def show_pending_isins(db: Session, user_id: str):
+    """
+    Affiche les ISIN de l'utilisateur en attente de résolution du symbole et l'historique des tentatives
+    """
+    isins = [isin for (isin,) in db.query(Asset.isin).filter(
+        Asset.owner_id == user_id,
+        Asset.isin.is_not(None),
+        Asset.isin != ""
+    ).distinct()]
+    pending = PriceService.get_pending_isins(isins)
+    if not pending:
+        return
+
+    with st.expander(f"⏳ {len(pending)} ISIN en attente de résolution du symbole"):
+        st.caption("Ces ISIN ne sont pas interrogés avant la date indiquée; le délai double à chaque échec.")
+        for isin, retry_at in sorted(pending.items(), key=lambda item: item[1]):
+            st.markdown(f"**{isin}** - prochaine tentative le {retry_at:%d/%m/%Y à %H:%M}")
+            attempts = PriceService.get_resolution_attempts(isin)
+            if attempts:
+                st.table([
+                    {
+                        "Date": attempt["attempted_at"].strftime("%d/%m/%Y %H:%M"),
+                        "Résultat": attempt["symbol"] or attempt["error"] or "Échec",
+                    }
+                    for attempt in attempts
+                ])
+
 
 def show_sync_cards(db, user_id, isin_count, forex_count, metal_count):
     """
@@ -125,4 +157,22 @@ def show_sync_cards(db, user_id, isin_count, forex_count, metal_count):
                 st.success(
                     f"Synchronisation complète terminée avec succès!\n- {forex_updated} taux de change\n- {isin_updated} prix via ISIN\n- {metals_updated} métaux précieux")
             else:
-                st.info("Aucun actif mis à jour lors de la synchronisation complète.")
\ No newline at end of file
+                st.info("Aucun actif mis à jour lors de la synchronisation complète.")
+
+            pending_isins = result.get("pending_isins")
+            if pending_isins:
+                st.warning(f"{len(pending_isins)} ISIN sans symbole Yahoo Finance: nouvelle tentative différée")
+
+            plan = result.get("plan")
+            if plan:
+                st.caption(
+                    f"Plan: {plan['isin']['keys']} ISIN, {plan['metal']['keys']} métaux et "
+                    f"{plan['currency']['keys']} devises pour {plan['assets']} actifs; "
+                    f"{sum(plan[kind]['cache_hits'] for kind in ('isin', 'metal', 'currency'))} en cache, "
+                    f"{sum(plan[kind]['fetches'] for kind in ('isin', 'metal', 'currency'))} à récupérer")
+
+            timings = result.get("timings")
+            if timings:
+                st.caption(
+                    f"Récupération des données: {timings['wall_time']:.1f}s "
+                    f"(au lieu de {timings['sequential_time']:.1f}s en séquentiel)")
\ No newline at end of file
@@ -8,9 +8,10 @@ import streamlit as st
 # Imports de l'application
 from config.app_config import ACCOUNT_TYPES
 from database.db_config import get_db_session  # Utilisation du gestionnaire de contexte
-from database.models import Bank, Account, Asset
+from database.models import Bank, Account
 from services.account_service import account_service
 from services.bank_service import bank_service
+from services.portfolio_snapshot import PortfolioSnapshotService
 from utils.session_manager import session_manager  # Utilisation du gestionnaire de session
 
 
@@ -62,8 +63,10 @@ def show_banks_tab(db, user_id: str):
 
     with col2:
         st.write("Liste des banques")
-        # Obtenir toutes les banques de l'utilisateur avec le nombre de comptes en une seule requête
-        banks_with_counts = bank_service.get_banks_with_account_counts(db, user_id)
+        # Banques et nombre de comptes lus depuis l'instantané partagé entre les pages
+        snapshot = PortfolioSnapshotService.get_snapshot(db, user_id)
+        account_counts = snapshot.account_counts()
+        banks_with_counts = [(bank, account_counts.get(bank.id, 0)) for bank in snapshot.banks]
 
         if banks_with_counts:
             # Créer un DataFrame directement à partir des résultats de la requête
@@ -81,7 +84,7 @@ def show_banks_tab(db, user_id: str):
                 key="select_bank_edit"
             )
 
-            selected_bank = bank_service.get_bank(db, selected_bank_id)
+            selected_bank = snapshot.banks_by_id.get(selected_bank_id)
 
             if selected_bank:
                 show_bank_editor(db, selected_bank)
@@ -132,7 +135,7 @@ def show_add_account_form(db, user_id: str):
     st.write("Ajouter un compte")
 
     # Récupérer les banques de l'utilisateur
-    banks = bank_service.get_banks(db, user_id)
+    banks = PortfolioSnapshotService.get_snapshot(db, user_id).banks
 
     if not banks:
         st.warning("Veuillez d'abord ajouter une banque.")
@@ -170,7 +173,8 @@ def show_accounts_list(db, user_id: str):
     st.write("Liste des comptes")
 
     # Récupérer les banques de l'utilisateur
-    banks = bank_service.get_banks(db, user_id)
+    snapshot = PortfolioSnapshotService.get_snapshot(db, user_id)
+    banks = snapshot.banks
 
     if banks:
         # Filtre par banque optionnel
@@ -182,10 +186,14 @@ def show_accounts_list(db, user_id: str):
             key="filter_bank_select"
         )
 
-        # Obtenir les comptes selon le filtre - en une seule requête avec la somme des valeurs des actifs
+        # Obtenir les comptes selon le filtre avec la somme des valeurs des actifs (depuis l'instantané)
         # CORRECTION: Passage de None au lieu de "Toutes les banques" quand aucun filtre
         filter_bank_id = None if filter_bank == "Toutes les banques" else filter_bank
-        accounts_with_values = account_service.get_accounts_with_total_values(db, user_id, filter_bank_id)
+        account_values = snapshot.account_values()
+        accounts_with_values = [
+            (acc, snapshot.banks_by_id.get(acc.bank_id), account_values.get(acc.id, 0.0))
+            for acc in snapshot.get_accounts(filter_bank_id)
+        ]
 
         if accounts_with_values:
             # Créer directement un DataFrame avec les données
@@ -211,14 +219,14 @@ def show_accounts_list(db, user_id: str):
                 selected_account = next((acc for acc, _, _ in accounts_with_values if acc.id == selected_account_id), None)
 
                 if selected_account:
-                    show_account_editor(db, selected_account, banks, user_id)
+                    show_account_editor(db, selected_account, banks, snapshot)
         else:
             st.info("Aucun compte n'a encore été ajouté.")
     else:
         st.info("Aucune banque n'a encore été ajoutée.")
 
 
-def show_account_editor(db, account: Account, banks: list, user_id: str):
+def show_account_editor(db, account: Account, banks: list, snapshot):
     """Affiche l'éditeur de compte et la liste des actifs associés"""
     with st.expander("Éditer le compte", expanded=True):
         edit_account_bank = st.selectbox(
@@ -263,11 +271,8 @@ def show_account_editor(db, account: Account, banks: list, user_id: str):
                 else:
                     st.error("Impossible de supprimer ce compte car il contient des actifs.")
 
-    # Récupérer et afficher les actifs de ce compte avec tous les détails en une seule requête
-    assets_with_details = db.query(Asset).filter(
-        Asset.owner_id == user_id,
-        Asset.account_id == account.id
-    ).all()
+    # Afficher les actifs de ce compte depuis l'instantané (déjà déchiffrés)
+    assets_with_details = snapshot.filter_assets(account_id=account.id)
 
     show_account_assets(assets_with_details)
 
@@ -11,8 +11,8 @@ import streamlit as st
 
 from database.db_config import get_db_session  # Utilisation du gestionnaire de contexte
 # Imports de l'application
-from database.models import Bank, Account, Asset, HistoryPoint
-from services.visualization_service import VisualizationService
+from services.data_service import DataService
+from services.portfolio_snapshot import PortfolioSnapshotService
 from utils.session_manager import session_manager  # Utilisation du gestionnaire de session
 from utils.style_manager import style_manager
 
@@ -39,40 +39,35 @@ def show_dashboard():
 
     # Utiliser le gestionnaire de contexte pour la session DB
     with get_db_session() as db:
-        # Récupérer les données de l'utilisateur
-        assets = db.query(Asset).filter(Asset.owner_id == user_id).all()
+        # Données déchiffrées partagées entre les pages (reconstruites si les données ont changé)
+        snapshot = PortfolioSnapshotService.get_snapshot(db, user_id)
 
         # Métriques principales avec style natif de Streamlit
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            # Calculer la valeur totale correctement
-            total_value = sum(
-                asset.value_eur if asset.value_eur is not None
-                else (asset.valeur_actuelle if asset.devise == "EUR" else 0.0)
-                for asset in assets
-            )
+            total_value = snapshot.total_value
             formatted_value = f"{total_value:,.2f} €".replace(",", " ")
             st.metric(label="Valeur totale du patrimoine", value=formatted_value, delta=None, delta_color="normal")
 
         with col2:
-            asset_count = len(assets)
+            asset_count = len(snapshot.assets)
             st.metric(label="Nombre d'actifs", value=asset_count)
 
         with col3:
-            account_count = db.query(Account).join(Bank).filter(Bank.owner_id == user_id).count()
+            account_count = len(snapshot.accounts)
             st.metric(label="Nombre de comptes", value=account_count)
 
         # Graphiques principaux (si des actifs existent)
-        if assets:
+        if snapshot.assets:
             col1, col2 = st.columns(2)
 
             with col1:
                 # Répartition par catégorie
                 st.subheader("Répartition par catégorie d'actif")
 
-                # Utiliser le service de visualisation
-                category_values = VisualizationService.calculate_category_values(db, user_id)
+                # Répartition calculée sur les vecteurs d'allocation de l'instantané
+                category_values = snapshot.engine.category_values()
 
                 # Convertir les catégories en format capitalisé pour l'affichage
                 category_values_display = {k.capitalize(): v for k, v in category_values.items() if v > 0}
@@ -114,8 +109,8 @@ def show_dashboard():
                 # Répartition géographique
                 st.subheader("Répartition géographique")
 
-                # Utiliser le service de visualisation
-                geo_values = VisualizationService.calculate_geo_values(db, user_id)
+                # Répartition calculée sur les vecteurs d'allocation de l'instantané
+                geo_values = snapshot.engine.geo_values()
 
                 # Convertir les zones en format capitalisé pour l'affichage
                 geo_values_display = {k.capitalize(): v for k, v in geo_values.items() if v > 0}
@@ -154,16 +149,16 @@ def show_dashboard():
                     st.pyplot(fig)
 
             # Évolution historique si disponible
-            history_points = db.query(HistoryPoint).order_by(HistoryPoint.date).all()
+            history_points = DataService.get_history_totals(db, user_id) or []
             if len(history_points) > 1:
                 st.subheader("Évolution du patrimoine")
 
                 # Créer un DataFrame pour Streamlit
                 history_data = []
-                for point in history_points:
+                for date, total in history_points:
                     history_data.append({
-                        "Date": point.date,
-                        "Valeur": point.total
+                        "Date": date,
+                        "Valeur": total
                     })
 
                 df = pd.DataFrame(history_data)
@@ -175,14 +170,14 @@ def show_dashboard():
                 st.info("L'historique d'évolution sera disponible après plusieurs mises à jour d'actifs.")
 
             # Top 5 des actifs avec Streamlit native
-            top_assets = sorted(assets, key=lambda x: x.value_eur if x.value_eur is not None else 0.0, reverse=True)[:5]
+            top_assets = snapshot.top_assets(5)
 
             if top_assets:
                 st.subheader("Top 5 des actifs")
 
                 for asset in top_assets:
-                    account = db.query(Account).filter(Account.id == asset.account_id).first()
-                    bank = db.query(Bank).filter(Bank.id == account.bank_id).first() if account else None
+                    account_label = snapshot.account_label(asset.account_id)
+                    bank_name = snapshot.bank_name(asset.bank_id)
 
                     # Calculer la plus-value de manière standardisée
                     pv = asset.valeur_actuelle - asset.prix_de_revient
@@ -194,10 +189,10 @@ def show_dashboard():
 
                         with col1:
                             st.markdown(f"**Valeur:** {asset.valeur_actuelle:,.2f} {asset.devise}".replace(",", " "))
-                            if account:
-                                st.markdown(f"**Compte:** {account.libelle}")
-                            if bank:
-                                st.markdown(f"**Banque:** {bank.nom}")
+                            if account_label:
+                                st.markdown(f"**Compte:** {account_label}")
+                            if bank_name:
+                                st.markdown(f"**Banque:** {bank_name}")
 
                         with col2:
                             perf_color = "green" if pv >= 0 else "red"
@@ -210,20 +205,20 @@ def show_dashboard():
                                     ",", " "), unsafe_allow_html=True)
 
             # Tâches à faire - Style moderne avec Streamlit natif
-            todos = db.query(Asset).filter(Asset.owner_id == user_id).filter(Asset.todo != "").all()
+            todos = snapshot.todos(db)
             if todos:
                 st.subheader("Tâches à faire")
 
-                for i, asset in enumerate(todos):
-                    account = db.query(Account).filter(Account.id == asset.account_id).first()
+                for i, (asset, todo) in enumerate(todos):
+                    account_label = snapshot.account_label(asset.account_id)
 
                     # Utiliser le style de carte centralisé
                     st.markdown(f"""
                     <div class="todo-card">
                         <h4 class="todo-header">{asset.nom}</h4>
-                        <p class="todo-content">{asset.todo}</p>
+                        <p class="todo-content">{todo}</p>
                         <div class="todo-footer">
-                            Compte: {account.libelle if account else "Non spécifié"}
+                            Compte: {account_label or "Non spécifié"}
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
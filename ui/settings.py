@@ -7,13 +7,15 @@ from pathlib import Path  # Utiliser pathlib au lieu de os.path
 import streamlit as st
 
 from config.app_config import DATA_DIR, MAX_USERS
-from database.db_config import get_db_session  # Au lieu de get_db
+from database.db_config import get_db_session, get_decryption_cache_stats  # Au lieu de get_db
 from database.models import User, Bank, Asset
 from services.backup_service import BackupService
 # Import du service d'intégrité
 from services.integrity_service import integrity_service
 from utils.error_manager import catch_exceptions  # Ajout de ce décorateur pour gérer les exceptions
+from utils.read_cache import get_read_cache_stats
 from utils.session_manager import session_manager  # Utilisation du gestionnaire de session
+from utils.startup_metrics import get_startup_metrics
 
 
 @catch_exceptions
@@ -287,6 +289,46 @@ def show_settings():
                     except Exception as e:
                         st.error(f"Erreur lors de l'analyse complète: {str(e)}")
 
+            # Statistiques du cache de déchiffrement (aide au dimensionnement de DECRYPTION_CACHE_SIZE)
+            with st.expander("Cache de déchiffrement"):
+                cache_stats = get_decryption_cache_stats()
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Entrées", f"{cache_stats['size']} / {cache_stats['max_size']}")
+                col2.metric("Succès", cache_stats["hits"])
+                col3.metric("Échecs", cache_stats["misses"])
+                col4.metric("Évictions", cache_stats["evictions"])
+                if cache_stats["hit_rate"] is not None:
+                    st.caption(f"Taux de succès: {cache_stats['hit_rate']:.1%}")
+
+            # Taux de succès des lectures de services mémoïsées (aide au réglage de READ_CACHE_TTL)
+            with st.expander("Cache des lectures"):
+                read_stats = get_read_cache_stats()
+                if read_stats:
+                    st.table([
+                        {
+                            "Lecture": name,
+                            "Entrées": f"{stats['size']} / {stats['max_size']}",
+                            "Succès": stats["hits"],
+                            "Échecs": stats["misses"],
+                            "Expirations": stats["expirations"],
+                            "Évictions": stats["evictions"],
+                            "Lectures directes": stats["bypasses"],
+                            "Taux de succès": f"{stats['hit_rate']:.1%}" if stats["hit_rate"] is not None else "-",
+                        }
+                        for name, stats in read_stats.items()
+                    ])
+                else:
+                    st.info("Aucune lecture mémoïsée.")
+
+            # Coûts d'initialisation du processus (dérivation des clés, etc.)
+            with st.expander("Métriques de démarrage"):
+                startup_metrics = get_startup_metrics()
+                if startup_metrics:
+                    for name, seconds in sorted(startup_metrics.items()):
+                        st.markdown(f"- **{name}**: {seconds * 1000:.1f} ms")
+                else:
+                    st.info("Aucune métrique de démarrage enregistrée.")
+
             # Section pour les sauvegardes avant migration
             st.markdown("### Sauvegardes automatiques avant migration")
             st.info("""
@@ -92,7 +92,8 @@ def show_existing_templates(db, user_id: str):
             selected_template = next((t for t in templates if t.id == selected_template_id), None)
 
             if selected_template:
-                show_template_details(db, selected_template)
+                # Les modèles en cache sont détachés: rattacher une copie à la session avant modification
+                show_template_details(db, db.merge(selected_template, load=False))
 
 
 def show_template_details(db, template: Asset):
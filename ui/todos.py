@@ -9,9 +9,10 @@ import streamlit as st
 
 # Imports de l'application
 from database.db_config import get_db_session  # Au lieu de get_db
-from database.models import Bank, Account, Asset
+from database.models import Asset
 from services.asset_service import asset_service
 from services.data_service import DataService
+from services.portfolio_snapshot import PortfolioSnapshotService
 from ui.components import styled_todo_card
 from utils.session_manager import session_manager  # Utilisation du gestionnaire de session
 
@@ -35,28 +36,28 @@ def show_todos():
 
     # Utiliser le gestionnaire de contexte pour la session DB
     with get_db_session() as db:
+        # Données déchiffrées partagées entre les pages (reconstruites si les données ont changé)
+        snapshot = PortfolioSnapshotService.get_snapshot(db, user_id)
+
         # Récupérer les actifs avec des tâches
-        todos = db.query(Asset).filter(
-            Asset.owner_id == user_id,
-            Asset.todo != ""
-        ).all()
+        todos = snapshot.todos(db)
 
         # Filtrer pour exclure les tâches déjà marquées comme terminées dans cette session
-        todos = [todo for todo in todos if todo.id not in session_manager.get('completed_tasks')]
+        todos = [(asset, todo) for asset, todo in todos if asset.id not in session_manager.get('completed_tasks')]
 
         if todos:
             st.subheader(f"Liste des tâches ({len(todos)})")
 
-            for asset in todos:
+            for asset, todo in todos:
                 # Récupérer le compte et la banque associés
-                account = db.query(Account).filter(Account.id == asset.account_id).first()
-                bank = db.query(Bank).filter(Bank.id == account.bank_id).first() if account else None
+                account_label = snapshot.account_label(asset.account_id)
+                bank_name = snapshot.bank_name(asset.bank_id)
 
                 # Afficher la tâche avec la classe CSS
-                footer_text = f"{account.libelle if account else 'N/A'} - {bank.nom if bank else 'N/A'}"
+                footer_text = f"{account_label or 'N/A'} - {bank_name or 'N/A'}"
                 styled_todo_card(
                     title=asset.nom,
-                    content=asset.todo,
+                    content=todo,
                     footer=footer_text
                 )
 
@@ -87,21 +88,21 @@ def show_todos():
             st.subheader("Ajouter une tâche")
 
             # Récupérer tous les actifs pour la sélection
-            all_assets = db.query(Asset).filter(Asset.owner_id == user_id).all()
+            all_assets = snapshot.assets
 
             if all_assets:
                 # Sélectionner l'actif
                 asset_id = st.selectbox(
                     "Actif",
                     options=[a.id for a in all_assets],
-                    format_func=lambda x: next((a.nom for a in all_assets if a.id == x), "")
+                    format_func=lambda x: snapshot.assets_by_id[x].nom if x in snapshot.assets_by_id else ""
                 )
 
                 # Texte de la tâche
                 todo_text = st.text_area("Description de la tâche")
 
                 if st.button("Ajouter la tâche", disabled=not todo_text):
-                    asset = next((a for a in all_assets if a.id == asset_id), None)
+                    asset = snapshot.assets_by_id.get(asset_id)
                     if asset:
                         # Mettre à jour directement le champ todo
                         updated = db.query(Asset).filter(Asset.id == asset_id).update({"todo": todo_text})
@@ -131,14 +132,14 @@ def show_todos():
             st.subheader("Ajouter une tâche")
 
             # Récupérer tous les actifs pour la sélection
-            all_assets = db.query(Asset).filter(Asset.owner_id == user_id).all()
+            all_assets = snapshot.assets
 
             if all_assets:
                 # Sélectionner l'actif
                 asset_id = st.selectbox(
                     "Actif",
                     options=[a.id for a in all_assets],
-                    format_func=lambda x: next((a.nom for a in all_assets if a.id == x), "")
+                    format_func=lambda x: snapshot.assets_by_id[x].nom if x in snapshot.assets_by_id else ""
                 )
 
                 # Texte de la tâche
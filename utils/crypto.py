@@ -1,14 +1,45 @@
 """
 Utilitaires pour le chiffrement et déchiffrement
 """
-from sqlalchemy import TypeDecorator, String
+from contextvars import ContextVar
+from typing import Any, Dict, List
+
+from sqlalchemy import TypeDecorator, String, inspect
+from sqlalchemy.engine import Row
+from sqlalchemy.engine.result import result_tuple
+from sqlalchemy.orm import Query
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.mutable import MutableDict, MutableList
 
-from database.db_config import encrypt_data, decrypt_data, encrypt_json, decrypt_json, DataCorruptionError
+from database.db_config import (
+    encrypt_data, decrypt_data, encrypt_json, decrypt_json, DataCorruptionError,
+    decrypt_data_batch, decrypt_json_batch
+)
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Mode de déchiffrement différé, actif uniquement pendant load_decrypted()
+_batch_decryption_enabled: ContextVar[bool] = ContextVar("batch_decryption_enabled", default=False)
+
+
+class PendingDecryption:
+    """
+    Valeur chiffrée chargée en mode lot et pas encore déchiffrée
+
+    Ces objets ne sortent jamais de load_decrypted(): ils sont remplacés par
+    la valeur en clair avant que les résultats ne soient rendus à l'appelant.
+    """
+    __slots__ = ("ciphertext", "kind")
+
+    STRING = "string"
+    JSON = "json"
+
+    def __init__(self, ciphertext: str, kind: str):
+        self.ciphertext = ciphertext
+        self.kind = kind
+
+
 class EncryptedString(TypeDecorator):
     """
     Type SQLAlchemy pour stocker des chaînes chiffrées
@@ -23,6 +54,8 @@ class EncryptedString(TypeDecorator):
 
     def process_result_value(self, value, dialect):
         if value is not None:
+            if _batch_decryption_enabled.get():
+                return PendingDecryption(value, PendingDecryption.STRING)
             return decrypt_data(value)
         return value
 
@@ -40,6 +73,8 @@ class EncryptedJSON(TypeDecorator):
 
     def process_result_value(self, value, dialect):
         if value is not None:
+            if _batch_decryption_enabled.get():
+                return PendingDecryption(value, PendingDecryption.JSON)
             try:
                 return decrypt_json(value, silent_errors=True)
             except DataCorruptionError as e:
@@ -63,4 +98,131 @@ class EncryptedList(MutableList):
     def coerce(cls, key, value):
         if isinstance(value, list) and not isinstance(value, EncryptedList):
             return EncryptedList(value)
-        return value
\ No newline at end of file
+        return value
+
+
+# Cache des attributs chiffrés par mapper
+_encrypted_keys_by_mapper: Dict[Any, List[str]] = {}
+
+
+def _get_encrypted_keys(mapper) -> List[str]:
+    """Liste les attributs d'un mapper stockés avec un type chiffré"""
+    keys = _encrypted_keys_by_mapper.get(mapper)
+    if keys is None:
+        keys = [
+            prop.key for prop in mapper.column_attrs
+            if isinstance(prop.columns[0].type, (EncryptedString, EncryptedJSON))
+        ]
+        _encrypted_keys_by_mapper[mapper] = keys
+    return keys
+
+
+def _decrypt_pending(pending: List[PendingDecryption]) -> List[Any]:
+    """Déchiffre un ensemble de valeurs en attente, groupées par type"""
+    results: List[Any] = [None] * len(pending)
+
+    string_positions = [i for i, p in enumerate(pending) if p.kind == PendingDecryption.STRING]
+    json_positions = [i for i, p in enumerate(pending) if p.kind == PendingDecryption.JSON]
+
+    if string_positions:
+        decrypted = decrypt_data_batch([pending[i].ciphertext for i in string_positions])
+        for position, value in zip(string_positions, decrypted):
+            results[position] = value
+
+    if json_positions:
+        # Même comportement que EncryptedJSON.process_result_value: erreurs journalisées, dict vide
+        decrypted = decrypt_json_batch([pending[i].ciphertext for i in json_positions], silent_errors=True)
+        for position, value in zip(json_positions, decrypted):
+            results[position] = value
+
+    return results
+
+
+def _pending_attributes(session) -> List[Any]:
+    """
+    Liste les attributs des instances de la session dont la valeur est en attente de déchiffrement
+
+    Toutes les instances de la session sont parcourues afin de couvrir aussi les
+    relations chargées par jointure (joinedload) en même temps que la requête.
+    """
+    attributes = []
+    for instance in list(session.identity_map.values()):
+        state = inspect(instance)
+        for key in _get_encrypted_keys(state.mapper):
+            value = state.dict.get(key)
+            if isinstance(value, PendingDecryption):
+                attributes.append((instance, key, value))
+    return attributes
+
+
+def _resolve_pending(session, results: List[Any]) -> List[Any]:
+    """
+    Remplace les valeurs en attente par leur valeur déchiffrée
+    """
+    targets = _pending_attributes(session)
+    pending = [value for _, _, value in targets]
+
+    # Colonnes chiffrées sélectionnées individuellement (ex: query(Bank.nom))
+    row_positions = []
+    for row_index, item in enumerate(results):
+        if isinstance(item, Row):
+            for column_index, value in enumerate(item):
+                if isinstance(value, PendingDecryption):
+                    row_positions.append((row_index, column_index))
+                    pending.append(value)
+
+    if not pending:
+        return results
+
+    decrypted = _decrypt_pending(pending)
+
+    for (instance, key, _), value in zip(targets, decrypted):
+        set_committed_value(instance, key, value)
+
+    if row_positions:
+        rows = {}
+        for (row_index, column_index), value in zip(row_positions, decrypted[len(targets):]):
+            row = rows.setdefault(row_index, list(results[row_index]))
+            row[column_index] = value
+        # Lignes reconstruites avec les mêmes noms de colonnes (accès par attribut et _mapping conservés)
+        results = list(results)
+        for row_index, values in rows.items():
+            results[row_index] = result_tuple(results[row_index]._fields)(values)
+
+    return results
+
+
+def _discard_pending(session) -> None:
+    """
+    Expire les attributs restés en attente de déchiffrement (rechargés au prochain accès)
+    """
+    for instance, key, _ in _pending_attributes(session):
+        session.expire(instance, [key])
+
+
+def load_decrypted(query: Query) -> List[Any]:
+    """
+    Exécute une requête et déchiffre ses colonnes chiffrées par lots
+
+    Les valeurs chiffrées du résultat sont collectées puis déchiffrées en une seule
+    passe (parallélisée au-delà de DECRYPTION_PARALLEL_THRESHOLD), au lieu d'être
+    déchiffrées une à une pendant le chargement des lignes. Les valeurs retournées et
+    le signalement des corruptions sont identiques à query.all().
+
+    Args:
+        query: Requête SQLAlchemy à exécuter
+
+    Returns:
+        Résultats de la requête avec les valeurs déchiffrées
+    """
+    token = _batch_decryption_enabled.set(True)
+    try:
+        results = query.all()
+    except Exception:
+        # Ne jamais laisser de valeur en attente dans la session, sans déchiffrer un chargement échoué
+        _discard_pending(query.session)
+        raise
+    finally:
+        _batch_decryption_enabled.reset(token)
+
+    return _resolve_pending(query.session, results)
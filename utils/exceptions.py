@@ -25,6 +25,14 @@ class ConfigurationError(AppError):
     """Exception levée lors d'erreurs de configuration"""
 
 
+class KeyVerificationError(ConfigurationError):
+    """Exception levée lorsque les clés ne déchiffrent pas les données existantes"""
+
+
+class KeyRotationError(ConfigurationError):
+    """Exception levée lors d'erreurs de rotation de la clé de chiffrement"""
+
+
 class SyncError(AppError):
     """Exception levée lors d'erreurs de synchronisation"""
 
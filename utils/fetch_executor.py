@@ -0,0 +1,221 @@
+"""
+Exécution concurrente des requêtes réseau avec limitation de débit par hôte
+
+- TokenBucket: seau à jetons (débit moyen et rafale maximale) d'un hôte amont;
+- acquire(host): prend un jeton avant chaque requête vers cet hôte (bloquant, avec délai);
+- FetchExecutor: pool de threads exécutant des récupérations indépendantes, avec délai par
+  requête, annulation des requêtes non démarrées et arrêt au premier résultat satisfaisant.
+
+Les limites par hôte sont définies dans FETCH_RATE_LIMITS; un hôte absent n'est pas limité.
+"""
+import threading
+import time
+from concurrent.futures import CancelledError, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+from config.app_config import FETCH_MAX_WORKERS, FETCH_RATE_LIMITS, FETCH_TIMEOUT
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """
+    Seau à jetons thread-safe
+
+    Le seau se remplit de `rate` jetons par seconde jusqu'à `capacity`; chaque requête
+    consomme un jeton et attend s'il n'y en a plus.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Jetons ajoutés par seconde (débit moyen autorisé)
+            capacity: Nombre maximum de jetons (rafale autorisée)
+        """
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Prend un jeton, en attendant qu'il soit disponible
+
+        Args:
+            timeout: Attente maximale en secondes (None pour attendre indéfiniment)
+
+        Returns:
+            True si un jeton a été obtenu, False si le délai a expiré
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait_time = (1.0 - self._tokens) / self.rate if self.rate > 0 else 0.1
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+            time.sleep(wait_time)
+
+
+# Seaux par hôte amont (créés à la première requête)
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def acquire(host: str, timeout: Optional[float] = FETCH_TIMEOUT) -> None:
+    """
+    Prend un jeton du seau d'un hôte avant d'envoyer une requête
+
+    Args:
+        host: Hôte amont (clé de FETCH_RATE_LIMITS)
+        timeout: Attente maximale en secondes
+
+    Raises:
+        TimeoutError: Si aucun jeton n'est disponible dans le délai
+    """
+    limits = FETCH_RATE_LIMITS.get(host)
+    if not limits:
+        return
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(*limits)
+    if not bucket.acquire(timeout):
+        raise TimeoutError(f"Limite de débit atteinte pour {host}")
+
+
+class FetchExecutor:
+    """
+    Pool de threads pour des récupérations réseau indépendantes
+
+    Chaque tâche dispose d'un délai mesuré à partir de son démarrage: une tâche qui le
+    dépasse est rapportée en TimeoutError et son résultat ignoré (un thread ne peut pas être
+    interrompu; les délais des requêtes HTTP bornent sa durée réelle). cancel() annule les
+    tâches non démarrées; les tâches en cours peuvent consulter `cancelled` pour s'arrêter
+    avant leur requête.
+    """
+
+    def __init__(self, max_workers: int = FETCH_MAX_WORKERS, timeout: Optional[float] = FETCH_TIMEOUT):
+        """
+        Args:
+            max_workers: Nombre de requêtes simultanées
+            timeout: Délai par tâche en secondes (None pour aucun délai)
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.timeout = timeout
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Annule les tâches non démarrées de l'exécution en cours"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Indique si l'exécution en cours a été annulée"""
+        return self._cancelled.is_set()
+
+    def run(
+            self,
+            tasks: Dict[Hashable, Callable[[], Any]],
+            until: Optional[Callable[[Any], bool]] = None
+    ) -> Dict[Hashable, Any]:
+        """
+        Exécute des tâches en parallèle
+
+        Les tâches démarrent dans l'ordre du dictionnaire (les premières sont prioritaires
+        quand elles sont plus nombreuses que les threads).
+
+        Args:
+            tasks: Tâches sans argument, par clé
+            until: Critère d'arrêt: dès qu'un résultat le satisfait, les autres tâches sont
+                annulées et rapportées en CancelledError
+
+        Returns:
+            Résultat de chaque tâche par clé (l'exception levée, TimeoutError ou CancelledError en cas d'échec)
+        """
+        self._cancelled.clear()
+        if not tasks:
+            return {}
+        if self.max_workers == 1 or len(tasks) == 1:
+            results = {}
+            for key, task in tasks.items():
+                results[key] = CancelledError() if self._cancelled.is_set() else self._call(task)
+                if until is not None and until(results[key]):
+                    self.cancel()
+            return results
+
+        started: Dict[Hashable, float] = {}
+        results: Dict[Hashable, Any] = {}
+
+        def start(key, task):
+            if self._cancelled.is_set():
+                raise CancelledError()
+            started[key] = time.monotonic()
+            return task()
+
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(tasks)), thread_name_prefix="fetch")
+        try:
+            futures = {pool.submit(start, key, task): key for key, task in tasks.items()}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = self._outcome(future)
+                    if until is not None and not self._cancelled.is_set() and until(results[futures[future]]):
+                        self.cancel()
+
+                now = time.monotonic()
+                for future in list(pending):
+                    key = futures[future]
+                    if self._cancelled.is_set() and (future.cancel() or until is not None):
+                        # Tâche en cours abandonnée après un résultat satisfaisant
+                        results[key] = CancelledError()
+                        pending.discard(future)
+                    elif self.timeout is not None and key in started and now - started[key] > self.timeout:
+                        logger.warning(f"Délai dépassé ({self.timeout}s) pour la récupération {key}")
+                        results[key] = TimeoutError(f"Délai dépassé ({self.timeout}s)")
+                        pending.discard(future)
+        finally:
+            # Ne pas attendre les requêtes abandonnées
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def map(self, func: Callable[[Any], Any], items: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Applique une fonction à chaque élément en parallèle
+
+        Args:
+            func: Fonction à un argument
+            items: Éléments (doublons ignorés)
+
+        Returns:
+            Résultat par élément (l'exception levée en cas d'échec)
+        """
+        return self.run({item: (lambda item=item: func(item)) for item in dict.fromkeys(items)})
+
+    @staticmethod
+    def _call(task: Callable[[], Any]) -> Any:
+        try:
+            return task()
+        except Exception as e:
+            return e
+
+    @staticmethod
+    def _outcome(future) -> Any:
+        try:
+            return future.result()
+        except BaseException as e:
+            return e
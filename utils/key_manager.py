@@ -33,6 +33,10 @@ class KeyManager:
         self.key_file = data_dir / ".key"
         self.metadata_file = data_dir / ".key_metadata.json"
 
+        # Sels de rotation: sel en cours de déploiement et sel d'avant la dernière rotation
+        self.next_salt_file = data_dir / ".salt.next"
+        self.previous_salt_file = data_dir / ".salt.previous"
+
         # Version par défaut
         self.current_version = 1
         self.creation_date = None
@@ -168,6 +172,86 @@ class KeyManager:
         logger.info(f"Backup des clés créé: version {self.current_version}, préfixe '{prefix}'")
         return salt_backup, key_backup, metadata_backup
 
+    @staticmethod
+    def _read_optional(file_path: Path) -> Optional[bytes]:
+        """Lit un fichier de clé optionnel (None s'il n'existe pas)"""
+        if not file_path.exists():
+            return None
+        with open(file_path, "rb") as f:
+            return f.read()
+
+    def read_next_salt(self) -> Optional[bytes]:
+        """
+        Retourne le sel de la rotation en cours
+
+        Returns:
+            Sel, ou None si aucune rotation n'est en cours
+        """
+        return self._read_optional(self.next_salt_file)
+
+    def read_previous_salt(self) -> Optional[bytes]:
+        """
+        Retourne le sel utilisé avant la dernière rotation
+
+        Returns:
+            Sel, ou None si aucune rotation n'a eu lieu
+        """
+        return self._read_optional(self.previous_salt_file)
+
+    def start_rotation(self) -> bytes:
+        """
+        Démarre une rotation de la clé de chiffrement en générant un nouveau sel
+
+        La clé secrète (JWT, index aveugles) est conservée: seule la clé de chiffrement
+        des données, dérivée du sel, change. Si une rotation est déjà en cours,
+        son sel est réutilisé.
+
+        Returns:
+            Sel de la rotation
+        """
+        import secrets
+
+        next_salt = self.read_next_salt()
+        if next_salt is not None:
+            return next_salt
+
+        if not self.check_keys_exist():
+            logger.error("Impossible de démarrer une rotation: fichiers de clés manquants")
+            raise FileNotFoundError("Les fichiers de clés n'existent pas")
+
+        self.backup_keys(prefix="pre_rotation")
+        next_salt = secrets.token_bytes(16)
+        with open(self.next_salt_file, "wb") as f:
+            f.write(next_salt)
+        try:
+            os.chmod(self.next_salt_file, 0o600)
+        except Exception:
+            pass
+
+        logger.info(f"Rotation de clé démarrée depuis la version {self.current_version}")
+        return next_salt
+
+    def complete_rotation(self) -> int:
+        """
+        Termine une rotation: le nouveau sel devient le sel courant, l'ancien est conservé
+
+        L'ancien sel reste disponible en déchiffrement jusqu'à la rotation suivante,
+        pour les valeurs écrites par un processus démarré avant la rotation.
+
+        Returns:
+            Nouvelle version des clés
+        """
+        if not self.next_salt_file.exists():
+            raise FileNotFoundError("Aucune rotation de clé en cours")
+
+        shutil.copy2(self.salt_file, self.previous_salt_file)
+        os.replace(self.next_salt_file, self.salt_file)
+        version = self.increment_version()
+        self.backup_keys(prefix="post_rotation")
+
+        logger.info(f"Rotation de clé terminée: version {version}")
+        return version
+
     def update_verification_timestamp(self) -> None:
         """Met à jour le timestamp de dernière vérification"""
         metadata = self._load_or_create_metadata()
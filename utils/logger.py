@@ -9,8 +9,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any
 
 # Configuration de base par défaut - sera remplacée plus tard
-DEFAULT_LOGS_DIR = Path("logs")
-DEFAULT_LOGS_DIR.mkdir(exist_ok=True)
+DEFAULT_LOGS_DIR = Path("logs")  # Créé à la demande par setup_file_logging
 
 # Configure logging with basic settings initially
 logging.basicConfig(
@@ -198,6 +197,7 @@ def setup_file_logging(user_id: Optional[str] = None) -> Path:
     """
     # Get logs directory (use global if configured, otherwise default)
     logs_dir = DEFAULT_LOGS_DIR
+    logs_dir.mkdir(exist_ok=True)
 
     # Create log file name
     today = datetime.now().strftime("%Y-%m-%d")
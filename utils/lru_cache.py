@@ -0,0 +1,133 @@
+"""
+Cache LRU borné et thread-safe avec statistiques d'utilisation
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Valeur sentinelle permettant de mettre None en cache
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Cache clé/valeur de taille bornée avec éviction des entrées les moins récemment utilisées
+
+    Les compteurs de succès, d'échecs et d'évictions permettent de dimensionner le cache.
+    Toutes les opérations sont protégées par un verrou (utilisable depuis un pool de threads).
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Args:
+            max_size: Nombre maximum d'entrées (0 désactive le cache)
+        """
+        self.max_size = max(0, int(max_size))
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Récupère une valeur et la marque comme récemment utilisée
+
+        Args:
+            key: Clé recherchée
+            default: Valeur retournée si la clé est absente
+
+        Returns:
+            Valeur en cache ou default
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Ajoute ou remplace une valeur, en évinçant les entrées les plus anciennes si nécessaire
+
+        Args:
+            key: Clé
+            value: Valeur à mettre en cache
+        """
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retire une entrée du cache
+
+        Args:
+            key: Clé à retirer
+            default: Valeur retournée si la clé est absente
+
+        Returns:
+            Valeur retirée ou default
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def remove_if(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Retire les entrées dont la clé satisfait un prédicat
+
+        Args:
+            predicate: Fonction appelée avec chaque clé
+
+        Returns:
+            Nombre d'entrées retirées
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self, reset_stats: bool = False) -> None:
+        """
+        Vide le cache
+
+        Args:
+            reset_stats: Si True, remet aussi les compteurs à zéro
+        """
+        with self._lock:
+            self._data.clear()
+            if reset_stats:
+                self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """
+        Retourne les statistiques d'utilisation du cache
+
+        Returns:
+            Dictionnaire avec la taille, la capacité, les compteurs et le taux de succès
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else None,
+            }
@@ -0,0 +1,217 @@
+"""
+Mémoïsation des lectures de services, indexée par utilisateur et révision des données
+
+Les lectures décorées par @cached_read sont mises en cache par processus avec la clé
+(user_id, révision des données, autres arguments): la session SQLAlchemy ne fait pas partie
+de la clé. Une lecture en cache coûte la lecture de la révision (une ligne, par clé primaire);
+toute écriture validée change la révision et rend les entrées de l'utilisateur inatteignables.
+Les entrées expirent en outre après une durée de vie et sont évincées au-delà d'un nombre
+maximum (LRU); les services les invalident explicitement après leurs écritures.
+
+Les résultats sont calculés dans une session dédiée, fermée aussitôt: les objets ORM
+retournés sont détachés (attributs chargés, aucun chargement paresseux possible) et ne
+partagent jamais l'identité des objets de la session de l'appelant. Chaque appel reçoit
+une copie profonde de l'entrée en cache: les sessions et threads ne partagent aucun objet.
+Pour modifier un objet obtenu d'une lecture en cache, le rattacher d'abord avec
+db.merge(obj, load=False).
+"""
+import copy
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from config.app_config import READ_CACHE_MAX_ENTRIES, READ_CACHE_TTL
+from database.revisions import get_revision
+from utils.logger import get_logger
+from utils.lru_cache import LRUCache
+
+logger = get_logger(__name__)
+
+# Arguments exclus de la clé de cache
+_UNKEYED_ARGUMENTS = ("self", "cls", "db")
+
+
+class CachedRead:
+    """Lecture de service mémoïsée (cf. cached_read)"""
+
+    def __init__(self, func: Callable, ttl: float, max_entries: int):
+        """
+        Args:
+            func: Fonction de lecture (arguments db et user_id obligatoires)
+            ttl: Durée de vie des entrées en secondes
+            max_entries: Nombre maximum d'entrées (0 désactive le cache)
+        """
+        self.func = func
+        self.name = func.__qualname__
+        self.ttl = ttl
+        self.signature = inspect.signature(func)
+        self._cache = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.bypasses = 0
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def __call__(self, *args, **kwargs):
+        bound = self.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        db = bound.arguments.get("db")
+        user_id = bound.arguments.get("user_id")
+
+        # Session simulée ou modifications en attente: lecture directe
+        if self._cache.max_size == 0 or not isinstance(db, Session) or db.new or db.dirty or db.deleted:
+            self._count("bypasses")
+            return self.func(*args, **kwargs)
+
+        revision = get_revision(db, user_id)
+        key = (user_id, revision) + tuple(
+            _key_value(value) for name, value in bound.arguments.items()
+            if name not in _UNKEYED_ARGUMENTS and name != "user_id"
+        )
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if time.monotonic() < expires_at:
+                self._count("hits")
+                return _copy_result(value)
+            self._cache.pop(key)
+            self._count("expirations")
+
+        with Session(bind=db.get_bind()) as read_session:
+            # Révision différente: écritures non validées dans la session de l'appelant
+            if get_revision(read_session, user_id) != revision:
+                self._count("bypasses")
+                return self.func(*args, **kwargs)
+
+            self._count("misses")
+            bound.arguments["db"] = read_session
+            value = self.func(*bound.args, **bound.kwargs)
+
+        # None signale une erreur (cf. catch_exceptions): jamais mis en cache
+        if value is not None:
+            self._cache.put(key, (time.monotonic() + self.ttl, value))
+        return _copy_result(value)
+
+    def __get__(self, instance, owner):
+        """Lie la lecture aux instances de service (méthodes non statiques)"""
+        if instance is None:
+            return self
+        return functools.partial(self.__call__, instance)
+
+    def invalidate(self, user_id: Optional[str] = None) -> int:
+        """
+        Retire les entrées d'un utilisateur (toutes si user_id est None)
+
+        Args:
+            user_id: ID de l'utilisateur
+
+        Returns:
+            Nombre d'entrées retirées
+        """
+        if user_id is None:
+            count = len(self._cache)
+            self._cache.clear()
+            return count
+        return self._cache.remove_if(lambda key: key[0] == user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les statistiques de la lecture
+
+        Returns:
+            Taille, capacité, succès, échecs, expirations, évictions, lectures directes et taux de succès
+        """
+        with self._lock:
+            lookups = self.hits + self.misses + self.expirations
+            return {
+                "size": len(self._cache),
+                "max_size": self._cache.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self._cache.evictions,
+                "bypasses": self.bypasses,
+                "hit_rate": (self.hits / lookups) if lookups else None,
+            }
+
+
+# Lectures mémoïsées du processus, par nom qualifié
+_registry: Dict[str, CachedRead] = {}
+
+
+def cached_read(ttl: Optional[float] = None, max_entries: Optional[int] = None) -> Callable:
+    """
+    Décorateur de mémoïsation d'une lecture de service
+
+    La fonction décorée doit recevoir la session (db) et l'utilisateur (user_id); ses
+    autres arguments doivent être hachables (listes et ensembles sont convertis).
+    Placer le décorateur sous @staticmethod.
+
+    Args:
+        ttl: Durée de vie des entrées en secondes (READ_CACHE_TTL par défaut)
+        max_entries: Nombre maximum d'entrées (READ_CACHE_MAX_ENTRIES par défaut)
+
+    Returns:
+        Décorateur
+    """
+
+    def decorator(func: Callable) -> CachedRead:
+        parameters = inspect.signature(func).parameters
+        if "db" not in parameters or "user_id" not in parameters:
+            raise TypeError(f"{func.__qualname__}: une lecture mémoïsée doit recevoir db et user_id")
+
+        cached = CachedRead(
+            func,
+            READ_CACHE_TTL if ttl is None else ttl,
+            READ_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+        functools.update_wrapper(cached, func)
+        _registry[cached.name] = cached
+        return cached
+
+    return decorator
+
+
+def _key_value(value: Any) -> Any:
+    """Version hachable d'un argument (listes et ensembles)"""
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _copy_result(value: Any) -> Any:
+    """Copie profonde d'un résultat (objets détachés compris): l'appelant peut la modifier"""
+    return copy.deepcopy(value)
+
+
+def invalidate_cached_reads(user_id: Optional[str] = None) -> None:
+    """
+    Invalide les lectures en cache d'un utilisateur, après une écriture
+
+    Args:
+        user_id: ID de l'utilisateur (None pour tous les utilisateurs)
+    """
+    removed = sum(cached.invalidate(user_id) for cached in _registry.values())
+    if removed:
+        logger.debug(f"{removed} lectures en cache invalidées (utilisateur: {user_id or 'tous'})")
+
+
+def get_read_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Retourne les statistiques de chaque lecture mémoïsée
+
+    Returns:
+        Dictionnaire {nom qualifié de la fonction: statistiques}
+    """
+    return {name: cached.stats() for name, cached in sorted(_registry.items())}
@@ -0,0 +1,63 @@
+"""
+Mesure des coûts d'initialisation du processus (dérivation de clés, chargement, etc.)
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Generator
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_metrics: Dict[str, float] = {}
+_metrics_lock = threading.Lock()
+
+
+def record_startup_metric(name: str, seconds: float) -> None:
+    """
+    Enregistre la durée d'une étape d'initialisation
+
+    Args:
+        name: Nom de l'étape
+        seconds: Durée en secondes (cumulée si l'étape est enregistrée plusieurs fois)
+    """
+    with _metrics_lock:
+        _metrics[name] = _metrics.get(name, 0.0) + seconds
+
+
+@contextmanager
+def measure_startup(name: str) -> Generator[None, None, None]:
+    """
+    Gestionnaire de contexte mesurant la durée d'une étape d'initialisation
+
+    Args:
+        name: Nom de l'étape
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        record_startup_metric(name, elapsed)
+        logger.debug(f"Initialisation '{name}': {elapsed * 1000:.1f} ms")
+
+
+def get_startup_metrics() -> Dict[str, float]:
+    """
+    Retourne les durées d'initialisation enregistrées
+
+    Returns:
+        Dictionnaire {étape: durée en secondes}
+    """
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def log_startup_metrics() -> None:
+    """Écrit un résumé des durées d'initialisation dans les logs"""
+    metrics = get_startup_metrics()
+    if not metrics:
+        return
+    summary = ", ".join(f"{name}={seconds * 1000:.1f} ms" for name, seconds in sorted(metrics.items()))
+    logger.info(f"Métriques de démarrage: {summary}")